@@ -6,8 +6,12 @@ limited to reusable simulation engine primitives.
 
 from airspacesim.core import (
     AircraftDefinition,
+    ConflictProbe,
     EngineEvent,
     ManagerStepper,
+    RouteConflictProbe,
+    RunAccumulator,
+    RunAnalytics,
     ScenarioBundle,
     ScenarioProvider,
     SeparationMonitor,
@@ -46,8 +50,12 @@ __all__ = [
     "Aircraft",
     "AircraftDefinition",
     "AircraftManager",
+    "ConflictProbe",
     "EngineEvent",
     "ManagerStepper",
+    "RouteConflictProbe",
+    "RunAccumulator",
+    "RunAnalytics",
     "ScenarioBundle",
     "ScenarioProvider",
     "SeparationMonitor",
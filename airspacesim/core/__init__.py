@@ -1,6 +1,8 @@
 """Core simulation domain: typed models, stable interfaces, and the façade."""
 
+from airspacesim.core.analytics import RunAccumulator, RunAnalytics
 from airspacesim.core.clock import SimulationClock
+from airspacesim.core.conflict_probe import ConflictProbe
 from airspacesim.core.engine_events import EngineEvent
 from airspacesim.core.interfaces import (
     ScenarioProvider,
@@ -13,16 +15,24 @@ from airspacesim.core.models import (
     TrajectoryTrack,
     Waypoint,
 )
+from airspacesim.core.route_probe import RouteConflictProbe
+from airspacesim.core.scheduler import EventScheduler, ScheduledItem
 from airspacesim.core.separation import SeparationMonitor, SeparationStandard
 from airspacesim.core.simulation import Simulation
 from airspacesim.core.stepper import ManagerStepper
 
 __all__ = [
     "AircraftDefinition",
+    "ConflictProbe",
     "EngineEvent",
+    "EventScheduler",
     "ManagerStepper",
+    "RouteConflictProbe",
+    "RunAccumulator",
+    "RunAnalytics",
     "ScenarioBundle",
     "ScenarioProvider",
+    "ScheduledItem",
     "SeparationMonitor",
     "SeparationStandard",
     "Simulation",
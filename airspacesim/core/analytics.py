@@ -0,0 +1,274 @@
+"""Incremental run analytics computed while the simulation steps.
+
+`Simulation.summary()` reports a handful of counters; richer reporting used to
+mean reprocessing stored trajectories. Instead, `RunAnalytics` feeds every
+step, emitted engine event, and separation-monitor pair measurement to a set
+of registered accumulators. Each one does constant work per aircraft,
+violation, or measurement it is shown and keeps only its running totals, so
+a run's analytics are complete the moment it ends.
+
+Built-in accumulators (`default_accumulators`):
+
+- `distance_flown_nm`: per aircraft, ground speed integrated over time.
+- `time_in_conflict_seconds`: total and per-aircraft time in loss of
+  separation.
+- `minimum_separation`: per pair, the closest horizontal distance measured
+  while the pair was inside the vertical minimum. With kinetic pruning, pairs
+  are measured whenever they could approach the standard, so minima near or
+  below the standard are exact; pairs that stay well clear report the
+  closest sampled distance.
+- `commands_per_aircraft`: applied commands per target aircraft.
+- `flight_level_seconds`: per aircraft, time at each displayed flight level.
+- `exit_times_seconds`: simulated time each aircraft left the airspace.
+
+Custom accumulators subclass `RunAccumulator` and override only the hooks they
+need. Every method has a working default: `export_state()` returns None and
+`restore_state()` does nothing, so an accumulator that keeps no state worth
+persisting (or overrides `result()` directly) still survives
+`Simulation.save_state()`. Stateful ones override both, and state
+round-trips by accumulator name.
+"""
+
+from airspacesim.core.engine_events import AIRCRAFT_EXITED, COMMAND_APPLIED
+
+
+class RunAccumulator:
+    """Base class for one named, incrementally maintained run metric."""
+
+    name = "accumulator"
+
+    def observe_step(self, time_seconds, seconds, states, violating_pairs):
+        """Called after each step with post-step aircraft states."""
+
+    def observe_event(self, event):
+        """Called for each engine event the simulation emits itself."""
+
+    def observe_pair(self, pair, horizontal_nm, vertical_ft, time_seconds):
+        """Called for each pair the separation monitor measures."""
+
+    def result(self):
+        """JSON-serialisable value reported under `name`."""
+        return self.export_state()
+
+    def export_state(self):
+        """JSON-serialisable running state; None when there is none to keep."""
+        return None
+
+    def restore_state(self, state):
+        """Restore `export_state` output; the default keeps nothing."""
+
+
+def _overrides(accumulator, hook):
+    return getattr(type(accumulator), hook) is not getattr(RunAccumulator, hook)
+
+
+def _active(states):
+    return (state for state in states if state.get("status", "active") == "active")
+
+
+class DistanceFlown(RunAccumulator):
+    name = "distance_flown_nm"
+
+    def __init__(self):
+        self.distance_nm = {}
+
+    def observe_step(self, time_seconds, seconds, states, violating_pairs):
+        hours = seconds / 3600.0
+        distance_nm = self.distance_nm
+        for state in _active(states):
+            aircraft_id = state["id"]
+            distance_nm[aircraft_id] = (
+                distance_nm.get(aircraft_id, 0.0) + abs(state["speed_kt"]) * hours
+            )
+
+    def export_state(self):
+        return dict(self.distance_nm)
+
+    def restore_state(self, state):
+        self.distance_nm = {key: float(value) for key, value in state.items()}
+
+
+class ConflictTime(RunAccumulator):
+    name = "time_in_conflict_seconds"
+
+    def __init__(self):
+        self.total_seconds = 0.0
+        self.aircraft_seconds = {}
+
+    def observe_step(self, time_seconds, seconds, states, violating_pairs):
+        if violating_pairs:
+            self.total_seconds += seconds
+        involved = {aircraft_id for pair in violating_pairs for aircraft_id in pair}
+        for aircraft_id in involved:
+            self.aircraft_seconds[aircraft_id] = (
+                self.aircraft_seconds.get(aircraft_id, 0.0) + seconds
+            )
+
+    def export_state(self):
+        return {"total": self.total_seconds, "aircraft": dict(self.aircraft_seconds)}
+
+    def restore_state(self, state):
+        self.total_seconds = float(state["total"])
+        self.aircraft_seconds = {
+            key: float(value) for key, value in state["aircraft"].items()
+        }
+
+
+class MinimumSeparation(RunAccumulator):
+    name = "minimum_separation"
+
+    def __init__(self, vertical_minimum_ft):
+        self.vertical_minimum_ft = float(vertical_minimum_ft)
+        self.minima = {}
+
+    def observe_pair(self, pair, horizontal_nm, vertical_ft, time_seconds):
+        if vertical_ft >= self.vertical_minimum_ft:
+            return
+        key = "|".join(pair)
+        closest = self.minima.get(key)
+        if closest is None or horizontal_nm < closest["horizontal_nm"]:
+            self.minima[key] = {
+                "horizontal_nm": horizontal_nm,
+                "vertical_ft": vertical_ft,
+                "time_seconds": time_seconds,
+            }
+
+    def export_state(self):
+        return {key: dict(value) for key, value in sorted(self.minima.items())}
+
+    def restore_state(self, state):
+        self.minima = {key: dict(value) for key, value in state.items()}
+
+
+class CommandsPerAircraft(RunAccumulator):
+    name = "commands_per_aircraft"
+
+    def __init__(self):
+        self.counts = {}
+
+    def observe_event(self, event):
+        if event.type != COMMAND_APPLIED:
+            return
+        aircraft_id = event.payload.get("payload", {}).get("aircraft_id")
+        if aircraft_id is not None:
+            self.counts[aircraft_id] = self.counts.get(aircraft_id, 0) + 1
+
+    def export_state(self):
+        return dict(self.counts)
+
+    def restore_state(self, state):
+        self.counts = {key: int(value) for key, value in state.items()}
+
+
+class FlightLevelTime(RunAccumulator):
+    name = "flight_level_seconds"
+
+    def __init__(self):
+        self.seconds_at_level = {}
+
+    def observe_step(self, time_seconds, seconds, states, violating_pairs):
+        for state in _active(states):
+            levels = self.seconds_at_level.setdefault(state["id"], {})
+            level = str(state["flight_level"])
+            levels[level] = levels.get(level, 0.0) + seconds
+
+    def export_state(self):
+        return {
+            aircraft_id: dict(levels)
+            for aircraft_id, levels in self.seconds_at_level.items()
+        }
+
+    def restore_state(self, state):
+        self.seconds_at_level = {
+            aircraft_id: {level: float(value) for level, value in levels.items()}
+            for aircraft_id, levels in state.items()
+        }
+
+
+class ExitTimes(RunAccumulator):
+    name = "exit_times_seconds"
+
+    def __init__(self):
+        self.exit_times = {}
+
+    def observe_event(self, event):
+        if event.type == AIRCRAFT_EXITED:
+            self.exit_times[event.payload["aircraft_id"]] = event.time_seconds
+
+    def export_state(self):
+        return dict(self.exit_times)
+
+    def restore_state(self, state):
+        self.exit_times = {key: float(value) for key, value in state.items()}
+
+
+def default_accumulators(standard):
+    """Fresh instances of the built-in accumulators for `standard`."""
+    return [
+        DistanceFlown(),
+        ConflictTime(),
+        MinimumSeparation(standard.vertical_ft),
+        CommandsPerAircraft(),
+        FlightLevelTime(),
+        ExitTimes(),
+    ]
+
+
+class RunAnalytics:
+    """Dispatch simulation observations to registered accumulators."""
+
+    def __init__(self, accumulators=()):
+        self._accumulators = {}
+        self._step_hooks = []
+        self._event_hooks = []
+        self._pair_hooks = []
+        for accumulator in accumulators:
+            self.register(accumulator)
+
+    def register(self, accumulator):
+        """Add `accumulator`; its `name` must be unique."""
+        if accumulator.name in self._accumulators:
+            raise ValueError(f"Accumulator '{accumulator.name}' already registered")
+        self._accumulators[accumulator.name] = accumulator
+        if _overrides(accumulator, "observe_step"):
+            self._step_hooks.append(accumulator.observe_step)
+        if _overrides(accumulator, "observe_event"):
+            self._event_hooks.append(accumulator.observe_event)
+        if _overrides(accumulator, "observe_pair"):
+            self._pair_hooks.append(accumulator.observe_pair)
+        return accumulator
+
+    @property
+    def observes_pairs(self):
+        return bool(self._pair_hooks)
+
+    def observe_step(self, time_seconds, seconds, states, violating_pairs):
+        for hook in self._step_hooks:
+            hook(time_seconds, seconds, states, violating_pairs)
+
+    def observe_event(self, event):
+        for hook in self._event_hooks:
+            hook(event)
+
+    def observe_pair(self, pair, horizontal_nm, vertical_ft, time_seconds):
+        for hook in self._pair_hooks:
+            hook(pair, horizontal_nm, vertical_ft, time_seconds)
+
+    def as_dict(self):
+        return {
+            name: accumulator.result()
+            for name, accumulator in self._accumulators.items()
+        }
+
+    def export_state(self):
+        return {
+            name: accumulator.export_state()
+            for name, accumulator in self._accumulators.items()
+        }
+
+    def restore_state(self, state):
+        """Restore registered accumulators by name; others are ignored."""
+        for name, accumulator_state in state.items():
+            accumulator = self._accumulators.get(name)
+            if accumulator is not None:
+                accumulator.restore_state(accumulator_state)
@@ -0,0 +1,319 @@
+"""Short-term conflict alert: closest-point-of-approach prediction.
+
+`SeparationMonitor` reports a loss of separation once it has happened; this
+probe warns before it does. Each probe projects every active aircraft along
+its current velocity vector (ground speed along `heading_deg`, vertical rate
+clamped at the cleared level) for `look_ahead_seconds` and predicts a
+conflict when, at some time inside the window, the pair is simultaneously
+inside the horizontal AND vertical minima of the shared `SeparationStandard`.
+
+Semantics mirror the separation monitor:
+
+- One continuous prediction for the same pair is one `conflict_predicted`
+  event, followed by one `conflict_cleared` event once the pair is no longer
+  predicted to conflict (resolved, diverging, or an aircraft became inactive).
+- Pairs already in loss of separation are reported with `time_to_loss_seconds`
+  of 0 so a controller sees the alert before and during the encounter.
+
+Scaling: positions are projected onto a local flat plane (NM) and bucketed
+in a uniform grid whose cell size covers the minimum plus both aircraft's
+look-ahead travel, so only pairs in neighbouring cells are candidates.
+Candidate pairs are evaluated in one batched pass over flat per-aircraft
+arrays; the probe runs at most once per `probe_interval_seconds` of
+simulated time regardless of the engine tick size. Extrapolation is straight
+line — route turns beyond the current leg are not anticipated.
+"""
+
+import math
+
+from airspacesim.core.engine_events import (
+    CONFLICT_CLEARED,
+    CONFLICT_PREDICTED,
+    EngineEvent,
+)
+from airspacesim.core.separation import SeparationStandard
+
+NM_PER_DEGREE_LATITUDE = 60.0
+
+
+def _vertical_profile(altitude_ft, rate_fpm, target_ft, look_ahead_seconds):
+    """Piecewise-linear altitude breakpoints `[(t, ft), ...]` over the window."""
+    if rate_fpm == 0:
+        return [(0.0, altitude_ft), (look_ahead_seconds, altitude_ft)]
+    rate_fps = rate_fpm / 60.0
+    if target_ft is not None and (target_ft - altitude_ft) * rate_fps > 0:
+        level_off = (target_ft - altitude_ft) / rate_fps
+        if level_off < look_ahead_seconds:
+            return [
+                (0.0, altitude_ft),
+                (level_off, target_ft),
+                (look_ahead_seconds, target_ft),
+            ]
+    end_ft = max(0.0, altitude_ft + rate_fps * look_ahead_seconds)
+    return [(0.0, altitude_ft), (look_ahead_seconds, end_ft)]
+
+
+def _altitude_at(profile, t):
+    for (t0, a0), (t1, a1) in zip(profile, profile[1:]):
+        if t <= t1:
+            if t1 <= t0:
+                return a1
+            return a0 + (a1 - a0) * (t - t0) / (t1 - t0)
+    return profile[-1][1]
+
+
+def _first_vertical_breach(first_profile, second_profile, start, end, minimum_ft):
+    """Earliest t in [start, end] where the altitude gap is below the minimum."""
+    breakpoints = sorted(
+        {start, end}
+        | {t for t, _ in first_profile if start < t < end}
+        | {t for t, _ in second_profile if start < t < end}
+    )
+    for t0, t1 in zip(breakpoints, breakpoints[1:]):
+        d0 = _altitude_at(first_profile, t0) - _altitude_at(second_profile, t0)
+        d1 = _altitude_at(first_profile, t1) - _altitude_at(second_profile, t1)
+        if abs(d0) < minimum_ft:
+            return t0
+        # Linear gap on this piece: find where it first enters the minimum band.
+        target = minimum_ft if d0 > 0 else -minimum_ft
+        if (d0 > 0 and d1 < target) or (d0 < 0 and d1 > target):
+            return t0 + (target - d0) / (d1 - d0) * (t1 - t0)
+    if breakpoints:
+        t_last = breakpoints[-1]
+        d_last = _altitude_at(first_profile, t_last) - _altitude_at(
+            second_profile, t_last
+        )
+        if abs(d_last) < minimum_ft:
+            return t_last
+    return None
+
+
+class ConflictProbe:
+    """Predict short-term conflicts between active aircraft pairs."""
+
+    def __init__(
+        self,
+        standard=None,
+        *,
+        look_ahead_seconds=120.0,
+        probe_interval_seconds=1.0,
+    ):
+        if look_ahead_seconds <= 0:
+            raise ValueError("look_ahead_seconds must be > 0")
+        if probe_interval_seconds < 0:
+            raise ValueError("probe_interval_seconds must be >= 0")
+        self.standard = standard or SeparationStandard()
+        self.look_ahead_seconds = float(look_ahead_seconds)
+        self.probe_interval_seconds = float(probe_interval_seconds)
+        self.prediction_count = 0
+        self.candidate_pairs_evaluated = 0
+        self._last_probe_seconds = None
+        self._predicted = {}
+
+    def update(self, states, time_seconds):
+        """Probe if the interval elapsed; return predicted/cleared EngineEvents."""
+        if (
+            self._last_probe_seconds is not None
+            and time_seconds - self._last_probe_seconds < self.probe_interval_seconds
+        ):
+            return []
+        self._last_probe_seconds = time_seconds
+        current = self.probe(states)
+
+        events = []
+        for key, prediction in current.items():
+            if key in self._predicted:
+                self._predicted[key].update(prediction)
+                continue
+            self._predicted[key] = {"predicted_at_seconds": time_seconds, **prediction}
+            self.prediction_count += 1
+            events.append(
+                EngineEvent(
+                    CONFLICT_PREDICTED, time_seconds, {"pair": list(key), **prediction}
+                )
+            )
+        for key in list(self._predicted):
+            if key not in current:
+                cleared = self._predicted.pop(key)
+                events.append(
+                    EngineEvent(
+                        CONFLICT_CLEARED,
+                        time_seconds,
+                        {
+                            "pair": list(key),
+                            "predicted_at_seconds": cleared["predicted_at_seconds"],
+                        },
+                    )
+                )
+        return events
+
+    def probe(self, states):
+        """Return `{pair_key: prediction}` for every pair predicted to conflict."""
+        active = [
+            state for state in states if state.get("status", "active") == "active"
+        ]
+        if len(active) < 2:
+            return {}
+
+        look_ahead = self.look_ahead_seconds
+        horizontal_min = self.standard.horizontal_nm
+        vertical_min = self.standard.vertical_ft
+
+        # Flat per-aircraft arrays on a local equirectangular plane (NM, NM/s).
+        reference_lat = math.radians(
+            sum(float(state["position_dd"][0]) for state in active) / len(active)
+        )
+        lon_scale = NM_PER_DEGREE_LATITUDE * math.cos(reference_lat)
+        ids, xs, ys, vxs, vys, reaches, altitudes, rates, targets = (
+            [], [], [], [], [], [], [], [], []
+        )
+        for state in active:
+            speed_nm_s = float(state.get("speed_kt") or 0.0) / 3600.0
+            heading = math.radians(float(state.get("heading_deg") or 0.0))
+            target_level = state.get("target_flight_level")
+            ids.append(state["id"])
+            xs.append(float(state["position_dd"][1]) * lon_scale)
+            ys.append(float(state["position_dd"][0]) * NM_PER_DEGREE_LATITUDE)
+            vxs.append(speed_nm_s * math.sin(heading))
+            vys.append(speed_nm_s * math.cos(heading))
+            reaches.append(speed_nm_s * look_ahead)
+            altitudes.append(float(state["flight_level"]) * 100.0)
+            rates.append(float(state.get("vertical_rate_fpm") or 0.0))
+            targets.append(
+                float(target_level) * 100.0 if target_level is not None else None
+            )
+
+        first_indices, second_indices = self._candidate_pairs(
+            xs, ys, reaches, altitudes, rates, horizontal_min, vertical_min
+        )
+        self.candidate_pairs_evaluated += len(first_indices)
+
+        predictions = {}
+        profiles = {}
+        for i, j in zip(first_indices, second_indices):
+            px, py = xs[j] - xs[i], ys[j] - ys[i]
+            vx, vy = vxs[j] - vxs[i], vys[j] - vys[i]
+            closing_sq = vx * vx + vy * vy
+            if closing_sq > 0:
+                t_cpa = min(max(-(px * vx + py * vy) / closing_sq, 0.0), look_ahead)
+            else:
+                t_cpa = 0.0
+            cx, cy = px + vx * t_cpa, py + vy * t_cpa
+            cpa_horizontal = math.hypot(cx, cy)
+            if cpa_horizontal >= horizontal_min:
+                continue
+
+            # Window during which the pair is horizontally inside the minimum.
+            distance_sq = px * px + py * py
+            if closing_sq > 0:
+                b = px * vx + py * vy
+                root = math.sqrt(
+                    max(b * b - closing_sq * (distance_sq - horizontal_min**2), 0.0)
+                )
+                enter = max((-b - root) / closing_sq, 0.0)
+                leave = min((-b + root) / closing_sq, look_ahead)
+            else:
+                enter, leave = 0.0, look_ahead
+            if enter > leave:
+                continue
+
+            for index in (i, j):
+                if index not in profiles:
+                    profiles[index] = _vertical_profile(
+                        altitudes[index], rates[index], targets[index], look_ahead
+                    )
+            breach = _first_vertical_breach(
+                profiles[i], profiles[j], enter, leave, vertical_min
+            )
+            if breach is None:
+                continue
+
+            key = tuple(sorted((ids[i], ids[j])))
+            predictions[key] = {
+                "time_to_loss_seconds": round(breach, 1),
+                "time_to_cpa_seconds": round(t_cpa, 1),
+                "cpa_horizontal_nm": round(cpa_horizontal, 2),
+                "cpa_vertical_ft": round(
+                    abs(
+                        _altitude_at(profiles[i], t_cpa)
+                        - _altitude_at(profiles[j], t_cpa)
+                    ),
+                    0,
+                ),
+            }
+        return predictions
+
+    def _candidate_pairs(
+        self, xs, ys, reaches, altitudes, rates, horizontal_min, vertical_min
+    ):
+        """Index pairs that could meet inside the window (uniform-grid broad phase)."""
+        cell_size = horizontal_min + 2.0 * max(reaches)
+        cells = {}
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            cells.setdefault(
+                (math.floor(x / cell_size), math.floor(y / cell_size)), []
+            ).append(index)
+
+        vertical_reach = [abs(rate) / 60.0 * self.look_ahead_seconds for rate in rates]
+        first_indices, second_indices = [], []
+        neighbour_offsets = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+        for (cx, cy), members in cells.items():
+            for dx, dy in neighbour_offsets:
+                others = cells.get((cx + dx, cy + dy))
+                if not others:
+                    continue
+                same_cell = dx == 0 and dy == 0
+                for position, i in enumerate(members):
+                    for j in others[position + 1 :] if same_cell else others:
+                        reach = horizontal_min + reaches[i] + reaches[j]
+                        ddx, ddy = xs[j] - xs[i], ys[j] - ys[i]
+                        if ddx * ddx + ddy * ddy >= reach * reach:
+                            continue
+                        if (
+                            abs(altitudes[j] - altitudes[i])
+                            - vertical_reach[i]
+                            - vertical_reach[j]
+                            >= vertical_min
+                        ):
+                            continue
+                        first_indices.append(i)
+                        second_indices.append(j)
+        return first_indices, second_indices
+
+    def predicted_conflicts(self):
+        """Currently predicted pairs with their latest prediction."""
+        return [
+            {"pair": list(key), **prediction}
+            for key, prediction in sorted(self._predicted.items())
+        ]
+
+    def as_dict(self):
+        return {
+            "look_ahead_seconds": self.look_ahead_seconds,
+            "predicted_conflicts": self.predicted_conflicts(),
+            "conflict_prediction_count": self.prediction_count,
+        }
+
+    def export_state(self):
+        """Plain-value state for engine persistence (see `restore_state`)."""
+        return {
+            "look_ahead_seconds": self.look_ahead_seconds,
+            "probe_interval_seconds": self.probe_interval_seconds,
+            "prediction_count": self.prediction_count,
+            "candidate_pairs_evaluated": self.candidate_pairs_evaluated,
+            "last_probe_seconds": self._last_probe_seconds,
+            "predicted": [
+                [list(key), prediction] for key, prediction in self._predicted.items()
+            ],
+        }
+
+    def restore_state(self, state):
+        """Restore settings, counters, and open predictions."""
+        self.look_ahead_seconds = float(state["look_ahead_seconds"])
+        self.probe_interval_seconds = float(state["probe_interval_seconds"])
+        self.prediction_count = int(state["prediction_count"])
+        self.candidate_pairs_evaluated = int(state["candidate_pairs_evaluated"])
+        self._last_probe_seconds = state["last_probe_seconds"]
+        self._predicted = {
+            tuple(key): dict(prediction) for key, prediction in state["predicted"]
+        }
@@ -7,6 +7,10 @@ AIRCRAFT_ENTERED = "aircraft_entered"
 AIRCRAFT_EXITED = "aircraft_exited"
 SEPARATION_LOSS_STARTED = "separation_loss_started"
 SEPARATION_LOSS_ENDED = "separation_loss_ended"
+CONFLICT_PREDICTED = "conflict_predicted"
+CONFLICT_CLEARED = "conflict_cleared"
+ROUTE_CONFLICT_PREDICTED = "route_conflict_predicted"
+ROUTE_CONFLICT_CLEARED = "route_conflict_cleared"
 COMMAND_APPLIED = "command_applied"
 SIMULATION_COMPLETED = "simulation_completed"
 
@@ -0,0 +1,123 @@
+"""Versioned binary encoding for full engine state.
+
+`Simulation.save_state()` produces a self-describing blob:
+
+    b"ASIMSTATE" | uint16 format version (big endian) | zlib(JSON document)
+
+The JSON document only contains plain values, so blobs are portable across
+Python versions and safe to load from a database (no pickle). Aircraft are
+stored column-wise (field names once, one value row per aircraft) and route
+waypoint lists are interned, which keeps 1,000-aircraft states small and lets
+`load_state()` rebuild the fleet without re-running aircraft validation.
+"""
+
+import base64
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+STATE_MAGIC = b"ASIMSTATE"
+STATE_FORMAT_VERSION = 1
+_HEADER = struct.Struct(">H")
+
+
+def encode_state(document):
+    """Encode a plain-value state document into a versioned binary blob."""
+    body = json.dumps(document, separators=(",", ":"), allow_nan=False)
+    return (
+        STATE_MAGIC
+        + _HEADER.pack(STATE_FORMAT_VERSION)
+        + zlib.compress(body.encode("utf-8"), 6)
+    )
+
+
+def decode_state(blob):
+    """Decode a blob written by `encode_state`; raise ValueError if invalid."""
+    data = bytes(blob)
+    if not data.startswith(STATE_MAGIC):
+        raise ValueError("Not an AirSpaceSim engine state blob")
+    offset = len(STATE_MAGIC)
+    try:
+        (version,) = _HEADER.unpack_from(data, offset)
+    except struct.error as exc:
+        raise ValueError("Truncated engine state header") from exc
+    if version != STATE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported engine state format version {version} "
+            f"(expected {STATE_FORMAT_VERSION})"
+        )
+    try:
+        body = zlib.decompress(data[offset + _HEADER.size :])
+        return json.loads(body)
+    except (zlib.error, ValueError) as exc:
+        raise ValueError("Corrupt engine state payload") from exc
+
+
+def pack_floats(values):
+    """Encode a flat float sequence as base64 little-endian float64 text.
+
+    Used for bulky numeric arrays (e.g. projected route segments) where
+    parsing JSON number literals would dominate restore time.
+    """
+    packed = array("d", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def unpack_floats(text):
+    """Inverse of `pack_floats`; returns a list of floats."""
+    packed = array("d")
+    packed.frombytes(base64.b64decode(text))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tolist()
+
+
+def encode_fleet(aircraft_list):
+    """Column-wise aircraft attributes with interned waypoint lists."""
+    interned = {}
+    routes = []
+    attribute_maps = []
+    for aircraft in aircraft_list:
+        attributes = dict(vars(aircraft))
+        waypoints = attributes.pop("waypoints")
+        route_key = tuple(tuple(point) for point in waypoints)
+        route_index = interned.get(route_key)
+        if route_index is None:
+            route_index = interned[route_key] = len(routes)
+            routes.append(waypoints)
+        attributes["waypoints"] = route_index
+        attribute_maps.append(attributes)
+
+    fields = sorted(
+        set.intersection(*(set(attributes) for attributes in attribute_maps))
+        if attribute_maps
+        else set()
+    )
+    rows = []
+    for attributes in attribute_maps:
+        row = [attributes.pop(field) for field in fields]
+        if attributes:
+            row.append(attributes)  # attributes only some aircraft carry
+        rows.append(row)
+    return {"fields": fields, "waypoints": routes, "rows": rows}
+
+
+def decode_fleet(document, aircraft_class):
+    """Rebuild aircraft instances from `encode_fleet` output."""
+    fields = document["fields"]
+    routes = document["waypoints"]
+    width = len(fields)
+    fleet = []
+    for row in document["rows"]:
+        aircraft = aircraft_class.__new__(aircraft_class)
+        attributes = dict(zip(fields, row))
+        if len(row) > width:
+            attributes.update(row[width])
+        attributes["waypoints"] = routes[attributes["waypoints"]]
+        aircraft.__dict__.update(attributes)
+        fleet.append(aircraft)
+    return fleet
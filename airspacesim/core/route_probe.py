@@ -0,0 +1,603 @@
+"""Route-aware medium-term conflict detection.
+
+`ConflictProbe` extrapolates the current velocity vector, so it cannot see a
+conflict that only develops after an aircraft turns at its next waypoint.
+`RouteConflictProbe` instead projects each aircraft along its *remaining
+route* into time-stamped 4D segments and searches for pairs that will be
+inside both the horizontal and vertical minima at the same simulated time
+within `horizon_seconds`.
+
+Projection follows the aircraft model exactly where it is deterministic:
+
+- `route`: from the current position along `waypoints[current_index + 1:]`
+  at the current speed (legs interpolate linearly in lat/lon, as the
+  aircraft does), ending when the route ends.
+- `direct_to`: straight to the target fix, then the route from that fix.
+- `hold_entry` / `hold`: to the hold fix, then stationary there (the racetrack
+  is a few NM around the fix).
+- heading / radial / intercept modes: straight along the current heading.
+- Vertical: current rate, levelling off at `target_flight_level`.
+
+Plans are cached per aircraft in absolute simulated time and only rebuilt
+when the aircraft is invalidated (`invalidate()`, called for every applied
+command), when its speed / vertical rate / lateral mode / target changes, or
+when half the horizon has elapsed. Only the rebuilt plans are re-tested:
+pair results between two unchanged plans stay valid. Candidate segment pairs
+come from a uniform spatial grid whose cells each hold an interval tree over
+segment time spans.
+"""
+
+import math
+
+from airspacesim.core.conflict_probe import (
+    NM_PER_DEGREE_LATITUDE,
+    _first_vertical_breach,
+    _vertical_profile,
+)
+from airspacesim.core.engine_events import (
+    ROUTE_CONFLICT_CLEARED,
+    ROUTE_CONFLICT_PREDICTED,
+    EngineEvent,
+)
+from airspacesim.core.persistence import pack_floats, unpack_floats
+from airspacesim.core.separation import SeparationStandard
+from airspacesim.utils.conversions import haversine
+
+
+class IntervalTree:
+    """Static centred interval tree over `(start, end, value)` items."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, items):
+        items = list(items)
+        self.left = self.right = None
+        if not items:
+            self.center = 0.0
+            self.by_start = self.by_end = []
+            return
+        endpoints = sorted(point for start, end, _ in items for point in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+        here, left, right = [], [], []
+        for item in items:
+            if item[1] < self.center:
+                left.append(item)
+            elif item[0] > self.center:
+                right.append(item)
+            else:
+                here.append(item)
+        self.by_start = sorted(here, key=lambda item: item[0])
+        self.by_end = sorted(here, key=lambda item: item[1], reverse=True)
+        if left:
+            self.left = IntervalTree(left)
+        if right:
+            self.right = IntervalTree(right)
+
+    def overlapping(self, start, end):
+        """Values of every item whose span intersects `[start, end]`."""
+        found = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if end < node.center:
+                for item in node.by_start:
+                    if item[0] > end:
+                        break
+                    found.append(item[2])
+                if node.left is not None:
+                    stack.append(node.left)
+            elif start > node.center:
+                for item in node.by_end:
+                    if item[1] < start:
+                        break
+                    found.append(item[2])
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                found.extend(item[2] for item in node.by_start)
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+        return found
+
+
+class _Plan:
+    __slots__ = ("signature", "start_seconds", "segments", "profile", "cells")
+
+    def __init__(self, signature, start_seconds, segments, profile):
+        self.signature = signature
+        self.start_seconds = start_seconds
+        # (t0, t1, x0, y0, x1, y1) in absolute seconds and local-plane NM.
+        self.segments = segments
+        self.profile = profile
+        self.cells = set()
+
+
+def _chunks(values, size):
+    return list(zip(*(values[offset::size] for offset in range(size))))
+
+
+def _plan_signature(state):
+    # Flat plain values so signatures survive engine state persistence.
+    waypoints = state.get("waypoints") or [[None, None]]
+    return (
+        float(state.get("speed_kt") or 0.0),
+        float(state.get("vertical_rate_fpm") or 0.0),
+        state.get("target_flight_level"),
+        state.get("lateral_mode", "route"),
+        len(waypoints),
+        waypoints[0][0],
+        waypoints[0][1],
+        waypoints[-1][0],
+        waypoints[-1][1],
+        state.get("direct_to_target_index"),
+        state.get("hold_fix_id"),
+    )
+
+
+class RouteConflictProbe:
+    """Predict medium-term conflicts along each aircraft's remaining route."""
+
+    def __init__(
+        self,
+        standard=None,
+        *,
+        horizon_seconds=1200.0,
+        probe_interval_seconds=10.0,
+        cell_size_nm=20.0,
+    ):
+        if horizon_seconds <= 0:
+            raise ValueError("horizon_seconds must be > 0")
+        if probe_interval_seconds < 0:
+            raise ValueError("probe_interval_seconds must be >= 0")
+        if cell_size_nm <= 0:
+            raise ValueError("cell_size_nm must be > 0")
+        self.standard = standard or SeparationStandard()
+        self.horizon_seconds = float(horizon_seconds)
+        self.probe_interval_seconds = float(probe_interval_seconds)
+        self.cell_size_nm = float(cell_size_nm)
+        self.prediction_count = 0
+        self.plans_built = 0
+        self.segment_pairs_evaluated = 0
+        self._reference_lat = None
+        self._lon_scale = None
+        self._last_probe_seconds = None
+        self._plans = {}
+        self._dirty = set()
+        self._cells = {}
+        self._trees = {}
+        self._windows = {}
+        self._predicted = {}
+        self._index_pending = False
+
+    def invalidate(self, aircraft_id):
+        """Drop the cached plan of `aircraft_id` so the next probe rebuilds it."""
+        self._dirty.add(aircraft_id)
+
+    def update(self, states, time_seconds):
+        """Probe if the interval elapsed; return predicted/cleared EngineEvents."""
+        if (
+            self._last_probe_seconds is not None
+            and time_seconds - self._last_probe_seconds < self.probe_interval_seconds
+        ):
+            return []
+        self._last_probe_seconds = time_seconds
+        current = self.probe(states, time_seconds)
+
+        events = []
+        for key, prediction in current.items():
+            if key in self._predicted:
+                self._predicted[key].update(prediction)
+                continue
+            self._predicted[key] = {"predicted_at_seconds": time_seconds, **prediction}
+            self.prediction_count += 1
+            events.append(
+                EngineEvent(
+                    ROUTE_CONFLICT_PREDICTED,
+                    time_seconds,
+                    {"pair": list(key), **prediction},
+                )
+            )
+        for key in list(self._predicted):
+            if key not in current:
+                cleared = self._predicted.pop(key)
+                events.append(
+                    EngineEvent(
+                        ROUTE_CONFLICT_CLEARED,
+                        time_seconds,
+                        {
+                            "pair": list(key),
+                            "predicted_at_seconds": cleared["predicted_at_seconds"],
+                        },
+                    )
+                )
+        return events
+
+    def probe(self, states, time_seconds):
+        """Refresh stale plans and return `{pair_key: prediction}` for the horizon."""
+        active = {
+            state["id"]: state
+            for state in states
+            if state.get("status", "active") == "active"
+        }
+        if self._reference_lat is None and active:
+            self._reference_lat = sum(
+                float(state["position_dd"][0]) for state in active.values()
+            ) / len(active)
+            self._lon_scale = NM_PER_DEGREE_LATITUDE * math.cos(
+                math.radians(self._reference_lat)
+            )
+
+        if self._index_pending:
+            for aircraft_id, plan in self._plans.items():
+                self._index_plan(aircraft_id, plan)
+            self._index_pending = False
+
+        for aircraft_id in [known for known in self._plans if known not in active]:
+            self._drop_plan(aircraft_id)
+
+        rebuilt = []
+        for aircraft_id, state in active.items():
+            plan = self._plans.get(aircraft_id)
+            if (
+                plan is None
+                or aircraft_id in self._dirty
+                or plan.signature != _plan_signature(state)
+                or time_seconds - plan.start_seconds >= self.horizon_seconds / 2.0
+            ):
+                self._drop_plan(aircraft_id)
+                self._add_plan(aircraft_id, self._build_plan(state, time_seconds))
+                rebuilt.append(aircraft_id)
+        self._dirty = set()
+
+        self._detect(rebuilt)
+        return self._predictions(time_seconds)
+
+    # ------------------------------------------------------------ projection
+
+    def _xy(self, position):
+        return (
+            float(position[1]) * self._lon_scale,
+            float(position[0]) * NM_PER_DEGREE_LATITUDE,
+        )
+
+    def _build_plan(self, state, now):
+        self.plans_built += 1
+        horizon_end = now + self.horizon_seconds
+        speed_nm_s = max(float(state.get("speed_kt") or 0.0), 0.0) / 3600.0
+        position = [float(state["position_dd"][0]), float(state["position_dd"][1])]
+        waypoints = state.get("waypoints") or []
+        mode = state.get("lateral_mode", "route")
+
+        path = [position]
+        terminal_hold = False
+        if mode == "route":
+            path.extend(waypoints[int(state.get("current_index", 0)) + 1 :])
+        elif mode == "direct_to" and state.get("direct_to_target_index") is not None:
+            path.extend(waypoints[int(state["direct_to_target_index"]) :])
+        elif mode in {"hold_entry", "hold"} and state.get("hold_fix_position"):
+            if mode == "hold_entry":
+                path.append(state["hold_fix_position"])
+            else:
+                path = [list(state["hold_fix_position"])]
+            terminal_hold = True
+        else:
+            heading = math.radians(float(state.get("heading_deg") or 0.0))
+            reach_nm = speed_nm_s * self.horizon_seconds
+            path.append(
+                [
+                    position[0] + reach_nm * math.cos(heading) / NM_PER_DEGREE_LATITUDE,
+                    position[1] + reach_nm * math.sin(heading) / self._lon_scale,
+                ]
+            )
+
+        segments = []
+        t = now
+        for start, end in zip(path, path[1:]):
+            if t >= horizon_end:
+                break
+            distance_nm = haversine(start[0], start[1], end[0], end[1])
+            if distance_nm <= 0:
+                continue
+            if speed_nm_s <= 0:
+                break
+            duration = distance_nm / speed_nm_s
+            x0, y0 = self._xy(start)
+            x1, y1 = self._xy(end)
+            if t + duration > horizon_end:
+                fraction = (horizon_end - t) / duration
+                x1, y1 = x0 + (x1 - x0) * fraction, y0 + (y1 - y0) * fraction
+                duration = horizon_end - t
+            segments.append((t, t + duration, x0, y0, x1, y1))
+            t += duration
+        if (terminal_hold or speed_nm_s <= 0) and t < horizon_end:
+            x, y = self._xy(path[-1] if terminal_hold else position)
+            segments.append((t, horizon_end, x, y, x, y))
+
+        profile = [
+            (now + offset, altitude)
+            for offset, altitude in _vertical_profile(
+                float(state["flight_level"]) * 100.0,
+                float(state.get("vertical_rate_fpm") or 0.0),
+                (
+                    float(state["target_flight_level"]) * 100.0
+                    if state.get("target_flight_level") is not None
+                    else None
+                ),
+                self.horizon_seconds,
+            )
+        ]
+        return _Plan(_plan_signature(state), now, segments, profile)
+
+    # ---------------------------------------------------------- spatial index
+
+    def _segment_cells(self, segment):
+        pad = self.standard.horizontal_nm / 2.0
+        _, _, x0, y0, x1, y1 = segment
+        size = self.cell_size_nm
+        return [
+            (cx, cy)
+            for cx in range(
+                math.floor((min(x0, x1) - pad) / size),
+                math.floor((max(x0, x1) + pad) / size) + 1,
+            )
+            for cy in range(
+                math.floor((min(y0, y1) - pad) / size),
+                math.floor((max(y0, y1) + pad) / size) + 1,
+            )
+        ]
+
+    def _add_plan(self, aircraft_id, plan):
+        self._plans[aircraft_id] = plan
+        self._index_plan(aircraft_id, plan)
+
+    def _index_plan(self, aircraft_id, plan):
+        for index, segment in enumerate(plan.segments):
+            for cell in self._segment_cells(segment):
+                self._cells.setdefault(cell, []).append(
+                    (segment[0], segment[1], (aircraft_id, index))
+                )
+                self._trees.pop(cell, None)
+                plan.cells.add(cell)
+
+    def _drop_plan(self, aircraft_id):
+        plan = self._plans.pop(aircraft_id, None)
+        if plan is None:
+            return
+        for cell in plan.cells:
+            remaining = [
+                item for item in self._cells.get(cell, []) if item[2][0] != aircraft_id
+            ]
+            if remaining:
+                self._cells[cell] = remaining
+            else:
+                self._cells.pop(cell, None)
+            self._trees.pop(cell, None)
+        for key in [key for key in self._windows if aircraft_id in key]:
+            del self._windows[key]
+
+    def _tree(self, cell):
+        tree = self._trees.get(cell)
+        if tree is None:
+            tree = self._trees[cell] = IntervalTree(self._cells.get(cell, []))
+        return tree
+
+    # ------------------------------------------------------------- detection
+
+    def _detect(self, rebuilt):
+        checked = set()
+        for aircraft_id in rebuilt:
+            plan = self._plans[aircraft_id]
+            for index, segment in enumerate(plan.segments):
+                for cell in self._segment_cells(segment):
+                    for other_id, other_index in self._tree(cell).overlapping(
+                        segment[0], segment[1]
+                    ):
+                        if other_id == aircraft_id:
+                            continue
+                        ref = ((aircraft_id, index), (other_id, other_index))
+                        ref = ref if ref[0] < ref[1] else (ref[1], ref[0])
+                        if ref in checked:
+                            continue
+                        checked.add(ref)
+                        self._evaluate(*ref)
+
+    def _evaluate(self, first_ref, second_ref):
+        self.segment_pairs_evaluated += 1
+        first_plan = self._plans[first_ref[0]]
+        second_plan = self._plans[second_ref[0]]
+        a = first_plan.segments[first_ref[1]]
+        b = second_plan.segments[second_ref[1]]
+        start, end = max(a[0], b[0]), min(a[1], b[1])
+        if start > end:
+            return
+
+        def state_at(segment, t):
+            span = segment[1] - segment[0]
+            fraction = (t - segment[0]) / span if span > 0 else 0.0
+            return (
+                segment[2] + (segment[4] - segment[2]) * fraction,
+                segment[3] + (segment[5] - segment[3]) * fraction,
+            )
+
+        ax, ay = state_at(a, start)
+        bx, by = state_at(b, start)
+        px, py = bx - ax, by - ay
+        duration = end - start
+        if duration > 0:
+            # Relative velocity over the shared window (NM/s).
+            aex, aey = state_at(a, end)
+            bex, bey = state_at(b, end)
+            vx = ((bex - aex) - px) / duration
+            vy = ((bey - aey) - py) / duration
+        else:
+            vx = vy = 0.0
+
+        minimum = self.standard.horizontal_nm
+        closing_sq = vx * vx + vy * vy
+        b_term = px * vx + py * vy
+        distance_sq = px * px + py * py
+        if closing_sq > 0:
+            discriminant = b_term * b_term - closing_sq * (distance_sq - minimum**2)
+            if discriminant < 0:
+                return
+            root = math.sqrt(discriminant)
+            enter = max((-b_term - root) / closing_sq, 0.0)
+            leave = min((-b_term + root) / closing_sq, duration)
+            t_min = min(max(-b_term / closing_sq, 0.0), duration)
+        else:
+            if distance_sq >= minimum**2:
+                return
+            enter, leave, t_min = 0.0, duration, 0.0
+        if enter > leave:
+            return
+
+        breach = _first_vertical_breach(
+            first_plan.profile,
+            second_plan.profile,
+            start + enter,
+            start + leave,
+            self.standard.vertical_ft,
+        )
+        if breach is None:
+            return
+        key = tuple(sorted((first_ref[0], second_ref[0])))
+        self._windows.setdefault(key, []).append(
+            (
+                breach,
+                start + leave,
+                math.hypot(px + vx * t_min, py + vy * t_min),
+            )
+        )
+
+    def _predictions(self, now):
+        horizon_end = now + self.horizon_seconds
+        predictions = {}
+        for key, windows in self._windows.items():
+            live = [
+                window
+                for window in windows
+                if window[1] >= now and window[0] <= horizon_end
+            ]
+            if not live:
+                continue
+            loss_at, _, min_horizontal = min(live)
+            predictions[key] = {
+                "loss_at_seconds": round(loss_at, 1),
+                "time_to_loss_seconds": round(max(loss_at - now, 0.0), 1),
+                "min_horizontal_nm": round(min_horizontal, 2),
+            }
+        return predictions
+
+    def predicted_conflicts(self):
+        """Currently predicted pairs with their latest prediction."""
+        return [
+            {"pair": list(key), **prediction}
+            for key, prediction in sorted(self._predicted.items())
+        ]
+
+    def as_dict(self):
+        return {
+            "horizon_seconds": self.horizon_seconds,
+            "predicted_conflicts": self.predicted_conflicts(),
+            "conflict_prediction_count": self.prediction_count,
+        }
+
+    def export_state(self):
+        """Plain-value state for engine persistence (see `restore_state`)."""
+        return {
+            "horizon_seconds": self.horizon_seconds,
+            "probe_interval_seconds": self.probe_interval_seconds,
+            "cell_size_nm": self.cell_size_nm,
+            "prediction_count": self.prediction_count,
+            "plans_built": self.plans_built,
+            "segment_pairs_evaluated": self.segment_pairs_evaluated,
+            "reference_lat": self._reference_lat,
+            "last_probe_seconds": self._last_probe_seconds,
+            "dirty": sorted(self._dirty),
+            # Numeric plan data is packed into a few float64 arrays.
+            "plans": {
+                "ids": list(self._plans),
+                "signatures": [list(plan.signature) for plan in self._plans.values()],
+                "starts": [plan.start_seconds for plan in self._plans.values()],
+                "segment_counts": [len(plan.segments) for plan in self._plans.values()],
+                "segments": pack_floats(
+                    value
+                    for plan in self._plans.values()
+                    for segment in plan.segments
+                    for value in segment
+                ),
+                "profile_counts": [len(plan.profile) for plan in self._plans.values()],
+                "profiles": pack_floats(
+                    value
+                    for plan in self._plans.values()
+                    for point in plan.profile
+                    for value in point
+                ),
+            },
+            "windows": {
+                "keys": [list(key) for key in self._windows],
+                "counts": [len(windows) for windows in self._windows.values()],
+                "values": pack_floats(
+                    value
+                    for windows in self._windows.values()
+                    for window in windows
+                    for value in window
+                ),
+            },
+            "predicted": [
+                [list(key), prediction] for key, prediction in self._predicted.items()
+            ],
+        }
+
+    def restore_state(self, state):
+        """Restore cached plans, pair windows, and open predictions."""
+        self.horizon_seconds = float(state["horizon_seconds"])
+        self.probe_interval_seconds = float(state["probe_interval_seconds"])
+        self.cell_size_nm = float(state["cell_size_nm"])
+        self.prediction_count = int(state["prediction_count"])
+        self.plans_built = int(state["plans_built"])
+        self.segment_pairs_evaluated = int(state["segment_pairs_evaluated"])
+        self._reference_lat = state["reference_lat"]
+        self._lon_scale = (
+            NM_PER_DEGREE_LATITUDE * math.cos(math.radians(self._reference_lat))
+            if self._reference_lat is not None
+            else None
+        )
+        self._last_probe_seconds = state["last_probe_seconds"]
+        self._dirty = set(state["dirty"])
+        self._plans = {}
+        self._cells = {}
+        self._trees = {}
+        # The spatial index is rebuilt on the next probe, keeping restore cheap.
+        plans = state["plans"]
+        segments = _chunks(unpack_floats(plans["segments"]), 6)
+        profiles = _chunks(unpack_floats(plans["profiles"]), 2)
+        segment_offset = profile_offset = 0
+        for aircraft_id, signature, start_seconds, segment_count, profile_count in zip(
+            plans["ids"],
+            plans["signatures"],
+            plans["starts"],
+            plans["segment_counts"],
+            plans["profile_counts"],
+        ):
+            self._plans[aircraft_id] = _Plan(
+                tuple(signature),
+                start_seconds,
+                segments[segment_offset : segment_offset + segment_count],
+                profiles[profile_offset : profile_offset + profile_count],
+            )
+            segment_offset += segment_count
+            profile_offset += profile_count
+        self._index_pending = bool(self._plans)
+
+        windows = _chunks(unpack_floats(state["windows"]["values"]), 3)
+        self._windows = {}
+        offset = 0
+        for key, count in zip(state["windows"]["keys"], state["windows"]["counts"]):
+            self._windows[tuple(key)] = windows[offset : offset + count]
+            offset += count
+        self._predicted = {
+            tuple(key): dict(prediction) for key, prediction in state["predicted"]
+        }
@@ -0,0 +1,96 @@
+"""Deterministic timed-event scheduler keyed by simulated time.
+
+A binary heap ordered by `(time_seconds, sequence)`: items due at the same
+simulated instant fire in the order they were scheduled, so replaying the
+same scenario always yields the same event stream. Scheduling and draining
+are O(log n) per item regardless of how many entries are queued.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+
+
+AIRCRAFT_ENTRY = "aircraft_entry"
+SCHEDULED_COMMAND = "command"
+
+
+@dataclass(frozen=True)
+class ScheduledItem:
+    """One queued occurrence: an aircraft entry or a canonical command."""
+
+    time_seconds: float
+    sequence: int
+    kind: str
+    payload: dict = field(default_factory=dict)
+
+
+class EventScheduler:
+    """Min-heap of scheduled items with stable ordering for equal times."""
+
+    def __init__(self):
+        self._heap = []
+        self._next_sequence = 0
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def schedule(self, time_seconds, kind, payload=None):
+        """Queue `payload` to fire at simulated `time_seconds`; return the item."""
+        when = float(time_seconds)
+        if when < 0:
+            raise ValueError(f"Scheduled time must be >= 0 (got {time_seconds})")
+        item = ScheduledItem(when, self._next_sequence, kind, dict(payload or {}))
+        self._next_sequence += 1
+        heapq.heappush(self._heap, (item.time_seconds, item.sequence, item))
+        self._counts[kind] = self._counts.get(kind, 0) + 1
+        return item
+
+    def peek_time(self):
+        """Simulated time of the next item, or None when nothing is queued."""
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_due(self, now_seconds):
+        """Remove and return every item due at or before `now_seconds`, in order."""
+        due = []
+        while self._heap and self._heap[0][0] <= now_seconds:
+            item = heapq.heappop(self._heap)[2]
+            self._counts[item.kind] -= 1
+            due.append(item)
+        return due
+
+    def count(self, kind=None):
+        """Number of queued items, optionally restricted to one kind."""
+        if kind is None:
+            return len(self._heap)
+        return self._counts.get(kind, 0)
+
+    def items(self):
+        """All queued items in firing order (does not modify the queue)."""
+        return [entry[2] for entry in sorted(self._heap)]
+
+    def export_state(self):
+        """Plain-value state for engine persistence (see `restore_state`)."""
+        return {
+            "next_sequence": self._next_sequence,
+            "items": [
+                [item.time_seconds, item.sequence, item.kind, item.payload]
+                for item in self.items()
+            ],
+        }
+
+    def restore_state(self, state):
+        """Replace the queue with one produced by `export_state`."""
+        self._heap = []
+        self._counts = {}
+        for time_seconds, sequence, kind, payload in state["items"]:
+            item = ScheduledItem(float(time_seconds), int(sequence), kind, payload)
+            self._heap.append((item.time_seconds, item.sequence, item))
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+        heapq.heapify(self._heap)
+        self._next_sequence = int(state["next_sequence"])
@@ -17,8 +17,27 @@ preserved, per docs/repository-audit/03 §5):
 
 Scenario-specific Practice success criteria do NOT belong here; this is the
 general monitor (brief non-negotiable #7).
+
+Kinetic pruning: when states carry `speed_kt` and `vertical_rate_fpm`, a
+separated pair is not re-measured every tick. After each measurement the
+monitor computes the earliest simulated time the pair could possibly breach
+the standard if both aircraft closed at their current speeds and vertical
+rates (with generous allowances for route interpolation, waypoint-capture
+snapping, and flight-level rounding) and parks the pair in a heap until
+then. Commands that change an aircraft's speed, lateral path, or vertical
+rate must call `invalidate(aircraft_id)`. The emitted event stream is
+identical to the brute-force all-pairs evaluation (`kinetic=False`).
+
+`next_check_seconds()` exposes the earliest parked bound, so a caller can
+take one long step instead of many short ones without skipping a breach.
+
+`pair_observer`, when set, is called as `(pair, horizontal_nm, vertical_ft,
+time_seconds)` for every pair measured; run analytics use it to track
+minimum separation without measuring any extra pairs.
 """
 
+import heapq
+import math
 from dataclasses import dataclass
 
 from airspacesim.core.engine_events import (
@@ -60,33 +79,223 @@ def pair_measurements(first, second):
     return horizontal_nm, vertical_ft
 
 
+# Conservative allowances for the kinetic bound. Route legs are interpolated
+# linearly in lat/lon, so along-track progress in NM can map to slightly more
+# great-circle displacement; each aircraft may also snap up to the waypoint
+# capture tolerance (3 NM) onto a fix; displayed flight levels round altitude
+# to the nearest 100 ft on each aircraft.
+KINETIC_SPEED_FACTOR = 1.5
+KINETIC_SNAP_ALLOWANCE_NM = 3.0
+KINETIC_LEVEL_ROUNDING_FT = 100.0
+
+
+def _has_kinematics(state):
+    return isinstance(state.get("speed_kt"), (int, float)) and isinstance(
+        state.get("vertical_rate_fpm"), (int, float)
+    )
+
+
 class SeparationMonitor:
     """Track pairwise loss-of-separation state transitions across all aircraft."""
 
-    def __init__(self, standard=None):
+    def __init__(self, standard=None, *, kinetic=True):
         self.standard = standard or SeparationStandard()
+        self.kinetic = bool(kinetic)
         self.loss_event_count = 0
+        self.pair_checks = 0
         self._violating = {}
+        self._queue = []
+        self._epochs = {}
+        self._kinematics = {}
+        self._dirty = set()
+        # Whether the last update parked every separated pair in the queue.
+        self._pruned = False
+        self.pair_observer = None
+
+    def invalidate(self, aircraft_id):
+        """Forget cached breach bounds for every pair involving `aircraft_id`."""
+        self._dirty.add(aircraft_id)
+
+    def earliest_breach_seconds(self, first, second, horizontal_nm, vertical_ft):
+        """Lower bound on simulated seconds before the pair could lose separation.
+
+        A loss needs horizontal AND vertical below minima, so the bound is the
+        later of the two per-axis bounds. Returns `math.inf` when the pair can
+        never breach at current speeds/rates.
+        """
+        closing_nm_per_second = (
+            (abs(float(first["speed_kt"])) + abs(float(second["speed_kt"])))
+            * KINETIC_SPEED_FACTOR
+            / 3600.0
+        )
+        horizontal_gap = (
+            horizontal_nm
+            - self.standard.horizontal_nm
+            - 2 * KINETIC_SNAP_ALLOWANCE_NM
+        )
+        if horizontal_gap <= 0:
+            horizontal_seconds = 0.0
+        elif closing_nm_per_second <= 0:
+            horizontal_seconds = math.inf
+        else:
+            horizontal_seconds = horizontal_gap / closing_nm_per_second
+
+        closing_ft_per_second = (
+            abs(float(first["vertical_rate_fpm"]))
+            + abs(float(second["vertical_rate_fpm"]))
+        ) / 60.0
+        if closing_ft_per_second <= 0:
+            vertical_seconds = (
+                math.inf if vertical_ft >= self.standard.vertical_ft else 0.0
+            )
+        else:
+            vertical_gap = (
+                vertical_ft
+                - self.standard.vertical_ft
+                - 2 * KINETIC_LEVEL_ROUNDING_FT
+            )
+            vertical_seconds = max(vertical_gap, 0.0) / closing_ft_per_second
+
+        return max(horizontal_seconds, vertical_seconds)
+
+    def next_check_seconds(self, kinematics):
+        """Simulated time before which no active pair can lose separation.
+
+        `kinematics` maps each active aircraft id to its current `(speed_kt,
+        vertical_rate_fpm)`. Returns None when no bound is known: the last
+        update did not prune, a pair is in violation, or an aircraft entered,
+        was invalidated, or changed speed or vertical rate since. Returns
+        `math.inf` when no pair can ever breach.
+        """
+        if (
+            not self._pruned
+            or self._violating
+            or self._dirty
+            or kinematics != self._kinematics
+        ):
+            return None
+        # Stale entries only make the bound earlier.
+        return self._queue[0][0] if self._queue else math.inf
 
     def update(self, states, time_seconds):
-        """Evaluate all active pairs; return started/ended EngineEvents."""
-        events = []
+        """Evaluate active pairs; return started/ended EngineEvents."""
         active = [
             state for state in states if state.get("status", "active") == "active"
         ]
+        if self.kinetic and all(_has_kinematics(state) for state in active):
+            current = self._kinetic_violations(active, time_seconds)
+        else:
+            current = self._brute_force_violations(active, time_seconds)
+        return self._transition(current, time_seconds)
 
+    def _brute_force_violations(self, active, time_seconds):
+        # Pruning state is meaningless once a tick is evaluated without it.
+        self._queue = []
+        self._kinematics = {}
+        self._dirty = set()
+        self._pruned = False
         current = {}
         for i in range(len(active)):
             for j in range(i + 1, len(active)):
                 first, second = active[i], active[j]
+                self.pair_checks += 1
                 horizontal_nm, vertical_ft = pair_measurements(first, second)
-                if not self.standard.is_separated(horizontal_nm, vertical_ft):
+                separated = self.standard.is_separated(horizontal_nm, vertical_ft)
+                if not separated or self.pair_observer is not None:
                     key = tuple(sorted((first["id"], second["id"])))
+                if self.pair_observer is not None:
+                    self.pair_observer(key, horizontal_nm, vertical_ft, time_seconds)
+                if not separated:
                     current[key] = {
                         "horizontal_nm": horizontal_nm,
                         "vertical_ft": vertical_ft,
                     }
+        return current
+
+    def _kinetic_violations(self, active, time_seconds):
+        index = {state["id"]: position for position, state in enumerate(active)}
 
+        # Aircraft that just became active, were invalidated by a command, or
+        # whose speed/vertical rate changed get a new epoch: bounds queued
+        # under the old epoch are stale.
+        kinematics = {
+            state["id"]: (float(state["speed_kt"]), float(state["vertical_rate_fpm"]))
+            for state in active
+        }
+        refreshed = {
+            aircraft_id
+            for aircraft_id, values in kinematics.items()
+            if aircraft_id in self._dirty or self._kinematics.get(aircraft_id) != values
+        }
+        self._kinematics = kinematics
+        self._dirty = set()
+        self._pruned = True
+        if len(self._queue) > 2 * len(index) * len(index) + 64:
+            self._compact_queue(index)
+        due_keys = set()
+        for aircraft_id in refreshed:
+            self._epochs[aircraft_id] = self._epochs.get(aircraft_id, 0) + 1
+            for other_id in index:
+                if other_id != aircraft_id:
+                    due_keys.add(tuple(sorted((aircraft_id, other_id))))
+
+        while self._queue and self._queue[0][0] <= time_seconds:
+            _, key, epochs = heapq.heappop(self._queue)
+            if key[0] not in index or key[1] not in index:
+                continue
+            if epochs != (self._epochs[key[0]], self._epochs[key[1]]):
+                continue
+            due_keys.add(key)
+        due_keys.update(
+            key for key in self._violating if key[0] in index and key[1] in index
+        )
+
+        found = []
+        for key in due_keys:
+            first_index, second_index = sorted((index[key[0]], index[key[1]]))
+            first, second = active[first_index], active[second_index]
+            self.pair_checks += 1
+            horizontal_nm, vertical_ft = pair_measurements(first, second)
+            if self.pair_observer is not None:
+                self.pair_observer(key, horizontal_nm, vertical_ft, time_seconds)
+            if not self.standard.is_separated(horizontal_nm, vertical_ft):
+                found.append(
+                    (
+                        first_index,
+                        second_index,
+                        key,
+                        {"horizontal_nm": horizontal_nm, "vertical_ft": vertical_ft},
+                    )
+                )
+                continue
+            breach_seconds = self.earliest_breach_seconds(
+                first, second, horizontal_nm, vertical_ft
+            )
+            if math.isinf(breach_seconds):
+                due_at = math.inf
+            else:
+                due_at = time_seconds + breach_seconds
+            heapq.heappush(
+                self._queue,
+                (due_at, key, (self._epochs[key[0]], self._epochs[key[1]])),
+            )
+
+        # Same insertion order as the all-pairs (i, j) scan.
+        found.sort(key=lambda item: (item[0], item[1]))
+        return {key: measurements for _, _, key, measurements in found}
+
+    def _compact_queue(self, index):
+        self._queue = [
+            entry
+            for entry in self._queue
+            if entry[1][0] in index
+            and entry[1][1] in index
+            and entry[2] == (self._epochs[entry[1][0]], self._epochs[entry[1][1]])
+        ]
+        heapq.heapify(self._queue)
+
+    def _transition(self, current, time_seconds):
+        events = []
         for key, measurements in current.items():
             if key in self._violating:
                 self._violating[key].update(measurements)
@@ -119,6 +328,10 @@ class SeparationMonitor:
                 )
         return events
 
+    def violating_pairs(self):
+        """Keys of the currently violating pairs."""
+        return list(self._violating)
+
     def active_violations(self):
         """Currently violating pairs with their latest measurements."""
         return [
@@ -137,3 +350,33 @@ class SeparationMonitor:
             "active_violations": self.active_violations(),
             "loss_of_separation_count": self.loss_event_count,
         }
+
+    def export_state(self):
+        """Plain-value state for engine persistence (see `restore_state`).
+
+        Kinetic pruning caches are not persisted: a restored monitor re-measures
+        every pair on its first update, which yields the same events.
+        """
+        return {
+            "kinetic": self.kinetic,
+            "loss_event_count": self.loss_event_count,
+            "pair_checks": self.pair_checks,
+            # Insertion order matters: ended events are emitted in this order.
+            "violating": [
+                [list(key), violation] for key, violation in self._violating.items()
+            ],
+        }
+
+    def restore_state(self, state):
+        """Restore counters and active violations from `export_state` output."""
+        self.kinetic = bool(state["kinetic"])
+        self.loss_event_count = int(state["loss_event_count"])
+        self.pair_checks = int(state["pair_checks"])
+        self._violating = {
+            tuple(key): dict(violation) for key, violation in state["violating"]
+        }
+        self._queue = []
+        self._epochs = {}
+        self._kinematics = {}
+        self._dirty = set()
+        self._pruned = False
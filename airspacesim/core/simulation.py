@@ -1,24 +1,33 @@
 """Deterministic simulation façade.
 
-`Simulation` owns simulated time, scheduled aircraft entry, command
-application, general separation monitoring, serialisable snapshots, and the
-emitted engine-event stream. It never sleeps, never spawns threads, and
-never writes files — embedding applications decide pacing and persistence.
+`Simulation` owns simulated time, scheduled aircraft entry and scripted
+commands, command application, general separation monitoring, short- and
+medium-term conflict prediction, incremental run analytics, serialisable
+snapshots, and the emitted engine-event stream. It never sleeps, never
+spawns threads, and never writes files — embedding applications decide
+pacing and persistence.
 
 Typical use::
 
     simulation = Simulation.from_contracts(scenario_airspace, scenario_aircraft)
-    simulation.issue_command({"event_id": "c1", "type": "SET_FL",
-                              "payload": {"aircraft_id": "NVR231", "flight_level": 310}})
+    simulation.issue_command({
+        "event_id": "c1",
+        "type": "SET_FL",
+        "payload": {"aircraft_id": "NVR231", "flight_level": 310},
+    })
     simulation.step(seconds=1.0)          # simulated seconds
     snapshot = simulation.snapshot()
     events = simulation.drain_events()
 """
 
+import hashlib
+import json
 import threading
 from datetime import datetime, timezone
 
+from airspacesim.core.analytics import RunAnalytics, default_accumulators
 from airspacesim.core.clock import SimulationClock
+from airspacesim.core.conflict_probe import ConflictProbe
 from airspacesim.core.engine_events import (
     AIRCRAFT_ENTERED,
     AIRCRAFT_EXITED,
@@ -26,7 +35,20 @@ from airspacesim.core.engine_events import (
     SIMULATION_COMPLETED,
     EngineEvent,
 )
+from airspacesim.core.persistence import (
+    decode_fleet,
+    decode_state,
+    encode_fleet,
+    encode_state,
+)
+from airspacesim.core.route_probe import RouteConflictProbe
+from airspacesim.core.scheduler import (
+    AIRCRAFT_ENTRY,
+    SCHEDULED_COMMAND,
+    EventScheduler,
+)
 from airspacesim.core.separation import SeparationMonitor, SeparationStandard
+from airspacesim.simulation.aircraft import Aircraft
 from airspacesim.simulation.aircraft_manager import AircraftManager
 from airspacesim.simulation.events import apply_events_idempotent
 
@@ -40,13 +62,28 @@ def _entry_time_seconds(item):
     return float(value or 0)
 
 
+def _command_time_seconds(command):
+    return float(command.get("time_seconds", command.get("at_seconds", 0)) or 0)
+
+
 class Simulation:
     """One deterministic simulation over a batched AircraftManager fleet."""
 
     STATUS_ACTIVE = "active"
     STATUS_COMPLETED = "completed"
 
-    def __init__(self, manager, *, pending_entries=None, standard=None, clock=None):
+    def __init__(
+        self,
+        manager,
+        *,
+        pending_entries=None,
+        scheduled_commands=None,
+        standard=None,
+        clock=None,
+        conflict_probe=None,
+        route_probe=None,
+        analytics=None,
+    ):
         if manager.execution_mode != "batched":
             raise ValueError(
                 "Simulation requires an AircraftManager in 'batched' execution mode"
@@ -55,11 +92,22 @@ class Simulation:
         self.manager = manager
         self.clock = clock or SimulationClock()
         self.monitor = SeparationMonitor(standard or SeparationStandard())
+        self.conflict_probe = conflict_probe or ConflictProbe(self.monitor.standard)
+        self.route_probe = route_probe or RouteConflictProbe(self.monitor.standard)
+        self.analytics = analytics or RunAnalytics(
+            default_accumulators(self.monitor.standard)
+        )
+        if self.analytics.observes_pairs:
+            self.monitor.pair_observer = self.analytics.observe_pair
         self.status = self.STATUS_ACTIVE
         self.commands_applied = 0
-        self._pending_entries = sorted(
-            list(pending_entries or []), key=_entry_time_seconds
-        )
+        self.scheduler = EventScheduler()
+        for item in pending_entries or []:
+            self.scheduler.schedule(
+                _entry_time_seconds(item), AIRCRAFT_ENTRY, item
+            )
+        for command in scheduled_commands or []:
+            self.schedule_command(command)
         self._events = []
         self._known_finished = set()
         for aircraft in manager.aircraft_list:
@@ -69,11 +117,22 @@ class Simulation:
             )
 
     @classmethod
-    def from_contracts(cls, scenario_airspace, scenario_aircraft, *, standard=None):
+    def from_contracts(
+        cls,
+        scenario_airspace,
+        scenario_aircraft,
+        *,
+        standard=None,
+        conflict_probe=None,
+        route_probe=None,
+        analytics=None,
+    ):
         """Build a simulation from canonical scenario contracts.
 
         Aircraft with `entry_time_seconds` (alias `appear_after_seconds`) > 0
         are scheduled by the simulation clock instead of entering at t=0.
+        Optional `data.scheduled_commands` entries (canonical commands with
+        `time_seconds`) are applied when the clock reaches their time.
         """
         from airspacesim.simulation.scenario_runner import (
             _build_routes_from_scenario_airspace,
@@ -93,7 +152,15 @@ class Simulation:
                 pending.append(dict(item))
                 continue
             cls._add_aircraft_from_item(manager, item)
-        return cls(manager, pending_entries=pending, standard=standard)
+        return cls(
+            manager,
+            pending_entries=pending,
+            scheduled_commands=scenario_aircraft["data"].get("scheduled_commands"),
+            standard=standard,
+            conflict_probe=conflict_probe,
+            route_probe=route_probe,
+            analytics=analytics,
+        )
 
     @staticmethod
     def _add_aircraft_from_item(manager, item):
@@ -109,9 +176,9 @@ class Simulation:
         )
 
     def _emit(self, event_type, payload):
-        self._events.append(
-            EngineEvent(event_type, self.clock.now_seconds, payload)
-        )
+        event = EngineEvent(event_type, self.clock.now_seconds, payload)
+        self._events.append(event)
+        self.analytics.observe_event(event)
 
     def step(self, seconds):
         """Advance the simulation by `seconds` simulated seconds."""
@@ -120,10 +187,11 @@ class Simulation:
                 return
             now = self.clock.advance(seconds)
 
-            while self._pending_entries and (
-                _entry_time_seconds(self._pending_entries[0]) <= now
-            ):
-                item = self._pending_entries.pop(0)
+            for scheduled in self.scheduler.pop_due(now):
+                if scheduled.kind == SCHEDULED_COMMAND:
+                    self._apply_command(scheduled.payload)
+                    continue
+                item = scheduled.payload
                 self._add_aircraft_from_item(self.manager, item)
                 self._emit(
                     AIRCRAFT_ENTERED,
@@ -144,11 +212,20 @@ class Simulation:
                         {"aircraft_id": aircraft.id, "callsign": aircraft.callsign},
                     )
 
-            self._events.extend(
-                self.monitor.update(self._aircraft_states(), now)
+            states = self._aircraft_states()
+            self._events.extend(self.monitor.update(states, now))
+            self._events.extend(self.conflict_probe.update(states, now))
+            self._events.extend(self.route_probe.update(states, now))
+            self.analytics.observe_step(
+                now, seconds, states, self.monitor.violating_pairs()
             )
 
-            if not self._pending_entries and self._all_aircraft_finished():
+            # Commands still queued once every aircraft has exited have
+            # nothing left to act on; only pending entries keep the run on.
+            if (
+                self.scheduler.count(AIRCRAFT_ENTRY) == 0
+                and self._all_aircraft_finished()
+            ):
                 self.status = self.STATUS_COMPLETED
                 self._emit(SIMULATION_COMPLETED, {})
 
@@ -159,18 +236,119 @@ class Simulation:
         shape as inbox events. Returns the applied/skipped/rejected result.
         """
         with self._lock:
-            result = apply_events_idempotent(self.manager, [command])
-            for event_id in result["applied"]:
-                self.commands_applied += 1
-                self._emit(
-                    COMMAND_APPLIED,
-                    {
-                        "command_id": event_id,
-                        "command_type": command["type"],
-                        "payload": dict(command.get("payload", {})),
+            return self._apply_command(command)
+
+    def schedule_command(self, command, at_seconds=None):
+        """Queue a canonical command to be applied at simulated `at_seconds`.
+
+        `at_seconds` defaults to the command's own `time_seconds` (alias
+        `at_seconds`). The command is applied at the start of the first
+        `step()` whose clock reaches that time, in scheduling order with any
+        aircraft entries due at the same instant.
+        """
+        when = _command_time_seconds(command) if at_seconds is None else at_seconds
+        with self._lock:
+            return self.scheduler.schedule(
+                when,
+                SCHEDULED_COMMAND,
+                {
+                    "event_id": command["event_id"],
+                    "type": command["type"],
+                    "payload": dict(command.get("payload", {})),
+                },
+            )
+
+    def _apply_command(self, command):
+        result = apply_events_idempotent(self.manager, [command])
+        if result["applied"]:
+            aircraft_id = command.get("payload", {}).get("aircraft_id")
+            if aircraft_id is not None:
+                self.monitor.invalidate(aircraft_id)
+                self.route_probe.invalidate(aircraft_id)
+        for event_id in result["applied"]:
+            self.commands_applied += 1
+            self._emit(
+                COMMAND_APPLIED,
+                {
+                    "command_id": event_id,
+                    "command_type": command["type"],
+                    "payload": dict(command.get("payload", {})),
+                },
+            )
+        return result
+
+    def save_state(self):
+        """Serialise the complete engine state to a compact versioned blob.
+
+        Unlike `snapshot()`, the blob is lossless: route progress, waypoint
+        lists, pending entries and scripted commands, separation and conflict
+        probe state, counters, and undrained events. `load_state()` restores
+        a simulation that steps identically to this one.
+        """
+        with self._lock:
+            with self.manager.lock:
+                fleet = encode_fleet(self.manager.aircraft_list)
+            return encode_state(
+                {
+                    "time_seconds": self.clock.now_seconds,
+                    "status": self.status,
+                    "commands_applied": self.commands_applied,
+                    "known_finished": sorted(self._known_finished),
+                    "events": [event.as_dict() for event in self._events],
+                    "manager": {
+                        "routes": self.manager.routes,
+                        "sim_rate": self.manager.sim_rate,
+                        "airspace_center": list(self.manager.airspace_center),
+                        "fleet": fleet,
                     },
-                )
-            return result
+                    "scheduler": self.scheduler.export_state(),
+                    "standard": self.monitor.standard.as_dict(),
+                    "monitor": self.monitor.export_state(),
+                    "conflict_probe": self.conflict_probe.export_state(),
+                    "route_probe": self.route_probe.export_state(),
+                    "analytics": self.analytics.export_state(),
+                }
+            )
+
+    @classmethod
+    def load_state(cls, blob, analytics=None):
+        """Rebuild a simulation from `save_state()` output.
+
+        Pass `analytics` to restore custom accumulators; saved state is
+        matched to registered accumulators by name. Raises ValueError for
+        blobs from another format version or that are not engine state at
+        all.
+        """
+        state = decode_state(blob)
+        manager_state = state["manager"]
+        manager = AircraftManager(
+            manager_state["routes"],
+            execution_mode="batched",
+            sim_rate=manager_state["sim_rate"],
+            enable_file_output=False,
+            airspace_center=manager_state["airspace_center"],
+        )
+        standard = SeparationStandard(**state["standard"])
+        simulation = cls(
+            manager,
+            standard=standard,
+            clock=SimulationClock(state["time_seconds"]),
+            analytics=analytics,
+        )
+        manager.aircraft_list = decode_fleet(manager_state["fleet"], Aircraft)
+        simulation.status = state["status"]
+        simulation.commands_applied = int(state["commands_applied"])
+        simulation._known_finished = set(state["known_finished"])
+        simulation._events = [
+            EngineEvent(event["type"], event["time_seconds"], event["payload"])
+            for event in state["events"]
+        ]
+        simulation.scheduler.restore_state(state["scheduler"])
+        simulation.monitor.restore_state(state["monitor"])
+        simulation.conflict_probe.restore_state(state["conflict_probe"])
+        simulation.route_probe.restore_state(state["route_probe"])
+        simulation.analytics.restore_state(state.get("analytics", {}))
+        return simulation
 
     def drain_events(self):
         """Return and clear the emitted engine events, oldest first."""
@@ -206,6 +384,20 @@ class Simulation:
                         float(aircraft.position[1]),
                     ],
                     "flight_level": flight_level,
+                    "speed_kt": float(aircraft.speed),
+                    "heading_deg": float(getattr(aircraft, "heading_deg", 0.0)),
+                    "vertical_rate_fpm": float(aircraft.vertical_rate_fpm),
+                    "target_flight_level": getattr(
+                        aircraft, "target_flight_level", None
+                    ),
+                    "waypoints": aircraft.waypoints,
+                    "current_index": aircraft.current_index,
+                    "lateral_mode": getattr(aircraft, "lateral_mode", "route"),
+                    "direct_to_target_index": getattr(
+                        aircraft, "direct_to_target_index", None
+                    ),
+                    "hold_fix_id": getattr(aircraft, "hold_fix_id", None),
+                    "hold_fix_position": getattr(aircraft, "hold_fix_position", None),
                     "status": "finished" if finished else "active",
                 }
             )
@@ -271,11 +463,25 @@ class Simulation:
             return {
                 "time_seconds": self.clock.now_seconds,
                 "status": self.status,
-                "pending_aircraft_count": len(self._pending_entries),
+                "pending_aircraft_count": self.scheduler.count(AIRCRAFT_ENTRY),
                 "aircraft": aircraft_items,
                 "separation": self.monitor.as_dict(),
+                "conflicts": self.conflict_probe.as_dict(),
+                "route_conflicts": self.route_probe.as_dict(),
             }
 
+    def state_digest(self):
+        """SHA-256 hex digest of the observable state, wall-clock fields excluded.
+
+        Two simulations driven through the same steps and commands have equal
+        digests, which is how a replay is checked against the original run.
+        """
+        with self._lock:
+            document = self.snapshot(updated_utc="-")
+            document["summary"] = self.summary()
+        body = json.dumps(document, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
     def summary(self):
         """Factual run counters — not a competency assessment."""
         with self._lock:
@@ -283,7 +489,13 @@ class Simulation:
                 current_count = len(self.manager.aircraft_list)
             return {
                 "simulated_seconds": self.clock.now_seconds,
-                "aircraft_total": current_count + len(self._pending_entries),
+                "aircraft_total": current_count
+                + self.scheduler.count(AIRCRAFT_ENTRY),
                 "instructions_issued": self.commands_applied,
                 "loss_of_separation_count": self.monitor.loss_event_count,
             }
+
+    def analytics_summary(self):
+        """Values of every registered run analytics accumulator."""
+        with self._lock:
+            return self.analytics.as_dict()
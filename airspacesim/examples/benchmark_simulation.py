@@ -3,6 +3,7 @@
 import argparse
 
 from airspacesim.simulation.performance import (
+    benchmark_conflict_probe,
     benchmark_json_write_path,
     benchmark_update_loop,
 )
@@ -28,6 +29,8 @@ def main():
         num_aircraft=args.aircraft, iterations=args.writes
     )
 
+    probe_metrics = benchmark_conflict_probe(num_aircraft=args.aircraft)
+
     print("Update-loop benchmark:")
     for key, value in update_metrics.items():
         print(f"- {key}: {value}")
@@ -36,6 +39,10 @@ def main():
     for key, value in write_metrics.items():
         print(f"- {key}: {value}")
 
+    print("\nConflict-probe benchmark:")
+    for key, value in probe_metrics.items():
+        print(f"- {key}: {value}")
+
 
 if __name__ == "__main__":
     main()
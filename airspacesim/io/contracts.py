@@ -401,6 +401,28 @@ def validate_scenario_aircraft(payload, route_ids=None):
                 and item["traffic_flow"] in {"outbound", "inbound", "transit", "unknown"},
                 f"data.aircraft[{idx}].traffic_flow must be one of outbound|inbound|transit|unknown",
             )
+
+    scheduled_commands = data.get("scheduled_commands")
+    if scheduled_commands is not None:
+        _require_list(scheduled_commands, "data.scheduled_commands")
+        for idx, command in enumerate(scheduled_commands):
+            _require_dict(command, f"data.scheduled_commands[{idx}]")
+            _require(
+                isinstance(command.get("event_id"), str) and command["event_id"],
+                f"data.scheduled_commands[{idx}].event_id required",
+            )
+            _require(
+                command.get("type") in KNOWN_COMMAND_TYPES,
+                f"data.scheduled_commands[{idx}].type unsupported",
+            )
+            _require(
+                isinstance(command.get("time_seconds"), (int, float))
+                and command["time_seconds"] >= 0,
+                f"data.scheduled_commands[{idx}].time_seconds must be >= 0",
+            )
+            _require_dict(
+                command.get("payload"), f"data.scheduled_commands[{idx}].payload"
+            )
     return payload
 
 
@@ -3,6 +3,7 @@
 import time
 from types import SimpleNamespace
 
+from airspacesim.core.conflict_probe import ConflictProbe
 from airspacesim.settings import settings
 from airspacesim.simulation.aircraft import Aircraft
 from airspacesim.simulation.aircraft_manager import AircraftManager
@@ -66,3 +67,37 @@ def benchmark_json_write_path(num_aircraft=200, iterations=25):
         "aircraft_file": settings.AIRCRAFT_FILE,
         "aircraft_state_file": settings.AIRCRAFT_STATE_FILE,
     }
+
+
+def benchmark_conflict_probe(num_aircraft=1000, num_probes=10, look_ahead_seconds=120.0):
+    """Benchmark the short-term conflict probe over a dense synthetic fleet."""
+    side = max(int(num_aircraft**0.5), 1)
+    states = [
+        {
+            "id": f"BENCH_{idx:04d}",
+            # ~15 NM grid spacing, mixed headings and levels.
+            "position_dd": [10.0 + (idx // side) * 0.25, (idx % side) * 0.25],
+            "flight_level": 300 + (idx % 5) * 10,
+            "speed_kt": 420.0,
+            "heading_deg": float((idx * 37) % 360),
+            "vertical_rate_fpm": 0.0,
+        }
+        for idx in range(num_aircraft)
+    ]
+    probe = ConflictProbe(look_ahead_seconds=look_ahead_seconds)
+
+    start = time.perf_counter()
+    for tick in range(num_probes):
+        probe.update(states, float(tick))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "num_aircraft": num_aircraft,
+        "num_probes": num_probes,
+        "elapsed_seconds": elapsed,
+        "mean_probe_ms": (elapsed / num_probes) * 1000.0 if num_probes else 0.0,
+        "candidate_pairs_per_probe": (
+            probe.candidate_pairs_evaluated / num_probes if num_probes else 0
+        ),
+        "predicted_conflicts": len(probe.predicted_conflicts()),
+    }
@@ -106,7 +106,7 @@ def submit_command(
         command_type=payload.command_type,
         payload=payload.payload,
     )
-    runtime_session = session_registry.get(run_id)
+    runtime_session = session_registry.recover(run)
     checkpoint = RunCheckpointRepository(db).latest_for_run(run_id)
     if runtime_session is None and run.status != "draft":
         response_payload = _reject_command(
@@ -137,6 +137,7 @@ def submit_command(
         if result["applied"]:
             command.status = "applied"
             command.applied_at = datetime.now(timezone.utc)
+            command.time_seconds = result.get("time_seconds")
             if payload.command_type == "SET_SIMULATION_SPEED":
                 run.sim_rate = runtime_session.sim_rate
                 RunRepository(db).update(run)
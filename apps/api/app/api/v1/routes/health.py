@@ -3,8 +3,18 @@
 from fastapi import APIRouter
 from sqlalchemy import text
 
-from ....dependencies import DbSessionDependency, SettingsDependency
-from ....schemas.health import HealthResponse
+from ....dependencies import (
+    BroadcastHubDependency,
+    DbSessionDependency,
+    SessionRegistryDependency,
+    SettingsDependency,
+)
+from ....schemas.health import (
+    HealthResponse,
+    RunLoad,
+    RuntimeSessionCounts,
+    StreamCounts,
+)
 
 router = APIRouter(tags=["health"])
 
@@ -13,8 +23,37 @@ router = APIRouter(tags=["health"])
 def healthcheck(
     settings: SettingsDependency,
     db: DbSessionDependency,
+    session_registry: SessionRegistryDependency = None,
+    broadcast_hub: BroadcastHubDependency = None,
 ) -> HealthResponse:
-    """Return a service heartbeat plus a minimal database readiness probe."""
+    """Return a service heartbeat plus a minimal database readiness probe.
+
+    Also reports resident vs hibernated live runs, for sizing containers, the
+    database writer's backlog, run stream subscriber lag, and the CPU budget
+    of running runs.
+    """
 
     db.execute(text("SELECT 1"))
-    return HealthResponse(status="ok", service=settings.app_name, database="ok")
+    return HealthResponse(
+        status="ok",
+        service=settings.app_name,
+        database="ok",
+        runtime_sessions=(
+            RuntimeSessionCounts(
+                **session_registry.session_counts(),
+                pending_writes=session_registry.writer.pending,
+            )
+            if session_registry is not None
+            else None
+        ),
+        streams=(
+            StreamCounts(**broadcast_hub.stream_counts())
+            if broadcast_hub is not None
+            else None
+        ),
+        run_load=(
+            RunLoad(**session_registry.load_report())
+            if session_registry is not None
+            else None
+        ),
+    )
@@ -1,19 +1,35 @@
 """Simulation run routes."""
 
 import asyncio
-from queue import Empty
-
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+import json
+from datetime import datetime
+from typing import Annotated, Literal
+
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from fastapi.responses import Response
 
 from airspacesim.io import build_envelope, serialize_trajectory_payload_to_csv
 
-from ....db.repositories import RunCheckpointRepository, RunRepository
+from ....db.repositories import (
+    RunCheckpointRepository,
+    RunRepository,
+    RunSummaryRepository,
+)
+from ....db.repositories.runs import decode_run_cursor, encode_run_cursor
 from ....dependencies import (
     BroadcastHubDependency,
     DbSessionDependency,
     OptionalUserDependency,
     RunCreationRateLimitDependency,
+    RunSeriesCacheDependency,
     SessionIdDependency,
     SessionRegistryDependency,
     SettingsDependency,
@@ -22,19 +38,31 @@ from ....schemas.runs import (
     PracticeRunCreateRequest,
     RunCreateRequest,
     RunListResponse,
+    RunReplayResponse,
     RunResponse,
+    RunSeriesResponse,
     RunStateResponse,
+    RunSummaryAggregateResponse,
+    RunTimelineResponse,
     RunTrajectoryResponse,
 )
 from ....services import (
+    build_run_series,
     create_run,
     missing_runtime_detail,
     pause_run as pause_run_service,
+    replay_run,
     resume_run as resume_run_service,
     start_run as start_run_service,
     stop_run as stop_run_service,
 )
 from ....services.practice_runs import create_practice_run
+from ....sessions import RunAdmissionRejected
+from ....ws import (
+    DEFAULT_STREAM_OPTIONS,
+    StreamOptions,
+    negotiate_codec,
+)
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
@@ -61,6 +89,17 @@ def _enforce_run_capacity(
         )
 
 
+def _admit_run(session_registry: SessionRegistryDependency, scenario) -> None:
+    try:
+        session_registry.admit(scenario)
+    except RunAdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(round(exc.retry_after_seconds))},
+        ) from exc
+
+
 def _get_run_or_404(
     run_id: str,
     db: DbSessionDependency,
@@ -149,6 +188,8 @@ def _build_checkpoint_state(run, checkpoint) -> RunStateResponse:
         time_seconds=snapshot.get("time_seconds"),
         aircraft=snapshot.get("aircraft", []),
         separation=snapshot.get("separation"),
+        conflicts=snapshot.get("conflicts"),
+        route_conflicts=snapshot.get("route_conflicts"),
         summary=snapshot.get("summary"),
         metrics=_checkpoint_metrics(snapshot),
     )
@@ -181,14 +222,28 @@ def _build_checkpoint_trajectory(run_id: str, checkpoint) -> RunTrajectoryRespon
     )
 
 
+def _json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+
+def _json_object(body: bytes = b"{}", **fields: bytes) -> bytes:
+    """Prepend already-serialised `fields` to the JSON object `body`."""
+    members = b",".join(
+        json.dumps(name).encode() + b":" + value for name, value in fields.items()
+    )
+    if body == b"{}":
+        return b"{" + members + b"}"
+    return b"{" + members + b"," + body[1:]
+
+
 def _build_run_trajectory(
     run_id: str,
     db: DbSessionDependency,
     session_registry: SessionRegistryDependency,
     session_id: str,
 ) -> RunTrajectoryResponse:
-    _get_run_or_404(run_id, db, session_id)
-    runtime_session = session_registry.get(run_id)
+    run = _get_run_or_404(run_id, db, session_id)
+    runtime_session = session_registry.recover(run)
     if runtime_session is not None:
         snapshot = runtime_session.trajectory_snapshot()
         return RunTrajectoryResponse(
@@ -198,6 +253,12 @@ def _build_run_trajectory(
             tracks=snapshot["tracks"],
         )
 
+    return _build_stored_trajectory(run_id, db)
+
+
+def _build_stored_trajectory(
+    run_id: str, db: DbSessionDependency
+) -> RunTrajectoryResponse:
     checkpoint = RunCheckpointRepository(db).latest_for_run(run_id)
     if checkpoint is not None:
         return _build_checkpoint_trajectory(run_id, checkpoint)
@@ -210,46 +271,184 @@ def _build_run_trajectory(
     )
 
 
-def _build_run_state(
-    run,
-    db: DbSessionDependency,
-    session_registry: SessionRegistryDependency,
-) -> RunStateResponse:
-    runtime_session = session_registry.get(run.id)
+def _run_trajectory_json(run, db: DbSessionDependency, runtime_session) -> bytes:
+    """`RunTrajectoryResponse` JSON; live runs reuse the session's bytes."""
+
     if runtime_session is not None:
-        snapshot = runtime_session.state_snapshot()
-        return RunStateResponse(
-            run=RunResponse.model_validate(run),
-            runtime_status=snapshot["runtime_status"],
-            sim_rate=float(snapshot["sim_rate"]),
-            updated_utc=snapshot["updated_utc"],
-            source="runtime_session",
-            last_error=snapshot["last_error"],
-            time_seconds=snapshot.get("time_seconds"),
-            aircraft=snapshot["aircraft"],
-            separation=snapshot.get("separation"),
-            summary=snapshot.get("summary"),
-            metrics=snapshot["metrics"],
+        return _json_object(
+            runtime_session.trajectory_json(), run_id=json.dumps(run.id).encode()
+        )
+    return _build_stored_trajectory(run.id, db).model_dump_json().encode()
+
+
+def _run_state_json(run, db: DbSessionDependency, runtime_session) -> bytes:
+    """`RunStateResponse` JSON for the live, checkpointed, or inactive run.
+
+    A live run's state is serialised once per state version by its runtime
+    session and only the run record is added here, so the hot path skips
+    model validation. Tests hold the bytes to the schema.
+    """
+
+    if runtime_session is not None:
+        return _json_object(
+            runtime_session.state_json(),
+            run=RunResponse.model_validate(run).model_dump_json().encode(),
+            source=b'"runtime_session"',
         )
 
     checkpoint = RunCheckpointRepository(db).latest_for_run(run.id)
     if checkpoint is not None:
-        return _build_checkpoint_state(run, checkpoint)
+        return _build_checkpoint_state(run, checkpoint).model_dump_json().encode()
+
+    return _build_inactive_state(run).model_dump_json().encode()
+
 
-    return _build_inactive_state(run)
+def _state_etag(run, db: DbSessionDependency, runtime_session, version) -> str:
+    """Weak ETag of a run's state, changing whenever its body may.
+
+    Made of the live session's state version (or the latest checkpoint) and
+    the run record's last update.
+    """
+
+    if runtime_session is not None:
+        tag = f"{runtime_session.instance_id}.{version}"
+    else:
+        checkpoint_id = RunCheckpointRepository(db).latest_id_for_run(run.id)
+        tag = f"checkpoint.{checkpoint_id}" if checkpoint_id else "inactive"
+    return f'W/"{tag}.{run.updated_at.timestamp():.6f}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == opaque
+        for candidate in (item.strip() for item in if_none_match.split(","))
+    )
+
+
+def _conditional_state_response(
+    run,
+    db: DbSessionDependency,
+    session_registry: SessionRegistryDependency,
+    build,
+    *,
+    if_none_match: str | None,
+    wait: float | None,
+) -> Response:
+    """Answer a state poll with `build(run, db, runtime_session)` or a 304.
+
+    The ETag is taken before the body is built, so it never claims a newer
+    state than the body has. When `If-None-Match` is current and `wait` is
+    given, a live run is long-polled until its state changes.
+    """
+
+    runtime_session = session_registry.recover(run)
+    version = runtime_session.state_version if runtime_session is not None else None
+    etag = _state_etag(run, db, runtime_session, version)
+    if _etag_matches(if_none_match, etag):
+        if not (
+            wait
+            and runtime_session is not None
+            and session_registry.wait_for_state_change(runtime_session, version, wait)
+        ):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        version = runtime_session.state_version
+        etag = _state_etag(run, db, runtime_session, version)
+    return Response(
+        content=build(run, db, runtime_session),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+def _build_timeline_state(
+    run,
+    db: DbSessionDependency,
+    session_registry: SessionRegistryDependency,
+    at_seconds: float,
+) -> RunStateResponse:
+    timeline = session_registry.timeline
+    extent = timeline.extent(db, run.id)
+    snapshot = (
+        timeline.state_at(db, run.id, at_seconds)
+        if extent is not None and extent[0] <= at_seconds <= extent[1]
+        else None
+    )
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No timeline state recorded at {at_seconds:g}s.",
+        )
+    return RunStateResponse(
+        run=RunResponse.model_validate(run),
+        runtime_status=snapshot["runtime_status"],
+        sim_rate=float(snapshot["sim_rate"]),
+        updated_utc=snapshot.get("updated_utc"),
+        source="timeline",
+        last_error=snapshot.get("last_error"),
+        time_seconds=snapshot["time_seconds"],
+        aircraft=snapshot.get("aircraft", []),
+        separation=snapshot.get("separation"),
+        conflicts=snapshot.get("conflicts"),
+        route_conflicts=snapshot.get("route_conflicts"),
+        summary=snapshot.get("summary"),
+        metrics=_checkpoint_metrics(snapshot),
+    )
 
 
 def _build_state_event(
     run,
     db: DbSessionDependency,
     session_registry: SessionRegistryDependency,
-) -> dict:
-    state = _build_run_state(run, db, session_registry)
-    return {
-        "type": "run_state.snapshot",
-        "run_id": run.id,
-        "data": state.model_dump(mode="json"),
-    }
+    options: StreamOptions = DEFAULT_STREAM_OPTIONS,
+) -> str:
+    data = _run_state_json(run, db, session_registry.recover(run))
+    if not options.is_default:
+        data = json.dumps(
+            options.project(json.loads(data)), ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    return _json_object(
+        type=b'"run_state.snapshot"',
+        run_id=json.dumps(run.id).encode(),
+        data=data,
+    ).decode("utf-8")
+
+
+async def _read_stream_controls(
+    websocket: WebSocket,
+    broadcast_hub: BroadcastHubDependency,
+    subscriber,
+    replies: asyncio.Queue,
+) -> None:
+    """Apply `stream.options` messages from the client until it disconnects."""
+
+    while True:
+        try:
+            text = await websocket.receive_text()
+        except WebSocketDisconnect:
+            return
+        try:
+            message = json.loads(text)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict) or message.get("type") != "stream.options":
+            replies.put_nowait(
+                {"type": "stream.error", "detail": "Expected a stream.options message."}
+            )
+            continue
+        try:
+            if not isinstance(message.get("options"), dict):
+                raise ValueError("options must be an object.")
+            options = StreamOptions.from_mapping(message["options"])
+        except ValueError as exc:
+            replies.put_nowait({"type": "stream.error", "detail": str(exc)})
+            continue
+        broadcast_hub.set_options(subscriber, options)
+        replies.put_nowait({"type": "stream.options", "data": options.as_dict()})
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=RunResponse)
@@ -300,7 +499,10 @@ def create_practice_run_route(
         lesson_id=payload.lesson_id,
         name=payload.name,
         user_id=user.id if user else None,
+        # Owned by this worker, so the session starts here.
+        run_id=session_registry.new_run_id(),
     )
+    _admit_run(session_registry, run.scenario)
     run = start_run_service(db, run)
     try:
         session_registry.start(run=run, scenario=run.scenario)
@@ -317,13 +519,64 @@ def list_runs(
     db: DbSessionDependency,
     session_id: SessionIdDependency,
     user: OptionalUserDependency = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+    cursor: str | None = None,
 ) -> RunListResponse:
-    """List runs for the browser session and, when signed in, the account."""
+    """List runs for the browser session and, when signed in, the account.
 
+    Newest first. Pass `next_cursor` back as `cursor` for the next page.
+    """
+
+    try:
+        after = decode_run_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
     items = RunRepository(db).list(
-        session_id=session_id, user_id=user.id if user else None
+        session_id=session_id,
+        user_id=user.id if user else None,
+        limit=limit + 1,
+        after=after,
+    )
+    next_cursor = encode_run_cursor(items[limit - 1]) if len(items) > limit else None
+    return RunListResponse(
+        items=[RunResponse.model_validate(item) for item in items[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/summaries/aggregate", response_model=RunSummaryAggregateResponse)
+def aggregate_run_summaries(
+    db: DbSessionDependency,
+    session_id: SessionIdDependency,
+    user: OptionalUserDependency = None,
+    group_by: Literal[
+        "lesson_id", "scenario_id", "airspace_id", "kind", "day"
+    ] = "lesson_id",
+    kind: Literal["practice", "simulate"] | None = None,
+    lesson_id: str | None = None,
+    ended_after: datetime | None = None,
+    ended_before: datetime | None = None,
+) -> RunSummaryAggregateResponse:
+    """Aggregate the caller's ended runs, e.g. losses of separation per lesson."""
+
+    groups = RunSummaryRepository(db).aggregate(
+        session_id=session_id,
+        user_id=user.id if user else None,
+        group_by=group_by,
+        kind=kind,
+        lesson_id=lesson_id,
+        ended_after=ended_after,
+        ended_before=ended_before,
+    )
+    return RunSummaryAggregateResponse(
+        group_by=group_by,
+        groups=[
+            {**group, "key": None if group["key"] is None else str(group["key"])}
+            for group in groups
+        ],
     )
-    return RunListResponse(items=[RunResponse.model_validate(item) for item in items])
 
 
 @router.get("/{run_id}", response_model=RunResponse)
@@ -353,6 +606,7 @@ def start_run(
 
     run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
     _enforce_run_capacity(db, session_registry, session_id, settings)
+    _admit_run(session_registry, run.scenario)
     run = start_run_service(db, run)
     try:
         session_registry.start(run=run, scenario=run.scenario)
@@ -375,6 +629,7 @@ def pause_run(
     """Transition a running run into paused state."""
 
     run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
+    session_registry.recover(run)
     try:
         runtime_session = session_registry.pause(run_id)
     except ValueError as exc:
@@ -406,6 +661,7 @@ def resume_run(
     """Resume a paused run."""
 
     run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
+    session_registry.recover(run)
     try:
         runtime_session = session_registry.resume(run_id)
     except ValueError as exc:
@@ -449,11 +705,130 @@ def get_run_state(
     session_registry: SessionRegistryDependency,
     session_id: SessionIdDependency,
     user: OptionalUserDependency = None,
-) -> RunStateResponse:
-    """Return the current live state or the latest checkpointed state."""
+    at: Annotated[float | None, Query(ge=0)] = None,
+    wait: Annotated[float | None, Query(gt=0, le=60)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Return the current live state or the latest checkpointed state.
+
+    With `at`, return the state recorded at that simulated second instead.
+    Otherwise the response carries an ETag: send it back as `If-None-Match`
+    to get 304 while nothing has changed, and add `wait` (seconds) to block
+    until the state changes instead.
+    """
 
     run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
-    return _build_run_state(run, db, session_registry)
+    if at is not None:
+        return _json_response(
+            _build_timeline_state(run, db, session_registry, at)
+            .model_dump_json()
+            .encode()
+        )
+    return _conditional_state_response(
+        run,
+        db,
+        session_registry,
+        _run_state_json,
+        if_none_match=if_none_match,
+        wait=wait,
+    )
+
+
+@router.get("/{run_id}/timeline", response_model=RunTimelineResponse)
+def get_run_timeline(
+    run_id: str,
+    db: DbSessionDependency,
+    session_registry: SessionRegistryDependency,
+    session_id: SessionIdDependency,
+    user: OptionalUserDependency = None,
+    from_seconds: Annotated[float, Query(alias="from", ge=0)] = 0.0,
+    to_seconds: Annotated[float | None, Query(alias="to", ge=0)] = None,
+    min_interval: Annotated[float, Query(ge=0)] = 0.0,
+    limit: Annotated[int, Query(ge=1, le=2000)] = 600,
+) -> RunTimelineResponse:
+    """Return recorded frames between `from` and `to` for playback.
+
+    Frames are at least `min_interval` simulated seconds apart. When the
+    window holds more than `limit` frames, fetch the rest from
+    `next_from_seconds`.
+    """
+
+    run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
+    timeline = session_registry.timeline
+    extent = timeline.extent(db, run.id)
+    if extent is None:
+        return RunTimelineResponse(run_id=run.id, frames=[])
+    end_seconds = extent[1] if to_seconds is None else min(to_seconds, extent[1])
+    frames = timeline.frames_between(
+        db,
+        run.id,
+        from_seconds,
+        end_seconds,
+        interval_seconds=min_interval,
+        limit=limit,
+    )
+    next_from_seconds = None
+    if len(frames) >= limit and frames[-1]["time_seconds"] < end_seconds:
+        next_from_seconds = frames[-1]["time_seconds"]
+    return RunTimelineResponse(
+        run_id=run.id,
+        start_seconds=extent[0],
+        end_seconds=extent[1],
+        frames=[
+            {**frame, "metrics": _checkpoint_metrics(frame)} for frame in frames
+        ],
+        next_from_seconds=next_from_seconds,
+    )
+
+
+@router.get("/{run_id}/series", response_model=RunSeriesResponse)
+def get_run_series(
+    run_id: str,
+    series: Literal[
+        "altitude_ft",
+        "speed_kt",
+        "separation_nm",
+        "aircraft_count",
+        "conflict_count",
+        "route_conflict_count",
+        "separation_violation_count",
+    ],
+    db: DbSessionDependency,
+    session_registry: SessionRegistryDependency,
+    series_cache: RunSeriesCacheDependency,
+    session_id: SessionIdDependency,
+    user: OptionalUserDependency = None,
+    aircraft_id: str | None = None,
+    points: Annotated[int, Query(ge=3, le=5000)] = 500,
+    method: Literal["lttb", "minmax"] = "lttb",
+) -> RunSeriesResponse:
+    """Return a chart series from the run's recorded timeline.
+
+    Per-aircraft series (`altitude_ft`, `speed_kt`, and `separation_nm` to the
+    nearest active traffic) need `aircraft_id`. The series is downsampled to
+    at most `points` points.
+    """
+
+    run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
+    result = build_run_series(
+        db,
+        run,
+        session_registry.timeline,
+        series_cache,
+        series=series,
+        aircraft_id=aircraft_id,
+        points=points,
+        method=method,
+    )
+    return RunSeriesResponse(
+        run_id=run.id,
+        series=result.series,
+        aircraft_id=result.aircraft_id,
+        method=result.method,
+        source_point_count=result.source_point_count,
+        time_seconds=result.time_seconds,
+        values=result.values,
+    )
 
 
 @router.get("/{run_id}/trajectory", response_model=RunTrajectoryResponse)
@@ -462,10 +837,50 @@ def get_run_trajectory(
     db: DbSessionDependency,
     session_registry: SessionRegistryDependency,
     session_id: SessionIdDependency,
-) -> RunTrajectoryResponse:
-    """Return live trajectory tracks or the latest checkpointed tracks."""
+    wait: Annotated[float | None, Query(gt=0, le=60)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Return live trajectory tracks or the latest checkpointed tracks.
 
-    return _build_run_trajectory(run_id, db, session_registry, session_id)
+    Supports the same ETag, `If-None-Match`, and `wait` polling as `/state`.
+    """
+
+    return _conditional_state_response(
+        _get_run_or_404(run_id, db, session_id),
+        db,
+        session_registry,
+        _run_trajectory_json,
+        if_none_match=if_none_match,
+        wait=wait,
+    )
+
+
+@router.get("/{run_id}/replay", response_model=RunReplayResponse)
+def get_run_replay(
+    run_id: str,
+    db: DbSessionDependency,
+    session_id: SessionIdDependency,
+    user: OptionalUserDependency = None,
+) -> RunReplayResponse:
+    """Replay an ended run at full speed and verify its final state digest."""
+
+    run = _get_run_or_404(run_id, db, session_id, user.id if user else None)
+    replay = replay_run(db, run)
+    return RunReplayResponse(
+        run_id=run.id,
+        time_seconds=replay.session.simulation.clock.now_seconds,
+        state_digest=replay.state_digest,
+        recorded_state_digest=replay.recorded_state_digest,
+        verified=replay.verified,
+        summary=replay.session.run_summary(analytics=True),
+    )
+
+
+async def _send_frame(websocket: WebSocket, frame: str | bytes) -> None:
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
 
 
 @router.websocket("/{run_id}/stream")
@@ -476,28 +891,70 @@ async def stream_run(
     session_registry: SessionRegistryDependency,
     broadcast_hub: BroadcastHubDependency,
     session_id: SessionIdDependency,
+    fields: str | None = None,
+    max_rate_hz: float | None = None,
+    separation: bool = True,
+    summary: bool = True,
+    bbox: str | None = None,
+    zoom: int | None = None,
 ) -> None:
-    """Stream run state and command events for one run."""
+    """Stream run state and command events for one run.
+
+    `fields` (comma-separated aircraft fields), `max_rate_hz`, `separation`,
+    `summary`, `bbox` (`min_lat,min_lon,max_lat,max_lon`), and `zoom` shape
+    the `run_state.updated` events; see `StreamOptions`.
+    The client can change them later by sending
+    `{"type": "stream.options", "options": {...}}`, which is answered with the
+    options in effect or a `stream.error`.
+
+    Events are JSON text frames unless the client offers the
+    `airspacesim.packed.v1` (or `...+deflate`) subprotocol, in which case they
+    are binary frames; see `app.ws.codec`.
+    """
 
     run = RunRepository(db).get(run_id, session_id=session_id)
     if run is None:
         await websocket.close(code=4404)
         return
+    try:
+        options = StreamOptions.from_mapping(
+            {
+                "fields": fields,
+                "max_rate_hz": max_rate_hz,
+                "separation": separation,
+                "summary": summary,
+                "bbox": bbox,
+                "zoom": zoom,
+            }
+        )
+    except ValueError:
+        await websocket.close(code=4400)
+        return
 
-    await websocket.accept()
-    subscriber = broadcast_hub.subscribe(run_id)
+    codec = negotiate_codec(websocket.scope.get("subprotocols") or [])
+    await websocket.accept(subprotocol=codec.subprotocol)
+    subscriber = broadcast_hub.subscribe(run_id, options)
+    replies: asyncio.Queue = asyncio.Queue()
+    reader = asyncio.create_task(
+        _read_stream_controls(websocket, broadcast_hub, subscriber, replies)
+    )
     try:
-        await websocket.send_json(_build_state_event(run, db, session_registry))
-        while True:
-            try:
-                event = subscriber.queue.get_nowait()
-            except Empty:
+        snapshot = _build_state_event(run, db, session_registry, options)
+        await _send_frame(
+            websocket, codec.encode(json.loads(snapshot)) if codec.binary else snapshot
+        )
+        while not reader.done():
+            while not replies.empty():
+                await _send_frame(websocket, codec.encode(replies.get_nowait()))
+            event = broadcast_hub.next_event(subscriber)
+            if event is None:
                 await asyncio.sleep(0.05)
                 continue
-            await websocket.send_json(event)
+            await _send_frame(websocket, broadcast_hub.encode(event, codec))
     except WebSocketDisconnect:
         return
     finally:
+        reader.cancel()
         broadcast_hub.unsubscribe(subscriber)
 
 
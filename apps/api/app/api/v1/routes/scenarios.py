@@ -62,10 +62,13 @@ def get_scenario(
     session_id: SessionIdDependency,
     user: OptionalUserDependency = None,
 ) -> ScenarioResponse:
-    """Fetch a persisted scenario by id."""
+    """Fetch a persisted scenario by id, including shared package content."""
 
     scenario = ScenarioRepository(db).get(
-        scenario_id, session_id=session_id, user_id=user.id if user else None
+        scenario_id,
+        session_id=session_id,
+        user_id=user.id if user else None,
+        include_shared=True,
     )
     if scenario is None:
         raise HTTPException(
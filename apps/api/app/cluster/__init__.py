@@ -0,0 +1,22 @@
+"""Multi-worker support: run ownership, forwarding, and the worker bus."""
+
+from .bus import InProcessBus, LocalBusNetwork, MessageBus, UnixSocketBus
+from .ring import HashRing
+from .workers import (
+    FORWARD_SECRET_HEADER,
+    FORWARDED_HEADER,
+    WorkerCluster,
+    forward_http,
+)
+
+__all__ = [
+    "FORWARD_SECRET_HEADER",
+    "FORWARDED_HEADER",
+    "HashRing",
+    "InProcessBus",
+    "LocalBusNetwork",
+    "MessageBus",
+    "UnixSocketBus",
+    "WorkerCluster",
+    "forward_http",
+]
@@ -0,0 +1,245 @@
+"""Message bus between the API workers of one host.
+
+Messages are JSON objects with a `kind`; the bus adds the sending
+`worker`. Delivery is best effort and at most once: a worker that is down or
+too slow to keep up misses messages, which suits latest-value-wins state
+fanout.
+
+`UnixSocketBus` connects the workers over Unix domain stream sockets, one
+listener per worker, with length-prefixed frames. `LocalBusNetwork` connects
+buses inside one process, for tests.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from queue import Full, Queue
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+BusHandler = Callable[[dict[str, Any]], None]
+
+_FRAME_LENGTH = struct.Struct(">I")
+
+
+class MessageBus:
+    """Handler registry shared by the bus transports."""
+
+    def __init__(self, worker_id: str) -> None:
+        self.worker_id = worker_id
+        self._handlers: dict[str, list[BusHandler]] = {}
+
+    def add_handler(self, kind: str, handler: BusHandler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def publish(self, message: dict[str, Any]) -> None:
+        """Send `message` to every other worker."""
+        raise NotImplementedError
+
+    def start(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        if message.get("worker") == self.worker_id:
+            return
+        for handler in self._handlers.get(message.get("kind"), []):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception(
+                    "Bus handler failed", extra={"kind": message.get("kind")}
+                )
+
+
+class LocalBusNetwork:
+    """In-process stand-in for the Unix socket bus; delivers synchronously."""
+
+    def __init__(self) -> None:
+        self.buses: list[InProcessBus] = []
+
+    def connect(self, worker_id: str) -> InProcessBus:
+        bus = InProcessBus(worker_id, self)
+        self.buses.append(bus)
+        return bus
+
+
+class InProcessBus(MessageBus):
+    def __init__(self, worker_id: str, network: LocalBusNetwork) -> None:
+        super().__init__(worker_id)
+        self.network = network
+
+    def publish(self, message: dict[str, Any]) -> None:
+        message = {**message, "worker": self.worker_id}
+        for bus in self.network.buses:
+            if bus is not self:
+                bus._dispatch(message)
+
+
+class _Peer:
+    """Outbound connection to one worker, fed by its own sender thread."""
+
+    def __init__(self, path: Path, queue_size: int) -> None:
+        self.path = path
+        self.queue: Queue[bytes | None] = Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, name=f"airspacesim-bus-{path.stem}", daemon=True
+        )
+        self._thread.start()
+
+    def send(self, frame: bytes) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except Full:
+            # A stalled peer must not stall the tick thread publishing.
+            self.dropped += 1
+
+    def close(self) -> None:
+        try:
+            self.queue.put_nowait(None)
+        except Full:
+            pass
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        connection: socket.socket | None = None
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            try:
+                if connection is None:
+                    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    connection.connect(str(self.path))
+                connection.sendall(frame)
+            except OSError:
+                # The peer is down or restarting; drop and reconnect later.
+                self.dropped += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+
+
+def _read_exactly(connection: socket.socket, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = connection.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class UnixSocketBus(MessageBus):
+    """Bus over Unix domain stream sockets in a shared directory.
+
+    Each worker listens on `<socket_dir>/<worker>.bus.sock` and keeps one
+    outbound connection per peer. Frames are a big-endian uint32 length and
+    a UTF-8 JSON message.
+    """
+
+    def __init__(
+        self,
+        worker_id: str,
+        workers: Iterable[str],
+        socket_dir: str | Path,
+        queue_size: int = 1024,
+    ) -> None:
+        super().__init__(worker_id)
+        self.socket_dir = Path(socket_dir)
+        self.queue_size = max(int(queue_size), 1)
+        self.peer_ids = [worker for worker in workers if worker != worker_id]
+        self._peers: dict[str, _Peer] = {}
+        self._listener: socket.socket | None = None
+        self._threads: list[threading.Thread] = []
+        self._closed = threading.Event()
+
+    def socket_path(self, worker_id: str) -> Path:
+        return self.socket_dir / f"{worker_id}.bus.sock"
+
+    @property
+    def dropped(self) -> int:
+        return sum(peer.dropped for peer in self._peers.values())
+
+    def start(self) -> None:
+        if self._listener is not None:
+            return
+        self.socket_dir.mkdir(parents=True, exist_ok=True)
+        path = self.socket_path(self.worker_id)
+        if path.exists():
+            path.unlink()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(path))
+        os.chmod(path, 0o600)
+        listener.listen()
+        self._listener = listener
+        self._peers = {
+            peer_id: _Peer(self.socket_path(peer_id), self.queue_size)
+            for peer_id in self.peer_ids
+        }
+        self._spawn(self._accept, "airspacesim-bus-accept")
+
+    def close(self) -> None:
+        self._closed.set()
+        for peer in self._peers.values():
+            peer.close()
+        if self._listener is not None:
+            self._listener.close()
+            self.socket_path(self.worker_id).unlink(missing_ok=True)
+            self._listener = None
+
+    def publish(self, message: dict[str, Any]) -> None:
+        payload = json.dumps(
+            {**message, "worker": self.worker_id}, separators=(",", ":")
+        ).encode("utf-8")
+        frame = _FRAME_LENGTH.pack(len(payload)) + payload
+        for peer in self._peers.values():
+            peer.send(frame)
+
+    def _spawn(self, target: Callable[..., None], name: str, *args: Any) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _accept(self) -> None:
+        while not self._closed.is_set():
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                return
+            self._spawn(self._receive, "airspacesim-bus-receive", connection)
+
+    def _receive(self, connection: socket.socket) -> None:
+        with connection:
+            while not self._closed.is_set():
+                try:
+                    header = _read_exactly(connection, _FRAME_LENGTH.size)
+                    if header is None:
+                        return
+                    (length,) = _FRAME_LENGTH.unpack(header)
+                    payload = _read_exactly(connection, length)
+                except OSError:
+                    return
+                if payload is None:
+                    return
+                try:
+                    message = json.loads(payload)
+                except ValueError:
+                    logger.warning("Dropped a malformed bus frame.")
+                    continue
+                self._dispatch(message)
+
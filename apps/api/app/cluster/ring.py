@@ -0,0 +1,42 @@
+"""Consistent hashing of run ids onto API workers."""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+from collections.abc import Iterable
+
+DEFAULT_VIRTUAL_NODES = 64
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class HashRing:
+    """Map keys to workers so that adding or removing a worker moves few keys.
+
+    Each worker is placed at `virtual_nodes` points on a 64-bit ring; a key
+    belongs to the first point at or after its own hash.
+    """
+
+    def __init__(
+        self, workers: Iterable[str], virtual_nodes: int = DEFAULT_VIRTUAL_NODES
+    ) -> None:
+        self.workers = tuple(dict.fromkeys(workers))
+        if not self.workers:
+            raise ValueError("A hash ring needs at least one worker.")
+        self.virtual_nodes = max(int(virtual_nodes), 1)
+        points = sorted(
+            (_hash(f"{worker}#{replica}"), worker)
+            for worker in self.workers
+            for replica in range(self.virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [worker for _, worker in points]
+
+    def owner(self, key: str) -> str:
+        index = bisect.bisect_left(self._hashes, _hash(key))
+        return self._owners[index % len(self._owners)]
@@ -0,0 +1,139 @@
+"""Run ownership and request forwarding between the API workers of one host.
+
+Every worker serves HTTP on `<socket_dir>/<worker>.http.sock` (uvicorn
+`--uds`) behind a proxy that spreads requests over all of them. A run is
+owned by the worker that `HashRing` maps its id to; only the owner keeps its
+runtime session in memory. A run request that reaches another worker is
+forwarded to the owner's socket (see `RunAffinityMiddleware`), while stream
+subscribers on any worker are fed over the message bus.
+
+The proxy reaches workers over the same sockets, so a forwarded request
+carries the cluster secret next to its forwarded-by mark. Workers ignore a
+mark that comes without it.
+"""
+
+from __future__ import annotations
+
+import http.client
+import socket
+from collections.abc import Iterable
+from pathlib import Path
+from uuid import uuid4
+
+from .bus import MessageBus
+from .ring import DEFAULT_VIRTUAL_NODES, HashRing
+
+FORWARDED_HEADER = "x-airspacesim-forwarded-by"
+FORWARD_SECRET_HEADER = "x-airspacesim-forward-secret"
+# Long polls may hold a forwarded request for up to a minute.
+FORWARD_TIMEOUT_SECONDS = 90.0
+# Connection-level headers that must not be relayed by a proxy.
+_HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "content-length",
+}
+# Set by `forward_http` itself, never relayed from the incoming request.
+_FORWARDING_HEADERS = {FORWARDED_HEADER, FORWARD_SECRET_HEADER}
+
+
+class WorkerCluster:
+    """One worker's view of the cluster: who owns which run, and the bus."""
+
+    def __init__(
+        self,
+        worker_id: str,
+        workers: Iterable[str],
+        socket_dir: str | Path,
+        bus: MessageBus,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES,
+        secret: str | None = None,
+    ) -> None:
+        self.ring = HashRing(workers, virtual_nodes)
+        if worker_id not in self.ring.workers:
+            raise ValueError(
+                f"Worker {worker_id!r} is not one of the cluster workers "
+                f"{list(self.ring.workers)}."
+            )
+        self.worker_id = worker_id
+        self.socket_dir = Path(socket_dir)
+        self.bus = bus
+        # Shared by every worker; proves a request was forwarded by one.
+        self.secret = secret
+
+    def owner(self, run_id: str) -> str:
+        return self.ring.owner(run_id)
+
+    def owns(self, run_id: str) -> bool:
+        return self.ring.owner(run_id) == self.worker_id
+
+    def new_run_id(self) -> str:
+        """A fresh run id owned by this worker, so its session can start here."""
+        while True:
+            run_id = str(uuid4())
+            if self.owns(run_id):
+                return run_id
+
+    def http_socket(self, worker_id: str) -> Path:
+        return self.socket_dir / f"{worker_id}.http.sock"
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: Path, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(str(self.path))
+
+
+def forward_http(
+    path: Path,
+    method: str,
+    target: str,
+    headers: list[tuple[str, str]],
+    body: bytes,
+    *,
+    forwarded_by: str,
+    secret: str | None = None,
+    timeout: float = FORWARD_TIMEOUT_SECONDS,
+) -> tuple[int, list[tuple[str, str]], bytes]:
+    """Relay one HTTP request over a worker's Unix socket; blocking.
+
+    Returns the status, end-to-end headers, and body. Raises OSError when
+    the worker cannot be reached.
+    """
+    connection = _UnixHTTPConnection(path, timeout)
+    try:
+        connection.putrequest(method, target, skip_host=True, skip_accept_encoding=True)
+        for name, value in headers:
+            lowered = name.lower()
+            if lowered not in _HOP_BY_HOP_HEADERS | _FORWARDING_HEADERS:
+                connection.putheader(name, value)
+        connection.putheader(FORWARDED_HEADER, forwarded_by)
+        if secret is not None:
+            connection.putheader(FORWARD_SECRET_HEADER, secret)
+        connection.putheader("content-length", str(len(body)))
+        connection.endheaders(body)
+        response = connection.getresponse()
+        payload = response.read()
+        return (
+            response.status,
+            [
+                (name, value)
+                for name, value in response.getheaders()
+                if name.lower() not in _HOP_BY_HOP_HEADERS
+            ],
+            payload,
+        )
+    except http.client.HTTPException as exc:
+        raise OSError(f"Bad response from worker socket {path}") from exc
+    finally:
+        connection.close()
@@ -2,6 +2,7 @@
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,8 +14,32 @@ class Settings(BaseSettings):
     api_v1_prefix: str = "/api/v1"
     database_url: str = "sqlite:///./var/airspacesim-api.db"
     database_echo: bool = False
+    # Connection pool per process. SQLite files get WAL journaling with
+    # synchronous=NORMAL and wait up to the busy timeout for the write lock.
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout_seconds: float = 30.0
+    database_busy_timeout_ms: int = 5000
+    database_sqlite_wal: bool = True
+    # Background writes (checkpoints, engine states, timeline segments,
+    # summaries, retention) waiting for the single writer thread.
+    database_write_queue_size: int = 10_000
     auto_create_schema: bool = True
     checkpoint_retention_per_run: int = 25
+    engine_state_interval_seconds: float = 5.0
+    recover_runs_on_startup: bool = True
+    run_recovery_workers: int = 8
+    # Paused, or unwatched and untouched, runs are evicted to the database
+    # after this long and rehydrated on demand; 0 keeps every run resident.
+    hibernate_idle_after_seconds: float = 900.0
+    hibernation_sweep_interval_seconds: float = 30.0
+    # Simulated seconds per seekable timeline segment (one keyframe each).
+    timeline_segment_seconds: float = 30.0
+    run_series_cache_entries: int = 256
+    # `wait=` long polls on run state: longest wait, and how many may block
+    # request threads at once.
+    run_state_long_poll_max_seconds: float = 25.0
+    run_state_long_poll_max_waiters: int = 16
     # Cookie-based auth requires credentialed CORS, which forbids the "*"
     # wildcard — defaults cover the local dev frontends; production must set
     # its own explicit origins (enforced in create_app).
@@ -32,9 +57,34 @@ class Settings(BaseSettings):
     auth_session_ttl_days: int = 30
     anonymous_run_retention_days: int = 14
     retention_sweep_interval_seconds: float = 3600.0
+    # Each sweep deletes in chunks and stops at its time budget; leftovers
+    # are swept again shortly after.
+    retention_sweep_chunk_size: int = 500
+    retention_sweep_time_budget_seconds: float = 5.0
     max_concurrent_runs_per_session: int = 100
     max_concurrent_runs_global: int = 500
+    # Cores the tick work of all running runs may use together; run starts
+    # that would not fit wait up to `run_admission_wait_seconds`, then get a
+    # 503, and the most expensive runs tick less often when running runs
+    # outgrow it. Ticks share one interpreter, so more than 1 rarely helps.
+    # 0 disables the budget.
+    run_cpu_budget: float = 0.8
+    run_admission_wait_seconds: float = 2.0
+    run_load_rebalance_interval_seconds: float = 1.0
     rate_limit_run_creates_per_minute: int = 300
+    # "memory" counts per worker; "sqlite" shares one count between the
+    # workers of a host through `rate_limit_sqlite_path`.
+    rate_limit_backend: Literal["memory", "sqlite"] = "memory"
+    rate_limit_sqlite_path: str = "./var/rate-limits.sqlite3"
+    # Multi-worker mode: set `worker_id` to one of `cluster_workers` in each
+    # worker process. Runs are owned by one worker each (consistent hashing
+    # on run id); workers forward run requests and share stream events over
+    # Unix sockets in `cluster_socket_dir`. `cluster_secret` marks requests
+    # forwarded between workers and is required with more than one worker.
+    worker_id: str | None = None
+    cluster_workers: list[str] = []
+    cluster_socket_dir: str = "./var/cluster"
+    cluster_secret: str | None = None
     max_request_body_bytes: int = 256_000
 
     model_config = SettingsConfigDict(
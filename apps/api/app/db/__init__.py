@@ -1,8 +1,10 @@
 """Database package for the FastAPI service."""
 
 from .session import get_db_session, get_engine, get_session_factory, init_db
+from .writer import DatabaseWriter
 
 __all__ = [
+    "DatabaseWriter",
     "get_db_session",
     "get_engine",
     "get_session_factory",
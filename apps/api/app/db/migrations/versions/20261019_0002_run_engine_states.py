@@ -0,0 +1,39 @@
+"""Add run_engine_states for crash-recoverable live runs.
+
+One row per run holding the latest `Simulation.save_state()` blob plus the
+session-level state needed to rebuild the runtime session after a restart.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0002"
+down_revision = "20260718_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_engine_states",
+        sa.Column(
+            "run_id",
+            sa.String(length=36),
+            sa.ForeignKey("runs.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("runtime_status", sa.String(length=32), nullable=False),
+        sa.Column("sim_rate", sa.Float(), nullable=False),
+        sa.Column("time_seconds", sa.Float(), nullable=False),
+        sa.Column(
+            "commands_applied", sa.Integer(), nullable=False, server_default="0"
+        ),
+        sa.Column("engine_state", sa.LargeBinary(), nullable=False),
+        sa.Column("session_json", sa.JSON(), nullable=False),
+        sa.Column("saved_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("run_engine_states")
@@ -0,0 +1,29 @@
+"""Record simulated command times and run replay manifests.
+
+`run_commands.time_seconds` is the simulated clock at which a command was
+applied; `runs.replay_json` holds the step size, starting sim rate, and final
+state digest written when a run ends.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0003"
+down_revision = "20261019_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("run_commands") as batch_op:
+        batch_op.add_column(sa.Column("time_seconds", sa.Float(), nullable=True))
+    with op.batch_alter_table("runs") as batch_op:
+        batch_op.add_column(sa.Column("replay_json", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("runs") as batch_op:
+        batch_op.drop_column("replay_json")
+    with op.batch_alter_table("run_commands") as batch_op:
+        batch_op.drop_column("time_seconds")
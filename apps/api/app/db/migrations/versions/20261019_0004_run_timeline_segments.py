@@ -0,0 +1,45 @@
+"""Add run_timeline_segments for seekable run playback.
+
+Each row is a compressed keyframe plus per-frame deltas for a span of
+simulated time, indexed by (run_id, start_seconds).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0004"
+down_revision = "20261019_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_timeline_segments",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column(
+            "run_id",
+            sa.String(length=36),
+            sa.ForeignKey("runs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("start_seconds", sa.Float(), nullable=False),
+        sa.Column("end_seconds", sa.Float(), nullable=False),
+        sa.Column("frame_count", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_run_timeline_segments_run_start",
+        "run_timeline_segments",
+        ["run_id", "start_seconds"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_run_timeline_segments_run_start", table_name="run_timeline_segments"
+    )
+    op.drop_table("run_timeline_segments")
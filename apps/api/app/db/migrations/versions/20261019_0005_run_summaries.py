@@ -0,0 +1,132 @@
+"""Add the run_summaries table and keyset-pagination indexes on runs.
+
+Existing runs with a `summary_json` are backfilled so cross-run aggregates
+cover history recorded before this revision.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0005"
+down_revision = "20261019_0004"
+branch_labels = None
+depends_on = None
+
+_SUMMARY_INDEXES = (
+    ("ix_run_summaries_lesson_ended", ["lesson_id", "ended_at"]),
+    ("ix_run_summaries_kind_ended", ["kind", "ended_at"]),
+    ("ix_run_summaries_session_ended", ["session_id", "ended_at"]),
+    ("ix_run_summaries_user_ended", ["user_id", "ended_at"]),
+)
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_runs_session_created",
+        "runs",
+        ["session_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_runs_user_created",
+        "runs",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    summaries = op.create_table(
+        "run_summaries",
+        sa.Column(
+            "run_id",
+            sa.String(length=36),
+            sa.ForeignKey("runs.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("session_id", sa.String(length=64), nullable=False),
+        sa.Column("user_id", sa.String(length=36), nullable=True),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("scenario_id", sa.String(length=36), nullable=True),
+        sa.Column("lesson_id", sa.String(length=160), nullable=True),
+        sa.Column("airspace_id", sa.String(length=120), nullable=True),
+        sa.Column("simulated_seconds", sa.Float(), nullable=False),
+        sa.Column("aircraft_total", sa.Integer(), nullable=False),
+        sa.Column("instructions_issued", sa.Integer(), nullable=False),
+        sa.Column("loss_of_separation_count", sa.Integer(), nullable=False),
+        sa.Column("practice_rating", sa.String(length=32), nullable=True),
+        sa.Column("practice_reason", sa.String(length=64), nullable=True),
+        sa.Column("separation_maintained", sa.Boolean(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    for name, columns in _SUMMARY_INDEXES:
+        op.create_index(name, "run_summaries", columns, unique=False)
+    _backfill(summaries)
+
+
+def _backfill(summaries: sa.Table) -> None:
+    runs = sa.table(
+        "runs",
+        sa.column("id", sa.String),
+        sa.column("session_id", sa.String),
+        sa.column("user_id", sa.String),
+        sa.column("scenario_id", sa.String),
+        sa.column("status", sa.String),
+        sa.column("summary_json", sa.JSON),
+        sa.column("started_at", sa.DateTime(timezone=True)),
+        sa.column("ended_at", sa.DateTime(timezone=True)),
+        sa.column("updated_at", sa.DateTime(timezone=True)),
+    )
+    scenarios = sa.table(
+        "scenarios",
+        sa.column("id", sa.String),
+        sa.column("metadata_payload", sa.JSON),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(runs, scenarios.c.metadata_payload)
+        .select_from(
+            runs.outerjoin(scenarios, scenarios.c.id == runs.c.scenario_id)
+        )
+        .where(runs.c.summary_json.is_not(None))
+    ).mappings()
+    records = []
+    for row in rows:
+        summary = row["summary_json"] or {}
+        metadata = row["metadata_payload"] or {}
+        outcome = summary.get("practice_outcome") or {}
+        records.append(
+            {
+                "run_id": row["id"],
+                "session_id": row["session_id"],
+                "user_id": row["user_id"],
+                "kind": summary.get("kind") or "simulate",
+                "status": row["status"],
+                "scenario_id": row["scenario_id"],
+                "lesson_id": metadata.get("lesson_id"),
+                "airspace_id": metadata.get("airspace_id"),
+                "simulated_seconds": float(summary.get("simulated_seconds") or 0.0),
+                "aircraft_total": int(summary.get("aircraft_total") or 0),
+                "instructions_issued": int(summary.get("instructions_issued") or 0),
+                "loss_of_separation_count": int(
+                    summary.get("loss_of_separation_count") or 0
+                ),
+                "practice_rating": outcome.get("rating"),
+                "practice_reason": outcome.get("reason"),
+                "separation_maintained": outcome.get("separation_maintained"),
+                "started_at": row["started_at"],
+                "ended_at": row["ended_at"] or row["updated_at"],
+                "created_at": row["ended_at"] or row["updated_at"],
+            }
+        )
+    if records:
+        op.bulk_insert(summaries, records)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_SUMMARY_INDEXES):
+        op.drop_index(name, table_name="run_summaries")
+    op.drop_table("run_summaries")
+    op.drop_index("ix_runs_user_created", table_name="runs")
+    op.drop_index("ix_runs_session_created", table_name="runs")
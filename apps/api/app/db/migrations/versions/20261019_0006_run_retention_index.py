@@ -0,0 +1,22 @@
+"""Index ended runs by status for the chunked retention sweep."""
+
+from alembic import op
+
+
+revision = "20261019_0006"
+down_revision = "20261019_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_runs_status_ended",
+        "runs",
+        ["status", "ended_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_runs_status_ended", table_name="runs")
@@ -0,0 +1,30 @@
+"""Add content-addressed scenarios shared by practice runs.
+
+Existing per-run practice scenarios keep a NULL hash and remain as they are.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261019_0007"
+down_revision = "20261019_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("scenarios") as batch_op:
+        batch_op.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.create_index(
+        "ix_scenarios_content_hash",
+        "scenarios",
+        ["content_hash"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scenarios_content_hash", table_name="scenarios")
+    with op.batch_alter_table("scenarios") as batch_op:
+        batch_op.drop_column("content_hash")
@@ -2,8 +2,11 @@
 
 from .checkpoint import RunCheckpointRecord
 from .command import RunCommandRecord
+from .engine_state import RunEngineStateRecord
 from .run import RunRecord
+from .run_summary import RunSummaryRecord
 from .scenario import ScenarioRecord
+from .timeline import RunTimelineSegmentRecord
 from .user import AuthSessionRecord, LearningProgressRecord, UserRecord
 
 __all__ = [
@@ -11,7 +14,10 @@ __all__ = [
     "LearningProgressRecord",
     "RunCheckpointRecord",
     "RunCommandRecord",
+    "RunEngineStateRecord",
     "RunRecord",
+    "RunSummaryRecord",
+    "RunTimelineSegmentRecord",
     "ScenarioRecord",
     "UserRecord",
 ]
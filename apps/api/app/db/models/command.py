@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, Float, ForeignKey, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import JSON
 
@@ -32,5 +32,7 @@ class RunCommandRecord(Base):
         DateTime(timezone=True), default=utcnow, nullable=False
     )
     applied_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Simulated clock when the command was applied; replay re-applies it there.
+    time_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     run = relationship("RunRecord", back_populates="commands")
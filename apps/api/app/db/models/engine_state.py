@@ -0,0 +1,38 @@
+"""Run engine-state persistence models."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import JSON
+
+from ..base import Base
+from .scenario import utcnow
+
+
+class RunEngineStateRecord(Base):
+    """Latest lossless engine state for a live run (one row per run).
+
+    `engine_state` is a `Simulation.save_state()` blob. Commands applied after
+    it are not in the blob: the first `commands_applied` applied commands of
+    the run are, and the rest form the journal replayed on recovery.
+    """
+
+    __tablename__ = "run_engine_states"
+
+    run_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("runs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    runtime_status: Mapped[str] = mapped_column(String(32), nullable=False)
+    sim_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    time_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    commands_applied: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    engine_state: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    session_json: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    saved_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False
+    )
+
+    run = relationship("RunRecord", back_populates="engine_state")
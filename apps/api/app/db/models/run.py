@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import DateTime, Float, ForeignKey, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import JSON
 
@@ -15,6 +15,13 @@ class RunRecord(Base):
     """Durable run metadata and lifecycle state."""
 
     __tablename__ = "runs"
+    # Keyset pagination for run lists: newest first within a visibility scope.
+    # The status/ended_at index serves the chunked retention sweep.
+    __table_args__ = (
+        Index("ix_runs_session_created", "session_id", "created_at", "id"),
+        Index("ix_runs_user_created", "user_id", "created_at", "id"),
+        Index("ix_runs_status_ended", "status", "ended_at"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid4())
@@ -44,6 +51,10 @@ class RunRecord(Base):
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     summary_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Step size, starting sim rate, and final state digest recorded when the
+    # run ended; together with the timed command journal it makes the run
+    # replayable (see services/replay.py).
+    replay_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
     scenario = relationship("ScenarioRecord", back_populates="runs")
     commands = relationship(
@@ -56,3 +67,20 @@ class RunRecord(Base):
         back_populates="run",
         cascade="all, delete-orphan",
     )
+    timeline_segments = relationship(
+        "RunTimelineSegmentRecord",
+        back_populates="run",
+        cascade="all, delete-orphan",
+    )
+    engine_state = relationship(
+        "RunEngineStateRecord",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
+    summary_record = relationship(
+        "RunSummaryRecord",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
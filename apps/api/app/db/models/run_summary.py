@@ -0,0 +1,53 @@
+"""Materialised run summary models."""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ..base import Base
+from .scenario import utcnow
+
+
+class RunSummaryRecord(Base):
+    """One indexed row per ended run, mirroring the key `summary_json` facts.
+
+    Written at the run's terminal checkpoint so cross-run questions (losses
+    of separation per lesson this week, outcome rates per scenario) are plain
+    indexed SQL aggregates instead of JSON scans.
+    """
+
+    __tablename__ = "run_summaries"
+    __table_args__ = (
+        Index("ix_run_summaries_lesson_ended", "lesson_id", "ended_at"),
+        Index("ix_run_summaries_kind_ended", "kind", "ended_at"),
+        Index("ix_run_summaries_session_ended", "session_id", "ended_at"),
+        Index("ix_run_summaries_user_ended", "user_id", "ended_at"),
+    )
+
+    run_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("runs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    session_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    scenario_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    lesson_id: Mapped[str | None] = mapped_column(String(160), nullable=True)
+    airspace_id: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    simulated_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    aircraft_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    instructions_issued: Mapped[int] = mapped_column(Integer, nullable=False)
+    loss_of_separation_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    practice_rating: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    practice_reason: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    separation_maintained: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    ended_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+    run = relationship("RunRecord", back_populates="summary_record")
@@ -10,6 +10,10 @@ from sqlalchemy.types import JSON
 from ..base import Base
 
 
+# Owner of content-addressed scenarios; real session ids are at least 8 chars.
+SHARED_SCENARIO_SESSION_ID = "content"
+
+
 def utcnow() -> datetime:
     """Return an aware UTC timestamp for ORM defaults."""
 
@@ -17,7 +21,11 @@ def utcnow() -> datetime:
 
 
 class ScenarioRecord(Base):
-    """Durable scenario definition for the hosted application."""
+    """Durable scenario definition for the hosted application.
+
+    Scenarios built from immutable package content carry a `content_hash` and
+    are shared, read-only, by every run of that content.
+    """
 
     __tablename__ = "scenarios"
 
@@ -37,6 +45,9 @@ class ScenarioRecord(Base):
     airspace_payload: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
     aircraft_payload: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
     metadata_payload: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64), unique=True, index=True, nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utcnow, nullable=False
     )
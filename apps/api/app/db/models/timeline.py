@@ -0,0 +1,42 @@
+"""Run timeline persistence models."""
+
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ..base import Base
+from .scenario import utcnow
+
+
+class RunTimelineSegmentRecord(Base):
+    """One keyframe plus per-frame deltas covering a span of simulated time.
+
+    `payload` is the compressed segment document written by
+    `app.sessions.timeline`. A segment is authoritative from `start_seconds`
+    until the next segment of the run starts.
+    """
+
+    __tablename__ = "run_timeline_segments"
+    __table_args__ = (
+        Index("ix_run_timeline_segments_run_start", "run_id", "start_seconds"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid4())
+    )
+    run_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("runs.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    start_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    end_seconds: Mapped[float] = mapped_column(Float, nullable=False)
+    frame_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+    run = relationship("RunRecord", back_populates="timeline_segments")
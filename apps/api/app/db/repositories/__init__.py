@@ -2,12 +2,18 @@
 
 from .checkpoints import RunCheckpointRepository
 from .commands import RunCommandRepository
+from .engine_states import RunEngineStateRepository
+from .run_summaries import RunSummaryRepository
 from .runs import RunRepository
 from .scenarios import ScenarioRepository
+from .timeline import RunTimelineRepository
 
 __all__ = [
     "RunCheckpointRepository",
     "RunCommandRepository",
+    "RunEngineStateRepository",
     "RunRepository",
+    "RunSummaryRepository",
+    "RunTimelineRepository",
     "ScenarioRepository",
 ]
@@ -55,6 +55,19 @@ class RunCheckpointRepository:
         )
         return self.session.scalar(statement)
 
+    def latest_id_for_run(self, run_id: str) -> str | None:
+        """Id of `latest_for_run`, without loading its snapshot."""
+        statement = (
+            select(RunCheckpointRecord.id)
+            .where(RunCheckpointRecord.run_id == run_id)
+            .order_by(
+                desc(RunCheckpointRecord.created_at),
+                desc(RunCheckpointRecord.id),
+            )
+            .limit(1)
+        )
+        return self.session.scalar(statement)
+
     def prune_for_run(self, run_id: str, *, keep_latest: int) -> int:
         if keep_latest <= 0:
             keep_latest = 1
@@ -31,3 +31,22 @@ class RunCommandRepository:
             .order_by(RunCommandRecord.created_at.desc())
         )
         return list(self.session.scalars(statement))
+
+    def list_applied_for_run(
+        self, run_id: str, *, offset: int = 0
+    ) -> list[RunCommandRecord]:
+        """Applied commands in application order, skipping the first `offset`."""
+        statement = (
+            select(RunCommandRecord)
+            .where(
+                RunCommandRecord.run_id == run_id,
+                RunCommandRecord.status == "applied",
+            )
+            .order_by(
+                RunCommandRecord.applied_at,
+                RunCommandRecord.created_at,
+                RunCommandRecord.id,
+            )
+            .offset(max(int(offset), 0))
+        )
+        return list(self.session.scalars(statement))
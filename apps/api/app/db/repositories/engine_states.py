@@ -0,0 +1,51 @@
+"""Engine-state repository helpers."""
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..models import RunEngineStateRecord, RunRecord
+
+_RECOVERABLE_RUN_STATUSES = ("running", "paused")
+# `runtime_status` of engine states saved when an idle session was evicted.
+HIBERNATED_RUNTIME_STATUS = "hibernated"
+
+
+class RunEngineStateRepository:
+    """Repository for the latest recoverable engine state of each run."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, run_id: str) -> RunEngineStateRecord | None:
+        return self.session.get(RunEngineStateRecord, run_id)
+
+    def save(self, state: RunEngineStateRecord) -> RunEngineStateRecord:
+        """Insert or replace the run's engine state."""
+        state = self.session.merge(state)
+        self.session.commit()
+        return state
+
+    def delete_for_run(self, run_id: str) -> int:
+        result = self.session.execute(
+            delete(RunEngineStateRecord).where(RunEngineStateRecord.run_id == run_id)
+        )
+        self.session.commit()
+        return int(result.rowcount or 0)
+
+    def list_recoverable_run_ids(self, *, include_hibernated: bool = True) -> list[str]:
+        """Runs that are durably live and have an engine state to resume from.
+
+        Hibernated runs were idle when saved; leave them out to only get runs
+        that were resident.
+        """
+        statement = (
+            select(RunEngineStateRecord.run_id)
+            .join(RunRecord, RunRecord.id == RunEngineStateRecord.run_id)
+            .where(RunRecord.status.in_(_RECOVERABLE_RUN_STATUSES))
+            .order_by(RunEngineStateRecord.saved_at.desc())
+        )
+        if not include_hibernated:
+            statement = statement.where(
+                RunEngineStateRecord.runtime_status != HIBERNATED_RUNTIME_STATUS
+            )
+        return list(self.session.scalars(statement))
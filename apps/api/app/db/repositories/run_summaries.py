@@ -0,0 +1,93 @@
+"""Run summary repository helpers."""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from ..models import RunSummaryRecord
+
+# Columns cross-run aggregates may be grouped by; "day" groups by ended_at.
+RUN_SUMMARY_GROUPS = ("lesson_id", "scenario_id", "airspace_id", "kind", "day")
+SAFE_PRACTICE_RATING = "safe_effective"
+
+
+class RunSummaryRepository:
+    """Repository for materialised run summaries and cross-run aggregates."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def save(self, summary: RunSummaryRecord) -> RunSummaryRecord:
+        """Insert or replace the run's summary row."""
+        summary = self.session.merge(summary)
+        self.session.commit()
+        return summary
+
+    @staticmethod
+    def _scope(session_id: str, user_id: str | None):
+        if user_id is None:
+            return RunSummaryRecord.session_id == session_id
+        return or_(
+            RunSummaryRecord.user_id == user_id,
+            and_(
+                RunSummaryRecord.session_id == session_id,
+                RunSummaryRecord.user_id.is_(None),
+            ),
+        )
+
+    def aggregate(
+        self,
+        *,
+        session_id: str,
+        user_id: str | None = None,
+        group_by: str = "lesson_id",
+        kind: str | None = None,
+        lesson_id: str | None = None,
+        ended_after: datetime | None = None,
+        ended_before: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """Per-group run counts, loss-of-separation and duration statistics."""
+        if group_by == "day":
+            key = func.date(RunSummaryRecord.ended_at)
+        else:
+            key = getattr(RunSummaryRecord, group_by)
+        filters = [self._scope(session_id, user_id)]
+        if kind is not None:
+            filters.append(RunSummaryRecord.kind == kind)
+        if lesson_id is not None:
+            filters.append(RunSummaryRecord.lesson_id == lesson_id)
+        if ended_after is not None:
+            filters.append(RunSummaryRecord.ended_at >= ended_after)
+        if ended_before is not None:
+            filters.append(RunSummaryRecord.ended_at < ended_before)
+
+        statement = (
+            select(
+                key.label("key"),
+                func.count().label("run_count"),
+                func.sum(RunSummaryRecord.loss_of_separation_count).label(
+                    "loss_of_separation_total"
+                ),
+                func.avg(RunSummaryRecord.loss_of_separation_count).label(
+                    "loss_of_separation_avg"
+                ),
+                func.avg(RunSummaryRecord.simulated_seconds).label(
+                    "simulated_seconds_avg"
+                ),
+                func.avg(RunSummaryRecord.instructions_issued).label(
+                    "instructions_issued_avg"
+                ),
+                func.sum(
+                    case(
+                        (RunSummaryRecord.practice_rating == SAFE_PRACTICE_RATING, 1),
+                        else_=0,
+                    )
+                ).label("safe_effective_count"),
+            )
+            .where(*filters)
+            .group_by(key)
+            .order_by(key)
+        )
+        return [dict(row) for row in self.session.execute(statement).mappings()]
@@ -1,5 +1,8 @@
 """Run repository helpers."""
 
+import base64
+from datetime import datetime
+
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session, selectinload
 
@@ -8,6 +11,22 @@ from ..models import RunRecord
 _ACTIVE_RUN_STATUSES = ("running", "paused")
 
 
+def encode_run_cursor(run: RunRecord) -> str:
+    """Opaque keyset cursor positioned just after `run` in list order."""
+    raw = f"{run.created_at.isoformat()}|{run.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_run_cursor(cursor: str) -> tuple[datetime, str]:
+    """Inverse of `encode_run_cursor`; raises ValueError for malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, run_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), run_id
+    except (UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid run list cursor") from exc
+
+
 class RunRepository:
     """Repository for run persistence operations."""
 
@@ -25,14 +44,26 @@ class RunRepository:
         )
 
     def list(
-        self, *, session_id: str, user_id: str | None = None
+        self,
+        *,
+        session_id: str,
+        user_id: str | None = None,
+        limit: int | None = None,
+        after: tuple[datetime, str] | None = None,
     ) -> list[RunRecord]:
-        statement = (
-            select(RunRecord)
-            .options(selectinload(RunRecord.scenario))
-            .where(self._scope(session_id, user_id))
-            .order_by(RunRecord.created_at.desc())
-        )
+        """Visible runs, newest first; `after` is a decoded keyset cursor."""
+        statement = select(RunRecord).where(self._scope(session_id, user_id))
+        if after is not None:
+            created_at, run_id = after
+            statement = statement.where(
+                or_(
+                    RunRecord.created_at < created_at,
+                    and_(RunRecord.created_at == created_at, RunRecord.id < run_id),
+                )
+            )
+        statement = statement.order_by(RunRecord.created_at.desc(), RunRecord.id.desc())
+        if limit is not None:
+            statement = statement.limit(limit)
         return list(self.session.scalars(statement))
 
     def get(
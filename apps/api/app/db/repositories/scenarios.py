@@ -35,11 +35,20 @@ class ScenarioRepository:
         return list(self.session.scalars(statement))
 
     def get(
-        self, scenario_id: str, *, session_id: str, user_id: str | None = None
+        self,
+        scenario_id: str,
+        *,
+        session_id: str,
+        user_id: str | None = None,
+        include_shared: bool = False,
     ) -> ScenarioRecord | None:
+        """Fetch a visible scenario; `include_shared` adds shared content."""
+        scope = self._scope(session_id, user_id)
+        if include_shared:
+            scope = or_(scope, ScenarioRecord.content_hash.is_not(None))
         statement = select(ScenarioRecord).where(
             ScenarioRecord.id == scenario_id,
-            self._scope(session_id, user_id),
+            scope,
         )
         return self.session.scalar(statement)
 
@@ -47,6 +56,12 @@ class ScenarioRepository:
         statement = select(ScenarioRecord).where(ScenarioRecord.slug == slug)
         return self.session.scalar(statement)
 
+    def get_by_content_hash(self, content_hash: str) -> ScenarioRecord | None:
+        statement = select(ScenarioRecord).where(
+            ScenarioRecord.content_hash == content_hash
+        )
+        return self.session.scalar(statement)
+
     def create(self, scenario: ScenarioRecord) -> ScenarioRecord:
         self.session.add(scenario)
         self.session.commit()
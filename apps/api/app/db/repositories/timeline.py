@@ -0,0 +1,88 @@
+"""Run timeline repository helpers."""
+
+from sqlalchemy import delete, desc, select
+from sqlalchemy.orm import Session
+
+from ..models import RunTimelineSegmentRecord
+
+
+class RunTimelineRepository:
+    """Repository for a run's timeline segments, ordered by simulated time."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def create(self, segment: RunTimelineSegmentRecord) -> RunTimelineSegmentRecord:
+        self.session.add(segment)
+        self.session.commit()
+        return segment
+
+    def segment_at(
+        self, run_id: str, time_seconds: float
+    ) -> RunTimelineSegmentRecord | None:
+        """The segment covering `time_seconds`: the last one starting at or before it."""
+        statement = (
+            select(RunTimelineSegmentRecord)
+            .where(
+                RunTimelineSegmentRecord.run_id == run_id,
+                RunTimelineSegmentRecord.start_seconds <= time_seconds,
+            )
+            .order_by(
+                desc(RunTimelineSegmentRecord.start_seconds),
+                desc(RunTimelineSegmentRecord.created_at),
+            )
+            .limit(1)
+        )
+        return self.session.scalar(statement)
+
+    def list_between(
+        self, run_id: str, start_seconds: float, end_seconds: float
+    ) -> list[RunTimelineSegmentRecord]:
+        """Segments covering any of [start_seconds, end_seconds], oldest first."""
+        first = self.segment_at(run_id, start_seconds)
+        lower = first.start_seconds if first is not None else start_seconds
+        statement = (
+            select(RunTimelineSegmentRecord)
+            .where(
+                RunTimelineSegmentRecord.run_id == run_id,
+                RunTimelineSegmentRecord.start_seconds >= lower,
+                RunTimelineSegmentRecord.start_seconds <= end_seconds,
+            )
+            .order_by(
+                RunTimelineSegmentRecord.start_seconds,
+                RunTimelineSegmentRecord.created_at,
+            )
+        )
+        return list(self.session.scalars(statement))
+
+    def extent(self, run_id: str) -> tuple[float, float] | None:
+        """(first start, last end) of the stored timeline, if any."""
+        first = self.session.scalar(
+            select(RunTimelineSegmentRecord.start_seconds)
+            .where(RunTimelineSegmentRecord.run_id == run_id)
+            .order_by(RunTimelineSegmentRecord.start_seconds)
+            .limit(1)
+        )
+        if first is None:
+            return None
+        last = self.session.scalar(
+            select(RunTimelineSegmentRecord.end_seconds)
+            .where(RunTimelineSegmentRecord.run_id == run_id)
+            .order_by(
+                desc(RunTimelineSegmentRecord.start_seconds),
+                desc(RunTimelineSegmentRecord.created_at),
+            )
+            .limit(1)
+        )
+        return first, last
+
+    def delete_from(self, run_id: str, start_seconds: float) -> int:
+        """Drop segments starting at or after `start_seconds` (abandoned history)."""
+        result = self.session.execute(
+            delete(RunTimelineSegmentRecord).where(
+                RunTimelineSegmentRecord.run_id == run_id,
+                RunTimelineSegmentRecord.start_seconds >= start_seconds,
+            )
+        )
+        self.session.commit()
+        return int(result.rowcount or 0)
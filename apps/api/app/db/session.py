@@ -1,19 +1,59 @@
 """SQLAlchemy engine and session management."""
 
 from functools import lru_cache
+from typing import Any
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from ..config import get_settings
+from ..config import Settings, get_settings
 from . import models  # noqa: F401
 from .base import Base
 
 
-def _sqlite_connect_args(database_url: str) -> dict[str, object]:
-    if database_url.startswith("sqlite"):
-        return {"check_same_thread": False}
-    return {}
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """Keyword arguments for `create_engine` under `settings`.
+
+    SQLite files and server databases share the pool sizing settings. An
+    in-memory SQLite database is one connection, shared through a static pool.
+    """
+
+    options: dict[str, Any] = {"echo": settings.database_echo, "future": True}
+    if settings.database_url.startswith("sqlite"):
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.database_busy_timeout_ms / 1000,
+        }
+        if settings.database_path is None:
+            options["poolclass"] = StaticPool
+            return options
+    else:
+        options["pool_pre_ping"] = True
+    options.update(
+        pool_size=max(settings.database_pool_size, 1),
+        max_overflow=max(settings.database_max_overflow, 0),
+        pool_timeout=settings.database_pool_timeout_seconds,
+    )
+    return options
+
+
+def _install_sqlite_pragmas(engine: Engine, settings: Settings) -> None:
+    wal = settings.database_sqlite_wal and settings.database_path is not None
+    busy_timeout_ms = int(settings.database_busy_timeout_ms)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            if wal:
+                # Readers no longer block the writer (or vice versa), and
+                # NORMAL syncs at checkpoints instead of every commit.
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        finally:
+            cursor.close()
 
 
 @lru_cache
@@ -24,12 +64,10 @@ def get_engine() -> Engine:
     database_path = settings.database_path
     if database_path is not None:
         database_path.parent.mkdir(parents=True, exist_ok=True)
-    return create_engine(
-        settings.database_url,
-        echo=settings.database_echo,
-        future=True,
-        connect_args=_sqlite_connect_args(settings.database_url),
-    )
+    engine = create_engine(settings.database_url, **engine_options(settings))
+    if engine.dialect.name == "sqlite":
+        _install_sqlite_pragmas(engine, settings)
+    return engine
 
 
 @lru_cache
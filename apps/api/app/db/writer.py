@@ -0,0 +1,127 @@
+"""Serialised background writer for the database.
+
+SQLite allows one writer at a time. When every tick thread opens its own
+session to save checkpoints, engine states, timeline segments, and summaries,
+those writers queue on the database lock inside the tick, and the wait shows
+up as tick jitter. `DatabaseWriter` owns one thread and one queue instead.
+Background writes are submitted as callables taking a fresh `Session`, and
+they run one at a time in submission order. Submissions from a single thread
+are therefore applied in the order they were made.
+
+`submit(write)` returns at once. `submit(write, wait=True)` blocks until the
+write has run, returns its result, and re-raises its exception. Use it when
+the caller must observe the write, for example a stop that reads its own
+summary back. The queue is bounded, so a writer that falls behind slows
+producers down instead of growing memory.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+Write = Callable[[Session], Any]
+
+
+class _Job:
+    __slots__ = ("write", "done", "result", "error")
+
+    def __init__(self, write: Write, wait: bool) -> None:
+        self.write = write
+        self.done = threading.Event() if wait else None
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class DatabaseWriter:
+    """Run database writes on a single background thread, in order."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        *,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self._queue: queue.Queue[_Job | None] = queue.Queue(max(int(max_pending), 1))
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, write: Write, *, wait: bool = False) -> Any:
+        """Queue `write(session)`; with `wait`, block for and return its result.
+
+        Writes run inline once the writer is closed or when submitted from the
+        writer thread itself.
+        """
+        if threading.current_thread() is self._thread:
+            return self._execute(write)
+        job = _Job(write, wait)
+        with self._lock:
+            if not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="airspacesim-db-writer", daemon=True
+                    )
+                    self._thread.start()
+                self._queue.put(job)
+                queued = True
+            else:
+                queued = False
+        if not queued:
+            return self._execute(write)
+        if job.done is None:
+            return None
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def flush(self) -> None:
+        """Block until every write submitted so far has run."""
+        if self._thread is not None:
+            self.submit(lambda session: None, wait=True)
+
+    def close(self) -> None:
+        """Drain queued writes and stop the thread. Later writes run inline."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _execute(self, write: Write) -> Any:
+        session = self.session_factory()
+        try:
+            return write(session)
+        finally:
+            session.close()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                job.result = self._execute(job.write)
+            except Exception as exc:
+                if job.done is None:
+                    logger.exception("Background database write failed.")
+                job.error = exc
+            finally:
+                if job.done is not None:
+                    job.done.set()
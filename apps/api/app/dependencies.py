@@ -11,6 +11,7 @@ from .db.models import UserRecord
 from .db.session import get_db_session
 from .limits import SlidingWindowRateLimiter
 from .services.auth import resolve_auth_session
+from .services.run_series import RunSeriesCache
 from .session_identity import SESSION_HEADER_NAME, SESSION_QUERY_PARAM, get_session_id
 from .sessions import SessionRegistry
 from .ws import BroadcastHub
@@ -34,6 +35,12 @@ def get_broadcast_hub_dependency(connection: HTTPConnection) -> BroadcastHub:
     return connection.app.state.broadcast_hub
 
 
+def get_run_series_cache_dependency(connection: HTTPConnection) -> RunSeriesCache:
+    """Expose the cache of downsampled run series."""
+
+    return connection.app.state.run_series_cache
+
+
 def enforce_run_creation_rate_limit(
     connection: HTTPConnection,
     session_id: Annotated[str, Depends(get_session_id)],
@@ -94,6 +101,10 @@ BroadcastHubDependency = Annotated[
     BroadcastHub,
     Depends(get_broadcast_hub_dependency),
 ]
+RunSeriesCacheDependency = Annotated[
+    RunSeriesCache,
+    Depends(get_run_series_cache_dependency),
+]
 SessionIdDependency = Annotated[str, Depends(get_session_id)]
 OptionalSessionIdDependency = Annotated[str | None, Depends(get_optional_session_id)]
 CurrentUserDependency = Annotated[UserRecord, Depends(get_required_current_user)]
@@ -1,37 +1,129 @@
-"""In-process request throttling for the hosted API.
+"""Request throttling for the hosted API.
 
-Single-process, in-memory limiter — matches the current single-worker
-deployment model (see docs/deployment/README.md). Revisit if the API moves
-to a multi-worker/multi-instance deployment.
+The limiter keeps its hit log in a pluggable backend. `InMemoryRateLimitBackend`
+suits a single worker. `SqliteRateLimitBackend` keeps hits in a small SQLite
+file shared by every worker process on the host, so a multi-worker
+deployment enforces one limit rather than one per worker.
 """
 
 from __future__ import annotations
 
+import sqlite3
 import threading
 import time
 from collections import defaultdict, deque
+from pathlib import Path
 
 from fastapi import HTTPException, status
 
 
-class SlidingWindowRateLimiter:
-    """Cap the number of calls per key within a rolling time window."""
+class RateLimitBackend:
+    """Where a rate limiter records hits."""
 
-    def __init__(self, *, max_requests: int, window_seconds: float) -> None:
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
+    def hit(self, key: str, *, limit: int, window_seconds: float) -> bool:
+        """Record a hit for `key` unless it already has `limit` in the window.
+
+        Returns whether the hit was allowed.
+        """
+        raise NotImplementedError
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process hit log; each worker counts on its own."""
+
+    def __init__(self) -> None:
         self._hits: dict[str, deque[float]] = defaultdict(deque)
         self._lock = threading.Lock()
 
-    def check(self, key: str) -> None:
+    def hit(self, key: str, *, limit: int, window_seconds: float) -> bool:
         now = time.monotonic()
         with self._lock:
             hits = self._hits[key]
-            while hits and now - hits[0] > self.window_seconds:
+            while hits and now - hits[0] > window_seconds:
                 hits.popleft()
-            if len(hits) >= self.max_requests:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Too many run-creation requests. Try again shortly.",
-                )
+            if len(hits) >= limit:
+                return False
             hits.append(now)
+            return True
+
+
+class SqliteRateLimitBackend(RateLimitBackend):
+    """Hit log in a SQLite file shared by the worker processes of one host.
+
+    Each check is one short `BEGIN IMMEDIATE` transaction, so concurrent
+    workers see each other's hits. Times are wall-clock seconds.
+    """
+
+    def __init__(self, path: str | Path, busy_timeout_seconds: float = 5.0) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=busy_timeout_seconds,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_hits "
+                "(key TEXT NOT NULL, hit_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_hits_key_hit_at "
+                "ON rate_limit_hits (key, hit_at)"
+            )
+
+    def hit(self, key: str, *, limit: int, window_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "DELETE FROM rate_limit_hits WHERE key = ? AND hit_at < ?",
+                    (key, now - window_seconds),
+                )
+                (count,) = connection.execute(
+                    "SELECT COUNT(*) FROM rate_limit_hits WHERE key = ?", (key,)
+                ).fetchone()
+                allowed = count < limit
+                if allowed:
+                    connection.execute(
+                        "INSERT INTO rate_limit_hits (key, hit_at) VALUES (?, ?)",
+                        (key, now),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class SlidingWindowRateLimiter:
+    """Cap the number of calls per key within a rolling time window."""
+
+    def __init__(
+        self,
+        *,
+        max_requests: int,
+        window_seconds: float,
+        backend: RateLimitBackend | None = None,
+    ) -> None:
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.backend = backend or InMemoryRateLimitBackend()
+
+    def check(self, key: str) -> None:
+        if not self.backend.hit(
+            key, limit=self.max_requests, window_seconds=self.window_seconds
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many run-creation requests. Try again shortly.",
+            )
@@ -1,5 +1,6 @@
 """FastAPI application factory."""
 
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -15,15 +16,61 @@ from .api.v1.routes import (
     runs,
     scenarios,
 )
-from .config import get_settings
+from .cluster import UnixSocketBus, WorkerCluster
+from .config import Settings, get_settings
 from .db.session import get_session_factory, init_db
-from .limits import SlidingWindowRateLimiter
+from .db.writer import DatabaseWriter
+from .limits import (
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+    SlidingWindowRateLimiter,
+    SqliteRateLimitBackend,
+)
 from .logging_config import configure_logging
-from .middleware import MaxBodySizeMiddleware
+from .middleware import MaxBodySizeMiddleware, RunAffinityMiddleware
 from .services.retention import RetentionSweeper
-from .sessions import SessionRegistry
+from .services.run_series import RunSeriesCache
+from .sessions import HibernationSweeper, LoadGovernor, SessionRegistry
 from .ws import BroadcastHub
 
+logger = logging.getLogger(__name__)
+
+
+def _build_cluster(settings: Settings) -> WorkerCluster | None:
+    if settings.worker_id is None:
+        return None
+    workers = settings.cluster_workers or [settings.worker_id]
+    if len(set(workers)) > 1 and not settings.cluster_secret:
+        raise RuntimeError(
+            "Set AIRSPACESIM_API_CLUSTER_SECRET to the same random value in "
+            "every worker."
+        )
+    try:
+        return WorkerCluster(
+            settings.worker_id,
+            workers,
+            settings.cluster_socket_dir,
+            UnixSocketBus(settings.worker_id, workers, settings.cluster_socket_dir),
+            secret=settings.cluster_secret,
+        )
+    except ValueError as exc:
+        raise RuntimeError(
+            f"{exc} Set AIRSPACESIM_API_CLUSTER_WORKERS to include it."
+        ) from exc
+
+
+def _build_rate_limit_backend(
+    settings: Settings, cluster: WorkerCluster | None
+) -> RateLimitBackend:
+    if settings.rate_limit_backend == "sqlite":
+        return SqliteRateLimitBackend(settings.rate_limit_sqlite_path)
+    if cluster is not None and len(cluster.ring.workers) > 1:
+        logger.warning(
+            "Rate limits are counted per worker; set "
+            "AIRSPACESIM_API_RATE_LIMIT_BACKEND=sqlite to share them."
+        )
+    return InMemoryRateLimitBackend()
+
 
 def create_app() -> FastAPI:
     """Build and configure the FastAPI application."""
@@ -42,20 +89,47 @@ def create_app() -> FastAPI:
                 f"(found {insecure_origins}); set "
                 "AIRSPACESIM_API_CORS_ALLOWED_ORIGINS explicitly."
             )
-    broadcast_hub = BroadcastHub()
+    cluster = _build_cluster(settings)
+    broadcast_hub = BroadcastHub(bus=cluster.bus if cluster else None)
+    database_writer = DatabaseWriter(
+        get_session_factory(), max_pending=settings.database_write_queue_size
+    )
     session_registry = SessionRegistry(
         broadcast_hub=broadcast_hub,
         checkpoint_retention_per_run=settings.checkpoint_retention_per_run,
+        engine_state_interval_seconds=settings.engine_state_interval_seconds,
+        recovery_workers=settings.run_recovery_workers,
+        hibernate_idle_after_seconds=settings.hibernate_idle_after_seconds,
+        timeline_segment_seconds=settings.timeline_segment_seconds,
+        writer=database_writer,
+        long_poll_max_seconds=settings.run_state_long_poll_max_seconds,
+        long_poll_max_waiters=settings.run_state_long_poll_max_waiters,
+        cluster=cluster,
+        cpu_budget=settings.run_cpu_budget,
+        admission_wait_seconds=settings.run_admission_wait_seconds,
+    )
+    load_governor = LoadGovernor(
+        session_registry,
+        interval_seconds=settings.run_load_rebalance_interval_seconds,
+    )
+    hibernation_sweeper = HibernationSweeper(
+        session_registry,
+        interval_seconds=settings.hibernation_sweep_interval_seconds,
     )
+    run_series_cache = RunSeriesCache(max_entries=settings.run_series_cache_entries)
     run_creation_rate_limiter = SlidingWindowRateLimiter(
         max_requests=settings.rate_limit_run_creates_per_minute,
         window_seconds=60.0,
+        backend=_build_rate_limit_backend(settings, cluster),
     )
 
     retention_sweeper = RetentionSweeper(
         get_session_factory(),
         retention_days=settings.anonymous_run_retention_days,
         interval_seconds=settings.retention_sweep_interval_seconds,
+        writer=database_writer,
+        chunk_size=settings.retention_sweep_chunk_size,
+        time_budget_seconds=settings.retention_sweep_time_budget_seconds,
     )
 
     @asynccontextmanager
@@ -65,11 +139,24 @@ def create_app() -> FastAPI:
         app.state.session_registry = session_registry
         app.state.broadcast_hub = broadcast_hub
         app.state.run_creation_rate_limiter = run_creation_rate_limiter
+        app.state.run_series_cache = run_series_cache
         app.state.retention_sweeper = retention_sweeper
+        if cluster is not None:
+            cluster.bus.start()
+            broadcast_hub.start()
+        if settings.recover_runs_on_startup:
+            session_registry.recover_all()
         retention_sweeper.start()
+        hibernation_sweeper.start()
+        load_governor.start()
         yield
+        load_governor.stop()
+        hibernation_sweeper.stop()
         retention_sweeper.stop()
         session_registry.shutdown()
+        database_writer.close()
+        if cluster is not None:
+            cluster.bus.close()
 
     app = FastAPI(
         title=settings.app_name,
@@ -82,13 +169,22 @@ def create_app() -> FastAPI:
         allow_credentials=settings.cors_allow_credentials,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Cross-origin pollers revalidate run state with it.
+        expose_headers=["ETag"],
     )
     app.add_middleware(
         MaxBodySizeMiddleware, max_bytes=settings.max_request_body_bytes
     )
+    if cluster is not None:
+        app.add_middleware(
+            RunAffinityMiddleware,
+            cluster=cluster,
+            runs_prefix=f"{settings.api_v1_prefix}/runs",
+        )
     app.state.session_registry = session_registry
     app.state.broadcast_hub = broadcast_hub
     app.state.run_creation_rate_limiter = run_creation_rate_limiter
+    app.state.run_series_cache = run_series_cache
 
     app.include_router(health.router)
     app.include_router(auth.router, prefix=settings.api_v1_prefix)
@@ -2,9 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import hmac
+import logging
+
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
+
+from .cluster import (
+    FORWARD_SECRET_HEADER,
+    FORWARDED_HEADER,
+    WorkerCluster,
+    forward_http,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class MaxBodySizeMiddleware(BaseHTTPMiddleware):
@@ -32,3 +45,81 @@ class MaxBodySizeMiddleware(BaseHTTPMiddleware):
                     content={"detail": "Request body too large."},
                 )
         return await call_next(request)
+
+
+class RunAffinityMiddleware(BaseHTTPMiddleware):
+    """Forward run requests to the worker that owns the run.
+
+    Applies to `<runs_prefix>/<run_id>/...` HTTP requests only. WebSocket
+    streams are served by any worker, fed over the cluster bus. A request
+    already forwarded once is never forwarded again, so a worker that
+    disagrees about ownership answers it itself. Only requests carrying the
+    cluster secret count as forwarded; the forwarding headers are stripped
+    from every other request, and the secret from all of them.
+    """
+
+    # Path segments under the runs prefix that are not run ids.
+    _COLLECTION_SEGMENTS = {"", "practice", "summaries"}
+
+    def __init__(self, app, *, cluster: WorkerCluster, runs_prefix: str) -> None:
+        super().__init__(app)
+        self.cluster = cluster
+        self.runs_prefix = runs_prefix.rstrip("/") + "/"
+
+    def _run_id(self, path: str) -> str | None:
+        if not path.startswith(self.runs_prefix):
+            return None
+        run_id = path[len(self.runs_prefix) :].split("/", 1)[0]
+        return None if run_id in self._COLLECTION_SEGMENTS else run_id
+
+    def _forwarded(self, request: Request) -> bool:
+        secret = request.headers.get(FORWARD_SECRET_HEADER)
+        forwarded = (
+            FORWARDED_HEADER in request.headers
+            and secret is not None
+            and self.cluster.secret is not None
+            and hmac.compare_digest(secret.encode(), self.cluster.secret.encode())
+        )
+        stripped = {FORWARD_SECRET_HEADER.encode()}
+        if not forwarded:
+            stripped.add(FORWARDED_HEADER.encode())
+        request.scope["headers"] = [
+            (name, value)
+            for name, value in request.scope["headers"]
+            if name.lower() not in stripped
+        ]
+        return forwarded
+
+    async def dispatch(self, request: Request, call_next):
+        forwarded = self._forwarded(request)
+        run_id = self._run_id(request.url.path)
+        if run_id is None or forwarded or self.cluster.owns(run_id):
+            return await call_next(request)
+        owner = self.cluster.owner(run_id)
+        target = request.url.path
+        if request.url.query:
+            target = f"{target}?{request.url.query}"
+        try:
+            status_code, headers, body = await asyncio.to_thread(
+                forward_http,
+                self.cluster.http_socket(owner),
+                request.method,
+                target,
+                request.headers.items(),
+                await request.body(),
+                forwarded_by=self.cluster.worker_id,
+                secret=self.cluster.secret,
+            )
+        except OSError:
+            logger.warning(
+                "Could not forward run request to its owner",
+                extra={"run_id": run_id, "owner": owner},
+            )
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "The worker running this run is unavailable."},
+            )
+        response = Response(content=body, status_code=status_code)
+        for name, value in headers:
+            response.headers.append(name, value)
+        return response
@@ -24,6 +24,7 @@ class RunCommandResponse(BaseModel):
     payload: dict[str, Any]
     created_at: datetime
     applied_at: datetime | None
+    time_seconds: float | None = None
 
     model_config = {"from_attributes": True}
 
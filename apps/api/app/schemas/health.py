@@ -3,9 +3,45 @@
 from pydantic import BaseModel
 
 
+class RuntimeSessionCounts(BaseModel):
+    """Live runs held in memory vs hibernated to the database."""
+
+    resident: int
+    hibernated: int
+    # Background database writes queued behind the writer thread.
+    pending_writes: int = 0
+
+
+class StreamCounts(BaseModel):
+    """Live run stream subscribers and how far the slowest is behind."""
+
+    subscribers: int
+    max_lag_seconds: float
+    # Command results and events not queued because a mailbox was full.
+    events_dropped: int
+
+
+class RunLoad(BaseModel):
+    """CPU budget of running runs and how much of it they use."""
+
+    # Cores; 0 when the budget is disabled.
+    cpu_budget: float
+    cpu_load: float
+    running: int
+    # Runs ticking less often to fit the budget.
+    degraded: int
+    admissions_waiting: int
+    admissions_rejected: int
+    # Calibrated tick work per aircraft, in seconds.
+    seconds_per_aircraft_tick: float
+
+
 class HealthResponse(BaseModel):
     """Minimal health payload."""
 
     status: str
     service: str
     database: str
+    runtime_sessions: RuntimeSessionCounts | None = None
+    streams: StreamCounts | None = None
+    run_load: RunLoad | None = None
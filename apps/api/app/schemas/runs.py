@@ -42,9 +42,29 @@ class RunResponse(BaseModel):
 
 
 class RunListResponse(BaseModel):
-    """Run list envelope."""
+    """Run list envelope, one keyset page at a time."""
 
     items: list[RunResponse]
+    next_cursor: str | None = None
+
+
+class RunSummaryAggregateGroup(BaseModel):
+    """Cross-run statistics for one group of ended runs."""
+
+    key: str | None
+    run_count: int
+    loss_of_separation_total: int
+    loss_of_separation_avg: float
+    simulated_seconds_avg: float
+    instructions_issued_avg: float
+    safe_effective_count: int
+
+
+class RunSummaryAggregateResponse(BaseModel):
+    """Aggregates over the caller's ended runs."""
+
+    group_by: str
+    groups: list[RunSummaryAggregateGroup]
 
 
 class RunAircraftStateResponse(BaseModel):
@@ -80,6 +100,14 @@ class RunMetricsResponse(BaseModel):
     active_aircraft_count: int
     finished_aircraft_count: int
     pending_aircraft_count: int = 0
+    # Tick pacing: engine steps per published state, how late the last tick
+    # started, ticks that ended past their deadline, extra steps taken to
+    # catch up, and wall seconds given up beyond the catch-up bound.
+    steps_per_tick: int = 1
+    tick_lag_seconds: float = 0.0
+    tick_overruns: int = 0
+    catch_up_steps: int = 0
+    dropped_seconds: float = 0.0
 
 
 class RunSeparationViolationResponse(BaseModel):
@@ -101,6 +129,45 @@ class RunSeparationResponse(BaseModel):
     loss_of_separation_count: int = 0
 
 
+class RunPredictedConflictResponse(BaseModel):
+    """One aircraft pair the short-term conflict probe predicts will conflict."""
+
+    pair: list[str]
+    predicted_at_seconds: float
+    time_to_loss_seconds: float
+    time_to_cpa_seconds: float
+    cpa_horizontal_nm: float
+    cpa_vertical_ft: float
+
+
+class RunConflictsResponse(BaseModel):
+    """Engine short-term conflict probe state for a run."""
+
+    look_ahead_seconds: float
+    predicted_conflicts: list[RunPredictedConflictResponse] = Field(
+        default_factory=list
+    )
+    conflict_prediction_count: int = 0
+
+
+class RunRouteConflictResponse(BaseModel):
+    """One aircraft pair predicted to conflict along their remaining routes."""
+
+    pair: list[str]
+    predicted_at_seconds: float
+    loss_at_seconds: float
+    time_to_loss_seconds: float
+    min_horizontal_nm: float
+
+
+class RunRouteConflictsResponse(BaseModel):
+    """Engine medium-term (route-aware) conflict probe state for a run."""
+
+    horizon_seconds: float
+    predicted_conflicts: list[RunRouteConflictResponse] = Field(default_factory=list)
+    conflict_prediction_count: int = 0
+
+
 class RunStateResponse(BaseModel):
     """Live run state, combining durable metadata and runtime session info."""
 
@@ -113,10 +180,60 @@ class RunStateResponse(BaseModel):
     time_seconds: float | None = None
     aircraft: list[RunAircraftStateResponse] = Field(default_factory=list)
     separation: RunSeparationResponse | None = None
+    conflicts: RunConflictsResponse | None = None
+    route_conflicts: RunRouteConflictsResponse | None = None
     summary: dict | None = None
     metrics: RunMetricsResponse
 
 
+class RunTimelineFrameResponse(BaseModel):
+    """One recorded instant of a run's timeline."""
+
+    time_seconds: float
+    runtime_status: str
+    sim_rate: float
+    updated_utc: str | None = None
+    last_error: str | None = None
+    aircraft: list[RunAircraftStateResponse] = Field(default_factory=list)
+    separation: RunSeparationResponse | None = None
+    conflicts: RunConflictsResponse | None = None
+    route_conflicts: RunRouteConflictsResponse | None = None
+    metrics: RunMetricsResponse
+
+
+class RunTimelineResponse(BaseModel):
+    """A window of recorded timeline frames for playback."""
+
+    run_id: str
+    start_seconds: float | None = None
+    end_seconds: float | None = None
+    frames: list[RunTimelineFrameResponse]
+    next_from_seconds: float | None = None
+
+
+class RunSeriesResponse(BaseModel):
+    """A run metric time series, downsampled to the requested point budget."""
+
+    run_id: str
+    series: str
+    aircraft_id: str | None = None
+    method: str
+    source_point_count: int
+    time_seconds: list[float]
+    values: list[float]
+
+
+class RunReplayResponse(BaseModel):
+    """Result of replaying an ended run from its command journal."""
+
+    run_id: str
+    time_seconds: float
+    state_digest: str
+    recorded_state_digest: str
+    verified: bool
+    summary: dict
+
+
 class RunTrajectoryTrackResponse(BaseModel):
     """Live trajectory track item."""
 
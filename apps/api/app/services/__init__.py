@@ -1,6 +1,8 @@
 """Service helpers for API orchestration."""
 
+from .compiled_scenarios import CompiledScenario, CompiledScenarioCache
 from .runs import (
+    build_run_summary_record,
     create_run,
     missing_runtime_detail,
     pause_run,
@@ -10,15 +12,30 @@ from .runs import (
     stop_run,
     transition_run_status,
 )
-from .scenarios import create_scenario, update_scenario
+from .replay import RunReplay, replay_run
+from .run_series import RunSeries, RunSeriesCache, build_run_series
+from .scenarios import (
+    create_scenario,
+    get_or_create_shared_scenario,
+    update_scenario,
+)
 
 __all__ = [
+    "build_run_series",
+    "build_run_summary_record",
+    "CompiledScenario",
+    "CompiledScenarioCache",
     "create_run",
     "create_scenario",
+    "get_or_create_shared_scenario",
     "missing_runtime_detail",
     "pause_run",
     "record_run_command",
+    "replay_run",
     "resume_run",
+    "RunReplay",
+    "RunSeries",
+    "RunSeriesCache",
     "start_run",
     "stop_run",
     "transition_run_status",
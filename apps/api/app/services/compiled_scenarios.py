@@ -0,0 +1,108 @@
+"""Content addressing and in-memory caching for package scenarios.
+
+Practice scenarios are built from immutable package content, so identical
+content is stored once. `scenario_content_hash` hashes the canonical JSON of
+the contracts' schemas and data (not their generated timestamps) and the
+scenario metadata. Runs of the same content share one `scenarios` row.
+
+`CompiledScenarioCache` keeps the work that does not need the database in
+memory: the package scenario built and validated from its files, and the
+validated runtime contracts of a shared scenario. A warm practice-run
+creation reads one row by hash and inserts the run.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    """A validated package scenario, ready to be stored or reused."""
+
+    content_hash: str
+    template_id: str
+    name: str
+    description: str
+    airspace_payload: dict[str, Any]
+    aircraft_payload: dict[str, Any]
+    metadata_payload: dict[str, Any]
+
+
+def _contract_identity(payload: dict[str, Any]) -> dict[str, Any]:
+    return {"schema": payload.get("schema"), "data": payload.get("data")}
+
+
+def scenario_content_hash(
+    airspace_payload: dict[str, Any],
+    aircraft_payload: dict[str, Any],
+    metadata_payload: dict[str, Any],
+) -> str:
+    """SHA-256 of the normalised scenario content."""
+    canonical = json.dumps(
+        {
+            "airspace": _contract_identity(airspace_payload),
+            "aircraft": _contract_identity(aircraft_payload),
+            "metadata": metadata_payload,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CompiledScenarioCache:
+    """Thread-safe LRU of compiled scenarios and resolved contracts."""
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max(int(max_entries), 1)
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: Any) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def contracts(
+        self, content_hash: str
+    ) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        """Private copies of the validated contracts cached for a hash."""
+        cached = self.get(("contracts", content_hash))
+        return copy.deepcopy(cached) if cached is not None else None
+
+    def put_contracts(
+        self,
+        content_hash: str,
+        contracts: tuple[dict[str, Any], dict[str, Any]],
+    ) -> None:
+        self.put(("contracts", content_hash), copy.deepcopy(contracts))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Process-wide: package content is immutable, so entries never go stale
+# while the files they were built from are unchanged.
+compiled_scenarios = CompiledScenarioCache()
@@ -1,4 +1,9 @@
-"""Practice-run creation from airspace package manifests."""
+"""Practice-run creation from airspace package manifests.
+
+Package scenarios are compiled once per process (see `compiled_scenarios`)
+and stored content-addressed, so each practice run references a shared
+scenario row instead of copying the airspace and traffic.
+"""
 
 from __future__ import annotations
 
@@ -24,8 +29,14 @@ from ..airspace_packages import (
     resolve_package_file,
     scenario_id_from_lesson,
 )
-from .runs import create_run
-from .scenarios import create_scenario
+from ..db.models import RunRecord, ScenarioRecord
+from ..db.repositories import RunRepository
+from .compiled_scenarios import (
+    CompiledScenario,
+    compiled_scenarios,
+    scenario_content_hash,
+)
+from .scenarios import get_or_create_shared_scenario, resolve_scenario_contracts
 
 
 def _load_json_object(path: Path) -> dict[str, Any]:
@@ -59,7 +70,7 @@ def _resolve_package_file(package_dir: Path, relative_path: str) -> Path:
     return candidate
 
 
-def _get_package_manifest(airspace_id: str) -> tuple[dict[str, Any], Path]:
+def _get_manifest_path(airspace_id: str) -> Path:
     try:
         package_dir = resolve_airspace_package_dir(airspace_id)
     except ValueError as exc:
@@ -73,6 +84,12 @@ def _get_package_manifest(airspace_id: str) -> tuple[dict[str, Any], Path]:
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Airspace package not found: {airspace_id}",
         )
+    return manifest_path
+
+
+def _get_package_manifest(airspace_id: str) -> tuple[dict[str, Any], Path]:
+    manifest_path = _get_manifest_path(airspace_id)
+    package_dir = manifest_path.parent
     manifest = _load_json_object(manifest_path)
     if manifest.get("id") != airspace_id:
         raise HTTPException(
@@ -127,20 +144,21 @@ def _normalize_airspace_payload(payload: dict[str, Any]) -> dict[str, Any]:
         ) from exc
 
 
-def _build_airspace_payload(
-    manifest: dict[str, Any],
-    package_dir: Path,
-    template: dict[str, Any],
-) -> dict[str, Any]:
+def _airspace_file_path(manifest: dict[str, Any], package_dir: Path) -> Path:
     airspace_file = manifest.get("airspace_file")
     if not isinstance(airspace_file, str):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Airspace package is missing airspace_file.",
         )
-    airspace = _normalize_airspace_payload(
-        _load_json_object(_resolve_package_file(package_dir, airspace_file))
-    )
+    return _resolve_package_file(package_dir, airspace_file)
+
+
+def _build_airspace_payload(
+    airspace_path: Path,
+    template: dict[str, Any],
+) -> dict[str, Any]:
+    airspace = _normalize_airspace_payload(_load_json_object(airspace_path))
     extra_routes = template.get("airspace", {}).get("extra_routes")
     if isinstance(extra_routes, list):
         existing_route_ids = {
@@ -195,18 +213,40 @@ def _build_aircraft_payload(template: dict[str, Any]) -> dict[str, Any]:
     )
 
 
-def create_practice_run(
-    session: Session,
-    *,
-    session_id: str,
+def _file_versions(paths: list[Path]) -> tuple[tuple[str, int | None], ...]:
+    """`(path, mtime_ns)` of each file; None for one that no longer exists."""
+    versions = []
+    for path in paths:
+        try:
+            versions.append((str(path), path.stat().st_mtime_ns))
+        except OSError:
+            versions.append((str(path), None))
+    return tuple(versions)
+
+
+def _compile_practice_scenario(
     airspace_id: str,
-    scenario_id: str | None = None,
-    lesson_id: str | None = None,
-    name: str | None = None,
-    user_id: str | None = None,
-):
-    """Create a scenario/run from package data for live lesson practice."""
+    scenario_id: str | None,
+    lesson_id: str | None,
+) -> CompiledScenario:
+    """Build, validate, and hash a package scenario, cached per process.
+
+    A cached entry is reused only while the modification times of every
+    file it was built from (manifest, scenario template, and airspace file)
+    are unchanged, so editing any of them recompiles the scenario.
+    """
+
+    manifest_path = _get_manifest_path(airspace_id)
+    cache_key = ("practice", str(manifest_path), airspace_id, scenario_id, lesson_id)
+    cached = compiled_scenarios.get(cache_key)
+    if cached is not None:
+        versions, compiled = cached
+        if _file_versions([Path(path) for path, _ in versions]) == versions:
+            return compiled
 
+    # Versions are taken before each file is read: an edit made while
+    # compiling makes the entry look stale instead of going unnoticed.
+    versions = _file_versions([manifest_path])
     manifest, package_dir = _get_package_manifest(airspace_id)
     resolved_scenario_id = (
         scenario_id
@@ -224,7 +264,10 @@ def create_practice_run(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Scenario is missing a path: {resolved_scenario_id}",
         )
-    template = _load_json_object(_resolve_package_file(package_dir, scenario_path))
+    template_path = _resolve_package_file(package_dir, scenario_path)
+    airspace_path = _airspace_file_path(manifest, package_dir)
+    versions += _file_versions([template_path, airspace_path])
+    template = _load_json_object(template_path)
     if template.get("airspace_id") not in (None, airspace_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -234,7 +277,7 @@ def create_practice_run(
             ),
         )
 
-    airspace_payload = _build_airspace_payload(manifest, package_dir, template)
+    airspace_payload = _build_airspace_payload(airspace_path, template)
     validation_errors = validate_scenario_template(
         template,
         airspace_payload,
@@ -253,67 +296,97 @@ def create_practice_run(
     template_metadata = (
         template.get("metadata") if isinstance(template.get("metadata"), dict) else {}
     )
-    scenario_name = (
-        name
-        or template_metadata.get("name")
-        or scenario_item.get("title")
-        or f"{airspace_id} Practice"
+    metadata_payload = {
+        "source": "airspacesim.api.practice_runs",
+        "airspace_id": airspace_id,
+        "scenario_template_id": resolved_scenario_id,
+        "lesson_id": lesson_id,
+        # Exact content versions used by this run, for reproducibility
+        # (brief: run records must identify scenario/environment versions).
+        "content_versions": {
+            "airspace_id": airspace_id,
+            "environment_version": environment_version(airspace_payload),
+            "scenario_template_id": resolved_scenario_id,
+            "scenario_template_version": (
+                template.get("version")
+                if isinstance(template.get("version"), str)
+                else None
+            ),
+        },
+        **(
+            {"practice": template_metadata["practice"]}
+            if isinstance(template_metadata.get("practice"), dict)
+            else {}
+        ),
+        **(
+            {"simulate": template_metadata["simulate"]}
+            if isinstance(template_metadata.get("simulate"), dict)
+            else {}
+        ),
+        **(
+            {"learn": template_metadata["learn"]}
+            if isinstance(template_metadata.get("learn"), dict)
+            else {}
+        ),
+        **(
+            {"traffic_relationship": template_metadata["traffic_relationship"]}
+            if isinstance(template_metadata.get("traffic_relationship"), dict)
+            else {}
+        ),
+    }
+    normalized_airspace, normalized_aircraft = resolve_scenario_contracts(
+        ScenarioRecord(
+            airspace_payload=airspace_payload,
+            aircraft_payload=_build_aircraft_payload(template),
+        )
     )
-    scenario = create_scenario(
-        session,
-        session_id=session_id,
-        user_id=user_id,
-        name=str(scenario_name),
+    compiled = CompiledScenario(
+        content_hash=scenario_content_hash(
+            normalized_airspace, normalized_aircraft, metadata_payload
+        ),
+        template_id=resolved_scenario_id,
+        name=str(
+            template_metadata.get("name")
+            or scenario_item.get("title")
+            or f"{airspace_id} Practice"
+        ),
         description=str(
             template_metadata.get("description")
             or scenario_item.get("description")
             or "Practice scenario created from an airspace package."
         ),
-        airspace_payload=airspace_payload,
-        aircraft_payload=_build_aircraft_payload(template),
-        metadata_payload={
-            "source": "airspacesim.api.practice_runs",
-            "airspace_id": airspace_id,
-            "scenario_template_id": resolved_scenario_id,
-            "lesson_id": lesson_id,
-            # Exact content versions used by this run, for reproducibility
-            # (brief: run records must identify scenario/environment versions).
-            "content_versions": {
-                "airspace_id": airspace_id,
-                "environment_version": environment_version(airspace_payload),
-                "scenario_template_id": resolved_scenario_id,
-                "scenario_template_version": (
-                    template.get("version")
-                    if isinstance(template.get("version"), str)
-                    else None
-                ),
-            },
-            **(
-                {"practice": template_metadata["practice"]}
-                if isinstance(template_metadata.get("practice"), dict)
-                else {}
-            ),
-            **(
-                {"simulate": template_metadata["simulate"]}
-                if isinstance(template_metadata.get("simulate"), dict)
-                else {}
-            ),
-            **(
-                {"learn": template_metadata["learn"]}
-                if isinstance(template_metadata.get("learn"), dict)
-                else {}
-            ),
-            **(
-                {"traffic_relationship": template_metadata["traffic_relationship"]}
-                if isinstance(template_metadata.get("traffic_relationship"), dict)
-                else {}
-            ),
-        },
+        airspace_payload=normalized_airspace,
+        aircraft_payload=normalized_aircraft,
+        metadata_payload=metadata_payload,
     )
-    return create_run(
-        session,
+    compiled_scenarios.put(cache_key, (versions, compiled))
+    return compiled
+
+
+def create_practice_run(
+    session: Session,
+    *,
+    session_id: str,
+    airspace_id: str,
+    scenario_id: str | None = None,
+    lesson_id: str | None = None,
+    name: str | None = None,
+    user_id: str | None = None,
+    run_id: str | None = None,
+) -> RunRecord:
+    """Create a run of a shared package scenario for live lesson practice.
+
+    `run_id` picks the new run's id, e.g. one owned by this API worker.
+    """
+
+    compiled = _compile_practice_scenario(airspace_id, scenario_id, lesson_id)
+    scenario = get_or_create_shared_scenario(session, compiled)
+    run = RunRecord(
         session_id=session_id,
         user_id=user_id,
         scenario_id=scenario.id,
-        name=name or f"{scenario.name} Practice Run",
+        name=name or f"{compiled.name} Practice Run",
     )
+    if run_id is not None:
+        run.id = run_id
+    return RunRepository(session).create(run)
@@ -0,0 +1,81 @@
+"""Deterministic fast replay of finished runs from their command journal.
+
+A run is reproducible from three durable inputs: its scenario contracts, the
+applied commands with the simulated `time_seconds` they were applied at, and
+the `replay_json` manifest written when it ended (step size, starting sim
+rate, final clock, and final `Simulation.state_digest()`). Replay feeds them
+into a fresh, unthreaded runtime session at full speed, so trajectories can be
+regenerated on demand and practice runs re-scored with the current scoring
+logic; the digest check proves the replay matches what users saw.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from ..db.models import RunRecord
+from ..db.repositories import RunCommandRepository
+from ..sessions.runtime import SimulationRuntimeSession
+from .scenarios import resolve_scenario_contracts
+
+
+@dataclass(frozen=True)
+class RunReplay:
+    """A replayed run: the rebuilt session plus digest verification."""
+
+    session: SimulationRuntimeSession
+    state_digest: str
+    recorded_state_digest: str
+
+    @property
+    def verified(self) -> bool:
+        return self.state_digest == self.recorded_state_digest
+
+
+def replay_run(session: Session, run: RunRecord) -> RunReplay:
+    """Rebuild `run` from its scenario and timed command journal."""
+
+    manifest = run.replay_json
+    if not manifest:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Run {run.id} has no replay manifest; only ended runs replay.",
+        )
+    journal = RunCommandRepository(session).list_applied_for_run(run.id)
+    if any(command.time_seconds is None for command in journal):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                f"Run {run.id} has commands without a recorded simulated time "
+                "and cannot be replayed."
+            ),
+        )
+
+    scenario = run.scenario
+    scenario_airspace, scenario_aircraft = resolve_scenario_contracts(scenario)
+    runtime_session = SimulationRuntimeSession(
+        run_id=run.id,
+        scenario_airspace=scenario_airspace,
+        scenario_aircraft=scenario_aircraft,
+        sim_rate=manifest["sim_rate"],
+        update_interval_seconds=manifest["tick_seconds"],
+        metadata_payload=scenario.metadata_payload if scenario is not None else None,
+    )
+    runtime_session.replay(
+        (
+            (command.id, command.command_type, command.payload, command.time_seconds)
+            for command in journal
+        ),
+        until_seconds=manifest["time_seconds"],
+        stopped=manifest["runtime_status"] == "stopped",
+        step_multipliers=manifest.get("step_multipliers"),
+    )
+    runtime_session.runtime_status = manifest["runtime_status"]
+    return RunReplay(
+        session=runtime_session,
+        state_digest=runtime_session.simulation.state_digest(),
+        recorded_state_digest=manifest["state_digest"],
+    )
@@ -1,73 +1,175 @@
 """Retention sweep for anonymous run data (decision Q10).
 
 Anonymous (guest) runs that ended more than `anonymous_run_retention_days`
-ago are deleted, together with their commands/checkpoints (FK cascade) and
-any practice scenarios left orphaned by the sweep. Runs owned by signed-in
-users are never touched — authenticated history is persistent.
+ago are deleted, together with their commands, checkpoints, and other per-run
+rows, and any practice scenarios left orphaned by the sweep. Runs owned by
+signed-in users are never touched — authenticated history is persistent.
+
+The sweep works in chunks of set-based DELETE statements. Each chunk removes
+up to `chunk_size` runs, their dependent rows, and the guest scenarios they
+leave unreferenced (an anti-join on `runs`), then commits. Between chunks the
+write lock is released, so live-run writes are not held up for the length of
+the whole sweep. A sweep stops at its time budget; the remainder is picked up
+by the next sweep.
 """
 
 from __future__ import annotations
 
 import logging
 import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import delete, exists, select
 from sqlalchemy.orm import Session
 
-from ..db.models import RunRecord, ScenarioRecord
+from ..db.models import (
+    RunCheckpointRecord,
+    RunCommandRecord,
+    RunEngineStateRecord,
+    RunRecord,
+    RunSummaryRecord,
+    RunTimelineSegmentRecord,
+    ScenarioRecord,
+)
+from ..db.writer import DatabaseWriter
 
 logger = logging.getLogger(__name__)
 
 _TERMINAL_RUN_STATUSES = ("stopped",)
+# Deleted explicitly: SQLite does not enforce ON DELETE CASCADE by default,
+# and bulk deletes bypass ORM relationship cascades.
+_RUN_CHILD_MODELS = (
+    RunCommandRecord,
+    RunCheckpointRecord,
+    RunEngineStateRecord,
+    RunTimelineSegmentRecord,
+    RunSummaryRecord,
+)
 
+DEFAULT_CHUNK_SIZE = 500
 
-def sweep_expired_anonymous_runs(
-    session: Session, *, retention_days: int, now: datetime | None = None
-) -> dict[str, int]:
-    """Delete expired anonymous completed runs; returns deletion counts."""
 
-    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+@dataclass
+class RetentionProgress:
+    """What one sweep removed, and whether it reached the end of the backlog."""
 
-    expired_runs = list(
-        session.scalars(
-            select(RunRecord).where(
-                RunRecord.user_id.is_(None),
-                RunRecord.status.in_(_TERMINAL_RUN_STATUSES),
-                RunRecord.ended_at.is_not(None),
-                RunRecord.ended_at < cutoff,
-            )
-        )
-    )
-    candidate_scenario_ids = {
-        run.scenario_id for run in expired_runs if run.scenario_id is not None
-    }
-    for run in expired_runs:
-        session.delete(run)
-    session.flush()
-
-    orphaned_scenarios = 0
-    for scenario_id in candidate_scenario_ids:
-        still_referenced = session.scalar(
-            select(RunRecord.id).where(RunRecord.scenario_id == scenario_id).limit(1)
-        )
-        if still_referenced is not None:
-            continue
-        scenario = session.get(ScenarioRecord, scenario_id)
-        if scenario is not None and scenario.user_id is None:
-            session.delete(scenario)
-            orphaned_scenarios += 1
+    runs: int = 0
+    scenarios: int = 0
+    dependent_rows: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+    complete: bool = False
 
+    def counts(self) -> dict[str, int]:
+        return {"runs": self.runs, "scenarios": self.scenarios}
+
+
+def delete_expired_run_chunk(
+    session: Session, *, cutoff: datetime, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict[str, int]:
+    """Delete up to `chunk_size` expired anonymous runs and commit."""
+
+    rows = session.execute(
+        select(RunRecord.id, RunRecord.scenario_id)
+        .where(
+            RunRecord.status.in_(_TERMINAL_RUN_STATUSES),
+            RunRecord.ended_at.is_not(None),
+            RunRecord.ended_at < cutoff,
+            RunRecord.user_id.is_(None),
+        )
+        .order_by(RunRecord.ended_at)
+        .limit(chunk_size)
+    ).all()
+    if not rows:
+        return {"runs": 0, "scenarios": 0, "dependent_rows": 0}
+    run_ids = [row.id for row in rows]
+    scenario_ids = {row.scenario_id for row in rows if row.scenario_id is not None}
+
+    dependent_rows = 0
+    for model in _RUN_CHILD_MODELS:
+        dependent_rows += session.execute(
+            delete(model).where(model.run_id.in_(run_ids))
+        ).rowcount
+    runs = session.execute(delete(RunRecord).where(RunRecord.id.in_(run_ids))).rowcount
+    scenarios = 0
+    if scenario_ids:
+        scenarios = session.execute(
+            delete(ScenarioRecord).where(
+                ScenarioRecord.id.in_(scenario_ids),
+                ScenarioRecord.user_id.is_(None),
+                # Shared package content outlives the runs that use it.
+                ScenarioRecord.content_hash.is_(None),
+                ~exists().where(RunRecord.scenario_id == ScenarioRecord.id),
+            )
+        ).rowcount
     session.commit()
-    if expired_runs or orphaned_scenarios:
+    return {"runs": runs, "scenarios": scenarios, "dependent_rows": dependent_rows}
+
+
+def _sweep(
+    execute: Callable[[Callable[[Session], Any]], Any],
+    *,
+    cutoff: datetime,
+    chunk_size: int,
+    time_budget_seconds: float | None,
+) -> RetentionProgress:
+    chunk_size = max(int(chunk_size), 1)
+    started_at = time.monotonic()
+    progress = RetentionProgress()
+    while True:
+        chunk = execute(
+            lambda session: delete_expired_run_chunk(
+                session, cutoff=cutoff, chunk_size=chunk_size
+            )
+        )
+        progress.chunks += 1
+        progress.runs += chunk["runs"]
+        progress.scenarios += chunk["scenarios"]
+        progress.dependent_rows += chunk["dependent_rows"]
+        progress.elapsed_seconds = time.monotonic() - started_at
+        if chunk["runs"] < chunk_size:
+            progress.complete = True
+            break
+        if (
+            time_budget_seconds is not None
+            and progress.elapsed_seconds >= time_budget_seconds
+        ):
+            break
+    if progress.runs or progress.scenarios:
         logger.info(
-            "Retention sweep removed %d anonymous runs and %d orphaned scenarios "
-            "older than %d days.",
-            len(expired_runs),
-            orphaned_scenarios,
-            retention_days,
+            "Retention sweep removed %d anonymous runs (%d dependent rows) and "
+            "%d orphaned scenarios in %d chunks over %.2fs%s.",
+            progress.runs,
+            progress.dependent_rows,
+            progress.scenarios,
+            progress.chunks,
+            progress.elapsed_seconds,
+            "" if progress.complete else "; time budget reached, more remain",
         )
-    return {"runs": len(expired_runs), "scenarios": orphaned_scenarios}
+    return progress
+
+
+def sweep_expired_anonymous_runs(
+    session: Session,
+    *,
+    retention_days: int,
+    now: datetime | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    time_budget_seconds: float | None = None,
+) -> dict[str, int]:
+    """Delete expired anonymous completed runs; returns deletion counts."""
+
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    return _sweep(
+        lambda write: write(session),
+        cutoff=cutoff,
+        chunk_size=chunk_size,
+        time_budget_seconds=time_budget_seconds,
+    ).counts()
 
 
 class RetentionSweeper:
@@ -79,12 +181,19 @@ class RetentionSweeper:
         *,
         retention_days: int,
         interval_seconds: float,
+        writer: DatabaseWriter | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        time_budget_seconds: float = 5.0,
     ) -> None:
         self._session_factory = session_factory
+        self._writer = writer
         self._retention_days = retention_days
         self._interval_seconds = max(float(interval_seconds), 60.0)
+        self._chunk_size = chunk_size
+        self._time_budget_seconds = max(float(time_budget_seconds), 0.0)
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
+        self.last_progress: RetentionProgress | None = None
 
     def start(self) -> None:
         if self._thread is not None and self._thread.is_alive():
@@ -99,18 +208,37 @@ class RetentionSweeper:
         if self._thread is not None:
             self._thread.join(timeout=2.0)
 
-    def sweep_once(self) -> dict[str, int]:
+    def sweep_once(self, now: datetime | None = None) -> RetentionProgress:
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(
+            days=self._retention_days
+        )
+        self.last_progress = _sweep(
+            self._execute,
+            cutoff=cutoff,
+            chunk_size=self._chunk_size,
+            time_budget_seconds=self._time_budget_seconds,
+        )
+        return self.last_progress
+
+    def _execute(self, write: Callable[[Session], Any]) -> Any:
+        if self._writer is not None:
+            # One chunk per queued write: live-run writes run in between.
+            return self._writer.submit(write, wait=True)
         session = self._session_factory()
         try:
-            return sweep_expired_anonymous_runs(
-                session, retention_days=self._retention_days
-            )
+            return write(session)
         finally:
             session.close()
 
     def _run(self) -> None:
-        while not self._stop_event.wait(self._interval_seconds):
+        wait_seconds = self._interval_seconds
+        while not self._stop_event.wait(wait_seconds):
+            wait_seconds = self._interval_seconds
             try:
-                self.sweep_once()
+                progress = self.sweep_once()
             except Exception:
                 logger.exception("Retention sweep failed; will retry next interval.")
+                continue
+            if not progress.complete:
+                # Backlog left over: continue soon, after a pause for live writes.
+                wait_seconds = 1.0
@@ -0,0 +1,232 @@
+"""Downsampled metric time series for run charts.
+
+Series are read from the run's recorded timeline (see
+`sessions/timeline.py`), so they cover everything a run published, not only
+its capped checkpoints. Long series are reduced server-side to a requested
+point budget with largest-triangle-three-buckets (`lttb`, keeps the visual
+shape) or per-bucket min/max envelopes (`minmax`, keeps every extreme).
+Results are cached per run, series, and resolution; the cache key includes the
+recorded extent, so live runs never serve a stale curve.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from airspacesim.utils.conversions import haversine
+
+from ..db.models import RunRecord
+from ..sessions.timeline import TimelineRecorder
+
+AIRCRAFT_SERIES = ("altitude_ft", "speed_kt", "separation_nm")
+RUN_SERIES = (
+    "aircraft_count",
+    "conflict_count",
+    "route_conflict_count",
+    "separation_violation_count",
+)
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+Point = tuple[float, float]
+
+
+@dataclass(frozen=True)
+class RunSeries:
+    """One downsampled series, as parallel time/value columns."""
+
+    series: str
+    aircraft_id: str | None
+    method: str
+    source_point_count: int
+    time_seconds: list[float]
+    values: list[float]
+
+
+def lttb(points: list[Point], threshold: int) -> list[Point]:
+    """Largest-triangle-three-buckets downsampling to at most `threshold` points."""
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, len(points))
+        following = points[end:next_end] or [points[-1]]
+        average_t = sum(point[0] for point in following) / len(following)
+        average_v = sum(point[1] for point in following) / len(following)
+        anchor_t, anchor_v = points[previous]
+        best_area = -1.0
+        best = start
+        for index in range(start, end):
+            t, v = points[index]
+            area = abs(
+                (anchor_t - average_t) * (v - anchor_v)
+                - (anchor_t - t) * (average_v - anchor_v)
+            )
+            if area > best_area:
+                best_area = area
+                best = index
+        sampled.append(points[best])
+        previous = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def min_max(points: list[Point], threshold: int) -> list[Point]:
+    """Per-bucket min/max envelope with at most `threshold` points."""
+    if threshold >= len(points) or threshold < 4:
+        return list(points)
+    buckets = (threshold - 2) // 2
+    bucket_size = (len(points) - 2) / buckets
+    sampled = [points[0]]
+    for bucket in range(buckets):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        window = points[start:end]
+        if not window:
+            continue
+        low = min(window, key=lambda point: point[1])
+        high = max(window, key=lambda point: point[1])
+        sampled.extend(sorted({low, high}))
+    sampled.append(points[-1])
+    return sampled
+
+
+_DOWNSAMPLERS: dict[str, Callable[[list[Point], int], list[Point]]] = {
+    "lttb": lttb,
+    "minmax": min_max,
+}
+
+
+def _nearest_traffic_nm(frame: dict[str, Any], aircraft: dict[str, Any]) -> float | None:
+    lat, lon = aircraft["position_dd"]
+    distances = [
+        haversine(lat, lon, other["position_dd"][0], other["position_dd"][1])
+        for other in frame["aircraft"]
+        if other["id"] != aircraft["id"] and other.get("status") == "active"
+    ]
+    return min(distances) if distances else None
+
+
+def _run_value(frame: dict[str, Any], series: str) -> float:
+    if series == "aircraft_count":
+        metrics = frame.get("metrics") or {}
+        return float(metrics.get("active_aircraft_count", len(frame["aircraft"])))
+    if series == "separation_violation_count":
+        section = frame.get("separation") or {}
+        return float(len(section.get("active_violations", [])))
+    key = "conflicts" if series == "conflict_count" else "route_conflicts"
+    section = frame.get(key) or {}
+    return float(len(section.get("predicted_conflicts", [])))
+
+
+def extract_series(
+    frames: Iterable[dict[str, Any]],
+    series: str,
+    aircraft_id: str | None = None,
+) -> list[Point]:
+    """Raw (time_seconds, value) points of `series`, skipping absent aircraft."""
+    points = []
+    for frame in frames:
+        time_seconds = float(frame["time_seconds"])
+        if series in RUN_SERIES:
+            points.append((time_seconds, _run_value(frame, series)))
+            continue
+        aircraft = next(
+            (item for item in frame["aircraft"] if item["id"] == aircraft_id), None
+        )
+        if aircraft is None:
+            continue
+        if series == "separation_nm":
+            value = _nearest_traffic_nm(frame, aircraft)
+        else:
+            value = aircraft.get(series)
+        if value is not None:
+            points.append((time_seconds, float(value)))
+    return points
+
+
+class RunSeriesCache:
+    """Thread-safe LRU of computed series."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max(int(max_entries), 1)
+        self._entries: OrderedDict[tuple, RunSeries] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> RunSeries | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: RunSeries) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def build_run_series(
+    session: Session,
+    run: RunRecord,
+    timeline: TimelineRecorder,
+    cache: RunSeriesCache,
+    *,
+    series: str,
+    aircraft_id: str | None = None,
+    points: int = 500,
+    method: str = "lttb",
+) -> RunSeries:
+    """Return `series` for `run`, downsampled to at most `points` points."""
+    if series in AIRCRAFT_SERIES and not aircraft_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Series '{series}' requires aircraft_id.",
+        )
+    if series in RUN_SERIES:
+        aircraft_id = None
+
+    extent = timeline.extent(session, run.id)
+    key = (run.id, series, aircraft_id, method, points, extent)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    frames = (
+        timeline.frames_between(session, run.id, extent[0], extent[1], limit=10**9)
+        if extent is not None
+        else []
+    )
+    raw = extract_series(frames, series, aircraft_id)
+    if aircraft_id is not None and not raw:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No recorded samples for aircraft '{aircraft_id}'.",
+        )
+    sampled = _DOWNSAMPLERS[method](raw, points)
+    result = RunSeries(
+        series=series,
+        aircraft_id=aircraft_id,
+        method=method,
+        source_point_count=len(raw),
+        time_seconds=[point[0] for point in sampled],
+        values=[point[1] for point in sampled],
+    )
+    cache.put(key, result)
+    return result
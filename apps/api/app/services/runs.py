@@ -6,7 +6,7 @@ from typing import Any
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from ..db.models import RunCommandRecord, RunRecord, ScenarioRecord
+from ..db.models import RunCommandRecord, RunRecord, RunSummaryRecord, ScenarioRecord
 from ..db.repositories import RunCommandRepository, RunRepository, ScenarioRepository
 
 
@@ -161,9 +161,40 @@ def missing_runtime_detail(
 
     if run.status in RUN_STATUSES_REQUIRING_LIVE_RUNTIME and has_checkpoint:
         return (
-            f"Run {run.id} has persisted checkpoint state, but live recovery is not "
-            "implemented yet."
+            f"Run {run.id} has persisted checkpoint state but no recoverable engine "
+            "state; stop it and start a new run."
         )
     if run.status == RUN_STATUS_STOPPED:
         return f"Run {run.id} is stopped and cannot accept live runtime operations."
     return f"Runtime session not active for run: {run.id}"
+
+
+def build_run_summary_record(
+    run: RunRecord,
+    summary: dict[str, Any],
+    *,
+    status: str,
+) -> RunSummaryRecord:
+    """Normalise an ended run's `summary_json` into its indexed summary row."""
+
+    metadata = run.scenario.metadata_payload if run.scenario is not None else {}
+    outcome = summary.get("practice_outcome") or {}
+    return RunSummaryRecord(
+        run_id=run.id,
+        session_id=run.session_id,
+        user_id=run.user_id,
+        kind=str(summary.get("kind") or "simulate"),
+        status=status,
+        scenario_id=run.scenario_id,
+        lesson_id=metadata.get("lesson_id"),
+        airspace_id=metadata.get("airspace_id"),
+        simulated_seconds=float(summary.get("simulated_seconds") or 0.0),
+        aircraft_total=int(summary.get("aircraft_total") or 0),
+        instructions_issued=int(summary.get("instructions_issued") or 0),
+        loss_of_separation_count=int(summary.get("loss_of_separation_count") or 0),
+        practice_rating=outcome.get("rating"),
+        practice_reason=outcome.get("reason"),
+        separation_maintained=outcome.get("separation_maintained"),
+        started_at=run.started_at,
+        ended_at=run.ended_at or _utcnow(),
+    )
@@ -2,6 +2,7 @@
 
 import json
 import re
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
@@ -11,10 +12,13 @@ from airspacesim.io.contracts import (
     validate_scenario_airspace,
 )
 from airspacesim.settings import settings as library_settings
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..db.models import ScenarioRecord
+from ..db.models.scenario import SHARED_SCENARIO_SESSION_ID
 from ..db.repositories import ScenarioRepository
+from .compiled_scenarios import CompiledScenario, compiled_scenarios
 
 
 def _slugify(value: str) -> str:
@@ -48,10 +52,10 @@ def _normalize_contract_payload(
     *,
     schema_name: str,
     source: str,
-    default_envelope: dict[str, Any],
+    default_envelope: Callable[[], dict[str, Any]],
 ) -> dict[str, Any]:
     if not payload:
-        return default_envelope
+        return default_envelope()
 
     if payload.get("schema", {}).get("name") == schema_name and "data" in payload:
         return payload
@@ -63,16 +67,22 @@ def _normalize_contract_payload(
 def resolve_scenario_contracts(
     scenario: ScenarioRecord | None,
 ) -> tuple[dict[str, Any], dict[str, Any]]:
-    """Resolve stored scenario payloads into validated canonical envelopes."""
+    """Resolve stored scenario payloads into validated canonical envelopes.
 
-    default_airspace = _default_scenario_airspace()
-    default_aircraft = _default_scenario_aircraft()
+    Shared content-addressed scenarios are validated once per process.
+    """
+
+    content_hash = scenario.content_hash if scenario is not None else None
+    if content_hash is not None:
+        cached = compiled_scenarios.contracts(content_hash)
+        if cached is not None:
+            return cached
 
     airspace_payload = _normalize_contract_payload(
         scenario.airspace_payload if scenario is not None else None,
         schema_name="airspacesim.scenario_airspace",
         source="airspacesim.api.scenarios",
-        default_envelope=default_airspace,
+        default_envelope=_default_scenario_airspace,
     )
     validate_scenario_airspace(airspace_payload)
 
@@ -80,10 +90,14 @@ def resolve_scenario_contracts(
         scenario.aircraft_payload if scenario is not None else None,
         schema_name="airspacesim.scenario_aircraft",
         source="airspacesim.api.scenarios",
-        default_envelope=default_aircraft,
+        default_envelope=_default_scenario_aircraft,
     )
     route_ids = {route["id"] for route in airspace_payload["data"]["routes"]}
     validate_scenario_aircraft(aircraft_payload, route_ids=route_ids)
+    if content_hash is not None:
+        compiled_scenarios.put_contracts(
+            content_hash, (airspace_payload, aircraft_payload)
+        )
     return airspace_payload, aircraft_payload
 
 
@@ -125,6 +139,37 @@ def create_scenario(
     return repository.create(scenario)
 
 
+def get_or_create_shared_scenario(
+    session: Session, compiled: CompiledScenario
+) -> ScenarioRecord:
+    """Return the shared scenario row for `compiled`, inserting it once."""
+
+    repository = ScenarioRepository(session)
+    scenario = repository.get_by_content_hash(compiled.content_hash)
+    if scenario is not None:
+        return scenario
+    scenario = ScenarioRecord(
+        session_id=SHARED_SCENARIO_SESSION_ID,
+        user_id=None,
+        slug=f"{_slugify(compiled.template_id)[:120]}-{compiled.content_hash[:12]}",
+        name=compiled.name,
+        description=compiled.description,
+        airspace_payload=compiled.airspace_payload,
+        aircraft_payload=compiled.aircraft_payload,
+        metadata_payload=compiled.metadata_payload,
+        content_hash=compiled.content_hash,
+    )
+    try:
+        return repository.create(scenario)
+    except IntegrityError:
+        # Another request stored the same content first.
+        session.rollback()
+        existing = repository.get_by_content_hash(compiled.content_hash)
+        if existing is None:
+            raise
+        return existing
+
+
 def update_scenario(
     session: Session,
     scenario: ScenarioRecord,
@@ -1,9 +1,14 @@
 """Runtime session management for the FastAPI service."""
 
+from .budget import LoadGovernor, RunAdmissionRejected
+from .hibernation import HibernationSweeper
 from .registry import SessionRegistry
 from .runtime import SimulationRuntimeSession
 
 __all__ = [
+    "HibernationSweeper",
+    "LoadGovernor",
+    "RunAdmissionRejected",
     "SessionRegistry",
     "SimulationRuntimeSession",
 ]
@@ -0,0 +1,113 @@
+"""CPU budgeting for live runs: a tick cost model, admission, and degradation.
+
+Every running session ticks on its own thread, but the ticks share one
+interpreter. Their combined load is budgeted in cores, where one session's
+load is the share of wall time its tick work (engine steps plus snapshot and
+publish) takes. `TickCostModel` estimates that work from the aircraft count,
+calibrated from the measured ticks of live runs. In these ticks cost grows
+with the number of aircraft and the tick rate, not with `sim_rate`, because
+the engine takes one step per tick whatever its length.
+
+`SessionRegistry.admit` holds a run start until it fits the budget at full
+tick rate, and rejects it if it still does not fit after a short wait.
+`SessionRegistry.rebalance_load` lowers the tick rate of the most expensive
+runs first when running runs grow past the budget (aircraft entering,
+recovered runs, calibration drift). `LoadGovernor` calls it on an interval.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .registry import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+# Seconds of work per aircraft and engine step before any tick is measured.
+DEFAULT_SECONDS_PER_AIRCRAFT_TICK = 5e-5
+# A degraded run ticks at most this many times less often than normal.
+MAX_TICK_INTERVAL_SCALE = 8.0
+
+
+class RunAdmissionRejected(Exception):
+    """A run start that does not fit the CPU budget."""
+
+    def __init__(self, message: str, *, retry_after_seconds: float) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+def tick_load(step_seconds: float, interval_seconds: float) -> float:
+    """Cores used by a run doing `step_seconds` of work per engine step.
+
+    Steps are paced one `interval_seconds` apart, so a run cannot use more
+    than one core.
+    """
+    return min(max(step_seconds, 0.0) / interval_seconds, 1.0)
+
+
+class TickCostModel:
+    """Tick work per aircraft, calibrated from the measured ticks of live runs."""
+
+    def __init__(
+        self,
+        seconds_per_aircraft_tick: float = DEFAULT_SECONDS_PER_AIRCRAFT_TICK,
+        smoothing: float = 0.02,
+    ) -> None:
+        self.seconds_per_aircraft_tick = seconds_per_aircraft_tick
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def observe(self, aircraft_count: int, step_seconds: float) -> None:
+        """Fold one tick's measured work per engine step into the estimate."""
+        if aircraft_count <= 0:
+            return
+        sample = step_seconds / aircraft_count
+        with self._lock:
+            self.seconds_per_aircraft_tick += self._smoothing * (
+                sample - self.seconds_per_aircraft_tick
+            )
+
+    def step_seconds(self, aircraft_count: int) -> float:
+        """Estimated work per engine step of a run with `aircraft_count` aircraft."""
+        return max(aircraft_count, 1) * self.seconds_per_aircraft_tick
+
+
+class LoadGovernor:
+    """Background thread calling `SessionRegistry.rebalance_load` on an interval."""
+
+    def __init__(
+        self,
+        registry: SessionRegistry,
+        *,
+        interval_seconds: float,
+    ) -> None:
+        self._registry = registry
+        self._interval_seconds = max(float(interval_seconds), 0.1)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._registry.cpu_budget <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="airspacesim-load-governor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval_seconds):
+            try:
+                self._registry.rebalance_load()
+            except Exception:
+                logger.exception("Run load rebalance failed; will retry next interval.")
@@ -0,0 +1,50 @@
+"""Background eviction of idle runtime sessions."""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from .registry import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class HibernationSweeper:
+    """Background thread calling `SessionRegistry.hibernate_idle` on an interval."""
+
+    def __init__(
+        self,
+        registry: SessionRegistry,
+        *,
+        interval_seconds: float,
+    ) -> None:
+        self._registry = registry
+        self._interval_seconds = max(float(interval_seconds), 1.0)
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._registry.hibernate_idle_after_seconds <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="airspacesim-hibernation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def sweep_once(self) -> int:
+        return self._registry.hibernate_idle()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._interval_seconds):
+            try:
+                self.sweep_once()
+            except Exception:
+                logger.exception("Hibernation sweep failed; will retry next interval.")
@@ -65,6 +65,19 @@ class PracticeTracker:
             return None
         return cls(practice)
 
+    def export_state(self) -> dict[str, Any]:
+        """Progress so far, for runtime-session persistence."""
+        return {
+            "encounter_min": self._encounter_min,
+            "crossing_min": self._crossing_min,
+            "outcome": self.outcome,
+        }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        self._encounter_min = state.get("encounter_min")
+        self._crossing_min = state.get("crossing_min")
+        self.outcome = state.get("outcome")
+
     def observe(
         self,
         aircraft_items: list[dict[str, Any]],
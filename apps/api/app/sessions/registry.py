@@ -1,23 +1,86 @@
-"""Registry for in-memory simulation runtime sessions."""
+"""Registry for in-memory simulation runtime sessions.
+
+Live sessions are crash-recoverable: the registry keeps the latest engine
+state blob of each live run in `run_engine_states` (on start/pause/resume and
+at most every `engine_state_interval_seconds` while running). Commands applied
+after that blob are the run's journal. `recover()` rehydrates one run lazily
+on first access and `recover_all()` does it eagerly with bounded parallelism;
+neither replays the run from t=0.
+
+The same mechanism frees memory held by idle runs: `hibernate_idle()` saves
+and evicts sessions that have been paused, or without stream subscribers and
+API access, for `hibernate_idle_after_seconds`. Their engine states are
+marked `hibernated`, so `recover_all()` leaves them on disk until a request
+touches them.
+
+Every published state is also appended to the run's seekable timeline (see
+`timeline.py`), which is flushed to `run_timeline_segments` when a session
+leaves memory.
+
+Checkpoints, engine states, timeline segments, and summaries are written by
+one `DatabaseWriter` thread rather than by each tick thread. Periodic writes
+from ticks are queued without waiting, so a busy database does not stall the
+simulation. Lifecycle writes (start, pause, stop, hibernation) wait for their
+turn, so callers can read them back.
+
+Running sessions share a CPU budget (see `budget.py`): `admit()` holds or
+rejects run starts that would not fit it, and `rebalance_load()` slows the
+most expensive runs first when the running ones outgrow it.
+
+With a `WorkerCluster`, the registry only keeps the runs this worker owns.
+It does not recover or rehydrate other workers' runs, and it asks the
+owner over the bus to stop them.
+"""
 
 from __future__ import annotations
 
 import logging
 import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from uuid import uuid4
 
 from sqlalchemy.orm import Session, sessionmaker
 
-from ..db.models import RunCheckpointRecord, RunRecord, ScenarioRecord
-from ..db.repositories import RunCheckpointRepository
+from ..cluster import WorkerCluster
+from ..db.models import (
+    RunCheckpointRecord,
+    RunEngineStateRecord,
+    RunRecord,
+    ScenarioRecord,
+)
+from ..db.repositories import (
+    RunCheckpointRepository,
+    RunCommandRepository,
+    RunEngineStateRepository,
+    RunSummaryRepository,
+)
+from ..db.repositories.engine_states import HIBERNATED_RUNTIME_STATUS
 from ..db.session import get_session_factory
+from ..db.writer import DatabaseWriter
+from ..services.runs import build_run_summary_record
 from ..services.scenarios import resolve_scenario_contracts
 from ..ws import BroadcastHub
+from .budget import (
+    MAX_TICK_INTERVAL_SCALE,
+    RunAdmissionRejected,
+    TickCostModel,
+    tick_load,
+)
 from .runtime import SimulationRuntimeSession
+from .timeline import TimelineRecorder
 
 
 logger = logging.getLogger(__name__)
 
+RECOVERABLE_RUN_STATUSES = {"running", "paused"}
+# A run read over HTTP this recently counts as watched (longer than a long
+# poll), so pollers see it advance in fine steps.
+WATCHED_AFTER_ACCESS_SECONDS = 30.0
+
 
 class SessionRegistry:
     """Track and manage runtime sessions keyed by run id."""
@@ -29,6 +92,16 @@ class SessionRegistry:
         checkpoint_retention_per_run: int = 25,
         broadcast_hub: BroadcastHub | None = None,
         session_factory: sessionmaker[Session] | None = None,
+        engine_state_interval_seconds: float = 5.0,
+        recovery_workers: int = 8,
+        hibernate_idle_after_seconds: float = 0.0,
+        timeline_segment_seconds: float = 30.0,
+        writer: DatabaseWriter | None = None,
+        long_poll_max_seconds: float = 25.0,
+        long_poll_max_waiters: int = 16,
+        cluster: WorkerCluster | None = None,
+        cpu_budget: float = 0.0,
+        admission_wait_seconds: float = 2.0,
     ) -> None:
         self.update_interval_seconds = max(float(update_interval_seconds), 0.05)
         self.checkpoint_interval_seconds = max(
@@ -36,12 +109,165 @@ class SessionRegistry:
             0.25,
         )
         self.checkpoint_retention_per_run = max(int(checkpoint_retention_per_run), 1)
+        self.engine_state_interval_seconds = max(
+            float(engine_state_interval_seconds),
+            self.checkpoint_interval_seconds,
+        )
+        self.recovery_workers = max(int(recovery_workers), 1)
+        # 0 disables hibernation.
+        self.hibernate_idle_after_seconds = max(
+            float(hibernate_idle_after_seconds), 0.0
+        )
         self.broadcast_hub = broadcast_hub
         self.session_factory = session_factory or get_session_factory()
+        # A writer passed in is shared (e.g. with the retention sweep) and
+        # closed by its owner; otherwise the registry owns one.
+        self._owns_writer = writer is None
+        self.writer = writer or DatabaseWriter(self.session_factory)
+        self.timeline = TimelineRecorder(
+            self.session_factory,
+            segment_seconds=timeline_segment_seconds,
+            writer=self.writer,
+        )
         self._sessions: dict[str, SimulationRuntimeSession] = {}
         self._lock = threading.Lock()
         self._checkpoint_lock = threading.Lock()
         self._last_checkpoint_at: dict[str, float] = {}
+        self._last_engine_state_at: dict[str, float] = {}
+        self._run_locks: dict[str, threading.Lock] = {}
+        self._last_active_at: dict[str, float] = {}
+        # Long polls hold a request thread each; beyond the cap they answer
+        # at once instead of starving other requests.
+        self.long_poll_max_seconds = max(float(long_poll_max_seconds), 0.0)
+        self._long_poll_slots = threading.BoundedSemaphore(
+            max(int(long_poll_max_waiters), 1)
+        )
+        # Cores all running sessions may use together; 0 disables admission
+        # control and load rebalancing.
+        self.cpu_budget = max(float(cpu_budget), 0.0)
+        self.admission_wait_seconds = max(float(admission_wait_seconds), 0.0)
+        self.cost_model = TickCostModel()
+        self._load_changed = threading.Condition()
+        self._admissions_waiting = 0
+        self.admissions_rejected = 0
+        self.cluster = cluster
+        if cluster is not None:
+            cluster.bus.add_handler("run.stop", self._on_remote_stop)
+
+    def owns(self, run_id: str) -> bool:
+        """Whether this worker runs `run_id`; always true without a cluster."""
+        return self.cluster is None or self.cluster.owns(run_id)
+
+    def new_run_id(self) -> str:
+        """An id for a new run whose session will start on this worker."""
+        return self.cluster.new_run_id() if self.cluster else str(uuid4())
+
+    def estimate_load(self, scenario: ScenarioRecord | None) -> float:
+        """Cores a new run of `scenario` would use at full tick rate."""
+        _, scenario_aircraft = resolve_scenario_contracts(scenario)
+        aircraft_count = len(scenario_aircraft["data"]["aircraft"])
+        return tick_load(
+            self.cost_model.step_seconds(aircraft_count),
+            self.update_interval_seconds,
+        )
+
+    def admit(self, scenario: ScenarioRecord | None) -> None:
+        """Wait until a run of `scenario` fits the CPU budget at full tick rate.
+
+        Raises `RunAdmissionRejected` when it still does not fit after
+        `admission_wait_seconds`. A run always fits while nothing else runs.
+        """
+        if self.cpu_budget <= 0:
+            return
+        estimate = self.estimate_load(scenario)
+        deadline = time.monotonic() + self.admission_wait_seconds
+        with self._load_changed:
+            self._admissions_waiting += 1
+            try:
+                while True:
+                    load = self._full_rate_load()
+                    if load == 0 or load + estimate <= self.cpu_budget:
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._load_changed.wait(remaining)
+            finally:
+                self._admissions_waiting -= 1
+            self.admissions_rejected += 1
+        raise RunAdmissionRejected(
+            "The service is at CPU capacity. Try again shortly.",
+            retry_after_seconds=max(self.admission_wait_seconds, 1.0),
+        )
+
+    def rebalance_load(self) -> int:
+        """Fit running sessions into the CPU budget by slowing their ticks.
+
+        The most expensive runs are slowed first, each by no more than
+        `MAX_TICK_INTERVAL_SCALE`; runs that fit again go back to full rate.
+        Returns how many runs are degraded.
+        """
+        if self.cpu_budget <= 0:
+            return 0
+        sessions = sorted(
+            self.list_sessions(),
+            key=lambda session: session.cpu_load(1.0),
+            reverse=True,
+        )
+        scales = {session.run_id: 1.0 for session in sessions}
+        excess = sum(session.cpu_load(1.0) for session in sessions) - self.cpu_budget
+        for session in sessions:
+            if excess <= 0:
+                break
+            full_load = session.cpu_load(1.0)
+            target = max(
+                full_load - excess, session.cpu_load(MAX_TICK_INTERVAL_SCALE)
+            )
+            if target <= 0:
+                continue
+            work = session.tick_work_seconds or 0.0
+            scale = work / (target * session.update_interval_seconds)
+            scales[session.run_id] = min(max(scale, 1.0), MAX_TICK_INTERVAL_SCALE)
+            excess -= full_load - session.cpu_load(scales[session.run_id])
+        for session in sessions:
+            session.tick_interval_scale = scales[session.run_id]
+        with self._load_changed:
+            self._load_changed.notify_all()
+        return sum(1 for scale in scales.values() if scale > 1.0)
+
+    def load_report(self) -> dict[str, float | int]:
+        """CPU budget, current load, and admission counters, for health checks."""
+        sessions = self.list_sessions()
+        with self._load_changed:
+            admissions_waiting = self._admissions_waiting
+        return {
+            "cpu_budget": self.cpu_budget,
+            "cpu_load": round(sum(session.cpu_load() for session in sessions), 4),
+            "running": sum(1 for session in sessions if session.cpu_load() > 0),
+            "degraded": sum(
+                1 for session in sessions if session.tick_interval_scale > 1.0
+            ),
+            "admissions_waiting": admissions_waiting,
+            "admissions_rejected": self.admissions_rejected,
+            "seconds_per_aircraft_tick": self.cost_model.seconds_per_aircraft_tick,
+        }
+
+    def is_watched(self, run_id: str) -> bool:
+        """Whether anyone streams `run_id` or has recently read it.
+
+        Unwatched sessions take coarse steps and rarely publish.
+        """
+        if (
+            self.broadcast_hub is not None
+            and self.broadcast_hub.subscriber_count(run_id) > 0
+        ):
+            return True
+        with self._lock:
+            last_active_at = self._last_active_at.get(run_id)
+        return (
+            last_active_at is not None
+            and time.monotonic() - last_active_at < WATCHED_AFTER_ACCESS_SECONDS
+        )
 
     def get(self, run_id: str) -> SimulationRuntimeSession | None:
         with self._lock:
@@ -51,6 +277,86 @@ class SessionRegistry:
         with self._lock:
             return list(self._sessions.values())
 
+    def recover(self, run: RunRecord) -> SimulationRuntimeSession | None:
+        """Return the live session for `run`, rehydrating it if needed.
+
+        Returns None when the run is not durably live or has no saved engine
+        state (for example, it was started before engine states existed).
+        """
+        session = self.get(run.id)
+        if (
+            session is None
+            and run.status in RECOVERABLE_RUN_STATUSES
+            and self.owns(run.id)
+        ):
+            session = self._recover_run_id(run.id)
+        if session is not None:
+            self._touch(run.id)
+        return session
+
+    def wait_for_state_change(
+        self,
+        session: SimulationRuntimeSession,
+        version: int,
+        timeout_seconds: float,
+    ) -> bool:
+        """Long-poll `session` until its state moves past `version`.
+
+        The wait is capped at `long_poll_max_seconds`, and returns False at
+        once when every long-poll slot is taken.
+        """
+        timeout_seconds = min(max(timeout_seconds, 0.0), self.long_poll_max_seconds)
+        if timeout_seconds <= 0 or not self._long_poll_slots.acquire(
+            blocking=False
+        ):
+            return session.state_version != version
+        try:
+            return session.wait_for_state_change(version, timeout_seconds)
+        finally:
+            self._long_poll_slots.release()
+
+    def recover_all(self, max_workers: int | None = None) -> int:
+        """Eagerly rehydrate recoverable runs that were resident.
+
+        Hibernated runs stay on disk. Returns how many runs are live.
+        """
+        db = self.session_factory()
+        try:
+            run_ids = RunEngineStateRepository(db).list_recoverable_run_ids(
+                include_hibernated=False
+            )
+        finally:
+            db.close()
+        run_ids = [run_id for run_id in run_ids if self.owns(run_id)]
+        if not run_ids:
+            return 0
+        workers = min(max_workers or self.recovery_workers, len(run_ids))
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="airspacesim-recovery",
+        ) as executor:
+            sessions = list(
+                executor.map(
+                    lambda run_id: self._recover_run_id(run_id, tick=False),
+                    run_ids,
+                )
+            )
+        # Tick threads start only once every run is resident, so rehydration
+        # does not compete with live checkpoint writes.
+        recovered = 0
+        for session in sessions:
+            if session is not None:
+                recovered += 1
+                session.ensure_ticking()
+        logger.info(
+            "Recovered %d of %d live runs in %.2fs.",
+            recovered,
+            len(run_ids),
+            time.monotonic() - started_at,
+        )
+        return recovered
+
     def start(
         self,
         *,
@@ -73,8 +379,11 @@ class SessionRegistry:
                     metadata_payload=(
                         scenario.metadata_payload if scenario is not None else None
                     ),
+                    tick_observer=self.cost_model.observe,
+                    viewer_check=partial(self.is_watched, run.id),
                 )
                 self._sessions[run.id] = session
+        self._touch(run.id)
         session.start()
         return session
 
@@ -95,14 +404,130 @@ class SessionRegistry:
         if session is not None:
             session.stop()
             self._discard_session(run_id)
+        elif not self.owns(run_id):
+            self.cluster.bus.publish({"kind": "run.stop", "run_id": run_id})
+        else:
+            self._discard_engine_state(run_id)
         return session
 
+    def hibernate(self, run_id: str) -> bool:
+        """Save a resident session's engine state and free it from memory.
+
+        The run stays durably live; `recover()` rehydrates it on the next
+        state read, command, pause, or resume. Returns False when the run was
+        not resident or ended meanwhile.
+        """
+        with self._run_lock(run_id):
+            session = self.get(run_id)
+            if session is None:
+                return False
+            try:
+                state = session.hibernate()
+                if state is not None:
+                    state["runtime_status"] = HIBERNATED_RUNTIME_STATUS
+                    self._save_engine_state(run_id, state)
+            finally:
+                # If the save failed, recovery falls back to the previous
+                # engine state plus the command journal.
+                self._discard_session(run_id)
+        return state is not None
+
+    def hibernate_idle(self, now: float | None = None) -> int:
+        """Hibernate sessions idle for `hibernate_idle_after_seconds`.
+
+        A session is idle while it is paused, or while nobody subscribes to
+        its stream and no request has touched it. Returns how many sessions
+        were hibernated.
+        """
+        if self.hibernate_idle_after_seconds <= 0:
+            return 0
+        now = time.monotonic() if now is None else now
+        idle_run_ids = []
+        for session in self.list_sessions():
+            run_id = session.run_id
+            if (
+                self.broadcast_hub is not None
+                and self.broadcast_hub.subscriber_count(run_id) > 0
+            ):
+                self._touch(run_id, now)
+            with self._lock:
+                idle_since = self._last_active_at.setdefault(run_id, now)
+            paused_since = session.paused_since
+            if paused_since is not None:
+                idle_since = min(idle_since, paused_since)
+            if now - idle_since >= self.hibernate_idle_after_seconds:
+                idle_run_ids.append(run_id)
+
+        hibernated = 0
+        for run_id in idle_run_ids:
+            try:
+                if self.hibernate(run_id):
+                    hibernated += 1
+            except Exception:
+                logger.exception("Failed to hibernate run", extra={"run_id": run_id})
+        if hibernated:
+            logger.info("Hibernated %d idle runs.", hibernated)
+        return hibernated
+
+    def session_counts(self) -> dict[str, int]:
+        """Resident vs hibernated live runs, for sizing containers.
+
+        Hibernated counts every durably live run with a saved engine state
+        that is not in memory, including runs not yet recovered after a
+        restart. In a cluster, only runs this worker owns are counted.
+        """
+        db = self.session_factory()
+        try:
+            live_run_ids = RunEngineStateRepository(db).list_recoverable_run_ids()
+        finally:
+            db.close()
+        with self._lock:
+            resident_ids = set(self._sessions)
+        owned_ids = {run_id for run_id in live_run_ids if self.owns(run_id)}
+        return {
+            "resident": len(resident_ids),
+            "hibernated": len(owned_ids - resident_ids),
+        }
+
     def shutdown(self) -> None:
+        """Suspend every session, saving its engine state for recovery."""
         with self._lock:
             sessions = list(self._sessions.values())
         for session in sessions:
-            session.stop()
+            session.request_suspend()
+        for session in sessions:
+            session.suspend()
+            try:
+                self._persist_engine_state(session.run_id)
+            except Exception:
+                logger.exception(
+                    "Failed to persist engine state on shutdown",
+                    extra={"run_id": session.run_id},
+                )
             self._discard_session(session.run_id)
+        if self._owns_writer:
+            self.writer.close()
+        else:
+            self.writer.flush()
+
+    def _full_rate_load(self) -> float:
+        # Sessions that have not ticked yet count at their estimated load.
+        load = 0.0
+        for session in self.list_sessions():
+            if session.runtime_status != "running":
+                continue
+            if session.tick_work_seconds is None:
+                load += tick_load(
+                    self.cost_model.step_seconds(session.aircraft_count),
+                    session.update_interval_seconds,
+                )
+            else:
+                load += session.cpu_load(1.0)
+        return load
+
+    def _on_remote_stop(self, message: dict) -> None:
+        if self.owns(message["run_id"]):
+            self.stop(message["run_id"])
 
     def _publish_state(
         self,
@@ -112,14 +537,28 @@ class SessionRegistry:
     ) -> None:
         if self.broadcast_hub is not None:
             self.broadcast_hub.publish_state(run_id, snapshot)
+        try:
+            self.timeline.record(run_id, snapshot)
+        except Exception:
+            logger.exception("Failed to record run timeline", extra={"run_id": run_id})
         if checkpoint_type in {"stopped", "completed", "error"}:
             try:
-                self._persist_run_summary(run_id, snapshot)
+                self._persist_run_summary(run_id, snapshot, checkpoint_type)
             except Exception:
                 logger.exception(
                     "Failed to persist run summary",
                     extra={"run_id": run_id, "checkpoint_type": checkpoint_type},
                 )
+        try:
+            if checkpoint_type in {"stopped", "completed", "error"}:
+                self._discard_engine_state(run_id)
+            elif self._should_persist_engine_state(run_id, checkpoint_type):
+                self._persist_engine_state(run_id, wait=checkpoint_type != "tick")
+        except Exception:
+            logger.exception(
+                "Failed to persist run engine state",
+                extra={"run_id": run_id, "checkpoint_type": checkpoint_type},
+            )
         if not self._should_persist_checkpoint(run_id, checkpoint_type):
             if checkpoint_type in {"completed", "error"}:
                 self._discard_session(run_id)
@@ -145,6 +584,7 @@ class SessionRegistry:
                 "started",
                 "paused",
                 "resumed",
+                "recovered",
                 "stopped",
                 "command",
                 "completed",
@@ -162,48 +602,203 @@ class SessionRegistry:
                 return True
             return False
 
+    def _should_persist_engine_state(self, run_id: str, checkpoint_type: str) -> bool:
+        # Commands are not a trigger: they are replayed from the journal.
+        now = time.monotonic()
+        with self._checkpoint_lock:
+            last_saved_at = self._last_engine_state_at.get(run_id)
+            if checkpoint_type in {"started", "paused", "resumed"} or (
+                checkpoint_type == "tick"
+                and (
+                    last_saved_at is None
+                    or now - last_saved_at >= self.engine_state_interval_seconds
+                )
+            ):
+                self._last_engine_state_at[run_id] = now
+                return True
+            return False
+
+    def _persist_engine_state(self, run_id: str, *, wait: bool = True) -> None:
+        runtime_session = self.get(run_id)
+        if runtime_session is None:
+            return
+        self._save_engine_state(
+            run_id, runtime_session.export_engine_state(), wait=wait
+        )
+
+    def _save_engine_state(
+        self, run_id: str, state: dict, *, wait: bool = True
+    ) -> None:
+        self.writer.submit(
+            lambda session: RunEngineStateRepository(session).save(
+                RunEngineStateRecord(run_id=run_id, **state)
+            ),
+            wait=wait,
+        )
+
+    def _discard_engine_state(self, run_id: str) -> None:
+        # Only called once a run has ended, so its lock is no longer needed.
+        with self._lock:
+            self._run_locks.pop(run_id, None)
+        with self._checkpoint_lock:
+            self._last_engine_state_at.pop(run_id, None)
+        self.writer.submit(
+            lambda session: RunEngineStateRepository(session).delete_for_run(run_id),
+            wait=True,
+        )
+
+    def _recover_run_id(
+        self, run_id: str, *, tick: bool = True
+    ) -> SimulationRuntimeSession | None:
+        try:
+            with self._run_lock(run_id):
+                session = self.get(run_id)
+                if session is not None:
+                    return session
+                rehydrated = self._rehydrate(run_id)
+                if rehydrated is None:
+                    return None
+                session, runtime_status = rehydrated
+                session.continue_recovered(runtime_status, tick=tick)
+                return session
+        except Exception:
+            logger.exception("Failed to recover run", extra={"run_id": run_id})
+            return None
+
+    @contextmanager
+    def _run_lock(self, run_id: str) -> Iterator[None]:
+        """Serialize rehydration and hibernation of one run."""
+        with self._lock:
+            lock = self._run_locks.setdefault(run_id, threading.Lock())
+        with lock:
+            yield
+
+    def _touch(self, run_id: str, now: float | None = None) -> None:
+        with self._lock:
+            self._last_active_at[run_id] = time.monotonic() if now is None else now
+
+    def _rehydrate(
+        self, run_id: str
+    ) -> tuple[SimulationRuntimeSession, str] | None:
+        db = self.session_factory()
+        try:
+            run = db.get(RunRecord, run_id)
+            if run is None or run.status not in RECOVERABLE_RUN_STATUSES:
+                return None
+            saved = RunEngineStateRepository(db).get(run_id)
+            if saved is None:
+                return None
+            journal = RunCommandRepository(db).list_applied_for_run(
+                run_id, offset=saved.commands_applied
+            )
+            scenario = run.scenario
+            session = SimulationRuntimeSession(
+                run_id=run.id,
+                sim_rate=saved.sim_rate,
+                update_interval_seconds=self.update_interval_seconds,
+                state_publisher=self._publish_state,
+                metadata_payload=(
+                    scenario.metadata_payload if scenario is not None else None
+                ),
+                recovered_state={
+                    "commands_applied": saved.commands_applied,
+                    "engine_state": saved.engine_state,
+                    "session_json": saved.session_json,
+                },
+                tick_observer=self.cost_model.observe,
+                viewer_check=partial(self.is_watched, run.id),
+            )
+            # Journaled commands apply at their recorded times, as in a run
+            # replay, so the journal stays the run's history.
+            replayed = session.replay_commands(
+                (
+                    command.id,
+                    command.command_type,
+                    command.payload,
+                    command.time_seconds,
+                )
+                for command in journal
+            )
+            runtime_status = run.status
+        finally:
+            db.close()
+        # Frames recorded after the saved state belong to lost history.
+        self.timeline.discard_from(run_id, session.simulation.clock.now_seconds)
+
+        with self._lock:
+            self._sessions[run_id] = session
+        with self._checkpoint_lock:
+            self._last_engine_state_at[run_id] = time.monotonic()
+        if replayed:
+            # Fold the replayed journal into a fresh engine state.
+            self._persist_engine_state(run_id)
+        return session, runtime_status
+
     def _persist_checkpoint(
         self,
         run_id: str,
         snapshot: dict,
         checkpoint_type: str,
     ) -> None:
-        session = self.session_factory()
-        try:
-            checkpoint = RunCheckpointRecord(
-                run_id=run_id,
-                checkpoint_type=checkpoint_type,
-                runtime_status=str(snapshot["runtime_status"]),
-                sim_rate=float(snapshot["sim_rate"]),
-                snapshot=snapshot,
-            )
+        checkpoint = RunCheckpointRecord(
+            run_id=run_id,
+            checkpoint_type=checkpoint_type,
+            runtime_status=str(snapshot["runtime_status"]),
+            sim_rate=float(snapshot["sim_rate"]),
+            snapshot=snapshot,
+        )
+
+        def write(session: Session) -> None:
             repository = RunCheckpointRepository(session)
             repository.create(checkpoint)
             repository.prune_for_run(
                 run_id,
                 keep_latest=self.checkpoint_retention_per_run,
             )
-        finally:
-            session.close()
 
-    def _persist_run_summary(self, run_id: str, snapshot: dict) -> None:
-        """Store the factual run summary on the durable run at terminal states."""
+        self.writer.submit(write, wait=checkpoint_type != "tick")
+
+    def _persist_run_summary(
+        self, run_id: str, snapshot: dict, checkpoint_type: str
+    ) -> None:
+        """Store the summary, analytics, and replay manifest at terminal states.
+
+        Also materialises the run's `run_summaries` row for cross-run queries.
+        """
         summary = snapshot.get("summary")
         if not isinstance(summary, dict):
             return
-        session = self.session_factory()
-        try:
+        runtime_session = self.get(run_id)
+        replay_manifest = None
+        if runtime_session is not None:
+            summary = {
+                **summary,
+                "analytics": runtime_session.simulation.analytics_summary(),
+            }
+            replay_manifest = runtime_session.replay_manifest()
+
+        def write(session: Session) -> None:
             run = session.get(RunRecord, run_id)
             if run is None:
                 return
             run.summary_json = summary
+            if replay_manifest is not None:
+                run.replay_json = replay_manifest
             session.add(run)
             session.commit()
-        finally:
-            session.close()
+            RunSummaryRepository(session).save(
+                build_run_summary_record(run, summary, status=checkpoint_type)
+            )
+
+        self.writer.submit(write, wait=True)
 
     def _discard_session(self, run_id: str) -> None:
         with self._lock:
             self._sessions.pop(run_id, None)
+            self._last_active_at.pop(run_id, None)
+        with self._load_changed:
+            self._load_changed.notify_all()
         with self._checkpoint_lock:
             self._last_checkpoint_at.pop(run_id, None)
+            self._last_engine_state_at.pop(run_id, None)
+        self.timeline.flush(run_id)
@@ -3,25 +3,102 @@
 The session owns pacing (wall-clock ticks, sim_rate) and run lifecycle; the
 engine's `Simulation` façade owns simulated time, movement, commands,
 scheduled aircraft entry, separation monitoring, and engine events.
+
+Ticks are paced by deadline: each engine step of `update_interval_seconds *
+sim_rate` simulated seconds is due one interval after the previous one, so
+the time a tick takes does not slow simulated time. A late tick catches up
+with a few extra steps, and a session that stays late publishes once every
+2, 4, ... steps instead of after each one. Engine steps keep their size, so
+replays still reproduce the run. Lateness beyond the catch-up bound is
+dropped and counted in the `metrics` of `state_snapshot()`.
+
+A session nobody watches (see `viewer_check`) and without a practice tracker
+lets its owed steps accumulate and takes them as one coarse engine step. The
+step ends no later than the separation monitor's earliest possible breach
+among active pairs, so the monitor measures every pair at the same fine-step
+time as it would without coarse steps. While a pair is in violation, or the
+monitor has no bound yet, the session takes fine steps. Steps also end
+before any aircraft could reach its final waypoint, so exits and completion
+fall on the same fine step, and at the next scheduled entry or command. The
+session only builds and publishes a snapshot every
+`UNWATCHED_PUBLISH_SECONDS`, and it returns to fine steps within one
+interval of a viewer arriving. Coarse steps are logged in
+`step_multipliers` so that recovery and replays take the same steps. A
+late coarse tick follows the same pacing rules, with coarse steps in place
+of fine ones.
 """
 
 from __future__ import annotations
 
+import json
 import threading
 import time
+import uuid
 from datetime import datetime, timezone
 from typing import Any
 
 from airspacesim.core import Simulation, SeparationStandard
 from airspacesim.core.models import TrajectoryTrack
+from airspacesim.core.separation import (
+    KINETIC_SNAP_ALLOWANCE_NM,
+    KINETIC_SPEED_FACTOR,
+)
+from airspacesim.utils.conversions import haversine
 
 from .practice import PracticeTracker
 
+# Extra engine steps (coarse ones when unwatched) a late tick may take to
+# catch up with its deadline.
+MAX_CATCH_UP_STEPS = 4
+# Engine steps per published tick when persistently late.
+MAX_STEPS_PER_TICK = 8
+# Consecutive late ticks before publishing less often, and on-time ticks
+# before publishing more often again.
+COARSEN_AFTER_LATE_TICKS = 8
+REFINE_AFTER_ON_TIME_TICKS = 40
+# Longest simulated step of an unwatched session, and how often it still
+# publishes (for checkpoints, engine states, and the timeline).
+MAX_COARSE_STEP_SECONDS = 30.0
+UNWATCHED_PUBLISH_SECONDS = 5.0
+
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def _dumps(payload: Any) -> bytes:
+    # Same encoding as FastAPI's JSONResponse.
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _earliest_exit_seconds(aircraft_list) -> float:
+    """Simulated seconds before which no aircraft can reach its final waypoint.
+
+    Uses the separation monitor's allowances: along-track progress may cover
+    more great-circle distance than flown, and a fix may be captured from up
+    to the snap allowance away.
+    """
+    earliest = float("inf")
+    for aircraft in aircraft_list:
+        speed_kt = float(aircraft.speed) * KINETIC_SPEED_FACTOR
+        if speed_kt <= 0:
+            continue
+        final = aircraft.waypoints[-1]
+        distance_nm = haversine(
+            float(aircraft.position[0]),
+            float(aircraft.position[1]),
+            float(final[0]),
+            float(final[1]),
+        )
+        earliest = min(
+            earliest,
+            max(distance_nm - KINETIC_SNAP_ALLOWANCE_NM, 0.0) * 3600.0 / speed_kt,
+        )
+    return earliest
+
+
 def _standard_from_metadata(
     metadata_payload: dict[str, Any] | None,
 ) -> SeparationStandard:
@@ -57,31 +134,86 @@ class SimulationRuntimeSession:
         self,
         *,
         run_id: str,
-        scenario_airspace: dict[str, Any],
-        scenario_aircraft: dict[str, Any],
+        scenario_airspace: dict[str, Any] | None = None,
+        scenario_aircraft: dict[str, Any] | None = None,
         sim_rate: float,
         update_interval_seconds: float = 0.25,
         state_publisher=None,
         metadata_payload: dict[str, Any] | None = None,
+        recovered_state: dict[str, Any] | None = None,
+        tick_observer=None,
+        viewer_check=None,
     ) -> None:
+        """Build a fresh session from scenario contracts, or rehydrate one.
+
+        `recovered_state` is an `export_engine_state()` result; when given,
+        the engine is restored from its blob instead of the contracts and the
+        session starts out paused (see `continue_recovered`).
+        `tick_observer(aircraft_count, step_seconds)` is called with the
+        measured work per engine step of every paced tick.
+        `viewer_check()` says whether anyone watches the run; without it the
+        session always takes fine steps.
+        """
         self.run_id = run_id
         self.sim_rate = float(sim_rate)
+        # Rate at start; with the timed command journal it defines every
+        # step size, which is what `replay` needs to reproduce the run.
+        self.initial_sim_rate = self.sim_rate
         self.update_interval_seconds = max(float(update_interval_seconds), 0.05)
         self.runtime_status = "draft"
         self.last_updated_utc = _utc_now_iso()
         self.last_error: str | None = None
         self._state_publisher = state_publisher
+        self._tick_observer = tick_observer
+        # Smoothed wall seconds of work per engine step, including its share
+        # of the publish.
+        self.tick_work_seconds: float | None = None
+        # Set by the registry's CPU budget. Above 1 the session ticks less
+        # often with the same step size, so simulated time runs slower than
+        # `sim_rate` but replays still reproduce the run.
+        self.tick_interval_scale = 1.0
+        # Deadline pacing state; see the module docstring.
+        self.steps_per_tick = 1
+        self.tick_lag_seconds = 0.0
+        self.tick_overruns = 0
+        self.catch_up_steps = 0
+        self.dropped_seconds = 0.0
+        self._viewer_check = viewer_check
+        # Coarse engine steps as `[start_time_seconds, multiplier, count]`
+        # runs: `count` steps of `multiplier` fine steps each, back to back.
+        self.step_multipliers: list[list[float | int]] = []
+        self._coarse_run_end: float | None = None
+        self._replay_plan: list[list[float | int]] = []
+        # Bumped on every published state change; the serialised snapshots
+        # below are reused until it moves. Versions restart with each session
+        # object, so `instance_id` tells a rehydrated session's apart.
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.state_version = 0
+        self._serialized: dict[str, tuple[int, bytes]] = {}
+        self._serialized_lock = threading.Lock()
+        self._state_changed = threading.Condition(self._serialized_lock)
 
         self._state_lock = threading.Lock()
         self._tick_lock = threading.Lock()
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
-
-        self.simulation = Simulation.from_contracts(
-            scenario_airspace,
-            scenario_aircraft,
-            standard=_standard_from_metadata(metadata_payload),
-        )
+        # Monotonic time the session was last paused (None while not paused);
+        # the registry hibernates sessions that stay paused too long.
+        self.paused_since: float | None = None
+        self._hibernated = False
+
+        # Applied commands, including session-level ones such as
+        # SET_SIMULATION_SPEED; recovery replays the journal after this many.
+        self.commands_applied = 0
+
+        if recovered_state is not None:
+            self.simulation = Simulation.load_state(recovered_state["engine_state"])
+        else:
+            self.simulation = Simulation.from_contracts(
+                scenario_airspace,
+                scenario_aircraft,
+                standard=_standard_from_metadata(metadata_payload),
+            )
         # Kept for embedding compatibility; the manager is engine-internal.
         self.manager = self.simulation.manager
         self.practice_tracker = PracticeTracker.from_metadata(metadata_payload)
@@ -92,6 +224,8 @@ class SimulationRuntimeSession:
         self.content_versions = (
             dict(content_versions) if isinstance(content_versions, dict) else None
         )
+        if recovered_state is not None:
+            self._restore_session_state(recovered_state)
 
     def start(self) -> None:
         with self._state_lock:
@@ -100,16 +234,33 @@ class SimulationRuntimeSession:
                     f"Cannot start runtime session in state {self.runtime_status}."
                 )
             self.runtime_status = "running"
-            if self._thread is None or not self._thread.is_alive():
-                self._thread = threading.Thread(
-                    target=self._run_loop,
-                    name=f"airspacesim-run-{self.run_id}",
-                    daemon=True,
-                )
-                self._thread.start()
+            self.paused_since = None
+            self._ensure_thread()
             self.last_updated_utc = _utc_now_iso()
         self._emit_state("started")
 
+    def continue_recovered(self, runtime_status: str, *, tick: bool = True) -> None:
+        """Put a rehydrated session back into its durable lifecycle state.
+
+        With `tick=False` a running session does not advance until
+        `ensure_ticking()` is called.
+        """
+        with self._state_lock:
+            self.runtime_status = "running" if runtime_status == "running" else "paused"
+            self.paused_since = (
+                None if self.runtime_status == "running" else time.monotonic()
+            )
+            self.last_updated_utc = _utc_now_iso()
+        self._emit_state("recovered")
+        if tick:
+            self.ensure_ticking()
+
+    def ensure_ticking(self) -> None:
+        """Start the tick thread of a running session if it is not alive."""
+        with self._state_lock:
+            if self.runtime_status == "running":
+                self._ensure_thread()
+
     def pause(self) -> None:
         with self._state_lock:
             if self.runtime_status != "running":
@@ -117,6 +268,7 @@ class SimulationRuntimeSession:
                     f"Cannot pause runtime session in state {self.runtime_status}."
                 )
             self.runtime_status = "paused"
+            self.paused_since = time.monotonic()
             self.last_updated_utc = _utc_now_iso()
         self._emit_state("paused")
 
@@ -127,6 +279,7 @@ class SimulationRuntimeSession:
                     f"Cannot resume runtime session in state {self.runtime_status}."
                 )
             self.runtime_status = "running"
+            self.paused_since = None
             self.last_updated_utc = _utc_now_iso()
         self._emit_state("resumed")
 
@@ -144,13 +297,46 @@ class SimulationRuntimeSession:
         self._observe_practice(stopping=True)
         self._emit_state("stopped")
 
+    def suspend(self) -> None:
+        """Stop ticking without ending the run, e.g. on process shutdown.
+
+        Unlike `stop`, no terminal checkpoint is published, so the run stays
+        live durably and can be rehydrated from its saved engine state.
+        """
+        self.request_suspend()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self.manager.terminate_simulations(timeout_seconds=1.0)
+
+    def request_suspend(self) -> None:
+        """Signal the tick thread to stop without waiting for it."""
+        self._stop_event.set()
+        self.manager.request_shutdown()
+
+    def hibernate(self) -> dict[str, Any] | None:
+        """Suspend for eviction and return the final `export_engine_state()`.
+
+        From here on commands are rejected, so none can land after the
+        exported state. Returns None if the run ended while suspending.
+        """
+        with self._tick_lock:
+            self._hibernated = True
+        self.request_suspend()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        with self._state_lock:
+            live = self.runtime_status in {"running", "paused"}
+        state = self.export_engine_state() if live else None
+        self.manager.terminate_simulations(timeout_seconds=1.0)
+        return state
+
     def apply_command(
         self,
         *,
         command_id: str,
         command_type: str,
         payload: dict[str, Any],
-    ) -> dict[str, list[Any]]:
+    ) -> dict[str, Any]:
         """Apply a command to the live simulation."""
 
         with self._state_lock:
@@ -168,31 +354,133 @@ class SimulationRuntimeSession:
                 ],
             }
 
-        if command_type == "SET_SIMULATION_SPEED":
-            sim_rate = payload.get("sim_rate")
-            if not isinstance(sim_rate, (int, float)) or sim_rate <= 0:
-                return {
-                    "applied": [],
-                    "skipped": [],
-                    "rejected": [(command_id, "invalid sim_rate")],
-                }
-            with self._state_lock:
-                self.sim_rate = float(sim_rate)
-                self.last_updated_utc = _utc_now_iso()
-            self._emit_state("command")
-            return {"applied": [command_id], "skipped": [], "rejected": []}
-
-        normalized_event = {
-            "event_id": command_id,
-            "type": command_type,
-            "payload": self._normalize_command_payload(command_type, payload),
-        }
-        with self._tick_lock:
-            result = self.simulation.issue_command(normalized_event)
+        result = self._apply(command_id, command_type, payload)
+        if self._hibernated or (
+            command_type == "SET_SIMULATION_SPEED" and not result["applied"]
+        ):
+            return result
         self.last_updated_utc = _utc_now_iso()
         self._emit_state("command")
         return result
 
+    def replay_commands(self, commands) -> int:
+        """Re-apply journaled commands at their recorded clock times.
+
+        `commands` are `(command_id, command_type, payload, time_seconds)`
+        items in application order. Each is applied once the clock reaches
+        its recorded time; one without a time applies at the current clock.
+        Used after restoring an engine state blob and by `replay`; nothing is
+        published. Returns how many commands applied.
+        """
+        applied = 0
+        for command_id, command_type, payload, time_seconds in commands:
+            if time_seconds is not None:
+                self.fast_forward(time_seconds)
+            if self._apply(command_id, command_type, payload)["applied"]:
+                applied += 1
+        return applied
+
+    def replay(
+        self,
+        commands,
+        *,
+        until_seconds: float,
+        stopped: bool = False,
+        step_multipliers: list[list[float | int]] | None = None,
+    ) -> int:
+        """Re-run a finished run at full speed, without pacing or publishing.
+
+        `commands` are journaled `(command_id, command_type, payload,
+        time_seconds)` items in application order, applied as in
+        `replay_commands` with the same step sizes as the paced loop. Pass
+        `stopped=True` for runs that were stopped, not completed, so practice
+        scoring sees the same end. `step_multipliers` are the run's coarse
+        steps, taken again at the same clock times. Returns how many commands
+        applied.
+        """
+        self._replay_plan = [list(item) for item in step_multipliers or []]
+        applied = self.replay_commands(commands)
+        self.fast_forward(until_seconds)
+        if stopped:
+            self._observe_practice(stopping=True)
+        return applied
+
+    def fast_forward(self, time_seconds: float) -> None:
+        """Tick without pacing or publishing until the clock reaches `time_seconds`."""
+        while (
+            self.simulation.clock.now_seconds < time_seconds
+            and self.simulation.status != Simulation.STATUS_COMPLETED
+        ):
+            with self._state_lock:
+                sim_rate = self.sim_rate
+            self._tick(sim_rate, self._replayed_step_multiplier())
+
+    def replay_manifest(self) -> dict[str, Any]:
+        """What `replay` needs besides the scenario and the command journal."""
+        with self._tick_lock:
+            with self._state_lock:
+                runtime_status = self.runtime_status
+            return {
+                "tick_seconds": self.update_interval_seconds,
+                "sim_rate": self.initial_sim_rate,
+                "runtime_status": runtime_status,
+                "time_seconds": self.simulation.clock.now_seconds,
+                "state_digest": self.simulation.state_digest(),
+                "step_multipliers": [list(item) for item in self.step_multipliers],
+            }
+
+    def export_engine_state(self) -> dict[str, Any]:
+        """Everything needed to rehydrate this session after a restart."""
+        with self._tick_lock:
+            with self._state_lock:
+                runtime_status = self.runtime_status
+                sim_rate = self.sim_rate
+                last_error = self.last_error
+            return {
+                "runtime_status": runtime_status,
+                "sim_rate": sim_rate,
+                "time_seconds": self.simulation.clock.now_seconds,
+                "commands_applied": self.commands_applied,
+                "engine_state": self.simulation.save_state(),
+                "session_json": {
+                    "last_error": last_error,
+                    "initial_sim_rate": self.initial_sim_rate,
+                    "step_multipliers": [
+                        list(item) for item in self.step_multipliers
+                    ],
+                    "practice": (
+                        self.practice_tracker.export_state()
+                        if self.practice_tracker is not None
+                        else None
+                    ),
+                },
+            }
+
+    @property
+    def aircraft_count(self) -> int:
+        return len(self.manager.aircraft_list)
+
+    def cpu_load(self, tick_interval_scale: float | None = None) -> float:
+        """Cores this session's ticks use, from its measured step work.
+
+        Each step is due one `update_interval_seconds * tick_interval_scale`
+        after the last, so the load is the step work over that, up to one
+        core. Pass `tick_interval_scale` for the load at another tick rate.
+        Returns 0 when the session is not running or has not ticked yet.
+        """
+        with self._state_lock:
+            running = self.runtime_status == "running"
+        if not running or self.tick_work_seconds is None:
+            return 0.0
+        scale = (
+            self.tick_interval_scale
+            if tick_interval_scale is None
+            else tick_interval_scale
+        )
+        return min(
+            self.tick_work_seconds / (self.update_interval_seconds * scale), 1.0
+        )
+
     def state_snapshot(self) -> dict[str, Any]:
         """Return the current live runtime state for API serialization."""
 
@@ -217,6 +505,8 @@ class SimulationRuntimeSession:
             "time_seconds": simulation_snapshot["time_seconds"],
             "aircraft": aircraft_items,
             "separation": simulation_snapshot["separation"],
+            "conflicts": simulation_snapshot["conflicts"],
+            "route_conflicts": simulation_snapshot["route_conflicts"],
             "summary": self.run_summary(),
             "metrics": {
                 "aircraft_count": len(aircraft_items),
@@ -225,11 +515,20 @@ class SimulationRuntimeSession:
                 "pending_aircraft_count": simulation_snapshot[
                     "pending_aircraft_count"
                 ],
+                "steps_per_tick": self.steps_per_tick,
+                "tick_lag_seconds": round(self.tick_lag_seconds, 4),
+                "tick_overruns": self.tick_overruns,
+                "catch_up_steps": self.catch_up_steps,
+                "dropped_seconds": round(self.dropped_seconds, 4),
             },
         }
 
-    def run_summary(self) -> dict[str, Any]:
-        """Factual run summary (persisted at terminal checkpoints)."""
+    def run_summary(self, *, analytics: bool = False) -> dict[str, Any]:
+        """Factual run summary (persisted at terminal checkpoints).
+
+        With `analytics`, include the engine's run analytics. Live snapshots
+        leave them out to stay small; the persisted summary has them.
+        """
 
         summary = self.simulation.summary()
         summary["kind"] = self._summary_kind
@@ -237,6 +536,8 @@ class SimulationRuntimeSession:
             summary["content_versions"] = dict(self.content_versions)
         if self.practice_tracker is not None:
             summary["practice_outcome"] = self.practice_tracker.outcome
+        if analytics:
+            summary["analytics"] = self.simulation.analytics_summary()
         return summary
 
     def trajectory_snapshot(self) -> dict[str, Any]:
@@ -264,6 +565,42 @@ class SimulationRuntimeSession:
             "tracks": tracks,
         }
 
+    def state_json(self) -> bytes:
+        """`state_snapshot()` as JSON bytes, serialised once per state version.
+
+        The object follows the `RunStateResponse` contract minus its
+        per-request fields (`run` and `source`), which the route adds.
+        """
+        return self._serialized_once("state", self.state_snapshot)
+
+    def trajectory_json(self) -> bytes:
+        """`trajectory_snapshot()` as JSON bytes, serialised once per state version."""
+        return self._serialized_once("trajectory", self.trajectory_snapshot)
+
+    def wait_for_state_change(self, version: int, timeout_seconds: float) -> bool:
+        """Block until `state_version` moves past `version`, up to a timeout.
+
+        Returns whether it moved.
+        """
+        with self._state_changed:
+            return self._state_changed.wait_for(
+                lambda: self.state_version != version, timeout=timeout_seconds
+            )
+
+    def _serialized_once(self, name: str, snapshot) -> bytes:
+        version = self.state_version
+        with self._serialized_lock:
+            cached = self._serialized.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Serialised outside the lock; racing readers at worst both do it.
+        payload = _dumps(snapshot())
+        with self._serialized_lock:
+            cached = self._serialized.get(name)
+            if cached is None or cached[0] <= version:
+                self._serialized[name] = (version, payload)
+        return payload
+
     def _observe_practice(self, *, stopping: bool = False) -> None:
         if self.practice_tracker is None:
             return
@@ -275,21 +612,81 @@ class SimulationRuntimeSession:
         )
 
     def _run_loop(self) -> None:
+        deadline: float | None = None
+        late_ticks = on_time_ticks = 0
+        coarse = False
+        last_published_at = 0.0
         while not self._stop_event.is_set():
             with self._state_lock:
                 runtime_status = self.runtime_status
                 sim_rate = self.sim_rate
 
             if runtime_status != "running":
+                # Paused time is not owed; pacing restarts on resume.
+                deadline = None
                 time.sleep(0.05)
                 continue
 
+            step_period = self.update_interval_seconds * self.tick_interval_scale
+            started_at = time.monotonic()
+            if deadline is None:
+                deadline = started_at
+            lag = max(started_at - deadline, 0.0)
+            # Fine steps due by now, counting the one at `deadline`.
+            due = int(lag // step_period) + 1
+            was_coarse, coarse = coarse, self._steps_coarsely()
+            stepping_coarsely = coarse or was_coarse
+            publish = True
+            if stepping_coarsely:
+                # Unwatched: wait until enough steps are owed for one coarse
+                # step, checking for viewers every interval. A viewer
+                # arriving settles what is owed in coarse steps.
+                limit = self._coarse_step_limit(sim_rate)
+                if coarse and due < limit:
+                    self._stop_event.wait(deadline + due * step_period - started_at)
+                    continue
+                # Late from when the first coarse step fell due.
+                lag = max(lag - (min(due, limit) - 1) * step_period, 0.0)
+                max_owed = limit * (1 + MAX_CATCH_UP_STEPS)
+                publish = (
+                    not coarse
+                    or started_at - last_published_at >= UNWATCHED_PUBLISH_SECONDS
+                )
+            else:
+                max_owed = 1 + MAX_CATCH_UP_STEPS
+            self.tick_lag_seconds = lag
+            owed = min(due, max_owed)
+            if due > owed:
+                dropped = (due - owed) * step_period
+                self.dropped_seconds += dropped
+                deadline += dropped
+            if not stepping_coarsely:
+                self.catch_up_steps += owed - 1
+                owed += self.steps_per_tick - 1
+
             try:
-                with self._tick_lock:
-                    self.simulation.step(self.update_interval_seconds * sim_rate)
-                self._observe_practice()
+                work_started_at = time.perf_counter()
+                taken = engine_steps = 0
+                while taken < owed:
+                    multiplier = (
+                        min(owed - taken, self._coarse_step_limit(sim_rate))
+                        if stepping_coarsely
+                        else 1
+                    )
+                    self._tick(sim_rate, multiplier)
+                    taken += multiplier
+                    engine_steps += 1
+                    if self.simulation.status == Simulation.STATUS_COMPLETED:
+                        break
+                if stepping_coarsely:
+                    self.catch_up_steps += engine_steps - 1
                 self.last_updated_utc = _utc_now_iso()
-                self._emit_state("tick")
+                self._emit_state("tick", publish=publish)
+                if publish:
+                    last_published_at = started_at
+                self._observe_tick_work(
+                    (time.perf_counter() - work_started_at) / taken
+                )
                 if self.simulation.status == Simulation.STATUS_COMPLETED:
                     with self._state_lock:
                         if self.runtime_status == "running":
@@ -302,7 +699,179 @@ class SimulationRuntimeSession:
                     self.runtime_status = "error"
                 self._emit_state("error")
                 break
-            time.sleep(self.update_interval_seconds)
+
+            deadline += owed * step_period
+            finished_at = time.monotonic()
+            if finished_at > deadline:
+                self.tick_overruns += 1
+                late_ticks, on_time_ticks = late_ticks + 1, 0
+            else:
+                late_ticks, on_time_ticks = 0, on_time_ticks + 1
+            if (
+                late_ticks >= COARSEN_AFTER_LATE_TICKS
+                and self.steps_per_tick < MAX_STEPS_PER_TICK
+            ):
+                self.steps_per_tick *= 2
+                late_ticks = 0
+            elif (
+                on_time_ticks >= REFINE_AFTER_ON_TIME_TICKS
+                and self.steps_per_tick > 1
+            ):
+                self.steps_per_tick //= 2
+                on_time_ticks = 0
+            # Degraded runs sleep long; wake at once when stopping.
+            self._stop_event.wait(max(deadline - finished_at, 0.0))
+
+    def _observe_tick_work(self, seconds: float) -> None:
+        previous = self.tick_work_seconds
+        self.tick_work_seconds = (
+            seconds if previous is None else previous + 0.2 * (seconds - previous)
+        )
+        if self._tick_observer is not None:
+            self._tick_observer(self.aircraft_count, seconds)
+
+    def _tick(self, sim_rate: float, multiplier: int = 1) -> None:
+        """Take one engine step of `multiplier` fine steps."""
+        with self._tick_lock:
+            started_at = self.simulation.clock.now_seconds
+            if multiplier > 1:
+                last = self.step_multipliers[-1] if self.step_multipliers else None
+                if (
+                    last is not None
+                    and last[1] == multiplier
+                    and self._coarse_run_end == started_at
+                ):
+                    last[2] += 1
+                else:
+                    self.step_multipliers.append([started_at, multiplier, 1])
+            self.simulation.step(self.update_interval_seconds * sim_rate * multiplier)
+            if multiplier > 1:
+                self._coarse_run_end = self.simulation.clock.now_seconds
+        self._observe_practice()
+
+    def _replayed_step_multiplier(self) -> int:
+        plan = self._replay_plan
+        if not plan or plan[0][0] > self.simulation.clock.now_seconds:
+            return 1
+        multiplier = int(plan[0][1])
+        plan[0][2] -= 1
+        if plan[0][2] <= 0:
+            plan.pop(0)
+        return multiplier
+
+    def _steps_coarsely(self) -> bool:
+        return (
+            self._viewer_check is not None
+            and self.practice_tracker is None
+            and not self._viewer_check()
+        )
+
+    def _coarse_step_limit(self, sim_rate: float) -> int:
+        """Most fine steps one unwatched engine step may cover.
+
+        The step ends no later than the monitor's next parked breach bound
+        (see `SeparationMonitor.next_check_seconds`), the earliest time an
+        active aircraft could reach its final waypoint and exit, and the next
+        scheduled entry or command. Returns 1 when the monitor has no bound.
+        """
+        now = self.simulation.clock.now_seconds
+        active = [
+            aircraft
+            for aircraft in list(self.manager.aircraft_list)
+            if aircraft.current_index < len(aircraft.waypoints) - 1
+        ]
+        kinematics = {
+            aircraft.id: (float(aircraft.speed), float(aircraft.vertical_rate_fpm))
+            for aircraft in active
+        }
+        next_check = self.simulation.monitor.next_check_seconds(kinematics)
+        if next_check is None:
+            return 1
+        limit_seconds = min(
+            MAX_COARSE_STEP_SECONDS,
+            next_check - now,
+            _earliest_exit_seconds(active),
+        )
+        next_due = self.simulation.scheduler.peek_time()
+        if next_due is not None:
+            limit_seconds = min(limit_seconds, next_due - now)
+        fine_step = self.update_interval_seconds * sim_rate
+        return max(int(limit_seconds // fine_step), 1)
+
+    def _apply(
+        self, command_id: str, command_type: str, payload: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Apply one command; `time_seconds` in the result is the clock it saw."""
+        if command_type == "SET_SIMULATION_SPEED":
+            sim_rate = payload.get("sim_rate")
+            if not isinstance(sim_rate, (int, float)) or sim_rate <= 0:
+                return {
+                    "applied": [],
+                    "skipped": [],
+                    "rejected": [(command_id, "invalid sim_rate")],
+                }
+            with self._tick_lock:
+                if self._hibernated:
+                    return self._rejected_hibernated(command_id)
+                with self._state_lock:
+                    self.sim_rate = float(sim_rate)
+                self.commands_applied += 1
+                time_seconds = self.simulation.clock.now_seconds
+            return {
+                "applied": [command_id],
+                "skipped": [],
+                "rejected": [],
+                "time_seconds": time_seconds,
+            }
+
+        normalized_event = {
+            "event_id": command_id,
+            "type": command_type,
+            "payload": self._normalize_command_payload(command_type, payload),
+        }
+        with self._tick_lock:
+            if self._hibernated:
+                return self._rejected_hibernated(command_id)
+            result = self.simulation.issue_command(normalized_event)
+            if result["applied"]:
+                self.commands_applied += 1
+            result["time_seconds"] = self.simulation.clock.now_seconds
+        return result
+
+    @staticmethod
+    def _rejected_hibernated(command_id: str) -> dict[str, list[Any]]:
+        # Only reachable by a caller that fetched the session just before it
+        # was evicted; the next registry lookup rehydrates it.
+        return {
+            "applied": [],
+            "skipped": [],
+            "rejected": [(command_id, "runtime session is hibernated; retry")],
+        }
+
+    def _restore_session_state(self, recovered_state: dict[str, Any]) -> None:
+        session_state = recovered_state.get("session_json") or {}
+        self.commands_applied = int(recovered_state.get("commands_applied", 0))
+        self.last_error = session_state.get("last_error")
+        self.initial_sim_rate = float(
+            session_state.get("initial_sim_rate", self.sim_rate)
+        )
+        self.step_multipliers = [
+            list(item) for item in session_state.get("step_multipliers") or []
+        ]
+        practice_state = session_state.get("practice")
+        if self.practice_tracker is not None and practice_state:
+            self.practice_tracker.restore_state(practice_state)
+        self.runtime_status = "paused"
+        self.paused_since = time.monotonic()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                name=f"airspacesim-run-{self.run_id}",
+                daemon=True,
+            )
+            self._thread.start()
 
     def _normalize_command_payload(
         self, command_type: str, payload: dict[str, Any]
@@ -318,8 +887,11 @@ class SimulationRuntimeSession:
                 normalized["speed_kt"] = speed_value
         return normalized
 
-    def _emit_state(self, checkpoint_type: str) -> None:
-        if self._state_publisher is not None:
+    def _emit_state(self, checkpoint_type: str, *, publish: bool = True) -> None:
+        with self._state_changed:
+            self.state_version += 1
+            self._state_changed.notify_all()
+        if publish and self._state_publisher is not None:
             self._state_publisher(
                 self.run_id,
                 self.state_snapshot(),
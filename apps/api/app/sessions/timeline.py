@@ -0,0 +1,480 @@
+"""Seekable run timeline: periodic keyframes plus compact per-frame deltas.
+
+Every state the registry publishes for a run becomes a timeline frame. Frames
+are grouped into segments of at most `segment_seconds` simulated seconds (and
+`max_frames` frames); each segment is one `run_timeline_segments` row holding
+a zlib-compressed JSON document:
+
+- `keyframe`: the first frame, verbatim.
+- `times`: simulated time of every later frame.
+- `ids` / `columns`: per aircraft and numeric field, the change of the
+  quantised value at each frame. These are small, mostly repeating integers,
+  which is what keeps a 10-minute, 50-aircraft run well under 1 MB.
+- `patches`: everything else that changed, e.g. top-level sections,
+  non-numeric aircraft fields, and added aircraft.
+
+Reconstructing any instant takes one indexed lookup for the segment starting
+at or before it, then applying at most one segment of deltas. Values after a
+keyframe are quantised (1e-6 degree, 0.1 ft, 0.01 kt, ...).
+
+With a `DatabaseWriter`, a segment that fills up during a tick is written in
+the background. Until that write commits, the segment is still read from
+memory.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import threading
+import zlib
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..db.models import RunTimelineSegmentRecord
+from ..db.repositories import RunTimelineRepository
+from ..db.writer import DatabaseWriter
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FORMAT_VERSION = 1
+
+# (name, scale): quantised value is round(value * scale).
+_NUMERIC_FIELDS = (
+    ("lat", 1_000_000),
+    ("lon", 1_000_000),
+    ("altitude_ft", 10),
+    ("speed_kt", 100),
+    ("heading_deg", 1000),
+    ("vertical_rate_fpm", 10),
+)
+_NUMERIC_ITEM_KEYS = {"position_dd", "updated_utc"} | {
+    name for name, _ in _NUMERIC_FIELDS
+}
+
+
+def _quantise(item: dict[str, Any]) -> list[int]:
+    lat, lon = item["position_dd"]
+    values = {"lat": lat, "lon": lon}
+    return [
+        round(float(values[name] if name in values else item[name]) * scale)
+        for name, scale in _NUMERIC_FIELDS
+    ]
+
+
+def _set_numeric(item: dict[str, Any], numbers: list[int]) -> None:
+    scales = [scale for _, scale in _NUMERIC_FIELDS]
+    item["position_dd"] = [numbers[0] / scales[0], numbers[1] / scales[1]]
+    for index, (name, scale) in enumerate(_NUMERIC_FIELDS[2:], start=2):
+        item[name] = numbers[index] / scale
+
+
+def _split(
+    snapshot: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, tuple[list[int], dict[str, Any]]]]:
+    """Top-level fields, and per aircraft (quantised numbers, other fields)."""
+    top = {
+        key: value
+        for key, value in snapshot.items()
+        if key not in {"aircraft", "time_seconds"}
+    }
+    aircraft = {
+        item["id"]: (
+            _quantise(item),
+            {key: value for key, value in item.items() if key not in _NUMERIC_ITEM_KEYS},
+        )
+        for item in snapshot.get("aircraft", [])
+    }
+    return top, aircraft
+
+
+def _strip_item(item: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in item.items() if key != "updated_utc"}
+
+
+class SegmentBuilder:
+    """Accumulates frames for one open segment of a run."""
+
+    def __init__(self, snapshot: dict[str, Any]) -> None:
+        self.start_seconds = float(snapshot["time_seconds"])
+        self.end_seconds = self.start_seconds
+        self.keyframe = {
+            **snapshot,
+            "aircraft": [_strip_item(item) for item in snapshot.get("aircraft", [])],
+        }
+        self.times: list[float] = []
+        self.ids: list[str] = []
+        self.columns: list[list[list[int]]] = []
+        self.patches: list[list[Any]] = []
+        self._index: dict[str, int] = {}
+        self._top, self._aircraft = _split(snapshot)
+        for aircraft_id in self._aircraft:
+            self._track(aircraft_id)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.times) + 1
+
+    def append(self, snapshot: dict[str, Any]) -> None:
+        frame = len(self.times)
+        self.times.append(float(snapshot["time_seconds"]))
+        self.end_seconds = self.times[-1]
+        top, aircraft = _split(snapshot)
+        for key, value in top.items():
+            if key not in self._top or self._top[key] != value:
+                self.patches.append([frame, "top", key, value])
+        for column in self.columns:
+            for values in column:
+                values.append(0)
+
+        items = {item["id"]: item for item in snapshot.get("aircraft", [])}
+        for aircraft_id, (numbers, other) in aircraft.items():
+            previous = self._aircraft.get(aircraft_id)
+            if previous is None:
+                self._track(aircraft_id, frame + 1)
+                self.patches.append([frame, "add", _strip_item(items[aircraft_id])])
+                continue
+            previous_numbers, previous_other = previous
+            column = self.columns[self._index[aircraft_id]]
+            for field, (new, old) in enumerate(zip(numbers, previous_numbers)):
+                if new != old:
+                    column[field][frame] = new - old
+            for key, value in other.items():
+                if key not in previous_other or previous_other[key] != value:
+                    self.patches.append([frame, "set", aircraft_id, key, value])
+        for aircraft_id in self._aircraft.keys() - aircraft.keys():
+            self.patches.append([frame, "drop", aircraft_id])
+        self._top, self._aircraft = top, aircraft
+
+    def document(self) -> dict[str, Any]:
+        return {
+            "version": SEGMENT_FORMAT_VERSION,
+            "keyframe": self.keyframe,
+            "times": self.times,
+            "ids": self.ids,
+            "columns": self.columns,
+            "patches": self.patches,
+        }
+
+    def copy_document(self) -> dict[str, Any]:
+        """`document()` with its frame lists copied, unaffected by `append`."""
+        return {
+            **self.document(),
+            "times": list(self.times),
+            "ids": list(self.ids),
+            "columns": [[list(values) for values in column] for column in self.columns],
+            "patches": list(self.patches),
+        }
+
+    def encode(self) -> bytes:
+        body = json.dumps(self.document(), separators=(",", ":"))
+        return zlib.compress(body.encode("utf-8"), 6)
+
+    def _track(self, aircraft_id: str, frames: int = 0) -> None:
+        self._index[aircraft_id] = len(self.ids)
+        self.ids.append(aircraft_id)
+        self.columns.append([[0] * frames for _ in _NUMERIC_FIELDS])
+
+
+def decode_segment(payload: bytes) -> dict[str, Any]:
+    document = json.loads(zlib.decompress(payload))
+    if document.get("version") != SEGMENT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported timeline segment version {document.get('version')}"
+        )
+    return document
+
+
+def segment_frames(
+    document: dict[str, Any],
+    *,
+    until_seconds: float | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield every frame of a decoded segment as a full state snapshot.
+
+    Each yielded snapshot is independent of later ones. Stops after the last
+    frame at or before `until_seconds`.
+    """
+    keyframe = document["keyframe"]
+    times = document["times"]
+    last = len(times) if until_seconds is None else bisect.bisect_right(
+        times, until_seconds
+    )
+    top = {key: value for key, value in keyframe.items() if key != "aircraft"}
+    items = {item["id"]: dict(item) for item in keyframe.get("aircraft", [])}
+    numbers = {aircraft_id: _quantise(item) for aircraft_id, item in items.items()}
+    yield _frame(top, items)
+
+    patches = document["patches"]
+    ids = document["ids"]
+    columns = document["columns"]
+    patch_index = 0
+    for frame in range(last):
+        top["time_seconds"] = times[frame]
+        while patch_index < len(patches) and patches[patch_index][0] == frame:
+            _, kind, *rest = patches[patch_index]
+            patch_index += 1
+            if kind == "top":
+                top[rest[0]] = rest[1]
+            elif kind == "set":
+                items[rest[0]][rest[1]] = rest[2]
+            elif kind == "add":
+                item = dict(rest[0])
+                items[item["id"]] = item
+                numbers[item["id"]] = _quantise(item)
+            elif kind == "drop":
+                items.pop(rest[0], None)
+                numbers.pop(rest[0], None)
+        for aircraft_id, column in zip(ids, columns):
+            current = numbers.get(aircraft_id)
+            if current is None:
+                continue
+            changed = False
+            for field, values in enumerate(column):
+                delta = values[frame]
+                if delta:
+                    current[field] += delta
+                    changed = True
+            if changed:
+                _set_numeric(items[aircraft_id], current)
+        yield _frame(top, items)
+
+
+def _frame(top: dict[str, Any], items: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    updated_utc = top.get("updated_utc")
+    return {
+        **top,
+        "aircraft": [{**item, "updated_utc": updated_utc} for item in items.values()],
+    }
+
+
+def state_at(document: dict[str, Any], time_seconds: float) -> dict[str, Any] | None:
+    """The last frame of a decoded segment at or before `time_seconds`."""
+    if time_seconds < document["keyframe"]["time_seconds"]:
+        return None
+    state = None
+    for state in segment_frames(document, until_seconds=time_seconds):
+        pass
+    return state
+
+
+class TimelineRecorder:
+    """Record published run states into timeline segments and read them back."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        *,
+        segment_seconds: float = 30.0,
+        max_frames: int = 240,
+        writer: DatabaseWriter | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.segment_seconds = max(float(segment_seconds), 1.0)
+        self.max_frames = max(int(max_frames), 2)
+        self.writer = writer
+        self._open: dict[str, SegmentBuilder] = {}
+        # Closed segments queued on the writer but not yet committed.
+        self._unwritten: dict[str, list[SegmentBuilder]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, run_id: str, snapshot: dict[str, Any]) -> None:
+        time_seconds = float(snapshot["time_seconds"])
+        closed = None
+        with self._lock:
+            builder = self._open.get(run_id)
+            if builder is not None and (
+                time_seconds - builder.start_seconds >= self.segment_seconds
+                or builder.frame_count >= self.max_frames
+                or time_seconds < builder.end_seconds
+            ):
+                closed = self._open.pop(run_id)
+                builder = None
+            if builder is None:
+                self._open[run_id] = SegmentBuilder(snapshot)
+            else:
+                builder.append(snapshot)
+        if closed is not None:
+            self._write(run_id, closed, wait=False)
+
+    def flush(self, run_id: str) -> None:
+        """Persist the run's open segment, e.g. when it ends or leaves memory."""
+        with self._lock:
+            builder = self._open.pop(run_id, None)
+        if builder is not None:
+            self._write(run_id, builder)
+
+    def flush_all(self) -> None:
+        with self._lock:
+            run_ids = list(self._open)
+        for run_id in run_ids:
+            self.flush(run_id)
+
+    def discard_from(self, run_id: str, time_seconds: float) -> None:
+        """Forget history at or after `time_seconds`; used when a run is
+        recovered from an engine state older than its latest frames."""
+        with self._lock:
+            self._open.pop(run_id, None)
+        # Queued segment writes run first, so they are deleted too.
+        self._submit(
+            lambda session: RunTimelineRepository(session).delete_from(
+                run_id, time_seconds
+            )
+        )
+
+    def _in_memory(self, run_id: str) -> list[SegmentBuilder]:
+        """Unwritten then open segments, oldest first. Read these before the
+        database: a segment leaves memory only after its write commits."""
+        with self._lock:
+            builders = list(self._unwritten.get(run_id, ()))
+            builder = self._open.get(run_id)
+        if builder is not None:
+            builders.append(builder)
+        return builders
+
+    def _in_memory_documents(
+        self, run_id: str, until_seconds: float
+    ) -> list[dict[str, Any]]:
+        """Documents of the in-memory segments starting at or before
+        `until_seconds`, oldest first. The open segment is copied under the
+        lock: `record` appends to it from the run thread, and a frame is
+        only complete once every column has it."""
+        with self._lock:
+            documents = [
+                builder.document()
+                for builder in self._unwritten.get(run_id, ())
+                if builder.start_seconds <= until_seconds
+            ]
+            builder = self._open.get(run_id)
+            if builder is not None and builder.start_seconds <= until_seconds:
+                documents.append(builder.copy_document())
+        return documents
+
+    def extent(self, session: Session, run_id: str) -> tuple[float, float] | None:
+        """(first, last) simulated time recorded for the run, if any."""
+        builders = self._in_memory(run_id)
+        stored = RunTimelineRepository(session).extent(run_id)
+        pending = (
+            (
+                min(builder.start_seconds for builder in builders),
+                max(builder.end_seconds for builder in builders),
+            )
+            if builders
+            else None
+        )
+        if stored is None or pending is None:
+            return stored or pending
+        return min(stored[0], pending[0]), max(stored[1], pending[1])
+
+    def state_at(
+        self, session: Session, run_id: str, time_seconds: float
+    ) -> dict[str, Any] | None:
+        """Reconstruct the run's state at simulated `time_seconds`."""
+        in_memory = self._in_memory_documents(run_id, time_seconds)
+        document = in_memory[-1] if in_memory else None
+        if document is None:
+            segment = RunTimelineRepository(session).segment_at(run_id, time_seconds)
+            if segment is None:
+                return None
+            document = decode_segment(segment.payload)
+        return state_at(document, time_seconds)
+
+    def frames_between(
+        self,
+        session: Session,
+        run_id: str,
+        start_seconds: float,
+        end_seconds: float,
+        *,
+        interval_seconds: float = 0.0,
+        limit: int = 600,
+    ) -> list[dict[str, Any]]:
+        """Frames in [start_seconds, end_seconds] for playback, oldest first.
+
+        The frame at or before `start_seconds` comes first so playback starts
+        from a complete state. After that, frames are at least
+        `interval_seconds` apart, up to `limit` frames.
+        """
+        in_memory = self._in_memory_documents(run_id, end_seconds)
+        documents = [
+            decode_segment(segment.payload)
+            for segment in RunTimelineRepository(session).list_between(
+                run_id, start_seconds, end_seconds
+            )
+        ]
+        # A segment committed while it was being read appears twice; the
+        # first copy yields no frames because the second starts at its start.
+        documents.extend(in_memory)
+        documents.sort(key=lambda document: document["keyframe"]["time_seconds"])
+
+        frames: list[dict[str, Any]] = []
+        opening = None
+        for position, document in enumerate(documents):
+            # A segment is authoritative until the next one starts.
+            valid_until = (
+                documents[position + 1]["keyframe"]["time_seconds"]
+                if position + 1 < len(documents)
+                else None
+            )
+            for frame in segment_frames(document, until_seconds=end_seconds):
+                time_seconds = frame["time_seconds"]
+                if valid_until is not None and time_seconds >= valid_until:
+                    break
+                if time_seconds <= start_seconds:
+                    opening = frame
+                    continue
+                if opening is not None:
+                    frames.append(opening)
+                    opening = None
+                if frames and time_seconds - frames[-1]["time_seconds"] < interval_seconds:
+                    continue
+                frames.append(frame)
+                if len(frames) >= limit:
+                    return frames
+        if opening is not None:
+            frames.append(opening)
+        return frames
+
+    def _submit(self, write, *, wait: bool = True) -> None:
+        if self.writer is not None:
+            self.writer.submit(write, wait=wait)
+            return
+        session = self.session_factory()
+        try:
+            write(session)
+        finally:
+            session.close()
+
+    def _write(
+        self, run_id: str, builder: SegmentBuilder, *, wait: bool = True
+    ) -> None:
+        with self._lock:
+            self._unwritten.setdefault(run_id, []).append(builder)
+
+        def write(session: Session) -> None:
+            try:
+                RunTimelineRepository(session).create(
+                    RunTimelineSegmentRecord(
+                        run_id=run_id,
+                        start_seconds=builder.start_seconds,
+                        end_seconds=builder.end_seconds,
+                        frame_count=builder.frame_count,
+                        payload=builder.encode(),
+                    )
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to persist timeline segment", extra={"run_id": run_id}
+                )
+            finally:
+                with self._lock:
+                    pending = self._unwritten.get(run_id, [])
+                    if builder in pending:
+                        pending.remove(builder)
+                    if not pending:
+                        self._unwritten.pop(run_id, None)
+
+        self._submit(write, wait=wait)
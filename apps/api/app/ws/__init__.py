@@ -1,8 +1,15 @@
 """WebSocket and broadcast helpers for the FastAPI service."""
 
+from .codec import JSON_CODEC, StreamCodec, negotiate_codec
 from .hub import BroadcastHub, RunStreamSubscriber
+from .options import DEFAULT_STREAM_OPTIONS, StreamOptions
 
 __all__ = [
     "BroadcastHub",
+    "DEFAULT_STREAM_OPTIONS",
+    "JSON_CODEC",
     "RunStreamSubscriber",
+    "StreamCodec",
+    "StreamOptions",
+    "negotiate_codec",
 ]
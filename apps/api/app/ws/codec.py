@@ -0,0 +1,293 @@
+"""Wire encodings for run stream events, negotiated per WebSocket.
+
+JSON text frames are the default. Clients that offer the packed
+subprotocol get binary frames instead:
+
+    b"ASF" | uint8 version | uint8 flags | body
+
+and the body, raw-deflated when `FLAG_DEFLATE` is set, is
+
+    uint32 header length | JSON header | uint32 string count |
+    per string: uint16 length, UTF-8 bytes | aircraft columns
+
+The header is the event with `data.aircraft` replaced by a column
+description (`count`, `columns` as `[name, kind]` pairs). Aircraft are sent
+column by column, little endian: `s` uint32 string table index, `p`
+quantised `[lat, lon]` int32 pairs (`POSITION_SCALE` per degree), `i` int32,
+and `f` float32. Nulls are `NULL_INDEX`, `NULL_INT`, or NaN. Columns that fit
+none of these (`j`) stay in the header under `json_columns`. All integers
+in the framing are big endian, like engine state blobs.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Any
+
+FRAME_MAGIC = b"ASF"
+FRAME_FORMAT_VERSION = 1
+FLAG_DEFLATE = 0x01
+POSITION_SCALE = 100_000
+NULL_INDEX = 0xFFFFFFFF
+NULL_INT = -(2**31)
+
+JSON_SUBPROTOCOL = "airspacesim.json"
+PACKED_SUBPROTOCOL = "airspacesim.packed.v1"
+PACKED_DEFLATE_SUBPROTOCOL = "airspacesim.packed.v1+deflate"
+
+_FRAME_HEADER = struct.Struct(">3sBB")
+_LENGTH = struct.Struct(">I")
+_STRING_LENGTH = struct.Struct(">H")
+_INT32_RANGE = range(NULL_INT + 1, 2**31)
+# Deflate only pays for itself above roughly one TCP segment.
+_DEFLATE_MIN_BYTES = 1024
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _is_position(value: Any) -> bool:
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and all(
+            isinstance(item, (int, float)) and not isinstance(item, bool)
+            for item in value
+        )
+    )
+
+
+def _column_kind(name: str, values: list[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if not present:
+        return "j"
+    if all(isinstance(value, str) for value in present):
+        return "s"
+    if name == "position_dd" and all(_is_position(value) for value in present):
+        return "p"
+    if any(isinstance(value, bool) for value in present):
+        return "j"
+    if all(isinstance(value, int) and value in _INT32_RANGE for value in present):
+        return "i"
+    if all(
+        isinstance(value, (int, float)) and math.isfinite(value) for value in present
+    ):
+        return "f"
+    return "j"
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._indices: dict[str, int] = {}
+
+    def index(self, value: str | None) -> int:
+        if value is None:
+            return NULL_INDEX
+        index = self._indices.get(value)
+        if index is None:
+            index = self._indices[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def pack(self) -> bytes:
+        parts = [_LENGTH.pack(len(self.strings))]
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            parts.append(_STRING_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+
+def _pack_column(kind: str, values: list[Any], strings: _StringTable) -> bytes:
+    if kind == "s":
+        return _little_endian(array("I", (strings.index(value) for value in values)))
+    if kind == "p":
+        packed = array("i")
+        for value in values:
+            if value is None:
+                packed.extend((NULL_INT, NULL_INT))
+            else:
+                packed.extend(round(item * POSITION_SCALE) for item in value[:2])
+        return _little_endian(packed)
+    if kind == "i":
+        return _little_endian(
+            array("i", (NULL_INT if value is None else value for value in values))
+        )
+    return _little_endian(
+        array("f", (math.nan if value is None else value for value in values))
+    )
+
+
+def encode_packed(event: dict[str, Any], *, deflate: bool = False) -> bytes:
+    """One binary frame for `event`; see the module docstring for the layout."""
+    header = dict(event)
+    strings = _StringTable()
+    columns: list[bytes] = []
+    data = event.get("data")
+    aircraft = data.get("aircraft") if isinstance(data, dict) else None
+    if isinstance(aircraft, list):
+        names: dict[str, None] = {}
+        for item in aircraft:
+            names.update(dict.fromkeys(item))
+        layout: list[list[str]] = []
+        json_columns: dict[str, list[Any]] = {}
+        for name in names:
+            values = [item.get(name) for item in aircraft]
+            kind = _column_kind(name, values)
+            layout.append([name, kind])
+            if kind == "j":
+                json_columns[name] = values
+            else:
+                columns.append(_pack_column(kind, values, strings))
+        header["data"] = {
+            **data,
+            "aircraft": {"count": len(aircraft), "columns": layout},
+        }
+        if json_columns:
+            header["data"]["aircraft"]["json_columns"] = json_columns
+
+    encoded_header = _dumps(header).encode("utf-8")
+    body = b"".join(
+        [_LENGTH.pack(len(encoded_header)), encoded_header, strings.pack(), *columns]
+    )
+    flags = 0
+    if deflate and len(body) >= _DEFLATE_MIN_BYTES:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        body = compressor.compress(body) + compressor.flush()
+        flags |= FLAG_DEFLATE
+    return _FRAME_HEADER.pack(FRAME_MAGIC, FRAME_FORMAT_VERSION, flags) + body
+
+
+def decode_packed(frame: bytes) -> dict[str, Any]:
+    """Decode a frame from `encode_packed`; raises ValueError if invalid.
+
+    Positions come back rounded to `POSITION_SCALE` and floats to float32.
+    """
+    try:
+        magic, version, flags = _FRAME_HEADER.unpack_from(frame)
+    except struct.error as exc:
+        raise ValueError("Truncated stream frame header") from exc
+    if magic != FRAME_MAGIC:
+        raise ValueError("Not an AirSpaceSim stream frame")
+    if version != FRAME_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported stream frame version {version} "
+            f"(expected {FRAME_FORMAT_VERSION})"
+        )
+    body = bytes(frame[_FRAME_HEADER.size :])
+    try:
+        if flags & FLAG_DEFLATE:
+            body = zlib.decompress(body, -zlib.MAX_WBITS)
+        (header_length,) = _LENGTH.unpack_from(body)
+        offset = _LENGTH.size
+        event = json.loads(body[offset : offset + header_length])
+        offset += header_length
+        (string_count,) = _LENGTH.unpack_from(body, offset)
+        offset += _LENGTH.size
+        strings = []
+        for _ in range(string_count):
+            (length,) = _STRING_LENGTH.unpack_from(body, offset)
+            offset += _STRING_LENGTH.size
+            strings.append(body[offset : offset + length].decode("utf-8"))
+            offset += length
+    except (zlib.error, struct.error, ValueError) as exc:
+        raise ValueError("Corrupt stream frame payload") from exc
+
+    data = event.get("data")
+    layout = data.get("aircraft") if isinstance(data, dict) else None
+    if not isinstance(layout, dict):
+        return event
+    count = layout["count"]
+    json_columns = layout.get("json_columns", {})
+    aircraft: list[dict[str, Any]] = [{} for _ in range(count)]
+    for name, kind in layout["columns"]:
+        if kind == "j":
+            values = json_columns[name]
+        else:
+            width = 8 if kind == "p" else 4
+            typecode = {"s": "I", "p": "i", "i": "i", "f": "f"}[kind]
+            raw = _from_little_endian(typecode, body[offset : offset + count * width])
+            offset += count * width
+            if kind == "s":
+                values = [
+                    None if index == NULL_INDEX else strings[index] for index in raw
+                ]
+            elif kind == "p":
+                values = [
+                    None
+                    if raw[2 * row] == NULL_INT
+                    else [
+                        raw[2 * row] / POSITION_SCALE,
+                        raw[2 * row + 1] / POSITION_SCALE,
+                    ]
+                    for row in range(count)
+                ]
+            elif kind == "i":
+                values = [None if value == NULL_INT else value for value in raw]
+            else:
+                values = [None if math.isnan(value) else value for value in raw]
+        for item, value in zip(aircraft, values):
+            item[name] = value
+    event["data"] = {**data, "aircraft": aircraft}
+    return event
+
+
+@dataclass(frozen=True)
+class StreamCodec:
+    """How events are framed for one stream; `subprotocol` is what was agreed."""
+
+    name: str
+    subprotocol: str | None
+    binary: bool = False
+    deflate: bool = False
+
+    def encode(self, event: dict[str, Any]) -> str | bytes:
+        if not self.binary:
+            return _dumps(event)
+        return encode_packed(event, deflate=self.deflate)
+
+
+JSON_CODEC = StreamCodec(name="json", subprotocol=None)
+_CODECS = {
+    JSON_SUBPROTOCOL: StreamCodec(name="json", subprotocol=JSON_SUBPROTOCOL),
+    PACKED_SUBPROTOCOL: StreamCodec(
+        name="packed", subprotocol=PACKED_SUBPROTOCOL, binary=True
+    ),
+    PACKED_DEFLATE_SUBPROTOCOL: StreamCodec(
+        name="packed+deflate",
+        subprotocol=PACKED_DEFLATE_SUBPROTOCOL,
+        binary=True,
+        deflate=True,
+    ),
+}
+
+
+def negotiate_codec(offered: list[str]) -> StreamCodec:
+    """The first subprotocol the client offered that we speak, else JSON."""
+    for subprotocol in offered:
+        codec = _CODECS.get(subprotocol)
+        if codec is not None:
+            return codec
+    return JSON_CODEC
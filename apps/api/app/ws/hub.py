@@ -1,14 +1,42 @@
-"""Thread-safe broadcast hub for run-scoped live updates."""
+"""Thread-safe broadcast hub for run-scoped live updates.
+
+Each subscriber has a mailbox with two parts. State updates go to a
+latest-value-wins slot: a newer state replaces one the subscriber has not
+read yet, so a slow client costs one state and always reads the newest next.
+Command results and other events go to a bounded, lossless FIFO. When it is
+full, new events are counted rather than queued, and the subscriber gets a
+`stream.overflow` event with the count before anything queued after the gap.
+
+Each subscriber has `StreamOptions`. A state update is projected once per
+distinct set of options (viewports query one spatial index built per
+update) and the same event object is placed in every subscriber mailbox
+that shares them. Subscribers with a rate cap read the slot only once the
+cap allows. `encode` turns a shared event into wire frames once per codec,
+however many subscribers send it.
+
+With a cluster `bus`, the hub also serves subscribers on other workers.
+Hubs announce their subscriber counts per run, and states and events are
+sent over the bus only for runs that have subscribers elsewhere. Received
+ones are delivered locally as if published here. `subscriber_count`
+includes remote subscribers, so the owning worker does not hibernate a run
+that is watched elsewhere.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from queue import Empty, Full, Queue
 from threading import Lock
 from typing import Any
 from uuid import uuid4
 
+from ..cluster import MessageBus
+from .codec import StreamCodec
+from .options import DEFAULT_STREAM_OPTIONS, StreamOptions
+from .viewport import AircraftIndex
+
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
@@ -16,31 +44,212 @@ def _utc_now_iso() -> str:
 
 @dataclass(frozen=True)
 class RunStreamSubscriber:
-    """Queue-backed subscriber handle for one run stream."""
+    """Handle for one subscriber of a run stream; read it with `next_event`."""
 
     run_id: str
     subscriber_id: str
-    queue: Queue[dict[str, Any]]
+
+
+@dataclass
+class _Subscription:
+    run_id: str
+    options: StreamOptions
+    max_events: int
+    # Latest-value-wins state slot and when it was filled.
+    state: dict[str, Any] | None = None
+    state_published_at: float | None = None
+    last_state_at: float | None = None
+    # Lossless events as (published_at, event).
+    events: deque[tuple[float, dict[str, Any]]] = field(default_factory=deque)
+    overflowed: int = 0
+    overflowed_since: float | None = None
+    states_delivered: int = 0
+    states_conflated: int = 0
+    events_delivered: int = 0
+    events_dropped: int = 0
+    max_queued_events: int = 0
+    lock: Lock = field(default_factory=Lock)
+
+    def due(self, now: float) -> bool:
+        return (
+            self.last_state_at is None
+            or now - self.last_state_at >= self.options.min_interval_seconds
+        )
+
+    def put_state(self, event: dict[str, Any], now: float) -> None:
+        if self.state is not None:
+            self.states_conflated += 1
+        else:
+            self.state_published_at = now
+        self.state = event
+
+    def put_event(self, event: dict[str, Any], now: float) -> None:
+        if self.overflowed and len(self.events) < self.max_events:
+            # Mark the gap in place, ahead of what is queued after it.
+            self.events.append((self.overflowed_since, self._overflow_event()))
+            self.overflowed = 0
+        if len(self.events) >= self.max_events:
+            if not self.overflowed:
+                self.overflowed_since = now
+            self.overflowed += 1
+            self.events_dropped += 1
+            return
+        self.events.append((now, event))
+        self.max_queued_events = max(self.max_queued_events, len(self.events))
+
+    def take(self, now: float) -> dict[str, Any] | None:
+        if self.events:
+            self.events_delivered += 1
+            return self.events.popleft()[1]
+        if self.overflowed:
+            self.overflowed = 0
+            return self._overflow_event()
+        if self.state is None or not self.due(now):
+            return None
+        event, self.state = self.state, None
+        self.last_state_at = now
+        self.states_delivered += 1
+        return event
+
+    def lag_seconds(self, now: float) -> float:
+        """Age of the oldest event or state this subscriber has not read."""
+        oldest = [
+            published_at
+            for published_at in (
+                self.events[0][0] if self.events else None,
+                self.overflowed_since if self.overflowed else None,
+                self.state_published_at if self.state is not None else None,
+            )
+            if published_at is not None
+        ]
+        return now - min(oldest) if oldest else 0.0
+
+    def metrics(self, now: float) -> dict[str, Any]:
+        return {
+            "lag_seconds": self.lag_seconds(now),
+            "queued_events": len(self.events),
+            "max_queued_events": self.max_queued_events,
+            "state_pending": self.state is not None,
+            "states_delivered": self.states_delivered,
+            "states_conflated": self.states_conflated,
+            "events_delivered": self.events_delivered,
+            "events_dropped": self.events_dropped,
+        }
+
+    def _overflow_event(self) -> dict[str, Any]:
+        return {
+            "type": "stream.overflow",
+            "run_id": self.run_id,
+            "emitted_at": _utc_now_iso(),
+            "data": {"dropped_events": self.overflowed},
+        }
 
 
 class BroadcastHub:
-    """Manage per-run subscribers and thread-safe event fanout."""
+    """Manage per-run subscriber mailboxes and thread-safe event fanout."""
 
-    def __init__(self, queue_size: int = 32) -> None:
+    def __init__(
+        self,
+        queue_size: int = 32,
+        frame_cache_size: int = 256,
+        bus: MessageBus | None = None,
+    ) -> None:
         self.queue_size = max(int(queue_size), 1)
-        self._subscribers: dict[str, dict[str, Queue[dict[str, Any]]]] = {}
+        self.frame_cache_size = max(int(frame_cache_size), 1)
+        self._subscribers: dict[str, dict[str, _Subscription]] = {}
         self._lock = Lock()
+        self.bus = bus
+        # run id -> worker id -> subscriber count on that worker.
+        self._remote_subscribers: dict[str, dict[str, int]] = {}
+        if bus is not None:
+            bus.add_handler("stream.hello", self._on_remote_hello)
+            bus.add_handler("stream.subscribers", self._on_remote_subscribers)
+            bus.add_handler("stream.state", self._on_remote_state)
+            bus.add_handler("stream.event", self._on_remote_event)
+        # (id(event), codec name) -> (event, frame); holding the event keeps
+        # its id from being reused while the entry lives.
+        self._frames: OrderedDict[
+            tuple[int, str], tuple[dict[str, Any], str | bytes]
+        ] = OrderedDict()
+        self._frames_lock = Lock()
 
-    def subscribe(self, run_id: str) -> RunStreamSubscriber:
+    def subscribe(
+        self, run_id: str, options: StreamOptions = DEFAULT_STREAM_OPTIONS
+    ) -> RunStreamSubscriber:
         subscriber_id = str(uuid4())
-        queue: Queue[dict[str, Any]] = Queue(maxsize=self.queue_size)
         with self._lock:
-            self._subscribers.setdefault(run_id, {})[subscriber_id] = queue
-        return RunStreamSubscriber(
-            run_id=run_id,
-            subscriber_id=subscriber_id,
-            queue=queue,
-        )
+            self._subscribers.setdefault(run_id, {})[subscriber_id] = _Subscription(
+                run_id=run_id, options=options, max_events=self.queue_size
+            )
+        self._announce(run_id)
+        return RunStreamSubscriber(run_id=run_id, subscriber_id=subscriber_id)
+
+    def set_options(
+        self, subscriber: RunStreamSubscriber, options: StreamOptions
+    ) -> None:
+        """Change a subscriber's options from its next state update on."""
+        subscription = self._subscription(subscriber)
+        if subscription is None:
+            return
+        with subscription.lock:
+            subscription.options = options
+            subscription.state = None
+
+    def options(self, subscriber: RunStreamSubscriber) -> StreamOptions:
+        subscription = self._subscription(subscriber)
+        return subscription.options if subscription else DEFAULT_STREAM_OPTIONS
+
+    def next_event(self, subscriber: RunStreamSubscriber) -> dict[str, Any] | None:
+        """The subscriber's next queued event, else its pending state once due."""
+        subscription = self._subscription(subscriber)
+        if subscription is None:
+            return None
+        with subscription.lock:
+            return subscription.take(time.monotonic())
+
+    def lag_metrics(self, subscriber: RunStreamSubscriber) -> dict[str, Any] | None:
+        """Backlog and delivery counters for one subscriber."""
+        subscription = self._subscription(subscriber)
+        if subscription is None:
+            return None
+        with subscription.lock:
+            return subscription.metrics(time.monotonic())
+
+    def stream_counts(self) -> dict[str, Any]:
+        """Subscriber totals and the worst current lag, for health reporting."""
+        with self._lock:
+            subscriptions = [
+                subscription
+                for run_subscribers in self._subscribers.values()
+                for subscription in run_subscribers.values()
+            ]
+        now = time.monotonic()
+        max_lag_seconds = 0.0
+        events_dropped = 0
+        for subscription in subscriptions:
+            with subscription.lock:
+                max_lag_seconds = max(max_lag_seconds, subscription.lag_seconds(now))
+                events_dropped += subscription.events_dropped
+        return {
+            "subscribers": len(subscriptions),
+            "max_lag_seconds": max_lag_seconds,
+            "events_dropped": events_dropped,
+        }
+
+    def encode(self, event: dict[str, Any], codec: StreamCodec) -> str | bytes:
+        """`event` as a `codec` frame, encoded once and shared by subscribers."""
+        key = (id(event), codec.name)
+        with self._frames_lock:
+            cached = self._frames.get(key)
+            if cached is not None:
+                self._frames.move_to_end(key)
+                return cached[1]
+        frame = codec.encode(event)
+        with self._frames_lock:
+            self._frames[key] = (event, frame)
+            while len(self._frames) > self.frame_cache_size:
+                self._frames.popitem(last=False)
+        return frame
 
     def unsubscribe(self, subscriber: RunStreamSubscriber) -> None:
         with self._lock:
@@ -50,30 +259,61 @@ class BroadcastHub:
             run_subscribers.pop(subscriber.subscriber_id, None)
             if not run_subscribers:
                 self._subscribers.pop(subscriber.run_id, None)
+        self._announce(subscriber.run_id)
 
-    def publish(self, run_id: str, event: dict[str, Any]) -> None:
+    def subscriber_count(self, run_id: str) -> int:
+        """Subscribers to `run_id` here and, with a bus, on other workers."""
         with self._lock:
-            subscribers = list(self._subscribers.get(run_id, {}).values())
-        for subscriber_queue in subscribers:
-            try:
-                subscriber_queue.put_nowait(event)
-            except Full:
-                try:
-                    subscriber_queue.get_nowait()
-                except Empty:
-                    pass
-                subscriber_queue.put_nowait(event)
+            return len(self._subscribers.get(run_id, {})) + sum(
+                self._remote_subscribers.get(run_id, {}).values()
+            )
+
+    def start(self) -> None:
+        """Join the bus: other workers resend their subscriber counts."""
+        if self.bus is not None:
+            self.bus.publish({"kind": "stream.hello"})
+
+    def publish(self, run_id: str, event: dict[str, Any]) -> None:
+        self._deliver(run_id, event)
+        if self._watched_elsewhere(run_id):
+            self.bus.publish({"kind": "stream.event", "run_id": run_id, "event": event})
 
     def publish_state(self, run_id: str, state_snapshot: dict[str, Any]) -> None:
-        self.publish(
-            run_id,
-            {
-                "type": "run_state.updated",
-                "run_id": run_id,
-                "emitted_at": _utc_now_iso(),
-                "data": state_snapshot,
-            },
-        )
+        self._deliver_state(run_id, state_snapshot)
+        if self._watched_elsewhere(run_id):
+            self.bus.publish(
+                {"kind": "stream.state", "run_id": run_id, "state": state_snapshot}
+            )
+
+    def _deliver(self, run_id: str, event: dict[str, Any]) -> None:
+        now = time.monotonic()
+        for subscription in self._run_subscriptions(run_id):
+            with subscription.lock:
+                subscription.put_event(event, now)
+
+    def _deliver_state(self, run_id: str, state_snapshot: dict[str, Any]) -> None:
+        subscriptions = self._run_subscriptions(run_id)
+        if not subscriptions:
+            return
+        emitted_at = _utc_now_iso()
+        events: dict[StreamOptions, dict[str, Any]] = {}
+        # One spatial index per update, shared by every viewport.
+        index: AircraftIndex | None = None
+        now = time.monotonic()
+        for subscription in subscriptions:
+            with subscription.lock:
+                options = subscription.options
+                event = events.get(options)
+                if event is None:
+                    if options.bbox is not None and index is None:
+                        index = AircraftIndex(state_snapshot.get("aircraft") or [])
+                    event = events[options] = {
+                        "type": "run_state.updated",
+                        "run_id": run_id,
+                        "emitted_at": emitted_at,
+                        "data": options.project(state_snapshot, index),
+                    }
+                subscription.put_state(event, now)
 
     def publish_command_result(
         self,
@@ -89,3 +329,55 @@ class BroadcastHub:
                 "data": command_result,
             },
         )
+
+    def _watched_elsewhere(self, run_id: str) -> bool:
+        if self.bus is None:
+            return False
+        with self._lock:
+            return any(self._remote_subscribers.get(run_id, {}).values())
+
+    def _announce(self, run_id: str) -> None:
+        if self.bus is None:
+            return
+        with self._lock:
+            count = len(self._subscribers.get(run_id, {}))
+        self.bus.publish(
+            {"kind": "stream.subscribers", "run_id": run_id, "count": count}
+        )
+
+    def _on_remote_hello(self, message: dict[str, Any]) -> None:
+        worker = message["worker"]
+        with self._lock:
+            # The worker (re)started: whatever it had before is gone.
+            for counts in self._remote_subscribers.values():
+                counts.pop(worker, None)
+            run_ids = list(self._subscribers)
+        for run_id in run_ids:
+            self._announce(run_id)
+
+    def _on_remote_subscribers(self, message: dict[str, Any]) -> None:
+        run_id = message["run_id"]
+        with self._lock:
+            counts = self._remote_subscribers.setdefault(run_id, {})
+            if message["count"]:
+                counts[message["worker"]] = int(message["count"])
+            else:
+                counts.pop(message["worker"], None)
+                if not counts:
+                    self._remote_subscribers.pop(run_id, None)
+
+    def _on_remote_state(self, message: dict[str, Any]) -> None:
+        self._deliver_state(message["run_id"], message["state"])
+
+    def _on_remote_event(self, message: dict[str, Any]) -> None:
+        self._deliver(message["run_id"], message["event"])
+
+    def _run_subscriptions(self, run_id: str) -> list[_Subscription]:
+        with self._lock:
+            return list(self._subscribers.get(run_id, {}).values())
+
+    def _subscription(self, subscriber: RunStreamSubscriber) -> _Subscription | None:
+        with self._lock:
+            return self._subscribers.get(subscriber.run_id, {}).get(
+                subscriber.subscriber_id
+            )
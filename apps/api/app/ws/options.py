@@ -0,0 +1,177 @@
+"""Per-subscriber options for run state streams."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from ..schemas.runs import RunAircraftStateResponse
+from .viewport import AircraftIndex, BoundingBox, cluster_aircraft
+
+AIRCRAFT_FIELDS = frozenset(RunAircraftStateResponse.model_fields)
+# Engine monitor blocks, only sent to subscribers that ask for separation.
+SEPARATION_BLOCKS = ("separation", "conflicts", "route_conflicts")
+MAX_RATE_HZ_LIMIT = 30.0
+MAX_ZOOM = 22
+_OPTION_NAMES = {"fields", "max_rate_hz", "separation", "summary", "bbox", "zoom"}
+
+
+def _parse_bool(name: str, value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in {"true", "1", "false", "0"}:
+        return value.lower() in {"true", "1"}
+    raise ValueError(f"{name} must be a boolean.")
+
+
+def _parse_bbox(value: Any) -> BoundingBox:
+    if isinstance(value, str):
+        value = value.split(",")
+    try:
+        min_lat, min_lon, max_lat, max_lon = (float(item) for item in value)
+    except (TypeError, ValueError):
+        raise ValueError(
+            "bbox must be four numbers: min_lat, min_lon, max_lat, max_lon."
+        ) from None
+    if not -90.0 <= min_lat <= max_lat <= 90.0:
+        raise ValueError("bbox latitudes must satisfy -90 <= min_lat <= max_lat <= 90.")
+    if not (-180.0 <= min_lon <= 180.0 and -180.0 <= max_lon <= 180.0):
+        raise ValueError("bbox longitudes must be within -180..180.")
+    return min_lat, min_lon, max_lat, max_lon
+
+
+@dataclass(frozen=True)
+class StreamOptions:
+    """What one subscriber wants from `run_state.updated` events.
+
+    `fields` projects each aircraft onto those keys (`id` is always kept);
+    None sends them whole. `max_rate_hz` caps state events per second,
+    conflating to the latest state in between. `separation` and `summary`
+    keep or drop those blocks. `bbox` (`min_lat, min_lon, max_lat, max_lon`)
+    keeps only the aircraft inside the client's viewport, and `zoom` (the
+    map zoom level) merges nearby aircraft into `clusters` below
+    `CLUSTER_MAX_ZOOM`. Options are hashable, so subscribers with the same
+    options share one projected event per tick.
+    """
+
+    fields: frozenset[str] | None = None
+    max_rate_hz: float | None = None
+    separation: bool = True
+    summary: bool = True
+    bbox: BoundingBox | None = None
+    zoom: int | None = None
+
+    @classmethod
+    def from_mapping(cls, payload: Mapping[str, Any]) -> StreamOptions:
+        """Validate client options; raises ValueError on bad input."""
+        unknown = set(payload) - _OPTION_NAMES
+        if unknown:
+            raise ValueError(f"Unknown stream options: {', '.join(sorted(unknown))}.")
+
+        fields = payload.get("fields")
+        if fields is not None:
+            if isinstance(fields, str):
+                fields = [name.strip() for name in fields.split(",") if name.strip()]
+            if not isinstance(fields, (list, tuple)) or not all(
+                isinstance(name, str) for name in fields
+            ):
+                raise ValueError("fields must be a list of aircraft field names.")
+            invalid = set(fields) - AIRCRAFT_FIELDS
+            if invalid:
+                raise ValueError(
+                    f"Unknown aircraft fields: {', '.join(sorted(invalid))}."
+                )
+            fields = frozenset(fields) | {"id"}
+
+        max_rate_hz = payload.get("max_rate_hz")
+        if max_rate_hz is not None:
+            try:
+                max_rate_hz = float(max_rate_hz)
+            except (TypeError, ValueError):
+                raise ValueError("max_rate_hz must be a number.") from None
+            if not 0 < max_rate_hz <= MAX_RATE_HZ_LIMIT:
+                raise ValueError(
+                    f"max_rate_hz must be above 0 and at most {MAX_RATE_HZ_LIMIT:g}."
+                )
+
+        bbox = payload.get("bbox")
+        if bbox is not None:
+            bbox = _parse_bbox(bbox)
+
+        zoom = payload.get("zoom")
+        if zoom is not None:
+            if isinstance(zoom, bool) or not isinstance(zoom, (int, str)):
+                raise ValueError("zoom must be an integer.")
+            try:
+                zoom = int(zoom)
+            except ValueError:
+                raise ValueError("zoom must be an integer.") from None
+            if not 0 <= zoom <= MAX_ZOOM:
+                raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}.")
+
+        return cls(
+            fields=fields,
+            max_rate_hz=max_rate_hz,
+            separation=_parse_bool("separation", payload.get("separation", True)),
+            summary=_parse_bool("summary", payload.get("summary", True)),
+            bbox=bbox,
+            zoom=zoom,
+        )
+
+    @property
+    def is_default(self) -> bool:
+        return self == DEFAULT_STREAM_OPTIONS
+
+    @property
+    def min_interval_seconds(self) -> float:
+        return 1.0 / self.max_rate_hz if self.max_rate_hz else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "fields": sorted(self.fields) if self.fields is not None else None,
+            "max_rate_hz": self.max_rate_hz,
+            "separation": self.separation,
+            "summary": self.summary,
+            "bbox": list(self.bbox) if self.bbox is not None else None,
+            "zoom": self.zoom,
+        }
+
+    def project(
+        self, state: dict[str, Any], index: AircraftIndex | None = None
+    ) -> dict[str, Any]:
+        """`state` reduced to these options; returned as is when nothing is cut.
+
+        `index` is the tick's shared `AircraftIndex`, built here if needed.
+        """
+        if (
+            self.fields is None
+            and self.separation
+            and self.summary
+            and self.bbox is None
+            and self.zoom is None
+        ):
+            return state
+        projected = dict(state)
+        aircraft = state.get("aircraft")
+        if isinstance(aircraft, list):
+            if self.bbox is not None:
+                aircraft = (index or AircraftIndex(aircraft)).within(self.bbox)
+            if self.zoom is not None:
+                aircraft, projected["clusters"] = cluster_aircraft(aircraft, self.zoom)
+            projected["aircraft"] = aircraft
+        if not self.separation:
+            for block in SEPARATION_BLOCKS:
+                projected.pop(block, None)
+        if not self.summary:
+            projected.pop("summary", None)
+        if self.fields is not None and isinstance(aircraft, list):
+            fields = self.fields
+            projected["aircraft"] = [
+                {key: value for key, value in item.items() if key in fields}
+                for item in aircraft
+            ]
+        return projected
+
+
+DEFAULT_STREAM_OPTIONS = StreamOptions()
@@ -0,0 +1,145 @@
+"""Viewport filtering and clustering of aircraft for run streams.
+
+Positions are `position_dd` pairs, `[lat, lon]`. A bounding box is
+`(min_lat, min_lon, max_lat, max_lon)`; `min_lon > max_lon` crosses the
+antimeridian.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterator
+from typing import Any
+
+BoundingBox = tuple[float, float, float, float]
+
+INDEX_CELL_DEG = 0.5
+# Below this map zoom, aircraft sharing a grid cell are merged into a
+# cluster marker; at or above it every visible aircraft is sent.
+CLUSTER_MAX_ZOOM = 8
+# Cluster cells are about this fraction of a 256 px web map tile (~32 px).
+_CLUSTER_CELLS_PER_TILE = 8
+
+
+def _position(item: dict[str, Any]) -> tuple[float, float] | None:
+    position = item.get("position_dd")
+    if not isinstance(position, (list, tuple)) or len(position) < 2:
+        return None
+    return float(position[0]), float(position[1])
+
+
+def _lon_ranges(min_lon: float, max_lon: float) -> list[tuple[float, float]]:
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+
+def _inside(position: tuple[float, float], bbox: BoundingBox) -> bool:
+    lat, lon = position
+    min_lat, min_lon, max_lat, max_lon = bbox
+    if not min_lat <= lat <= max_lat:
+        return False
+    return any(low <= lon <= high for low, high in _lon_ranges(min_lon, max_lon))
+
+
+class AircraftIndex:
+    """Uniform grid over one tick's aircraft positions.
+
+    Built once per published state and shared by every viewport query
+    against it.
+    """
+
+    def __init__(
+        self, aircraft: list[dict[str, Any]], cell_deg: float = INDEX_CELL_DEG
+    ) -> None:
+        self.aircraft = aircraft
+        self.cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], list[int]] = {}
+        self._positions: list[tuple[float, float] | None] = []
+        for index, item in enumerate(aircraft):
+            position = _position(item)
+            self._positions.append(position)
+            if position is not None:
+                self._cells.setdefault(self._cell(position), []).append(index)
+
+    def _cell(self, position: tuple[float, float]) -> tuple[int, int]:
+        return (
+            math.floor(position[0] / self.cell_deg),
+            math.floor(position[1] / self.cell_deg),
+        )
+
+    def _candidate_cells(self, bbox: BoundingBox) -> Iterator[tuple[int, int]]:
+        min_lat, min_lon, max_lat, max_lon = bbox
+        rows = range(
+            math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg) + 1
+        )
+        for low, high in _lon_ranges(min_lon, max_lon):
+            columns = range(
+                math.floor(low / self.cell_deg), math.floor(high / self.cell_deg) + 1
+            )
+            if len(rows) * len(columns) > len(self._cells):
+                # A wide box: cheaper to walk the occupied cells.
+                yield from (
+                    cell
+                    for cell in self._cells
+                    if cell[0] in rows and cell[1] in columns
+                )
+            else:
+                for row in rows:
+                    for column in columns:
+                        if (row, column) in self._cells:
+                            yield row, column
+
+    def within(self, bbox: BoundingBox) -> list[dict[str, Any]]:
+        """Aircraft inside `bbox`, in their original order."""
+        indices = {
+            index
+            for cell in self._candidate_cells(bbox)
+            for index in self._cells[cell]
+            if _inside(self._positions[index], bbox)
+        }
+        return [self.aircraft[index] for index in sorted(indices)]
+
+
+def cluster_cell_deg(zoom: int) -> float:
+    return 360.0 / (2**zoom) / _CLUSTER_CELLS_PER_TILE
+
+
+def cluster_aircraft(
+    aircraft: list[dict[str, Any]], zoom: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Split aircraft into lone ones and cluster markers for a map zoom.
+
+    Aircraft sharing a grid cell sized for `zoom` become one marker with
+    their count and mean position. Returns `(aircraft, clusters)`.
+    """
+    if zoom >= CLUSTER_MAX_ZOOM:
+        return aircraft, []
+    cell_deg = cluster_cell_deg(zoom)
+    cells: dict[tuple[int, int], list[dict[str, Any]]] = {}
+    for item in aircraft:
+        position = _position(item)
+        if position is not None:
+            key = (
+                math.floor(position[0] / cell_deg),
+                math.floor(position[1] / cell_deg),
+            )
+            cells.setdefault(key, []).append(item)
+
+    clustered: set[int] = set()
+    clusters: list[dict[str, Any]] = []
+    for (row, column), members in sorted(cells.items()):
+        if len(members) == 1:
+            continue
+        clustered.update(id(item) for item in members)
+        clusters.append(
+            {
+                "id": f"cluster:{zoom}:{row}:{column}",
+                "count": len(members),
+                "position_dd": [
+                    sum(item["position_dd"][0] for item in members) / len(members),
+                    sum(item["position_dd"][1] for item in members) / len(members),
+                ],
+            }
+        )
+    return [item for item in aircraft if id(item) not in clustered], clusters
@@ -0,0 +1,279 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn, UnixStreamServer
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.api.v1.routes.runs import create_run_route, start_run
+from app.cluster import (
+    FORWARD_SECRET_HEADER,
+    FORWARDED_HEADER,
+    HashRing,
+    LocalBusNetwork,
+    UnixSocketBus,
+    WorkerCluster,
+)
+from app.config import get_settings
+from app.limits import SlidingWindowRateLimiter, SqliteRateLimitBackend
+from app.middleware import RunAffinityMiddleware
+from app.schemas.runs import RunCreateRequest
+from app.sessions import SessionRegistry
+from app.ws import BroadcastHub
+
+SESSION_ID = "test-session-a"
+
+
+def wait_until(predicate, *, timeout_seconds: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while not predicate():
+        if time.monotonic() >= deadline:
+            raise AssertionError("condition did not become true before timeout")
+        time.sleep(0.01)
+
+
+def _run_id_owned_by(cluster: WorkerCluster, worker_id: str) -> str:
+    return next(
+        run_id
+        for run_id in (f"run-{index}" for index in range(1000))
+        if cluster.owner(run_id) == worker_id
+    )
+
+
+def test_hash_ring_spreads_runs_and_moves_few_when_a_worker_joins():
+    run_ids = [f"run-{index}" for index in range(3000)]
+    three = HashRing(["w0", "w1", "w2"])
+    four = HashRing(["w0", "w1", "w2", "w3"])
+
+    owners = [three.owner(run_id) for run_id in run_ids]
+    assert all(owners.count(worker) > 600 for worker in three.workers)
+    moved = [run_id for run_id in run_ids if three.owner(run_id) != four.owner(run_id)]
+    # Only runs taken over by the new worker move.
+    assert all(four.owner(run_id) == "w3" for run_id in moved)
+    assert len(moved) < len(run_ids) / 3
+
+    cluster = WorkerCluster("w1", ["w0", "w1", "w2"], "/tmp", LocalBusNetwork().connect("w1"))
+    assert all(cluster.owns(cluster.new_run_id()) for _ in range(20))
+    with pytest.raises(ValueError):
+        WorkerCluster("w9", ["w0", "w1"], "/tmp", LocalBusNetwork().connect("w9"))
+
+
+def test_hubs_fan_out_over_the_bus_only_to_watched_runs():
+    network = LocalBusNetwork()
+    owner_bus, edge_bus = network.connect("w0"), network.connect("w1")
+    owner = BroadcastHub(bus=owner_bus)
+    edge = BroadcastHub(bus=edge_bus)
+    sent_states = []
+    network.connect("spy").add_handler("stream.state", sent_states.append)
+
+    owner.publish_state("run-123", {"runtime_status": "running"})
+    assert sent_states == []
+
+    watcher = edge.subscribe("run-123")
+    assert owner.subscriber_count("run-123") == 1
+    owner.publish_state("run-123", {"runtime_status": "running", "step": 1})
+    owner.publish_command_result("run-123", {"command_id": "c1"})
+    assert [event["type"] for event in iter(lambda: edge.next_event(watcher), None)] == [
+        "run_command.result",
+        "run_state.updated",
+    ]
+    assert len(sent_states) == 1
+
+    # A restarted worker says hello; its old subscribers are forgotten.
+    edge_bus.publish({"kind": "stream.hello"})
+    assert owner.subscriber_count("run-123") == 0
+    edge.unsubscribe(watcher)
+    assert owner.subscriber_count("run-123") == 0
+
+
+def test_unix_socket_bus_delivers_between_workers(tmp_path):
+    workers = ["w0", "w1"]
+    sender = UnixSocketBus("w0", workers, tmp_path)
+    receiver = UnixSocketBus("w1", workers, tmp_path)
+    received = []
+    receiver.add_handler("stream.state", received.append)
+    receiver.start()
+    sender.start()
+    try:
+        big_state = {"aircraft": [{"id": f"AC{index}"} for index in range(5000)]}
+        sender.publish({"kind": "stream.state", "run_id": "run-123", "state": big_state})
+        wait_until(lambda: received)
+    finally:
+        sender.close()
+        receiver.close()
+
+    assert received[0]["worker"] == "w0"
+    assert received[0]["state"] == big_state
+
+
+def test_registry_stops_runs_owned_by_another_worker_over_the_bus(db_session):
+    network = LocalBusNetwork()
+    clusters = {
+        worker: WorkerCluster(worker, ["w0", "w1"], "/tmp", network.connect(worker))
+        for worker in ("w0", "w1")
+    }
+    registries = {
+        worker: SessionRegistry(
+            update_interval_seconds=0.01,
+            broadcast_hub=BroadcastHub(bus=cluster.bus),
+            cluster=cluster,
+        )
+        for worker, cluster in clusters.items()
+    }
+    try:
+        run = create_run_route(RunCreateRequest(name="Owned Run"), db_session, SESSION_ID)
+        owner = clusters["w0"].owner(run.id)
+        other = "w1" if owner == "w0" else "w0"
+        start_run(run.id, db_session, registries[owner], SESSION_ID, get_settings())
+        session = registries[owner].get(run.id)
+
+        assert registries[other].new_run_id() != run.id
+        assert clusters[other].owns(registries[other].new_run_id())
+        registries[other].stop(run.id)
+
+        assert registries[owner].get(run.id) is None
+        assert session.runtime_status == "stopped"
+    finally:
+        for registry in registries.values():
+            registry.shutdown()
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["content-length"]))
+        payload = json.dumps(
+            {
+                "path": self.path,
+                "body": body.decode(),
+                "forwarded_by": self.headers[FORWARDED_HEADER],
+                "secret": self.headers[FORWARD_SECRET_HEADER],
+            }
+        ).encode()
+        self.send_response(202)
+        self.send_header("content-type", "application/json")
+        self.send_header("etag", 'W/"owner"')
+        self.send_header("content-length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("owner", 0)
+
+
+def _affinity_client(tmp_path) -> tuple[WorkerCluster, TestClient]:
+    cluster = WorkerCluster(
+        "w0",
+        ["w0", "w1"],
+        tmp_path,
+        LocalBusNetwork().connect("w0"),
+        secret="cluster-secret",
+    )
+    app = FastAPI()
+
+    @app.post("/api/v1/runs/{run_id}/commands")
+    def local(run_id: str, request: Request) -> dict:
+        return {
+            "served_by": "w0",
+            "forwarded_by": request.headers.get(FORWARDED_HEADER),
+            "secret": request.headers.get(FORWARD_SECRET_HEADER),
+        }
+
+    @app.post("/api/v1/runs/practice")
+    def practice() -> dict:
+        return {"served_by": "w0"}
+
+    app.add_middleware(
+        RunAffinityMiddleware, cluster=cluster, runs_prefix="/api/v1/runs"
+    )
+    return cluster, TestClient(app)
+
+
+def test_run_affinity_middleware_forwards_requests_to_the_owner(tmp_path):
+    cluster, client = _affinity_client(tmp_path)
+    local_run, remote_run = (
+        _run_id_owned_by(cluster, "w0"),
+        _run_id_owned_by(cluster, "w1"),
+    )
+
+    assert client.post(f"/api/v1/runs/{local_run}/commands").json() == {
+        "served_by": "w0",
+        "forwarded_by": None,
+        "secret": None,
+    }
+    assert client.post("/api/v1/runs/practice").json() == {"served_by": "w0"}
+    # The owner is down.
+    assert client.post(f"/api/v1/runs/{remote_run}/commands").status_code == 503
+
+    server = _UnixHTTPServer(str(cluster.http_socket("w1")), _EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        response = client.post(
+            f"/api/v1/runs/{remote_run}/commands?dry=1", content=b'{"a": 1}'
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.status_code == 202
+    assert response.headers["etag"] == 'W/"owner"'
+    assert response.json() == {
+        "path": f"/api/v1/runs/{remote_run}/commands?dry=1",
+        "body": '{"a": 1}',
+        "forwarded_by": "w0",
+        "secret": "cluster-secret",
+    }
+
+
+def test_run_affinity_middleware_ignores_forwarding_headers_without_the_secret(
+    tmp_path,
+):
+    cluster, client = _affinity_client(tmp_path)
+    local_run, remote_run = (
+        _run_id_owned_by(cluster, "w0"),
+        _run_id_owned_by(cluster, "w1"),
+    )
+    spoofed = {FORWARDED_HEADER: "w1", FORWARD_SECRET_HEADER: "guess"}
+
+    # Not treated as forwarded: the request still goes to the (down) owner.
+    assert (
+        client.post(f"/api/v1/runs/{remote_run}/commands", headers=spoofed).status_code
+        == 503
+    )
+    assert client.post(
+        f"/api/v1/runs/{local_run}/commands", headers=spoofed
+    ).json() == {"served_by": "w0", "forwarded_by": None, "secret": None}
+
+    forwarded = {FORWARDED_HEADER: "w1", FORWARD_SECRET_HEADER: "cluster-secret"}
+    assert client.post(
+        f"/api/v1/runs/{remote_run}/commands", headers=forwarded
+    ).json() == {"served_by": "w0", "forwarded_by": "w1", "secret": None}
+
+
+def test_sqlite_rate_limit_backend_shares_counts_between_workers(tmp_path):
+    path = tmp_path / "rate-limits.sqlite3"
+    limiters = [
+        SlidingWindowRateLimiter(
+            max_requests=3, window_seconds=60.0, backend=SqliteRateLimitBackend(path)
+        )
+        for _ in range(2)
+    ]
+
+    limiters[0].check("session-a")
+    limiters[1].check("session-a")
+    limiters[0].check("session-a")
+    with pytest.raises(HTTPException) as exc_info:
+        limiters[1].check("session-a")
+    assert exc_info.value.status_code == 429
+    limiters[1].check("session-b")
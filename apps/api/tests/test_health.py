@@ -7,3 +7,20 @@ def test_healthcheck_returns_ok(db_session):
 
     assert response.status == "ok"
     assert response.database == "ok"
+
+
+def test_healthcheck_reports_resident_and_hibernated_runs(db_session, session_registry):
+    response = healthcheck(get_settings(), db_session, session_registry)
+
+    assert response.runtime_sessions.resident == 0
+    assert response.runtime_sessions.hibernated == 0
+    assert response.run_load.running == 0
+
+
+def test_healthcheck_reports_stream_subscribers(db_session, broadcast_hub):
+    broadcast_hub.subscribe("run-123")
+
+    response = healthcheck(get_settings(), db_session, None, broadcast_hub)
+
+    assert response.streams.subscribers == 1
+    assert response.streams.events_dropped == 0
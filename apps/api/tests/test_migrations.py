@@ -8,7 +8,7 @@ from sqlalchemy import create_engine, inspect, text
 from app.config import get_settings
 from app.db.session import get_engine, get_session_factory
 
-BASELINE_REVISION = "20260718_0001"
+HEAD_REVISION = "20261019_0007"
 EXPECTED_TABLES = {
     "alembic_version",
     "users",
@@ -18,6 +18,9 @@ EXPECTED_TABLES = {
     "runs",
     "run_commands",
     "run_checkpoints",
+    "run_engine_states",
+    "run_timeline_segments",
+    "run_summaries",
 }
 
 
@@ -87,7 +90,7 @@ def test_baseline_upgrade_creates_full_schema_on_every_database(tmp_path, monkey
         command.upgrade(alembic_config, "head")
         table_names, current_revision = _inspect_database(database_url)
         assert EXPECTED_TABLES.issubset(table_names), database_url
-        assert current_revision == BASELINE_REVISION
+        assert current_revision == HEAD_REVISION
 
         # Downgrade returns to an empty database.
         command.downgrade(alembic_config, "base")
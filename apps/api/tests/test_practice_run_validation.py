@@ -1,11 +1,20 @@
 """Phase 4: practice-run template validation and content-version stamping."""
 
 import json
+import os
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import func, select
 
 from app import airspace_packages
+from app.api.v1.routes.scenarios import (
+    get_scenario,
+    list_scenarios,
+    update_scenario_route,
+)
+from app.db.models import ScenarioRecord
+from app.schemas.scenarios import ScenarioUpdateRequest
 from app.services import practice_runs
 from app.services.practice_runs import create_practice_run
 
@@ -113,3 +122,81 @@ def test_valid_practice_run_stamps_content_versions(db_session):
     assert versions["environment_version"] == "1.0.0"
     assert versions["scenario_template_id"] == "crossing_traffic"
     assert versions["scenario_template_version"] == "1.0.0"
+
+
+def test_practice_runs_share_one_content_addressed_scenario(db_session):
+    runs = [
+        create_practice_run(
+            db_session,
+            session_id=session_id,
+            airspace_id="training_alpha",
+            lesson_id="enroute_crossing_traffic_intro",
+        )
+        for session_id in (SESSION_ID, SESSION_ID, "test-session-other")
+    ]
+    other_lesson = create_practice_run(
+        db_session,
+        session_id=SESSION_ID,
+        airspace_id="training_alpha",
+        lesson_id="enroute_heading_vs_radial_intro",
+    )
+
+    assert len({run.scenario_id for run in runs}) == 1
+    assert other_lesson.scenario_id != runs[0].scenario_id
+    assert db_session.scalar(select(func.count()).select_from(ScenarioRecord)) == 2
+    assert runs[0].scenario.content_hash is not None
+
+    # Shared content is readable from any session but owned by none.
+    fetched = get_scenario(runs[0].scenario_id, db_session, "test-session-stranger")
+    assert fetched.metadata_payload["lesson_id"] == "enroute_crossing_traffic_intro"
+    assert list_scenarios(db_session, SESSION_ID).items == []
+    with pytest.raises(HTTPException) as exc_info:
+        update_scenario_route(
+            runs[0].scenario_id,
+            ScenarioUpdateRequest(name="Renamed"),
+            db_session,
+            SESSION_ID,
+        )
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "edited_file", ["scenarios/only.v1.json", "airspace.v1.json"]
+)
+def test_editing_any_package_input_recompiles_the_scenario(
+    db_session, tmp_path, synthetic_airspaces_root, edited_file
+):
+    root = synthetic_airspaces_root(tmp_path)
+    package_dir = _write_package(root)
+    first = create_practice_run(
+        db_session,
+        session_id=SESSION_ID,
+        airspace_id="bad_pack",
+        scenario_id="only",
+        name="Morning drill",
+    )
+
+    # Only the edited file changes; the manifest keeps its mtime.
+    edited = package_dir / edited_file
+    payload = json.loads(edited.read_text())
+    if edited_file == "airspace.v1.json":
+        payload["data"]["points"]["EDGE"]["coord"]["dd"] = [11.5, 10.0]
+    else:
+        payload["aircraft"][0]["speed_kt"] = 380
+    stat = edited.stat()
+    edited.write_text(json.dumps(payload))
+    os.utime(edited, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = create_practice_run(
+        db_session,
+        session_id=SESSION_ID,
+        airspace_id="bad_pack",
+        scenario_id="only",
+    )
+
+    assert second.scenario_id != first.scenario_id
+    # The custom name belongs to the run; the shared scenario keeps the
+    # template's name so every run of the same content can reuse it.
+    assert first.name == "Morning drill"
+    assert first.scenario.name == "Bad Scenario"
+    assert second.name == "Bad Scenario Practice Run"
@@ -2,9 +2,18 @@
 
 from datetime import datetime, timedelta, timezone
 
-from app.db.models import RunRecord, ScenarioRecord, UserRecord
+from sqlalchemy import func, select
+
+from app.db.models import (
+    RunCheckpointRecord,
+    RunCommandRecord,
+    RunRecord,
+    ScenarioRecord,
+    UserRecord,
+)
+from app.db.session import get_session_factory
 from app.security import hash_password
-from app.services.retention import sweep_expired_anonymous_runs
+from app.services.retention import RetentionSweeper, sweep_expired_anonymous_runs
 
 NOW = datetime(2026, 7, 18, 12, 0, 0, tzinfo=timezone.utc)
 
@@ -80,3 +89,52 @@ def test_sweep_keeps_scenarios_still_referenced_by_other_runs(db_session):
     assert counts["runs"] == 1
     assert db_session.get(ScenarioRecord, scenario.id) is not None
     assert db_session.get(RunRecord, keeper.id) is not None
+
+
+def test_sweeper_deletes_in_chunks_within_its_time_budget(db_session):
+    expired = [
+        _run(db_session, name=f"guest {index}", ended_days_ago=30 + index)
+        for index in range(5)
+    ]
+    for run in expired:
+        db_session.add(
+            RunCommandRecord(
+                run_id=run.id, command_type="ASSIGN_HEADING", payload={}
+            )
+        )
+        db_session.add(
+            RunCheckpointRecord(
+                run_id=run.id,
+                checkpoint_type="stopped",
+                runtime_status="stopped",
+                sim_rate=1.0,
+                snapshot={},
+            )
+        )
+    db_session.commit()
+
+    def sweeper(time_budget_seconds):
+        return RetentionSweeper(
+            get_session_factory(),
+            retention_days=14,
+            interval_seconds=3600,
+            chunk_size=2,
+            time_budget_seconds=time_budget_seconds,
+        )
+
+    # A zero budget still completes one chunk per sweep.
+    first = sweeper(0).sweep_once(now=NOW)
+    assert (first.runs, first.chunks, first.complete) == (2, 1, False)
+    assert first.dependent_rows == 4
+
+    unhurried = sweeper(60)
+    rest = unhurried.sweep_once(now=NOW)
+    assert (rest.runs, rest.chunks, rest.complete) == (3, 2, True)
+    assert unhurried.last_progress is rest
+
+    db_session.expire_all()
+    assert db_session.scalar(select(func.count()).select_from(RunRecord)) == 0
+    assert db_session.scalar(select(func.count()).select_from(RunCommandRecord)) == 0
+    assert (
+        db_session.scalar(select(func.count()).select_from(RunCheckpointRecord)) == 0
+    )
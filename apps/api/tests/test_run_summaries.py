@@ -220,5 +220,15 @@ def test_registry_persists_summary_on_stop(db_session):
         assert "loss_of_separation_count" in stored.summary_json
         assert "instructions_issued" in stored.summary_json
         assert stored.summary_json["simulated_seconds"] >= 0.0
+        analytics = stored.summary_json["analytics"]
+        assert set(analytics) >= {
+            "distance_flown_nm",
+            "time_in_conflict_seconds",
+            "minimum_separation",
+            "commands_per_aircraft",
+            "flight_level_seconds",
+            "exit_times_seconds",
+        }
+        assert all(distance >= 0.0 for distance in analytics["distance_flown_nm"].values())
     finally:
         registry.shutdown()
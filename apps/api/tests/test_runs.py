@@ -1,39 +1,67 @@
-from queue import Empty
+import json
+import threading
+import time
 
 import pytest
 from fastapi import HTTPException
 
 from app.api.v1.routes.commands import submit_command
 from app.api.v1.routes.runs import (
+    aggregate_run_summaries,
     create_run_route,
     create_practice_run_route,
     export_run_csv,
-    get_run_state,
+    get_run_replay,
+    get_run_series,
+    get_run_state as get_run_state_route,
+    get_run_timeline,
     list_runs,
     pause_run,
     resume_run,
     start_run,
     stop_run,
-    get_run_trajectory,
+    get_run_trajectory as get_run_trajectory_route,
 )
 from app.api.v1.routes.scenarios import create_scenario_route
 from app.config import get_settings
-from app.db.repositories import RunCheckpointRepository
+from app.db.repositories import (
+    RunCheckpointRepository,
+    RunEngineStateRepository,
+    RunRepository,
+)
 from app.schemas.commands import RunCommandCreateRequest
-from app.schemas.runs import PracticeRunCreateRequest, RunCreateRequest
+from app.schemas.runs import (
+    PracticeRunCreateRequest,
+    RunCreateRequest,
+    RunResponse,
+    RunStateResponse,
+    RunTrajectoryResponse,
+)
 from app.schemas.scenarios import ScenarioCreateRequest
+from app.services import RunSeriesCache
 from app.sessions import SessionRegistry
 
 SESSION_ID = "test-session-a"
 
 
-def _drain_events(subscriber):
+def get_run_state(*args, **kwargs) -> RunStateResponse:
+    # The route returns raw JSON; parsing it holds every body to the schema.
+    return RunStateResponse.model_validate_json(
+        get_run_state_route(*args, **kwargs).body
+    )
+
+
+def get_run_trajectory(*args, **kwargs) -> RunTrajectoryResponse:
+    return RunTrajectoryResponse.model_validate_json(
+        get_run_trajectory_route(*args, **kwargs).body
+    )
+
+
+def _drain_events(broadcast_hub, subscriber):
     events = []
-    while True:
-        try:
-            events.append(subscriber.queue.get_nowait())
-        except Empty:
-            return events
+    while (event := broadcast_hub.next_event(subscriber)) is not None:
+        events.append(event)
+    return events
 
 
 def test_run_lifecycle_and_command_persistence(
@@ -64,7 +92,7 @@ def test_run_lifecycle_and_command_persistence(
     assert started_run.status == "running"
     assert started_run.started_at is not None
     assert any(
-        event["type"] == "run_state.updated" for event in _drain_events(subscriber)
+        event["type"] == "run_state.updated" for event in _drain_events(broadcast_hub, subscriber)
     )
 
     running_state = get_run_state(created_run.id, db_session, session_registry, SESSION_ID)
@@ -96,7 +124,7 @@ def test_run_lifecycle_and_command_persistence(
     assert command.command.payload["id"] == "AC900"
     assert command.command.status == "applied"
     assert command.result.state == "applied"
-    command_events = _drain_events(subscriber)
+    command_events = _drain_events(broadcast_hub, subscriber)
     assert any(event["type"] == "run_command.result" for event in command_events)
 
     state_response = get_run_state(created_run.id, db_session, session_registry, SESSION_ID)
@@ -117,7 +145,7 @@ def test_run_lifecycle_and_command_persistence(
     stopped_state = get_run_state(created_run.id, db_session, session_registry, SESSION_ID)
     assert stopped_state.runtime_status == "stopped"
     assert any(
-        event["type"] == "run_state.updated" for event in _drain_events(subscriber)
+        event["type"] == "run_state.updated" for event in _drain_events(broadcast_hub, subscriber)
     )
 
     list_response = list_runs(db_session, SESSION_ID)
@@ -151,6 +179,142 @@ def test_create_practice_run_from_lesson_starts_runtime(db_session, session_regi
     assert state_response.aircraft[0].callsign.startswith("ALP")
 
 
+def test_live_state_and_trajectory_bodies_match_their_response_schemas(
+    db_session, session_registry
+):
+    created_run = create_practice_run_route(
+        PracticeRunCreateRequest(
+            airspace_id="training_alpha",
+            lesson_id="enroute_heading_vs_radial_intro",
+        ),
+        db_session,
+        session_registry,
+        SESSION_ID,
+        get_settings(),
+    )
+    time.sleep(0.1)
+    pause_run(created_run.id, db_session, session_registry, SESSION_ID)
+    runtime_session = session_registry.get(created_run.id)
+    run = RunRepository(db_session).get(created_run.id, session_id=SESSION_ID)
+
+    state_body = get_run_state_route(
+        created_run.id, db_session, session_registry, SESSION_ID
+    ).body
+    expected_state = RunStateResponse(
+        run=RunResponse.model_validate(run),
+        source="runtime_session",
+        **runtime_session.state_snapshot(),
+    )
+    # Same content as the validated model, and already in its contract shape:
+    # no missing or extra keys for the model to fill in or drop.
+    assert RunStateResponse.model_validate_json(state_body) == expected_state
+    assert json.loads(state_body) == expected_state.model_dump(mode="json")
+
+    trajectory_body = get_run_trajectory_route(
+        created_run.id, db_session, session_registry, SESSION_ID
+    ).body
+    expected_trajectory = RunTrajectoryResponse(
+        run_id=created_run.id, **runtime_session.trajectory_snapshot()
+    )
+    assert (
+        RunTrajectoryResponse.model_validate_json(trajectory_body)
+        == expected_trajectory
+    )
+
+    # Serialised once per state version.
+    assert runtime_session.state_json() is runtime_session.state_json()
+    cached = runtime_session.trajectory_json()
+    aircraft_id = expected_state.aircraft[0].id
+    runtime_session.apply_command(
+        command_id="fast-path-speed",
+        command_type="SET_SPEED",
+        payload={"aircraft_id": aircraft_id, "speed_kt": 333},
+    )
+    assert runtime_session.trajectory_json() is not cached
+    speeds = {
+        track["id"]: track["speed_kt"]
+        for track in json.loads(runtime_session.trajectory_json())["tracks"]
+    }
+    assert speeds[aircraft_id] == 333.0
+
+
+def test_state_polls_revalidate_by_etag_and_long_poll_for_changes(
+    db_session, session_registry
+):
+    settings = get_settings()
+    scenario = create_scenario_route(
+        ScenarioCreateRequest(name="Polling Scenario"), db_session, SESSION_ID
+    )
+    created_run = create_run_route(
+        RunCreateRequest(scenario_id=scenario.id), db_session, SESSION_ID
+    )
+    draft = get_run_state_route(created_run.id, db_session, session_registry, SESSION_ID)
+    assert get_run_state_route(
+        created_run.id,
+        db_session,
+        session_registry,
+        SESSION_ID,
+        if_none_match=draft.headers["etag"],
+    ).status_code == 304
+
+    start_run(created_run.id, db_session, session_registry, SESSION_ID, settings)
+    pause_run(created_run.id, db_session, session_registry, SESSION_ID)
+    paused = get_run_state_route(created_run.id, db_session, session_registry, SESSION_ID)
+    assert paused.headers["etag"] != draft.headers["etag"]
+    not_modified = get_run_state_route(
+        created_run.id,
+        db_session,
+        session_registry,
+        SESSION_ID,
+        if_none_match=f'"other", {paused.headers["etag"]}',
+        wait=0.1,
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == paused.headers["etag"]
+
+    trajectory = get_run_trajectory_route(
+        created_run.id, db_session, session_registry, SESSION_ID
+    )
+    runtime_session = session_registry.get(created_run.id)
+    timer = threading.Timer(
+        0.2,
+        runtime_session.apply_command,
+        kwargs={
+            "command_id": "long-poll-speed",
+            "command_type": "SET_SIMULATION_SPEED",
+            "payload": {"sim_rate": 2.0},
+        },
+    )
+    timer.start()
+    started_at = time.monotonic()
+    changed = get_run_trajectory_route(
+        created_run.id,
+        db_session,
+        session_registry,
+        SESSION_ID,
+        wait=5.0,
+        if_none_match=trajectory.headers["etag"],
+    )
+    timer.join()
+    assert changed.status_code == 200
+    assert time.monotonic() - started_at < 2.0
+    assert changed.headers["etag"] != trajectory.headers["etag"]
+    assert RunTrajectoryResponse.model_validate_json(changed.body).run_id == created_run.id
+
+    stop_run(created_run.id, db_session, session_registry, SESSION_ID)
+    stopped = get_run_state_route(created_run.id, db_session, session_registry, SESSION_ID)
+    assert RunStateResponse.model_validate_json(stopped.body).source == "checkpoint"
+    assert get_run_state_route(
+        created_run.id,
+        db_session,
+        session_registry,
+        SESSION_ID,
+        if_none_match=stopped.headers["etag"],
+        wait=5.0,
+    ).status_code == 304
+
+
 def test_restarting_same_lesson_replaces_previous_active_practice_run(
     db_session,
     session_registry,
@@ -180,6 +344,228 @@ def test_restarting_same_lesson_replaces_previous_active_practice_run(
     assert all(session_registry.get(run.id) is None for run in created_runs[:-1])
 
 
+def test_run_list_pages_by_cursor_and_ended_runs_aggregate_by_lesson(
+    db_session,
+    session_registry,
+):
+    settings = get_settings()
+    settings.max_concurrent_runs_per_session = 3
+
+    created_runs = [
+        create_practice_run_route(
+            PracticeRunCreateRequest(
+                airspace_id="training_alpha",
+                lesson_id="enroute_crossing_traffic_intro",
+            ),
+            db_session,
+            session_registry,
+            SESSION_ID,
+            settings,
+        )
+        for _ in range(3)
+    ]
+    stopped = stop_run(created_runs[-1].id, db_session, session_registry, SESSION_ID)
+
+    first_page = list_runs(db_session, SESSION_ID, limit=2)
+    assert len(first_page.items) == 2
+    assert first_page.next_cursor is not None
+    second_page = list_runs(
+        db_session, SESSION_ID, limit=2, cursor=first_page.next_cursor
+    )
+    assert second_page.next_cursor is None
+    paged_ids = [run.id for run in first_page.items + second_page.items]
+    assert sorted(paged_ids) == sorted(run.id for run in created_runs)
+    assert paged_ids == [run.id for run in list_runs(db_session, SESSION_ID).items]
+
+    with pytest.raises(HTTPException) as cursor_error:
+        list_runs(db_session, SESSION_ID, cursor="not-a-cursor")
+    assert cursor_error.value.status_code == 400
+
+    by_lesson = aggregate_run_summaries(db_session, SESSION_ID)
+    assert by_lesson.group_by == "lesson_id"
+    assert len(by_lesson.groups) == 1
+    group = by_lesson.groups[0]
+    assert group.key == "enroute_crossing_traffic_intro"
+    assert group.run_count == 3
+    assert group.simulated_seconds_avg >= 0
+    by_kind = aggregate_run_summaries(db_session, SESSION_ID, group_by="kind")
+    assert [(item.key, item.run_count) for item in by_kind.groups] == [
+        (stopped.summary["kind"], 3)
+    ]
+    assert aggregate_run_summaries(db_session, "another-session").groups == []
+
+
+def test_stopped_practice_run_replays_to_the_recorded_state_digest(
+    db_session, session_registry, broadcast_hub
+):
+    settings = get_settings()
+    created_run = create_practice_run_route(
+        PracticeRunCreateRequest(
+            airspace_id="training_alpha",
+            lesson_id="enroute_heading_vs_radial_intro",
+            name="Replay Practice",
+        ),
+        db_session,
+        session_registry,
+        SESSION_ID,
+        settings,
+    )
+    with pytest.raises(HTTPException) as running_error:
+        get_run_replay(created_run.id, db_session, SESSION_ID)
+    assert running_error.value.status_code == 409
+
+    aircraft_id = get_run_state(
+        created_run.id, db_session, session_registry, SESSION_ID
+    ).aircraft[0].id
+    for command_type, payload in (
+        ("SET_SIMULATION_SPEED", {"sim_rate": 8}),
+        ("SET_FL", {"aircraft_id": aircraft_id, "flight_level": 250}),
+        ("ASSIGN_HEADING", {"aircraft_id": aircraft_id, "heading_deg": 90}),
+    ):
+        time.sleep(0.05)
+        response = submit_command(
+            created_run.id,
+            RunCommandCreateRequest(command_type=command_type, payload=payload),
+            db_session,
+            session_registry,
+            broadcast_hub,
+            SESSION_ID,
+        )
+        assert response.command.status == "applied"
+        assert response.command.time_seconds is not None
+    pause_run(created_run.id, db_session, session_registry, SESSION_ID)
+    resume_run(created_run.id, db_session, session_registry, SESSION_ID)
+    time.sleep(0.05)
+    stopped = stop_run(created_run.id, db_session, session_registry, SESSION_ID)
+    assert stopped.summary["simulated_seconds"] > 0
+
+    replay = get_run_replay(created_run.id, db_session, SESSION_ID)
+    assert replay.verified
+    assert replay.state_digest == replay.recorded_state_digest
+    assert replay.summary == stopped.summary
+    assert replay.summary["instructions_issued"] == 2
+
+
+def test_stopped_run_state_can_be_read_at_any_recorded_time(
+    db_session, session_registry
+):
+    settings = get_settings()
+    created_run = create_practice_run_route(
+        PracticeRunCreateRequest(
+            airspace_id="training_alpha",
+            lesson_id="enroute_heading_vs_radial_intro",
+            name="Timeline Practice",
+        ),
+        db_session,
+        session_registry,
+        SESSION_ID,
+        settings,
+    )
+    time.sleep(0.2)
+    stop_run(created_run.id, db_session, session_registry, SESSION_ID)
+    final_state = get_run_state(created_run.id, db_session, session_registry, SESSION_ID)
+
+    timeline = get_run_timeline(
+        created_run.id, db_session, session_registry, SESSION_ID
+    )
+    assert timeline.start_seconds == 0
+    assert timeline.end_seconds == final_state.time_seconds
+    assert len(timeline.frames) > 2
+    assert timeline.frames[-1].runtime_status == "stopped"
+
+    middle = timeline.frames[len(timeline.frames) // 2]
+    state = get_run_state(
+        created_run.id,
+        db_session,
+        session_registry,
+        SESSION_ID,
+        at=middle.time_seconds + 0.001,
+    )
+    assert state.source == "timeline"
+    assert state.time_seconds == middle.time_seconds
+    assert state.aircraft == middle.aircraft
+
+    ended = get_run_state(
+        created_run.id,
+        db_session,
+        session_registry,
+        SESSION_ID,
+        at=final_state.time_seconds,
+    )
+    assert ended.runtime_status == "stopped"
+    for replayed, recorded in zip(ended.aircraft, final_state.aircraft, strict=True):
+        assert replayed.id == recorded.id
+        assert replayed.position_dd == pytest.approx(recorded.position_dd, abs=1e-6)
+        assert replayed.altitude_ft == pytest.approx(recorded.altitude_ft, abs=0.1)
+
+    with pytest.raises(HTTPException) as excinfo:
+        get_run_state(
+            created_run.id,
+            db_session,
+            session_registry,
+            SESSION_ID,
+            at=final_state.time_seconds + 60.0,
+        )
+    assert excinfo.value.status_code == 404
+
+
+def test_run_series_are_downsampled_from_the_timeline_and_cached(
+    db_session, session_registry
+):
+    settings = get_settings()
+    created_run = create_practice_run_route(
+        PracticeRunCreateRequest(
+            airspace_id="training_alpha",
+            lesson_id="enroute_heading_vs_radial_intro",
+            name="Series Practice",
+        ),
+        db_session,
+        session_registry,
+        SESSION_ID,
+        settings,
+    )
+    time.sleep(0.2)
+    stop_run(created_run.id, db_session, session_registry, SESSION_ID)
+    aircraft_id = get_run_state(
+        created_run.id, db_session, session_registry, SESSION_ID
+    ).aircraft[0].id
+    cache = RunSeriesCache()
+
+    def series(name, **kwargs):
+        return get_run_series(
+            created_run.id,
+            name,
+            db_session,
+            session_registry,
+            cache,
+            SESSION_ID,
+            **kwargs,
+        )
+
+    altitude = series("altitude_ft", aircraft_id=aircraft_id, points=5)
+    assert altitude.source_point_count > 5
+    assert len(altitude.values) <= 5
+    assert altitude.time_seconds == sorted(altitude.time_seconds)
+    assert series("altitude_ft", aircraft_id=aircraft_id, points=5) == altitude
+    assert len(cache) == 1
+
+    envelope = series(
+        "separation_nm", aircraft_id=aircraft_id, points=6, method="minmax"
+    )
+    assert len(envelope.values) <= 6
+    conflicts = series("conflict_count", aircraft_id=aircraft_id)
+    assert conflicts.aircraft_id is None
+    assert conflicts.source_point_count == len(conflicts.values)
+    assert len(cache) == 3
+
+    with pytest.raises(HTTPException) as missing_aircraft:
+        series("speed_kt")
+    assert missing_aircraft.value.status_code == 422
+    with pytest.raises(HTTPException) as unknown_aircraft:
+        series("speed_kt", aircraft_id="NOPE")
+    assert unknown_aircraft.value.status_code == 404
+
+
 def test_invalid_run_transition_returns_conflict(db_session, session_registry):
     created_run = create_run_route(RunCreateRequest(), db_session, SESSION_ID)
 
@@ -239,7 +625,7 @@ def test_export_run_csv_returns_live_runtime_snapshot(
     assert len(csv_text.strip().splitlines()) >= 2
 
 
-def test_command_is_rejected_when_runtime_is_missing_for_running_run(
+def test_command_recovers_runtime_from_engine_state_after_restart(
     db_session,
     session_registry,
     broadcast_hub,
@@ -257,6 +643,49 @@ def test_command_is_rejected_when_runtime_is_missing_for_running_run(
     )
     start_run(created_run.id, db_session, session_registry, SESSION_ID, settings)
 
+    restarted_registry = SessionRegistry(update_interval_seconds=0.01)
+    try:
+        response = submit_command(
+            created_run.id,
+            RunCommandCreateRequest(
+                command_type="ADD_AIRCRAFT",
+                payload={"id": "AC903", "route": "UL602"},
+            ),
+            db_session,
+            restarted_registry,
+            broadcast_hub,
+            SESSION_ID,
+        )
+        recovered = restarted_registry.get(created_run.id)
+        assert recovered is not None
+        assert recovered.runtime_status == "running"
+    finally:
+        restarted_registry.shutdown()
+
+    assert response.command.status == "applied"
+    assert response.result.state == "applied"
+
+
+def test_command_is_rejected_when_run_has_no_engine_state(
+    db_session,
+    session_registry,
+    broadcast_hub,
+):
+    settings = get_settings()
+    scenario = create_scenario_route(
+        ScenarioCreateRequest(name="Legacy Scenario"),
+        db_session,
+        SESSION_ID,
+    )
+    created_run = create_run_route(
+        RunCreateRequest(scenario_id=scenario.id, name="Legacy Session"),
+        db_session,
+        SESSION_ID,
+    )
+    start_run(created_run.id, db_session, session_registry, SESSION_ID, settings)
+    session_registry.get(created_run.id).suspend()
+    RunEngineStateRepository(db_session).delete_for_run(created_run.id)
+
     orphaned_registry = SessionRegistry(update_interval_seconds=0.01)
     try:
         response = submit_command(
@@ -275,7 +704,7 @@ def test_command_is_rejected_when_runtime_is_missing_for_running_run(
 
     assert response.command.status == "rejected"
     assert response.result.state == "rejected"
-    assert "live recovery is not implemented yet" in response.result.rejected[0].reason
+    assert "no recoverable engine state" in response.result.rejected[0].reason
 
 
 def test_run_state_and_trajectory_fall_back_to_checkpoint(
@@ -338,7 +767,7 @@ def test_run_state_and_trajectory_fall_back_to_checkpoint(
     assert "route_id" in export_csv
 
 
-def test_resume_requires_live_runtime_when_only_checkpoint_state_exists(
+def test_resume_recovers_paused_run_after_restart(
     db_session,
     session_registry,
 ):
@@ -355,16 +784,24 @@ def test_resume_requires_live_runtime_when_only_checkpoint_state_exists(
     )
     start_run(created_run.id, db_session, session_registry, SESSION_ID, settings)
     pause_run(created_run.id, db_session, session_registry, SESSION_ID)
+    paused_seconds = session_registry.get(created_run.id).simulation.clock.now_seconds
 
-    orphaned_registry = SessionRegistry(update_interval_seconds=0.01)
+    restarted_registry = SessionRegistry(update_interval_seconds=0.01)
     try:
-        with pytest.raises(HTTPException) as excinfo:
-            resume_run(created_run.id, db_session, orphaned_registry, SESSION_ID)
-    finally:
-        orphaned_registry.shutdown()
+        paused_state = get_run_state(
+            created_run.id, db_session, restarted_registry, SESSION_ID
+        )
+        assert paused_state.source == "runtime_session"
+        assert paused_state.runtime_status == "paused"
+        assert paused_state.time_seconds == paused_seconds
 
-    assert excinfo.value.status_code == 409
-    assert "live recovery is not implemented yet" in excinfo.value.detail
+        resumed_run = resume_run(
+            created_run.id, db_session, restarted_registry, SESSION_ID
+        )
+        assert resumed_run.status == "running"
+        assert restarted_registry.get(created_run.id).runtime_status == "running"
+    finally:
+        restarted_registry.shutdown()
 
 
 def test_run_creation_rejected_past_concurrency_cap(db_session, session_registry):
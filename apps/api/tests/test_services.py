@@ -1,3 +1,5 @@
+import math
+
 import pytest
 from fastapi import HTTPException
 
@@ -15,6 +17,7 @@ from app.services.runs import (
     stop_run,
 )
 from app.services.airspaces import list_airspace_packages
+from app.services.run_series import lttb, min_max
 from app.services.scenarios import create_scenario, update_scenario
 
 SESSION_ID = "test-session-a"
@@ -169,7 +172,8 @@ def test_missing_runtime_detail_matches_run_state_and_checkpoint_context(db_sess
     run.status = RUN_STATUS_RUNNING
     assert (
         missing_runtime_detail(run, has_checkpoint=True)
-        == f"Run {run.id} has persisted checkpoint state, but live recovery is not implemented yet."
+        == f"Run {run.id} has persisted checkpoint state but no recoverable engine "
+        "state; stop it and start a new run."
     )
 
     run.status = RUN_STATUS_STOPPED
@@ -201,3 +205,19 @@ def test_create_practice_run_rejects_traversal_airspace_id(db_session):
         )
 
     assert excinfo.value.status_code == 400
+
+
+def test_downsamplers_respect_the_point_budget_and_keep_extremes():
+    points = [(index * 0.25, math.sin(index / 40.0)) for index in range(2400)]
+    points[1234] = (points[1234][0], 5.0)  # one-sample spike
+
+    shape = lttb(points, 200)
+    envelope = min_max(points, 200)
+
+    for sampled in (shape, envelope):
+        assert len(sampled) <= 200
+        assert sampled[0] == points[0] and sampled[-1] == points[-1]
+        assert [t for t, _ in sampled] == sorted(t for t, _ in sampled)
+        assert points[1234] in sampled
+    assert min(v for _, v in envelope) == min(v for _, v in points)
+    assert lttb(points[:50], 200) == points[:50]
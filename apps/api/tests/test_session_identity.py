@@ -56,7 +56,7 @@ def test_session_query_param_is_accepted(build_client):
         response = client.get("/api/v1/runs?sid=session-via-query-1234")
 
     assert response.status_code == 200
-    assert response.json() == {"items": []}
+    assert response.json() == {"items": [], "next_cursor": None}
 
 
 def test_runs_are_isolated_between_sessions(build_client):
@@ -1,10 +1,31 @@
 import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
 
-from app.db.repositories import RunCheckpointRepository
-from app.services.runs import create_run
+import pytest
+from airspacesim.io.contracts import build_envelope
+
+from app.db.repositories import (
+    RunCheckpointRepository,
+    RunCommandRepository,
+    RunEngineStateRepository,
+)
+from app.services.runs import (
+    create_run,
+    pause_run,
+    record_run_command,
+    start_run,
+    stop_run,
+)
 from app.services.scenarios import resolve_scenario_contracts
-from app.sessions import SessionRegistry
+from app.sessions import RunAdmissionRejected, SessionRegistry
 from app.sessions.runtime import SimulationRuntimeSession
+from app.sessions.timeline import (
+    SegmentBuilder,
+    decode_segment,
+    segment_frames,
+    state_at,
+)
 
 SESSION_ID = "test-session-a"
 
@@ -138,3 +159,526 @@ def test_session_registry_stop_discards_runtime_and_persists_stopped_checkpoint(
         assert run.id not in registry._last_checkpoint_at
     finally:
         registry.shutdown()
+
+
+def test_deadline_pacing_keeps_simulated_time_up_with_slow_ticks(monkeypatch):
+    monkeypatch.setattr("app.sessions.runtime.COARSEN_AFTER_LATE_TICKS", 2)
+    # Publishing takes six 0.05 s steps' worth of wall time.
+    runtime_session = build_runtime_session(
+        state_publisher=lambda run_id, snapshot, checkpoint_type: time.sleep(0.3)
+    )
+    runtime_session.start()
+    started_at = time.monotonic()
+    time.sleep(2.0)
+    simulated_seconds = runtime_session.simulation.clock.now_seconds
+    elapsed_seconds = time.monotonic() - started_at
+    runtime_session.stop()
+
+    # Sleeping a full interval after each tick would manage about 1/7 of this.
+    assert simulated_seconds >= 0.6 * elapsed_seconds
+    metrics = runtime_session.state_snapshot()["metrics"]
+    assert metrics["steps_per_tick"] >= 2
+    assert metrics["tick_overruns"] >= 2
+    assert metrics["catch_up_steps"] > 0
+    assert metrics["tick_lag_seconds"] >= 0.0
+
+
+class _LoopClock:
+    """Wall clock and stop event for driving `_run_loop` in the test thread.
+
+    Time only moves while the loop waits, so ticks take no wall time and the
+    loop stops once `seconds` have passed.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.now = 1024.0
+        self.stop_at = self.now + seconds
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def is_set(self) -> bool:
+        return self.now >= self.stop_at
+
+    def wait(self, seconds: float) -> bool:
+        self.now += max(seconds, 0.0)
+        return self.is_set()
+
+
+def _run_loop_for(monkeypatch, runtime_session, clock: _LoopClock) -> None:
+    monkeypatch.setattr(
+        "app.sessions.runtime.time",
+        SimpleNamespace(
+            monotonic=clock.monotonic, perf_counter=time.perf_counter, sleep=clock.wait
+        ),
+    )
+    monkeypatch.setattr(runtime_session, "_stop_event", clock)
+    runtime_session.runtime_status = "running"
+    runtime_session._run_loop()
+
+
+def test_unwatched_sessions_step_coarsely_and_replays_take_the_same_steps(monkeypatch):
+    # Intervals are binary fractions so the stepped clock stays exact.
+    clock = _LoopClock(8.0)
+    watched_from = clock.now + 4.0
+    published: list[tuple[bool, str]] = []
+    scenario_airspace, scenario_aircraft = resolve_scenario_contracts(None)
+    runtime_session = SimulationRuntimeSession(
+        run_id="runtime-test-run",
+        scenario_airspace=scenario_airspace,
+        scenario_aircraft=scenario_aircraft,
+        sim_rate=64.0,
+        update_interval_seconds=0.0625,
+        state_publisher=lambda run_id, snapshot, checkpoint_type: published.append(
+            (clock.now >= watched_from, checkpoint_type)
+        ),
+        viewer_check=lambda: clock.now >= watched_from,
+    )
+    _run_loop_for(monkeypatch, runtime_session, clock)
+
+    # 4 s of wall time is 64 fine steps of 4 simulated seconds.
+    assert runtime_session.step_multipliers
+    assert all(start < 256.0 for start, _, _ in runtime_session.step_multipliers)
+    assert published.count((False, "tick")) <= 1
+    assert published.count((True, "tick")) >= 64
+    assert runtime_session.simulation.clock.now_seconds == 512.0
+
+    replica = build_runtime_session(sim_rate=64.0)
+    replica.update_interval_seconds = 0.0625
+    replica.replay(
+        [],
+        until_seconds=runtime_session.simulation.clock.now_seconds,
+        step_multipliers=runtime_session.replay_manifest()["step_multipliers"],
+    )
+    assert replica.simulation.state_digest() == runtime_session.simulation.state_digest()
+
+
+def _grazing_contracts(speed_kt: float = 450):
+    # Head-on at FL330 on parallel tracks 9.9 NM apart: inside the 10 NM
+    # minimum for about 11 s around t=480 s.
+    offset_deg = 9.9 / 60.0
+    scenario_airspace = build_envelope(
+        schema_name="airspacesim.scenario_airspace",
+        source="tests.sessions",
+        data={
+            "reference": {"datum": "WGS84", "earth_model": "spherical", "nm_to_m": 1852},
+            "points": {
+                "W": {"type": "fix", "name": "W", "coord": {"dd": [0.0, 0.0]}},
+                "E": {"type": "fix", "name": "E", "coord": {"dd": [0.0, 2.0]}},
+                "WO": {"type": "fix", "name": "WO", "coord": {"dd": [offset_deg, 0.0]}},
+                "EO": {"type": "fix", "name": "EO", "coord": {"dd": [offset_deg, 2.0]}},
+            },
+            "routes": [
+                {"id": "EAST", "waypoint_ids": ["W", "E"]},
+                {"id": "WEST", "waypoint_ids": ["EO", "WO"]},
+            ],
+            "airspaces": [],
+        },
+    )
+    scenario_aircraft = build_envelope(
+        schema_name="airspacesim.scenario_aircraft",
+        source="tests.sessions",
+        data={
+            "aircraft": [
+                {
+                    "id": "A",
+                    "callsign": "A",
+                    "route_id": "EAST",
+                    "speed_kt": speed_kt,
+                    "flight_level": 330,
+                },
+                {
+                    "id": "B",
+                    "callsign": "B",
+                    "route_id": "WEST",
+                    "speed_kt": speed_kt,
+                    "flight_level": 330,
+                },
+            ]
+        },
+    )
+    return scenario_airspace, scenario_aircraft
+
+
+def test_unwatched_sessions_detect_grazing_losses_like_watched_ones(monkeypatch):
+    scenario_airspace, scenario_aircraft = _grazing_contracts()
+    results = []
+    for viewer_check in (None, lambda: False):
+        runtime_session = SimulationRuntimeSession(
+            run_id="runtime-test-run",
+            scenario_airspace=scenario_airspace,
+            scenario_aircraft=scenario_aircraft,
+            sim_rate=16.0,
+            update_interval_seconds=0.0625,
+            viewer_check=viewer_check,
+        )
+        _run_loop_for(monkeypatch, runtime_session, _LoopClock(40.0))
+        losses = [
+            (event.type, event.time_seconds, event.payload["pair"])
+            for event in runtime_session.simulation.drain_events()
+            if event.type.startswith("separation_loss")
+        ]
+        analytics = runtime_session.simulation.analytics_summary()
+        results.append(
+            (
+                runtime_session.step_multipliers,
+                losses,
+                analytics["time_in_conflict_seconds"],
+                analytics["minimum_separation"],
+            )
+        )
+
+    (fine_steps, *fine), (coarse_steps, *coarse) = results
+    assert not fine_steps and coarse_steps
+    assert fine[0] == [
+        ("separation_loss_started", 475.0, ["A", "B"]),
+        ("separation_loss_ended", 486.0, ["A", "B"]),
+    ]
+    assert coarse == fine
+
+
+def test_unwatched_sessions_report_the_same_exits_as_watched_ones(monkeypatch):
+    scenario_airspace, scenario_aircraft = _grazing_contracts(speed_kt=440)
+    results = []
+    for viewer_check in (None, lambda: False):
+        runtime_session = SimulationRuntimeSession(
+            run_id="runtime-test-run",
+            scenario_airspace=scenario_airspace,
+            scenario_aircraft=scenario_aircraft,
+            sim_rate=16.0,
+            update_interval_seconds=0.0625,
+            viewer_check=viewer_check,
+        )
+        # Both aircraft fly 120 NM at 440 kt and exit on the 983 s step.
+        _run_loop_for(monkeypatch, runtime_session, _LoopClock(70.0))
+        exits = [
+            (event.time_seconds, event.payload["aircraft_id"])
+            for event in runtime_session.simulation.drain_events()
+            if event.type == "aircraft_exited"
+        ]
+        results.append(
+            (
+                runtime_session.runtime_status,
+                runtime_session.simulation.clock.now_seconds,
+                sorted(exits),
+                runtime_session.simulation.analytics_summary()["exit_times_seconds"],
+            )
+        )
+
+    assert results[0][0] == "completed"
+    assert results[0][2] == [(983.0, "A"), (983.0, "B")]
+    assert results[1] == results[0]
+
+
+def test_stalled_unwatched_sessions_catch_up_boundedly_and_report_lag(monkeypatch):
+    scenario_airspace, scenario_aircraft = _grazing_contracts()
+    clock = _LoopClock(30.0)
+    lags: list[float] = []
+
+    def stall_once(aircraft_count, step_seconds):
+        # The first tick's work takes 20 s of wall time.
+        if not lags:
+            clock.now += 20.0
+        lags.append(runtime_session.tick_lag_seconds)
+
+    runtime_session = SimulationRuntimeSession(
+        run_id="runtime-test-run",
+        scenario_airspace=scenario_airspace,
+        scenario_aircraft=scenario_aircraft,
+        sim_rate=16.0,
+        update_interval_seconds=0.0625,
+        tick_observer=stall_once,
+        viewer_check=lambda: False,
+    )
+    _run_loop_for(monkeypatch, runtime_session, clock)
+
+    metrics = runtime_session.state_snapshot()["metrics"]
+    # 320 fine steps were owed after the stall; at most five coarse steps'
+    # worth were taken, the rest dropped.
+    assert max(lags) >= 18.0
+    assert metrics["dropped_seconds"] >= 10.0
+    assert metrics["tick_overruns"] >= 1
+    assert metrics["catch_up_steps"] >= 1
+    assert runtime_session.simulation.clock.now_seconds < 30.0 * 16.0 - 160.0
+
+
+def _start_live_run(db_session, registry, name):
+    run = start_run(db_session, create_run(db_session, session_id=SESSION_ID, name=name))
+    return run, registry.start(run=run, scenario=None)
+
+
+def test_recovery_replays_only_the_command_journal_after_the_engine_state(db_session):
+    crashed = SessionRegistry(update_interval_seconds=0.01)
+    try:
+        run, runtime_session = _start_live_run(db_session, crashed, "Journal Run")
+        crashed.pause(run.id)
+        run = pause_run(db_session, run)
+        paused_seconds = runtime_session.simulation.clock.now_seconds
+
+        # Commands do not rewrite the engine state; this one is journal-only.
+        command = record_run_command(
+            db_session,
+            run=run,
+            command_type="ADD_AIRCRAFT",
+            payload={"id": "AC950", "route": "UL602"},
+        )
+        result = runtime_session.apply_command(
+            command_id=command.id,
+            command_type=command.command_type,
+            payload=command.payload,
+        )
+        assert result["applied"] == [command.id]
+        command.status = "applied"
+        command.applied_at = datetime.now(timezone.utc)
+        RunCommandRepository(db_session).update(command)
+        assert RunEngineStateRepository(db_session).get(run.id).commands_applied == 0
+
+        # The first recovery replays the journal and saves a fresh engine
+        # state; the second must not apply the command again.
+        for _ in range(2):
+            restarted = SessionRegistry(update_interval_seconds=0.01)
+            try:
+                recovered = restarted.recover(run)
+                ids = [aircraft.id for aircraft in recovered.manager.aircraft_list]
+                assert ids.count("AC950") == 1
+                assert recovered.runtime_status == "paused"
+                assert recovered.commands_applied == 1
+                assert recovered.simulation.clock.now_seconds == paused_seconds
+            finally:
+                restarted.shutdown()
+    finally:
+        crashed.shutdown()
+
+
+def test_recovery_applies_journaled_commands_at_their_recorded_times(db_session):
+    crashed = SessionRegistry(update_interval_seconds=0.01)
+    try:
+        run, runtime_session = _start_live_run(db_session, crashed, "Timed Journal Run")
+        crashed.pause(run.id)
+        run = pause_run(db_session, run)
+        paused_seconds = runtime_session.simulation.clock.now_seconds
+
+        # Applied 8 s after the saved engine state, then lost in the crash.
+        command = record_run_command(
+            db_session,
+            run=run,
+            command_type="ADD_AIRCRAFT",
+            payload={"id": "AC951", "route": "UL602"},
+        )
+        command.status = "applied"
+        command.applied_at = datetime.now(timezone.utc)
+        command.time_seconds = paused_seconds + 8.0
+        RunCommandRepository(db_session).update(command)
+
+        restarted = SessionRegistry(update_interval_seconds=0.01)
+        try:
+            recovered = restarted.recover(run)
+            ids = [aircraft.id for aircraft in recovered.manager.aircraft_list]
+            assert ids.count("AC951") == 1
+            assert recovered.commands_applied == 1
+            assert recovered.simulation.clock.now_seconds == pytest.approx(
+                paused_seconds + 8.0, abs=0.05
+            )
+        finally:
+            restarted.shutdown()
+        db_session.refresh(command)
+        assert command.time_seconds == paused_seconds + 8.0
+    finally:
+        crashed.shutdown()
+
+
+def test_recover_all_rehydrates_live_runs_in_parallel(db_session):
+    registry = SessionRegistry(update_interval_seconds=0.01)
+    runs = []
+    try:
+        for index in range(6):
+            run, _ = _start_live_run(db_session, registry, f"Eager Run {index}")
+            runs.append(run)
+        stopped_run = runs.pop()
+        registry.stop(stopped_run.id)
+        stop_run(db_session, stopped_run)
+        time.sleep(0.05)
+    finally:
+        registry.shutdown()  # suspends and saves engine state, runs stay live
+
+    restarted = SessionRegistry(update_interval_seconds=0.01)
+    try:
+        assert restarted.recover_all(max_workers=3) == len(runs)
+        assert {session.run_id for session in restarted.list_sessions()} == {
+            run.id for run in runs
+        }
+        assert all(
+            session.runtime_status == "running" for session in restarted.list_sessions()
+        )
+        assert restarted.get(stopped_run.id) is None
+        latest = RunCheckpointRepository(db_session).latest_for_run(runs[0].id)
+        assert latest.checkpoint_type in {"recovered", "tick"}
+    finally:
+        restarted.shutdown()
+
+
+def test_idle_sessions_hibernate_and_rehydrate_on_access(db_session, broadcast_hub):
+    registry = SessionRegistry(
+        update_interval_seconds=0.01,
+        broadcast_hub=broadcast_hub,
+        hibernate_idle_after_seconds=60.0,
+    )
+    try:
+        paused_run, paused_session = _start_live_run(db_session, registry, "Paused")
+        registry.pause(paused_run.id)
+        paused_run = pause_run(db_session, paused_run)
+        paused_seconds = paused_session.simulation.clock.now_seconds
+        watched_run, _ = _start_live_run(db_session, registry, "Watched")
+        subscriber = broadcast_hub.subscribe(watched_run.id)
+        unwatched_run, unwatched_session = _start_live_run(
+            db_session, registry, "Unwatched"
+        )
+
+        now = time.monotonic()
+        assert registry.hibernate_idle(now=now + 30.0) == 0
+        assert registry.hibernate_idle(now=now + 120.0) == 2
+        assert {session.run_id for session in registry.list_sessions()} == {
+            watched_run.id
+        }
+        assert registry.session_counts() == {"resident": 1, "hibernated": 2}
+        repository = RunEngineStateRepository(db_session)
+        assert repository.list_recoverable_run_ids(include_hibernated=False) == [
+            watched_run.id
+        ]
+
+        # A caller still holding the evicted session cannot apply commands to it.
+        result = unwatched_session.apply_command(
+            command_id="late-command",
+            command_type="SET_SIMULATION_SPEED",
+            payload={"sim_rate": 4},
+        )
+        assert result["rejected"] == [
+            ("late-command", "runtime session is hibernated; retry")
+        ]
+
+        rehydrated = registry.recover(paused_run)
+        assert rehydrated is not paused_session
+        assert rehydrated.runtime_status == "paused"
+        assert rehydrated.simulation.clock.now_seconds == paused_seconds
+        assert registry.recover(unwatched_run).runtime_status == "running"
+        assert registry.session_counts() == {"resident": 3, "hibernated": 0}
+        broadcast_hub.unsubscribe(subscriber)
+    finally:
+        registry.shutdown()
+
+
+def test_cpu_budget_rejects_starts_and_slows_the_most_expensive_runs(db_session):
+    # Long ticks: each session ticks once, then keeps the work set below.
+    registry = SessionRegistry(
+        update_interval_seconds=30.0, cpu_budget=0.5, admission_wait_seconds=0.0
+    )
+    try:
+        registry.admit(None)
+        _, cheap = _start_live_run(db_session, registry, "Cheap")
+        costly_run, costly = _start_live_run(db_session, registry, "Costly")
+        deadline = time.monotonic() + 2.0
+        while cheap.tick_work_seconds is None or costly.tick_work_seconds is None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        cheap.tick_work_seconds = 3.0
+        costly.tick_work_seconds = 30.0
+
+        assert registry.rebalance_load() == 1
+        assert cheap.tick_interval_scale == 1.0
+        assert costly.tick_interval_scale > 1.0
+        assert cheap.cpu_load() + costly.cpu_load() == pytest.approx(0.5)
+        with pytest.raises(RunAdmissionRejected):
+            registry.admit(None)
+        report = registry.load_report()
+        assert report["running"] == 2
+        assert report["degraded"] == 1
+        assert report["admissions_rejected"] == 1
+
+        registry.pause(costly_run.id)
+        assert registry.rebalance_load() == 0
+        assert costly.tick_interval_scale == 1.0
+        registry.admit(None)
+    finally:
+        registry.shutdown()
+
+
+def _synthetic_snapshot(frame: int, aircraft_count: int) -> dict:
+    time_seconds = frame * 0.25
+    aircraft = []
+    for index in range(aircraft_count):
+        if index == 0 and frame >= 1200:
+            continue  # lands halfway through
+        aircraft.append(
+            {
+                "id": f"AC{index:03d}",
+                "callsign": f"NVR{index:03d}",
+                "route_id": "UL602",
+                "position_dd": [
+                    33.0 + index * 0.01 + time_seconds * 0.00012,
+                    -41.0 + time_seconds * 0.00009 * (1 + index % 3),
+                ],
+                "speed_kt": 420.0 + index,
+                "flight_level": 350 if frame < 600 else 340,
+                "altitude_ft": max(35000.0 - max(frame - 600, 0) * 4.2, 34000.0),
+                "vertical_rate_fpm": -1000.0 if 600 <= frame < 838 else 0.0,
+                "heading_deg": 45.0 + index,
+                "status": "active",
+                "updated_utc": f"t{frame}",
+            }
+        )
+    return {
+        "runtime_status": "running",
+        "sim_rate": 1.0,
+        "updated_utc": f"t{frame}",
+        "time_seconds": time_seconds,
+        "aircraft": aircraft,
+        "metrics": {"aircraft_count": len(aircraft)},
+    }
+
+
+def test_timeline_segments_reconstruct_any_frame_within_the_storage_bound():
+    # 10 simulated minutes of 50 aircraft at the default 4 Hz publish rate,
+    # in 30-second segments.
+    segments = []
+    builder = None
+    for frame in range(2400):
+        snapshot = _synthetic_snapshot(frame, 50)
+        if frame % 120 == 0:
+            if builder is not None:
+                segments.append(builder.encode())
+            builder = SegmentBuilder(snapshot)
+        else:
+            builder.append(snapshot)
+    segments.append(builder.encode())
+    assert sum(len(payload) for payload in segments) < 1_000_000
+
+    for frame in (0, 5, 119, 600, 1201, 2399):
+        document = decode_segment(segments[frame // 120])
+        expected = _synthetic_snapshot(frame, 50)
+        state = state_at(document, expected["time_seconds"] + 0.1)
+        assert state["time_seconds"] == expected["time_seconds"]
+        assert state["updated_utc"] == expected["updated_utc"]
+        assert state["metrics"] == expected["metrics"]
+        assert [item["id"] for item in state["aircraft"]] == [
+            item["id"] for item in expected["aircraft"]
+        ]
+        for item, expected_item in zip(state["aircraft"], expected["aircraft"]):
+            assert item["flight_level"] == expected_item["flight_level"]
+            assert item["updated_utc"] == expected_item["updated_utc"]
+            for axis in range(2):
+                assert abs(item["position_dd"][axis] - expected_item["position_dd"][axis]) <= 1e-6
+            assert abs(item["altitude_ft"] - expected_item["altitude_ft"]) <= 0.05
+    assert state_at(decode_segment(segments[1]), 29.9) is None
+
+
+def test_copied_open_segment_documents_are_unaffected_by_later_frames():
+    builder = SegmentBuilder(_synthetic_snapshot(0, 3))
+    builder.append(_synthetic_snapshot(1, 3))
+    document = builder.copy_document()
+    for frame in range(2, 5):
+        builder.append(_synthetic_snapshot(frame, 3))
+
+    assert document["times"] == [0.25]
+    assert all(len(values) == 1 for column in document["columns"] for values in column)
+    assert [frame["time_seconds"] for frame in segment_frames(document)] == [0.0, 0.25]
+    assert state_at(document, 10.0)["updated_utc"] == "t1"
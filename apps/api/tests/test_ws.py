@@ -1,7 +1,7 @@
 import asyncio
+import json
 import threading
 import time
-from queue import Empty
 
 import pytest
 from fastapi import WebSocketDisconnect
@@ -12,20 +12,31 @@ from app.db.session import get_session_factory
 from app.schemas.runs import RunCreateRequest
 from app.schemas.scenarios import ScenarioCreateRequest
 from app.sessions import SessionRegistry
-from app.ws import BroadcastHub
+from app.ws import BroadcastHub, StreamOptions, negotiate_codec
+from app.ws.codec import PACKED_DEFLATE_SUBPROTOCOL, decode_packed
 
 SESSION_ID = "test-session-a"
 
 
 class FakeWebSocket:
-    def __init__(self, *, disconnect_after: int | None = None) -> None:
+    def __init__(
+        self,
+        *,
+        disconnect_after: int | None = None,
+        subprotocols: list[str] | None = None,
+    ) -> None:
         self.disconnect_after = disconnect_after
+        self.scope = {"subprotocols": subprotocols or []}
         self.accepted = False
+        self.subprotocol: str | None = None
         self.close_code: int | None = None
         self.messages: list[dict] = []
+        self.binary_frames: list[bytes] = []
+        self.incoming: list[str] = []
 
-    async def accept(self) -> None:
+    async def accept(self, subprotocol: str | None = None) -> None:
         self.accepted = True
+        self.subprotocol = subprotocol
 
     async def close(self, code: int) -> None:
         self.close_code = code
@@ -38,6 +49,18 @@ class FakeWebSocket:
         ):
             raise WebSocketDisconnect(code=1000)
 
+    async def send_text(self, payload: str) -> None:
+        await self.send_json(json.loads(payload))
+
+    async def send_bytes(self, payload: bytes) -> None:
+        self.binary_frames.append(payload)
+        await self.send_json(decode_packed(payload))
+
+    async def receive_text(self) -> str:
+        while not self.incoming:
+            await asyncio.sleep(0.01)
+        return self.incoming.pop(0)
+
     async def wait_until_accepted(self) -> None:
         async def _wait() -> None:
             while not self.accepted:
@@ -91,7 +114,7 @@ def test_broadcast_hub_publish_delivers_to_run_subscribers():
 
     hub.publish_state("run-123", {"runtime_status": "running"})
 
-    event = subscriber.queue.get_nowait()
+    event = hub.next_event(subscriber)
     assert event["type"] == "run_state.updated"
     assert event["run_id"] == "run-123"
     assert event["data"]["runtime_status"] == "running"
@@ -99,8 +122,223 @@ def test_broadcast_hub_publish_delivers_to_run_subscribers():
     hub.unsubscribe(subscriber)
     hub.publish_state("run-123", {"runtime_status": "stopped"})
 
-    with pytest.raises(Empty):
-        subscriber.queue.get_nowait()
+    assert hub.next_event(subscriber) is None
+
+
+def test_broadcast_hub_mailboxes_keep_newest_state_and_signal_event_overflow():
+    hub = BroadcastHub(queue_size=3)
+    slow = hub.subscribe("run-123")
+
+    for step in range(100):
+        hub.publish_state("run-123", {"runtime_status": "running", "step": step})
+    for command_id in range(5):
+        hub.publish_command_result("run-123", {"command_id": command_id})
+
+    metrics = hub.lag_metrics(slow)
+    assert metrics["states_conflated"] == 99
+    assert metrics["queued_events"] == 3
+    assert metrics["events_dropped"] == 2
+    assert metrics["lag_seconds"] > 0
+
+    events = []
+    while (event := hub.next_event(slow)) is not None:
+        events.append(event)
+        if len(events) == 2:
+            # Room again: the gap is marked before the new result.
+            hub.publish_command_result("run-123", {"command_id": 5})
+    assert [event["type"] for event in events] == [
+        "run_command.result",
+        "run_command.result",
+        "run_command.result",
+        "stream.overflow",
+        "run_command.result",
+        "run_state.updated",
+    ]
+    assert [event["data"].get("command_id") for event in events[:3]] == [0, 1, 2]
+    assert events[3]["data"] == {"dropped_events": 2}
+    assert events[4]["data"]["command_id"] == 5
+    assert events[5]["data"]["step"] == 99
+    assert hub.lag_metrics(slow)["lag_seconds"] == 0.0
+
+
+def _aircraft_state(aircraft_id: str) -> dict:
+    return {
+        "id": aircraft_id,
+        "callsign": f"CS{aircraft_id}",
+        "position_dd": [10.0, 20.0],
+        "radial_cross_track_nm": 0.4,
+    }
+
+
+def test_broadcast_hub_projects_once_per_option_set_and_conflates_capped_subscribers():
+    hub = BroadcastHub()
+    full = hub.subscribe("run-123")
+    map_options = StreamOptions.from_mapping(
+        {"fields": "position_dd", "separation": False, "summary": "false"}
+    )
+    map_a = hub.subscribe("run-123", map_options)
+    map_b = hub.subscribe("run-123", StreamOptions.from_mapping(map_options.as_dict()))
+    capped = hub.subscribe("run-123", StreamOptions(max_rate_hz=10.0))
+    state = {
+        "runtime_status": "running",
+        "aircraft": [_aircraft_state("AC1")],
+        "separation": {"standard": {}},
+        "summary": {"kind": "simulate"},
+    }
+
+    hub.publish_state("run-123", state)
+
+    assert hub.next_event(full)["data"] is state
+    projected = hub.next_event(map_a)
+    assert hub.next_event(map_b) is projected
+    assert projected["data"] == {
+        "runtime_status": "running",
+        "aircraft": [{"id": "AC1", "position_dd": [10.0, 20.0]}],
+    }
+    assert hub.next_event(capped)["data"] is state
+
+    # Within the cap only the newest state is kept, and handed out when due.
+    for status in ("paused", "running", "completed"):
+        hub.publish_state("run-123", {**state, "runtime_status": status})
+    assert hub.next_event(capped) is None
+    time.sleep(0.11)
+    assert hub.next_event(capped)["data"]["runtime_status"] == "completed"
+    assert hub.next_event(capped) is None
+
+    with pytest.raises(ValueError):
+        StreamOptions.from_mapping({"fields": ["id", "not_a_field"]})
+    with pytest.raises(ValueError):
+        StreamOptions.from_mapping({"max_rate_hz": 0})
+
+
+def test_broadcast_hub_filters_viewports_and_clusters_low_zoom_subscribers():
+    hub = BroadcastHub()
+    viewport = hub.subscribe(
+        "run-123", StreamOptions.from_mapping({"bbox": "9,19,11,21", "fields": "id"})
+    )
+    pacific = hub.subscribe(
+        "run-123", StreamOptions.from_mapping({"bbox": [-10, 170, 10, -170]})
+    )
+    overview = hub.subscribe("run-123", StreamOptions.from_mapping({"zoom": "3"}))
+    aircraft = [
+        {**_aircraft_state("AC1"), "position_dd": [10.0, 20.0]},
+        {**_aircraft_state("AC2"), "position_dd": [10.5, 20.5]},
+        {**_aircraft_state("AC3"), "position_dd": [40.0, 20.0]},
+        {**_aircraft_state("AC4"), "position_dd": [0.0, 179.5]},
+        {**_aircraft_state("AC5"), "position_dd": [0.0, -179.5]},
+    ]
+
+    hub.publish_state("run-123", {"runtime_status": "running", "aircraft": aircraft})
+
+    assert hub.next_event(viewport)["data"]["aircraft"] == [
+        {"id": "AC1"},
+        {"id": "AC2"},
+    ]
+    across_antimeridian = hub.next_event(pacific)["data"]["aircraft"]
+    assert [item["id"] for item in across_antimeridian] == ["AC4", "AC5"]
+    clustered = hub.next_event(overview)["data"]
+    assert [item["id"] for item in clustered["aircraft"]] == ["AC3", "AC4", "AC5"]
+    assert [(item["count"], item["position_dd"]) for item in clustered["clusters"]] == [
+        (2, [10.25, 20.25])
+    ]
+
+    with pytest.raises(ValueError):
+        StreamOptions.from_mapping({"bbox": "11,19,9,21"})
+    with pytest.raises(ValueError):
+        StreamOptions.from_mapping({"zoom": 30})
+
+
+def test_packed_frames_round_trip_and_are_encoded_once_per_codec():
+    hub = BroadcastHub()
+    aircraft = [
+        {
+            **_aircraft_state(f"AC{index}"),
+            "route_id": "R1",
+            "position_dd": [10.0 + index * 0.001234, 20.0 - index * 0.004321],
+            "flight_level": 300 + index % 5 * 10,
+            "speed_kt": 420.5,
+            "target_flight_level": None,
+        }
+        for index in range(200)
+    ]
+    event = {
+        "type": "run_state.updated",
+        "run_id": "run-123",
+        "emitted_at": "2026-10-19T00:00:00Z",
+        "data": {"runtime_status": "running", "aircraft": aircraft},
+    }
+    json_codec = negotiate_codec(["unknown"])
+    packed = negotiate_codec(["unknown", PACKED_DEFLATE_SUBPROTOCOL])
+
+    frame = hub.encode(event, packed)
+    assert hub.encode(event, packed) is frame
+    assert packed.subprotocol == PACKED_DEFLATE_SUBPROTOCOL
+    assert json_codec.subprotocol is None
+    assert len(frame) * 5 < len(hub.encode(event, json_codec).encode())
+
+    decoded = decode_packed(frame)
+    assert {key: decoded[key] for key in ("type", "run_id", "emitted_at")} == {
+        key: event[key] for key in ("type", "run_id", "emitted_at")
+    }
+    for original, restored in zip(aircraft, decoded["data"]["aircraft"], strict=True):
+        assert restored["position_dd"] == pytest.approx(original["position_dd"], abs=1e-5)
+        # Other floats travel as float32.
+        assert {
+            key: value for key, value in restored.items() if key != "position_dd"
+        } == pytest.approx(
+            {key: value for key, value in original.items() if key != "position_dd"}
+        )
+
+    with pytest.raises(ValueError):
+        decode_packed(b"not a frame")
+
+
+def test_stream_run_sends_packed_frames_when_negotiated(
+    db_session,
+    broadcast_hub,
+):
+    created_run = create_run_route(RunCreateRequest(name="Packed Run"), db_session, SESSION_ID)
+    session_registry = SessionRegistry(
+        update_interval_seconds=0.01,
+        broadcast_hub=broadcast_hub,
+    )
+    websocket = FakeWebSocket(
+        disconnect_after=2, subprotocols=["v2.unknown", PACKED_DEFLATE_SUBPROTOCOL]
+    )
+    session_factory = get_session_factory()
+
+    async def run_stream_flow() -> None:
+        stream_session = session_factory()
+        try:
+            await stream_run(
+                websocket,
+                created_run.id,
+                stream_session,
+                session_registry,
+                broadcast_hub,
+                SESSION_ID,
+                fields="callsign",
+            )
+        finally:
+            stream_session.close()
+
+    thread, outcome = start_async_in_thread(run_stream_flow)
+
+    try:
+        wait_until(lambda: len(websocket.messages) >= 1)
+        broadcast_hub.publish_state(
+            created_run.id,
+            {"runtime_status": "running", "aircraft": [_aircraft_state("AC1")]},
+        )
+        finish_async_thread(thread, outcome)
+    finally:
+        session_registry.shutdown()
+
+    assert websocket.subprotocol == PACKED_DEFLATE_SUBPROTOCOL
+    assert len(websocket.binary_frames) == 2
+    snapshot, update = websocket.messages
+    assert snapshot["type"] == "run_state.snapshot"
+    assert update["data"]["aircraft"] == [{"id": "AC1", "callsign": "CSAC1"}]
 
 
 def test_stream_run_closes_missing_run_with_4404(
@@ -267,3 +505,64 @@ def test_stream_run_sends_command_result_events(
     assert websocket.messages[1]["type"] == "run_command.result"
     assert websocket.messages[1]["data"]["command"]["run_id"] == created_run.id
     assert websocket.messages[1]["data"]["result"]["state"] == "queued"
+
+
+def test_stream_run_applies_connect_and_control_message_options(
+    db_session,
+    broadcast_hub,
+):
+    created_run = create_run_route(RunCreateRequest(name="Options Run"), db_session, SESSION_ID)
+    session_registry = SessionRegistry(
+        update_interval_seconds=0.01,
+        broadcast_hub=broadcast_hub,
+    )
+    websocket = FakeWebSocket(disconnect_after=4)
+    session_factory = get_session_factory()
+
+    async def run_stream_flow() -> None:
+        stream_session = session_factory()
+        try:
+            await stream_run(
+                websocket,
+                created_run.id,
+                stream_session,
+                session_registry,
+                broadcast_hub,
+                SESSION_ID,
+                fields="callsign",
+                summary=False,
+            )
+        finally:
+            stream_session.close()
+
+    thread, outcome = start_async_in_thread(run_stream_flow)
+
+    try:
+        wait_until(lambda: len(websocket.messages) >= 1)
+        state = {"runtime_status": "running", "aircraft": [_aircraft_state("AC1")]}
+        broadcast_hub.publish_state(created_run.id, {**state, "summary": {}})
+        wait_until(lambda: len(websocket.messages) >= 2)
+        websocket.incoming.append(
+            json.dumps({"type": "stream.options", "options": {"fields": ["bogus"]}})
+        )
+        websocket.incoming.append(
+            json.dumps(
+                {"type": "stream.options", "options": {"fields": ["position_dd"]}}
+            )
+        )
+        wait_until(lambda: len(websocket.messages) >= 4)
+        finish_async_thread(thread, outcome)
+    finally:
+        session_registry.shutdown()
+
+    snapshot, update, error, applied = websocket.messages
+    assert snapshot["type"] == "run_state.snapshot"
+    assert "summary" not in snapshot["data"]
+    assert update["data"] == {
+        "runtime_status": "running",
+        "aircraft": [{"id": "AC1", "callsign": "CSAC1"}],
+    }
+    assert error["type"] == "stream.error"
+    assert applied["type"] == "stream.options"
+    assert applied["data"]["fields"] == ["id", "position_dd"]
+    assert applied["data"]["summary"] is True
@@ -82,6 +82,7 @@ export interface RunResponse {
 
 export interface RunListResponse {
   items: RunResponse[];
+  next_cursor?: string | null;
 }
 
 export interface RunAircraftStateResponse {
@@ -113,6 +114,11 @@ export interface RunMetricsResponse {
   active_aircraft_count: number;
   finished_aircraft_count: number;
   pending_aircraft_count?: number;
+  steps_per_tick?: number;
+  tick_lag_seconds?: number;
+  tick_overruns?: number;
+  catch_up_steps?: number;
+  dropped_seconds?: number;
 }
 
 export interface RunSeparationViolationResponse {
@@ -142,7 +148,15 @@ export interface RunStateResponse {
   metrics: RunMetricsResponse;
 }
 
-export type RunStateStreamPayload = Omit<RunStateResponse, "run" | "source">;
+export interface RunAircraftClusterResponse {
+  id: string;
+  count: number;
+  position_dd: [number, number];
+}
+
+export type RunStateStreamPayload = Omit<RunStateResponse, "run" | "source"> & {
+  clusters?: RunAircraftClusterResponse[];
+};
 
 export interface RunTrajectoryTrackResponse {
   id: string;
@@ -216,7 +230,36 @@ export interface RunCommandResultEvent {
   data: RunCommandSubmissionResponse;
 }
 
+export interface RunStreamOptions {
+  fields: string[] | null;
+  max_rate_hz: number | null;
+  separation: boolean;
+  summary: boolean;
+  bbox: [number, number, number, number] | null;
+  zoom: number | null;
+}
+
+export interface RunStreamOptionsEvent {
+  type: "stream.options";
+  data: RunStreamOptions;
+}
+
+export interface RunStreamErrorEvent {
+  type: "stream.error";
+  detail: string;
+}
+
+export interface RunStreamOverflowEvent {
+  type: "stream.overflow";
+  run_id: string;
+  emitted_at: string;
+  data: { dropped_events: number };
+}
+
 export type RunStreamEvent =
   | RunStateSnapshotEvent
   | RunStateUpdatedEvent
-  | RunCommandResultEvent;
+  | RunCommandResultEvent
+  | RunStreamOptionsEvent
+  | RunStreamErrorEvent
+  | RunStreamOverflowEvent;
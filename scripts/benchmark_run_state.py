@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Benchmark the run state and trajectory response paths of the hosted API.
+
+Compares building the validated `RunStateResponse`/`RunTrajectoryResponse`
+models per request with the runtime session's pre-serialised JSON, both on
+the first request after a state change and on the requests that reuse it.
+Also reports the size and encoding cost of one `run_state.updated` stream
+event per WebSocket codec.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+API_ROOT = PROJECT_ROOT / "apps" / "api"
+for path in (PROJECT_ROOT, API_ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402 (after sys.path setup)
+
+from app.schemas.runs import (  # noqa: E402 (after sys.path setup)
+    RunStateResponse,
+    RunTrajectoryResponse,
+)
+from app.services.scenarios import (  # noqa: E402 (after sys.path setup)
+    resolve_scenario_contracts,
+)
+from app.sessions.runtime import (  # noqa: E402 (after sys.path setup)
+    SimulationRuntimeSession,
+)
+from app.ws import negotiate_codec  # noqa: E402 (after sys.path setup)
+from app.ws.codec import (  # noqa: E402 (after sys.path setup)
+    PACKED_DEFLATE_SUBPROTOCOL,
+    PACKED_SUBPROTOCOL,
+)
+
+RUN_ID = "benchmark-run"
+
+
+def build_session(num_aircraft: int) -> SimulationRuntimeSession:
+    scenario_airspace, scenario_aircraft = resolve_scenario_contracts(None)
+    route_ids = [route["id"] for route in scenario_airspace["data"]["routes"]]
+    template = scenario_aircraft["data"]["aircraft"][0]
+    aircraft = []
+    for idx in range(num_aircraft):
+        item = copy.deepcopy(template)
+        # One aircraft per route and level, so the fleet is not one huge
+        # cluster of separation losses.
+        item.update(
+            id=f"BENCH_{idx:04d}",
+            callsign=f"B{idx:04d}",
+            route_id=route_ids[idx % len(route_ids)],
+            flight_level=20 + (idx // len(route_ids)) * 10,
+        )
+        aircraft.append(item)
+    scenario_aircraft["data"]["aircraft"] = aircraft
+    runtime_session = SimulationRuntimeSession(
+        run_id=RUN_ID,
+        scenario_airspace=scenario_airspace,
+        scenario_aircraft=scenario_aircraft,
+        sim_rate=1.0,
+    )
+    runtime_session.fast_forward(5.0)
+    return runtime_session
+
+
+def _model_state(runtime_session: SimulationRuntimeSession, run) -> bytes:
+    state = RunStateResponse(
+        run=run, source="runtime_session", **runtime_session.state_snapshot()
+    )
+    return json.dumps(jsonable_encoder(state), separators=(",", ":")).encode()
+
+
+def _model_trajectory(runtime_session: SimulationRuntimeSession, run) -> bytes:
+    trajectory = RunTrajectoryResponse(
+        run_id=RUN_ID, **runtime_session.trajectory_snapshot()
+    )
+    return json.dumps(jsonable_encoder(trajectory), separators=(",", ":")).encode()
+
+
+def _timed(label: str, iterations: int, request) -> dict:
+    size = len(request())
+    start = time.perf_counter()
+    for _ in range(iterations):
+        request()
+    elapsed = time.perf_counter() - start
+    return {
+        "path": label,
+        "mean_ms": (elapsed / iterations) * 1000.0 if iterations else 0.0,
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--aircraft", type=int, default=500, help="Aircraft count.")
+    parser.add_argument(
+        "--iterations", type=int, default=50, help="Requests per measured path."
+    )
+    args = parser.parse_args()
+    logging.getLogger("airspacesim").setLevel(logging.INFO)
+
+    runtime_session = build_session(args.aircraft)
+    now = "2026-01-01T00:00:00Z"
+    run = {
+        "id": RUN_ID,
+        "scenario_id": None,
+        "name": "benchmark",
+        "status": "running",
+        "sim_rate": 1.0,
+        "created_at": now,
+        "updated_at": now,
+        "started_at": now,
+        "ended_at": None,
+    }
+
+    def changed_state() -> SimulationRuntimeSession:
+        # What a tick does to the cache: the next request re-serialises.
+        runtime_session.state_version += 1
+        return runtime_session
+
+    results = {
+        "state": [
+            _timed(
+                "validated model",
+                args.iterations,
+                lambda: _model_state(runtime_session, run),
+            ),
+            _timed(
+                "pre-serialised, new version",
+                args.iterations,
+                lambda: changed_state().state_json(),
+            ),
+            _timed(
+                "pre-serialised, cached",
+                args.iterations,
+                runtime_session.state_json,
+            ),
+        ],
+        "trajectory": [
+            _timed(
+                "validated model",
+                args.iterations,
+                lambda: _model_trajectory(runtime_session, run),
+            ),
+            _timed(
+                "pre-serialised, new version",
+                args.iterations,
+                lambda: changed_state().trajectory_json(),
+            ),
+            _timed(
+                "pre-serialised, cached",
+                args.iterations,
+                runtime_session.trajectory_json,
+            ),
+        ],
+        "stream event": [],
+    }
+    event = {
+        "type": "run_state.updated",
+        "run_id": RUN_ID,
+        "emitted_at": now,
+        "data": runtime_session.state_snapshot(),
+    }
+    for subprotocol in (None, PACKED_SUBPROTOCOL, PACKED_DEFLATE_SUBPROTOCOL):
+        codec = negotiate_codec([subprotocol] if subprotocol else [])
+        results["stream event"].append(
+            _timed(
+                codec.name,
+                args.iterations,
+                lambda codec=codec: codec.encode(event),
+            )
+        )
+
+    print(f"Aircraft: {len(json.loads(runtime_session.state_json())['aircraft'])}")
+    for endpoint, rows in results.items():
+        print(f"\n{endpoint}:")
+        for row in rows:
+            print(f"- {row['path']}: {row['mean_ms']:.3f} ms ({row['bytes']} bytes)")
+
+
+if __name__ == "__main__":
+    main()
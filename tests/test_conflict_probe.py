@@ -0,0 +1,151 @@
+"""Short-term conflict probe: CPA prediction, event semantics, broad phase."""
+
+import random
+
+import pytest
+
+from airspacesim.core import ConflictProbe, SeparationStandard, Simulation
+from airspacesim.io.contracts import build_envelope
+
+
+def _state(aircraft_id, lat, lon, heading_deg, *, speed_kt=450.0, fl=330, **extra):
+    return {
+        "id": aircraft_id,
+        "position_dd": [lat, lon],
+        "flight_level": fl,
+        "speed_kt": speed_kt,
+        "heading_deg": heading_deg,
+        "vertical_rate_fpm": 0.0,
+        **extra,
+    }
+
+
+def _head_on(separation_nm=40.0, **second_extra):
+    # Same latitude, opposite headings; 1 degree of longitude at the equator is 60 NM.
+    return [
+        _state("A", 0.0, 0.0, 90.0),
+        _state("B", 0.0, separation_nm / 60.0, 270.0, **second_extra),
+    ]
+
+
+def test_head_on_pair_is_predicted_with_time_to_loss():
+    probe = ConflictProbe(look_ahead_seconds=180.0)
+    predictions = probe.probe(_head_on())
+
+    prediction = predictions[("A", "B")]
+    # Closing at 900 kt (0.25 NM/s): 30 NM to the 10 NM minimum, 40 NM to CPA.
+    assert prediction["time_to_loss_seconds"] == pytest.approx(120.0, abs=0.5)
+    assert prediction["time_to_cpa_seconds"] == pytest.approx(160.0, abs=0.5)
+    assert prediction["cpa_horizontal_nm"] == pytest.approx(0.0, abs=0.05)
+    assert prediction["cpa_vertical_ft"] == 0.0
+
+
+def test_conflict_beyond_look_ahead_is_not_predicted():
+    probe = ConflictProbe(look_ahead_seconds=60.0)
+    assert probe.probe(_head_on()) == {}
+
+
+def test_vertically_separated_pair_is_only_predicted_when_descending_into_it():
+    probe = ConflictProbe(look_ahead_seconds=180.0)
+    assert probe.probe(_head_on(fl=350)) == {}
+
+    descending = _head_on(fl=350, vertical_rate_fpm=-2000.0, target_flight_level=330)
+    prediction = probe.probe(descending)[("A", "B")]
+    # Inside 1000 ft after 30 s of descent, but horizontally only from t=120 s.
+    assert prediction["time_to_loss_seconds"] == pytest.approx(120.0, abs=0.5)
+
+    levelling_off = _head_on(fl=350, vertical_rate_fpm=-2000.0, target_flight_level=340)
+    assert probe.probe(levelling_off) == {}
+
+
+def test_predicted_and_cleared_events_follow_one_encounter():
+    probe = ConflictProbe(look_ahead_seconds=180.0, probe_interval_seconds=1.0)
+
+    started = probe.update(_head_on(), 0.0)
+    assert [event.type for event in started] == ["conflict_predicted"]
+    assert started[0].payload["pair"] == ["A", "B"]
+    assert probe.update(_head_on(), 0.5) == []  # inside the probe interval
+    assert probe.update(_head_on(35.0), 5.0) == []  # same encounter continues
+    assert probe.predicted_conflicts()[0]["predicted_at_seconds"] == 0.0
+
+    diverging = [
+        _state("A", 0.0, 0.0, 270.0),
+        _state("B", 0.0, 35.0 / 60.0, 90.0),
+    ]
+    cleared = probe.update(diverging, 6.0)
+    assert [event.type for event in cleared] == ["conflict_cleared"]
+    assert cleared[0].payload == {"pair": ["A", "B"], "predicted_at_seconds": 0.0}
+    assert probe.as_dict()["conflict_prediction_count"] == 1
+    assert probe.predicted_conflicts() == []
+
+
+def test_grid_broad_phase_matches_exhaustive_pairs():
+    rng = random.Random(1234)
+    states = [
+        _state(
+            f"AC{idx:03d}",
+            rng.uniform(-0.7, 0.7),
+            rng.uniform(-1.0, 1.0),
+            rng.uniform(0.0, 360.0),
+            speed_kt=rng.uniform(250.0, 500.0),
+            fl=rng.choice([300, 310, 320, 330]),
+        )
+        for idx in range(60)
+    ]
+    probe = ConflictProbe(look_ahead_seconds=120.0)
+
+    predicted = set(probe.probe(states))
+    exhaustive = set()
+    for i in range(len(states)):
+        for j in range(i + 1, len(states)):
+            exhaustive |= set(probe.probe([states[i], states[j]]))
+
+    assert predicted
+    assert predicted == exhaustive
+    assert probe.candidate_pairs_evaluated < len(states) * (len(states) - 1) // 2
+
+
+def test_simulation_predicts_crossing_conflict_before_loss():
+    airspace = build_envelope(
+        schema_name="airspacesim.scenario_airspace",
+        source="tests.conflict_probe",
+        data={
+            "reference": {"datum": "WGS84", "earth_model": "spherical", "nm_to_m": 1852},
+            "points": {
+                "W1": {"type": "fix", "name": "W1", "coord": {"dd": [10.0, 0.0]}},
+                "E1": {"type": "fix", "name": "E1", "coord": {"dd": [11.0, 1.0]}},
+                "N1": {"type": "fix", "name": "N1", "coord": {"dd": [11.0, 0.0]}},
+                "S1": {"type": "fix", "name": "S1", "coord": {"dd": [10.0, 1.0]}},
+            },
+            "routes": [
+                {"id": "X1", "waypoint_ids": ["W1", "E1"]},
+                {"id": "X2", "waypoint_ids": ["N1", "S1"]},
+            ],
+            "airspaces": [],
+        },
+    )
+    aircraft = build_envelope(
+        schema_name="airspacesim.scenario_aircraft",
+        source="tests.conflict_probe",
+        data={
+            "aircraft": [
+                {"id": "NVR231", "route_id": "X1", "speed_kt": 460, "flight_level": 330},
+                {"id": "SKL842", "route_id": "X2", "speed_kt": 430, "flight_level": 330},
+            ]
+        },
+    )
+    simulation = Simulation.from_contracts(
+        airspace,
+        aircraft,
+        conflict_probe=ConflictProbe(SeparationStandard(), look_ahead_seconds=120.0),
+    )
+    for _ in range(120):
+        simulation.step(30.0)
+
+    events = simulation.drain_events()
+    types = [event.type for event in events]
+    assert types.count("conflict_predicted") == 1
+    assert types.count("conflict_cleared") == 1
+    assert types.index("conflict_predicted") < types.index("separation_loss_started")
+    assert simulation.snapshot()["conflicts"]["conflict_prediction_count"] == 1
+
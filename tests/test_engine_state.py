@@ -0,0 +1,130 @@
+"""Engine save/load: lossless, versioned, and deterministic after restore."""
+
+import zlib
+
+import pytest
+
+from airspacesim.core import Simulation
+from airspacesim.core.persistence import STATE_MAGIC, pack_floats, unpack_floats
+from airspacesim.io.contracts import build_envelope
+
+FIXED_UTC = "2026-01-01T00:00:00Z"
+
+
+def _simulation():
+    airspace = build_envelope(
+        schema_name="airspacesim.scenario_airspace",
+        source="tests.engine_state",
+        data={
+            "reference": {"datum": "WGS84", "earth_model": "spherical", "nm_to_m": 1852},
+            "points": {
+                "W1": {"type": "fix", "name": "W1", "coord": {"dd": [10.0, 0.0]}},
+                "E1": {"type": "fix", "name": "E1", "coord": {"dd": [11.0, 1.0]}},
+                "N1": {"type": "fix", "name": "N1", "coord": {"dd": [11.0, 0.0]}},
+                "S1": {"type": "fix", "name": "S1", "coord": {"dd": [10.0, 1.0]}},
+                "M1": {"type": "fix", "name": "M1", "coord": {"dd": [10.5, 0.2]}},
+            },
+            "routes": [
+                {"id": "X1", "waypoint_ids": ["W1", "M1", "E1"]},
+                {"id": "X2", "waypoint_ids": ["N1", "S1"]},
+            ],
+            "airspaces": [],
+        },
+    )
+    aircraft = build_envelope(
+        schema_name="airspacesim.scenario_aircraft",
+        source="tests.engine_state",
+        data={
+            "aircraft": [
+                {"id": "NVR231", "route_id": "X1", "speed_kt": 460, "flight_level": 330},
+                {"id": "SKL842", "route_id": "X2", "speed_kt": 430, "flight_level": 330},
+                {
+                    "id": "LATE01",
+                    "route_id": "X2",
+                    "speed_kt": 420,
+                    "flight_level": 350,
+                    "appear_after_seconds": 600,
+                },
+            ],
+            "scheduled_commands": [
+                {
+                    "event_id": "s1",
+                    "type": "SET_FL",
+                    "time_seconds": 900,
+                    "payload": {"aircraft_id": "LATE01", "flight_level": 310},
+                }
+            ],
+        },
+    )
+    return Simulation.from_contracts(airspace, aircraft)
+
+
+def _advance(simulation, steps, step_seconds=30.0):
+    events = []
+    for _ in range(steps):
+        simulation.step(step_seconds)
+        events.extend(event.as_dict() for event in simulation.drain_events())
+    return events
+
+
+def test_load_then_save_reproduces_the_blob():
+    simulation = _simulation()
+    _advance(simulation, 10)
+    simulation.step(30.0)  # leave undrained events in the state
+
+    blob = simulation.save_state()
+    assert blob.startswith(STATE_MAGIC)
+    assert Simulation.load_state(blob).save_state() == blob
+
+
+def test_restored_simulation_continues_identically():
+    original = _simulation()
+    _advance(original, 11)  # inside the encounter, late entry still pending
+    assert original.monitor.active_violations()
+    assert len(original.scheduler) == 2
+
+    restored = Simulation.load_state(original.save_state())
+    assert restored.snapshot(FIXED_UTC) == original.snapshot(FIXED_UTC)
+
+    original_events = _advance(original, 60)
+    restored_events = _advance(restored, 60)
+    assert restored_events == original_events
+    assert {event["type"] for event in restored_events} >= {
+        "aircraft_entered",
+        "separation_loss_ended",
+        "command_applied",
+        "simulation_completed",
+    }
+    assert restored.snapshot(FIXED_UTC) == original.snapshot(FIXED_UTC)
+    assert restored.summary() == original.summary()
+
+
+def test_load_rejects_foreign_or_newer_blobs():
+    blob = _simulation().save_state()
+    header = len(STATE_MAGIC)
+
+    with pytest.raises(ValueError, match="Not an AirSpaceSim"):
+        Simulation.load_state(b"PK\x03\x04" + blob[4:])
+    with pytest.raises(ValueError, match="version 99"):
+        Simulation.load_state(STATE_MAGIC + b"\x00\x63" + blob[header + 2 :])
+    with pytest.raises(ValueError, match="Truncated"):
+        Simulation.load_state(STATE_MAGIC)
+    with pytest.raises(ValueError, match="Corrupt"):
+        Simulation.load_state(blob[: header + 2] + zlib.compress(b"not json"))
+
+
+def test_packed_floats_round_trip_exactly():
+    values = [0.0, -1.5, 1e-300, 33.123456789012345, float(2**53)]
+    assert unpack_floats(pack_floats(values)) == values
+
+
+def test_state_digest_tracks_observable_state():
+    original = _simulation()
+    _advance(original, 11)
+    restored = Simulation.load_state(original.save_state())
+    assert restored.state_digest() == original.state_digest()
+
+    restored.step(30.0)
+    assert restored.state_digest() != original.state_digest()
+    original.step(30.0)
+    assert restored.state_digest() == original.state_digest()
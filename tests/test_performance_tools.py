@@ -1,4 +1,5 @@
 from airspacesim.simulation.performance import (
+    benchmark_conflict_probe,
     benchmark_json_write_path,
     benchmark_update_loop,
 )
@@ -30,3 +31,11 @@ def test_benchmark_json_write_path_returns_metrics(tmp_path):
     finally:
         settings.AIRCRAFT_FILE = original_aircraft_file
         settings.AIRCRAFT_STATE_FILE = original_aircraft_state_file
+
+
+def test_benchmark_conflict_probe_returns_metrics():
+    metrics = benchmark_conflict_probe(num_aircraft=50, num_probes=2)
+    assert metrics["num_aircraft"] == 50
+    assert metrics["num_probes"] == 2
+    assert metrics["mean_probe_ms"] >= 0
+    assert metrics["candidate_pairs_per_probe"] >= 0
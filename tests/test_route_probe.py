@@ -0,0 +1,146 @@
+"""Route-aware medium-term conflict probe: projection, caching, index."""
+
+import random
+
+from airspacesim.core import ConflictProbe, RouteConflictProbe, Simulation
+from airspacesim.core.route_probe import IntervalTree
+from airspacesim.io.contracts import build_envelope
+
+
+def _route_state(aircraft_id, waypoints, *, current_index=0, fl=330, speed_kt=450.0):
+    return {
+        "id": aircraft_id,
+        "position_dd": list(waypoints[current_index]),
+        "flight_level": fl,
+        "speed_kt": speed_kt,
+        "heading_deg": 90.0,
+        "vertical_rate_fpm": 0.0,
+        "waypoints": waypoints,
+        "current_index": current_index,
+        "lateral_mode": "route",
+    }
+
+
+# A flies east, then turns north at (0, 0.5); B flies south through (0.5, 0.5)
+# so the two only meet on A's second leg.
+TURNING = [[0.0, 0.0], [0.0, 0.5], [1.0, 0.5]]
+SOUTHBOUND = [[1.5, 0.5], [-0.5, 0.5]]
+
+
+def test_interval_tree_matches_linear_scan():
+    rng = random.Random(7)
+    items = []
+    for value in range(300):
+        start = rng.uniform(0.0, 1000.0)
+        items.append((start, start + rng.uniform(0.0, 80.0), value))
+    tree = IntervalTree(items)
+
+    for _ in range(100):
+        low = rng.uniform(-50.0, 1050.0)
+        high = low + rng.uniform(0.0, 60.0)
+        expected = {value for start, end, value in items if start <= high and end >= low}
+        assert set(tree.overlapping(low, high)) == expected
+    assert IntervalTree([]).overlapping(0.0, 1.0) == []
+
+
+def test_conflict_after_a_turn_is_predicted_only_by_the_route_probe():
+    states = [
+        _route_state("A", TURNING),
+        _route_state("B", SOUTHBOUND, speed_kt=450.0),
+    ]
+    # Straight-line extrapolation keeps A flying east, away from B's track.
+    assert ConflictProbe(look_ahead_seconds=1200.0).probe(states) == {}
+
+    probe = RouteConflictProbe(horizon_seconds=1200.0)
+    prediction = probe.probe(states, 0.0)[("A", "B")]
+    # A reaches the turn after 30 NM (240 s) and meets B near (0.5, 0.5)
+    # 30 NM later; B covers its 60 NM in the same 480 s.
+    assert 300.0 < prediction["loss_at_seconds"] < 480.0
+    assert prediction["min_horizontal_nm"] < 1.0
+
+
+def test_levelled_pair_is_not_predicted():
+    states = [
+        _route_state("A", TURNING, fl=330),
+        _route_state("B", SOUTHBOUND, fl=350),
+    ]
+    assert RouteConflictProbe().probe(states, 0.0) == {}
+
+
+def test_plans_are_cached_until_invalidated_or_changed():
+    probe = RouteConflictProbe(horizon_seconds=1200.0, probe_interval_seconds=0.0)
+    states = [_route_state("A", TURNING), _route_state("B", SOUTHBOUND)]
+    probe.update(states, 0.0)
+    assert probe.plans_built == 2
+
+    probe.update(states, 10.0)
+    assert probe.plans_built == 2
+
+    probe.invalidate("A")
+    probe.update(states, 20.0)
+    assert probe.plans_built == 3
+
+    states[1]["speed_kt"] = 300.0
+    probe.update(states, 30.0)
+    assert probe.plans_built == 4
+
+    probe.update(states, 630.0)  # half the horizon since the last plans
+    assert probe.plans_built == 6
+
+
+def test_route_conflict_events_and_resolution_in_simulation():
+    airspace = build_envelope(
+        schema_name="airspacesim.scenario_airspace",
+        source="tests.route_probe",
+        data={
+            "reference": {"datum": "WGS84", "earth_model": "spherical", "nm_to_m": 1852},
+            "points": {
+                "A0": {"type": "fix", "name": "A0", "coord": {"dd": TURNING[0]}},
+                "A1": {"type": "fix", "name": "A1", "coord": {"dd": TURNING[1]}},
+                "A2": {"type": "fix", "name": "A2", "coord": {"dd": TURNING[2]}},
+                "B0": {"type": "fix", "name": "B0", "coord": {"dd": SOUTHBOUND[0]}},
+                "B1": {"type": "fix", "name": "B1", "coord": {"dd": SOUTHBOUND[1]}},
+            },
+            "routes": [
+                {"id": "TURN", "waypoint_ids": ["A0", "A1", "A2"]},
+                {"id": "SOUTH", "waypoint_ids": ["B0", "B1"]},
+            ],
+            "airspaces": [],
+        },
+    )
+    aircraft = build_envelope(
+        schema_name="airspacesim.scenario_aircraft",
+        source="tests.route_probe",
+        data={
+            "aircraft": [
+                {"id": "A", "route_id": "TURN", "speed_kt": 450, "flight_level": 330},
+                {"id": "B", "route_id": "SOUTH", "speed_kt": 450, "flight_level": 330},
+            ]
+        },
+    )
+    simulation = Simulation.from_contracts(airspace, aircraft)
+    simulation.step(10.0)
+    predicted = [
+        event
+        for event in simulation.drain_events()
+        if event.type == "route_conflict_predicted"
+    ]
+    assert [event.payload["pair"] for event in predicted] == [["A", "B"]]
+    assert simulation.snapshot()["route_conflicts"]["predicted_conflicts"][0][
+        "pair"
+    ] == ["A", "B"]
+
+    simulation.issue_command(
+        {
+            "event_id": "c1",
+            "type": "SET_FL",
+            "payload": {"aircraft_id": "A", "flight_level": 290},
+        }
+    )
+    simulation.step(10.0)
+    types = [event.type for event in simulation.drain_events()]
+    assert "route_conflict_cleared" in types
+
+    for _ in range(120):
+        simulation.step(10.0)
+    assert simulation.summary()["loss_of_separation_count"] == 0
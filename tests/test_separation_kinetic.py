@@ -0,0 +1,193 @@
+"""Kinetic separation pruning must be indistinguishable from all-pairs checks.
+
+Every bundled airspace-package scenario is run twice — once with the default
+kinetic `SeparationMonitor` and once with `kinetic=False` — under identical
+steps and scripted commands, and the drained engine event streams must match.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from airspacesim.core import SeparationMonitor, SeparationStandard, Simulation
+from airspacesim.io import build_envelope, normalize_scenario_airspace_payload
+
+AIRSPACES_DIR = Path(__file__).resolve().parents[1] / "airspaces"
+SCENARIO_PATHS = sorted(AIRSPACES_DIR.glob("*/scenarios/*.v1.json"))
+
+
+def _load_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _contracts(template_path):
+    package_dir = template_path.parents[1]
+    manifest = _load_json(package_dir / "package.v1.json")
+    template = _load_json(template_path)
+
+    airspace = normalize_scenario_airspace_payload(
+        _load_json(package_dir / manifest["airspace_file"])
+    )
+    existing_route_ids = {route.get("id") for route in airspace["data"]["routes"]}
+    for route in template.get("airspace", {}).get("extra_routes", []):
+        if route.get("id") not in existing_route_ids:
+            airspace["data"]["routes"].append(route)
+
+    aircraft = []
+    for item in template["aircraft"]:
+        aircraft_id = item.get("aircraft_id") or item.get("id")
+        aircraft.append(
+            {
+                "id": aircraft_id,
+                "callsign": item.get("callsign") or aircraft_id,
+                "aircraft_type": item.get("aircraft_type") or "B737",
+                "route_id": item["route_id"],
+                "speed_kt": float(item.get("speed_kt", 420)),
+                "flight_level": int(item.get("flight_level", 350)),
+                "appear_after_seconds": float(item.get("appear_after_seconds", 0)),
+            }
+        )
+    return airspace, build_envelope(
+        schema_name="airspacesim.scenario_aircraft",
+        source="tests.separation_kinetic",
+        data={"aircraft": aircraft},
+    )
+
+
+def _scripted_commands(aircraft_ids):
+    first, last = aircraft_ids[0], aircraft_ids[-1]
+    return [
+        {
+            "event_id": "k-speed",
+            "type": "SET_SPEED",
+            "time_seconds": 120,
+            "payload": {"aircraft_id": first, "speed_kt": 300},
+        },
+        {
+            "event_id": "k-level",
+            "type": "SET_FL",
+            "time_seconds": 240,
+            "payload": {"aircraft_id": last, "flight_level": 250},
+        },
+        {
+            "event_id": "k-heading",
+            "type": "ASSIGN_HEADING",
+            "time_seconds": 360,
+            "payload": {"aircraft_id": first, "heading_deg": 90},
+        },
+        {
+            "event_id": "k-resume",
+            "type": "RESUME_ROUTE",
+            "time_seconds": 600,
+            "payload": {"aircraft_id": first},
+        },
+    ]
+
+
+def _run(template_path, *, kinetic, step_seconds=15.0, max_seconds=1500.0):
+    airspace, aircraft = _contracts(template_path)
+    simulation = Simulation.from_contracts(airspace, aircraft)
+    simulation.monitor = SeparationMonitor(SeparationStandard(), kinetic=kinetic)
+    ids = [item["id"] for item in aircraft["data"]["aircraft"]]
+    for command in _scripted_commands(ids):
+        simulation.schedule_command(command)
+
+    events = []
+    elapsed = 0.0
+    while elapsed < max_seconds and simulation.status != Simulation.STATUS_COMPLETED:
+        simulation.step(step_seconds)
+        elapsed += step_seconds
+        events.extend(
+            (event.type, event.time_seconds, event.payload)
+            for event in simulation.drain_events()
+        )
+    return events, simulation.monitor
+
+
+@pytest.mark.parametrize(
+    "template_path",
+    SCENARIO_PATHS,
+    ids=[f"{path.parents[1].name}/{path.name}" for path in SCENARIO_PATHS],
+)
+def test_kinetic_monitor_matches_brute_force_event_stream(template_path):
+    kinetic_events, kinetic_monitor = _run(template_path, kinetic=True)
+    brute_events, brute_monitor = _run(template_path, kinetic=False)
+
+    assert kinetic_events == brute_events
+    assert kinetic_monitor.pair_checks <= brute_monitor.pair_checks
+
+
+def test_bundled_scenarios_are_discovered():
+    assert len(SCENARIO_PATHS) >= 2
+
+
+def test_kinetic_monitor_skips_pairs_that_cannot_close_in_time():
+    def state(aircraft_id, lon, speed_kt=450.0):
+        return {
+            "id": aircraft_id,
+            "position_dd": [0.0, lon],
+            "flight_level": 330,
+            "speed_kt": speed_kt,
+            "vertical_rate_fpm": 0.0,
+        }
+
+    monitor = SeparationMonitor()
+    far_apart = [state("A", 0.0), state("B", 5.0)]  # ~300 NM
+    monitor.update(far_apart, 0.0)
+    assert monitor.pair_checks == 1
+    for tick in range(1, 60):
+        monitor.update(far_apart, float(tick))
+    assert monitor.pair_checks == 1
+
+    monitor.invalidate("A")
+    monitor.update(far_apart, 60.0)
+    assert monitor.pair_checks == 2
+
+
+def test_kinetic_monitor_rechecks_after_speed_change():
+    def state(aircraft_id, lon, speed_kt):
+        return {
+            "id": aircraft_id,
+            "position_dd": [0.0, lon],
+            "flight_level": 330,
+            "speed_kt": speed_kt,
+            "vertical_rate_fpm": 0.0,
+        }
+
+    monitor = SeparationMonitor()
+    monitor.update([state("A", 0.0, 0.0), state("B", 1.0, 0.0)], 0.0)
+    monitor.update([state("A", 0.0, 0.0), state("B", 1.0, 0.0)], 1.0)
+    assert monitor.pair_checks == 1
+
+    monitor.update([state("A", 0.0, 450.0), state("B", 1.0, 0.0)], 2.0)
+    assert monitor.pair_checks == 2
+
+
+def test_next_check_seconds_is_the_earliest_parked_breach_bound():
+    def state(aircraft_id, lon, speed_kt=450.0):
+        return {
+            "id": aircraft_id,
+            "position_dd": [0.0, lon],
+            "flight_level": 330,
+            "speed_kt": speed_kt,
+            "vertical_rate_fpm": 0.0,
+        }
+
+    kinematics = {"A": (450.0, 0.0), "B": (450.0, 0.0)}
+    monitor = SeparationMonitor()
+    assert monitor.next_check_seconds(kinematics) is None
+
+    far_apart = [state("A", 0.0), state("B", 5.0)]
+    monitor.update(far_apart, 10.0)
+    next_check = monitor.next_check_seconds(kinematics)
+    horizontal_nm = 5.0 * 60.0  # roughly, on the equator
+    assert 10.0 < next_check < 10.0 + horizontal_nm / (900.0 / 3600.0)
+    # New speeds or an invalidated aircraft void the bound until re-measured.
+    assert monitor.next_check_seconds({**kinematics, "A": (500.0, 0.0)}) is None
+    monitor.invalidate("A")
+    assert monitor.next_check_seconds(kinematics) is None
+
+    monitor.update([state("A", 0.0), state("B", 0.01)], 11.0)
+    assert monitor.violating_pairs()
+    assert monitor.next_check_seconds(kinematics) is None
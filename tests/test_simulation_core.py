@@ -8,12 +8,19 @@ faithful port (docs/repository-audit/03 §5, 07 Phase 2 parity requirement).
 import pytest
 
 from airspacesim.core import (
+    EventScheduler,
+    RunAccumulator,
+    RunAnalytics,
     SeparationMonitor,
     SeparationStandard,
     Simulation,
     SimulationClock,
 )
-from airspacesim.io.contracts import build_envelope
+from airspacesim.io.contracts import (
+    ValidationError,
+    build_envelope,
+    validate_scenario_aircraft,
+)
 
 
 def _airspace(points, routes):
@@ -67,6 +74,30 @@ def test_clock_advances_and_rejects_negative_steps():
         clock.advance(-1)
 
 
+# ------------------------------------------------------------ scheduler
+
+
+def test_scheduler_pops_due_items_in_time_then_insertion_order():
+    scheduler = EventScheduler()
+    scheduler.schedule(30.0, "command", {"n": 1})
+    scheduler.schedule(10.0, "aircraft_entry", {"n": 2})
+    scheduler.schedule(30.0, "aircraft_entry", {"n": 3})
+    scheduler.schedule(20.0, "command", {"n": 4})
+
+    assert len(scheduler) == 4
+    assert scheduler.count("aircraft_entry") == 2
+    assert scheduler.peek_time() == 10.0
+    assert [item.payload["n"] for item in scheduler.items()] == [2, 4, 1, 3]
+
+    assert [item.payload["n"] for item in scheduler.pop_due(25.0)] == [2, 4]
+    assert [item.payload["n"] for item in scheduler.pop_due(30.0)] == [1, 3]
+    assert not scheduler
+    assert scheduler.count("aircraft_entry") == 0
+    assert scheduler.peek_time() is None
+    with pytest.raises(ValueError):
+        scheduler.schedule(-1.0, "command")
+
+
 # --------------------------------------------------- separation semantics
 
 
@@ -254,6 +285,98 @@ def test_crossing_traffic_produces_one_loss_event_and_commands_are_counted():
     assert simulation.status == "completed"
 
 
+class _StepCounter(RunAccumulator):
+    name = "steps"
+
+    def __init__(self):
+        self.steps = 0
+
+    def observe_step(self, time_seconds, seconds, states, violating_pairs):
+        self.steps += 1
+
+    def export_state(self):
+        return self.steps
+
+    def restore_state(self, state):
+        self.steps = int(state)
+
+
+class _LastEventType(RunAccumulator):
+    name = "last_event"
+
+    def __init__(self):
+        self.event_type = None
+
+    def observe_event(self, event):
+        self.event_type = event.type
+
+    def result(self):
+        return self.event_type
+
+
+def test_accumulators_without_persisted_state_survive_save_state():
+    simulation = Simulation.load_state(
+        _crossing_simulation().save_state(),
+        analytics=RunAnalytics([_LastEventType()]),
+    )
+    while simulation.status != "completed":
+        simulation.step(30.0)
+    assert simulation.analytics_summary() == {"last_event": "simulation_completed"}
+
+    # The base `export_state`/`restore_state` defaults persist nothing, so a
+    # restored copy starts its result afresh rather than failing to save.
+    restored = Simulation.load_state(
+        simulation.save_state(), analytics=RunAnalytics([_LastEventType()])
+    )
+    assert restored.analytics_summary() == {"last_event": None}
+
+
+def test_run_analytics_accumulate_during_stepping_and_survive_save_state():
+    simulation = _crossing_simulation()
+    simulation.issue_command(
+        {
+            "event_id": "c1",
+            "type": "SET_SPEED",
+            "payload": {"aircraft_id": "NVR231", "speed_kt": 440},
+        }
+    )
+    for _ in range(20):
+        simulation.step(30.0)
+    midpoint = simulation.save_state()
+    restored = Simulation.load_state(midpoint)
+    for _ in range(220):
+        simulation.step(30.0)
+        restored.step(30.0)
+
+    analytics = simulation.analytics_summary()
+    assert restored.analytics_summary() == analytics
+    assert analytics["commands_per_aircraft"] == {"NVR231": 1}
+    assert set(analytics["exit_times_seconds"]) == {"NVR231", "SKL842"}
+    exit_seconds = analytics["exit_times_seconds"]["NVR231"]
+    # Within one 30 s tick of 440 kt over the time flown.
+    assert analytics["distance_flown_nm"]["NVR231"] == pytest.approx(
+        440 * exit_seconds / 3600.0, abs=440 * 30 / 3600.0
+    )
+    assert analytics["flight_level_seconds"]["NVR231"] == {
+        "330": pytest.approx(exit_seconds, abs=30.0)
+    }
+    conflict = analytics["time_in_conflict_seconds"]
+    assert conflict["total"] > 0
+    assert conflict["aircraft"] == {
+        "NVR231": conflict["total"],
+        "SKL842": conflict["total"],
+    }
+    closest = analytics["minimum_separation"]["NVR231|SKL842"]
+    assert closest["horizontal_nm"] < simulation.monitor.standard.horizontal_nm
+
+    custom = RunAnalytics([_StepCounter()])
+    counted = Simulation.load_state(midpoint, analytics=custom)
+    counted.step(1.0)
+    assert counted.analytics_summary() == {"steps": 1}
+    with pytest.raises(ValueError):
+        custom.register(_StepCounter())
+
+
 def test_vertical_resolution_prevents_loss_event():
     simulation = _crossing_simulation()
     simulation.issue_command(
@@ -287,6 +410,104 @@ def test_snapshot_reports_active_violation_measurements():
         assert simulation.status != "completed", "never came into violation"
 
 
+def test_scheduled_commands_apply_at_simulated_time_without_a_driver():
+    aircraft = _aircraft(
+        [
+            {
+                "id": "NVR231",
+                "callsign": "NVR231",
+                "aircraft_type": "A320",
+                "route_id": "X1",
+                "speed_kt": 460,
+                "flight_level": 330,
+            },
+            {
+                "id": "SKL842",
+                "callsign": "SKL842",
+                "aircraft_type": "B738",
+                "route_id": "X2",
+                "speed_kt": 430,
+                "flight_level": 330,
+            },
+        ]
+    )
+    aircraft["data"]["scheduled_commands"] = [
+        {
+            "event_id": "s1",
+            "type": "SET_FL",
+            "time_seconds": 60,
+            "payload": {"aircraft_id": "NVR231", "flight_level": 310},
+        }
+    ]
+    validate_scenario_aircraft(aircraft, route_ids={"X1", "X2"})
+    simulation = Simulation.from_contracts(CROSSING_AIRSPACE, aircraft)
+    simulation.drain_events()
+
+    simulation.step(30.0)
+    assert simulation.commands_applied == 0
+    simulation.step(30.0)
+    applied = [
+        event for event in simulation.drain_events() if event.type == "command_applied"
+    ]
+    assert [event.payload["command_id"] for event in applied] == ["s1"]
+    assert applied[0].time_seconds == 60.0
+
+    for _ in range(240):
+        simulation.step(30.0)
+    assert simulation.summary()["loss_of_separation_count"] == 0
+    assert simulation.summary()["instructions_issued"] == 1
+
+
+def test_schedule_command_fires_at_its_time():
+    simulation = _crossing_simulation()
+    simulation.schedule_command(
+        {
+            "event_id": "late",
+            "type": "SET_SPEED",
+            "payload": {"aircraft_id": "NVR231", "speed_kt": 440},
+        },
+        at_seconds=90.0,
+    )
+    simulation.step(60.0)
+    assert simulation.scheduler.count() == 1
+    simulation.step(60.0)
+    assert simulation.scheduler.count() == 0
+    assert simulation.snapshot()["aircraft"][0]["speed_kt"] == 440.0
+
+
+def test_commands_scheduled_after_the_last_exit_do_not_delay_completion():
+    simulation = _crossing_simulation()
+    simulation.schedule_command(
+        {
+            "event_id": "after-exit",
+            "type": "SET_SPEED",
+            "payload": {"aircraft_id": "NVR231", "speed_kt": 440},
+        },
+        at_seconds=36_000.0,
+    )
+    while simulation.status != "completed" and simulation.clock.now_seconds < 36_000.0:
+        simulation.step(30.0)
+
+    events = simulation.drain_events()
+    last_exit = max(
+        event.time_seconds for event in events if event.type == "aircraft_exited"
+    )
+    assert events[-1].type == "simulation_completed"
+    assert events[-1].time_seconds == last_exit
+    assert simulation.commands_applied == 0
+
+
+def test_scheduled_command_contract_is_validated():
+    aircraft = _aircraft(
+        [{"id": "A", "route_id": "X1", "speed_kt": 400}]
+    )
+    aircraft["data"]["scheduled_commands"] = [
+        {"event_id": "bad", "type": "SET_FL", "time_seconds": -5, "payload": {}}
+    ]
+    with pytest.raises(ValidationError, match="time_seconds"):
+        validate_scenario_aircraft(aircraft)
+
+
 def test_simulation_requires_batched_manager():
     from airspacesim.simulation.aircraft_manager import AircraftManager
 